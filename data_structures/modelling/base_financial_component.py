@@ -71,7 +71,8 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
 
     BaseFinancialComponents provide ordered views of their contents on demand
     through get_ordered(). The ordered view is a list of details sorted by
-    their relative position.
+    their relative position. Instance caches the sorted view and a name index
+    for find_first() and find_all() until details are added, removed or moved.
 
     Positions should be integers GTE 0. Positions can (and usually should) be
     non-consecutive. You can specify your own positions when adding a detail or
@@ -129,6 +130,10 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
         self._restricted = False  # whether user can modify structure,
         self._period = period
 
+        # lookup caches, rebuilt on demand after any change to details
+        self._name_index = None
+        self._ordered = None
+
     def __eq__(self, comparator, trace=False, tab_width=4):
         """
 
@@ -392,6 +397,8 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
             result.set_period(None)
 
         result._consolidated = False
+        result._name_index = None
+        result._ordered = None
         result.tags = self.tags.copy()
         result.relationships = self.relationships.copy()
 
@@ -473,6 +480,8 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
         if remove:
             root = self._details.pop(caseless_root_name, None)
             # Pull root out of details
+            if root:
+                self._clear_lookup_cache()
         else:
             root = self._details.get(caseless_root_name)
             # Keep root in details
@@ -487,12 +496,25 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
                 # Nothing left, at the final node
                 node = root
                 result.append(node)
-        else:
+        elif remove:
             for detail in self.get_ordered():
                 lower_nodes = detail.find_all(*ancestor_tree, remove=remove)
                 if lower_nodes:
                     result.extend(lower_nodes)
                     continue
+        elif len(ancestor_tree) == 1:
+            # index holds exactly what the depth-first walk would return
+            lower_nodes = self._get_name_index().get(caseless_root_name)
+            if lower_nodes:
+                result.extend(lower_nodes)
+        elif caseless_root_name in self._get_name_index():
+            for detail in self.get_ordered():
+                if caseless_root_name not in detail._get_name_index():
+                    continue
+
+                lower_nodes = detail.find_all(*ancestor_tree)
+                if lower_nodes:
+                    result.extend(lower_nodes)
 
         return result
 
@@ -533,6 +555,8 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
         if remove:
             root = self._details.pop(caseless_root_name, None)
             # Pull root out of details
+            if root:
+                self._clear_lookup_cache()
         else:
             root = self._details.get(caseless_root_name)
             # Keep root in details
@@ -545,7 +569,7 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
                 result = root
                 # Caller specified one criteria and we matched it. Stop work.
 
-        else:
+        elif remove:
             for detail in self.get_ordered():
                 result = detail.find_first(*ancestor_tree, remove=remove)
                 if result is not None:
@@ -553,6 +577,22 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
                 else:
                     continue
 
+        elif len(ancestor_tree) == 1:
+            # first entry in the index is the first hit of a depth-first walk
+            matches = self._get_name_index().get(caseless_root_name)
+            if matches:
+                result = matches[0]
+
+        elif caseless_root_name in self._get_name_index():
+            # only walk into details that contain the root somewhere
+            for detail in self.get_ordered():
+                if caseless_root_name not in detail._get_name_index():
+                    continue
+
+                result = detail.find_first(*ancestor_tree)
+                if result is not None:
+                    break
+
         return result
 
     def get_full_ordered(self):
@@ -585,9 +625,15 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
         BaseFinancialComponent.get_ordered() -> list
 
 
-        Return a list of details in order of relative position.
+        Return a list of details in order of relative position. Method sorts
+        details once and serves copies of the cached list until they change.
         """
-        result = sorted(self._details.values(), key=lambda line: line.position)
+        if self._ordered is None:
+            self._ordered = sorted(
+                self._details.values(), key=lambda line: line.position
+            )
+
+        result = self._ordered[:]
         return result
 
     def increment(self, matching_statement, consolidating=False, xl_label=None,
@@ -780,11 +826,57 @@ class BaseFinancialsComponent(Equalities, TagsMixIn):
             line.register(namespace=self.id.namespace)
 
         self._details[line.tags.name] = line
+        self._clear_lookup_cache()
 
         if not noclear and self.model is not None:
             # the only time we would ever not do this is on a copy call
             self.model.clear_fins_storage()
 
+    def _clear_lookup_cache(self):
+        """
+
+
+        BaseFinancialComponent._clear_lookup_cache() -> None
+
+
+        Drop cached ordered view and name index on instance and on every
+        ancestor component, whose indices cover instance details.
+        """
+        component = self
+        while isinstance(component, BaseFinancialsComponent):
+            component._name_index = None
+            component._ordered = None
+            component = component.relationships.parent
+
+    def _get_name_index(self):
+        """
+
+
+        BaseFinancialComponent._get_name_index() -> dict
+
+
+        Return dictionary of caseless name : list of matching lines, in the
+        order find_all() would return them. Own details shadow lines of the
+        same name further down, same as in find_all(). Method builds the index
+        from detail indices on first call after a change.
+        """
+        if self._name_index is None:
+            index = dict()
+            for detail in self.get_ordered():
+                get_index = getattr(detail, '_get_name_index', None)
+                if get_index is None:
+                    continue
+
+                for name, lines in get_index().items():
+                    index.setdefault(name, list()).extend(lines)
+
+            for name, detail in self._details.items():
+                index[name] = [detail]
+
+            self._name_index = index
+
+        return self._name_index
+
     def _inspect_line_for_insertion(self, line):
         """
 
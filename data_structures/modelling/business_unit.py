@@ -46,6 +46,7 @@ from . import common_events
 
 from .financials import Financials
 from .components import Components
+from .consolidation_plan import ConsolidationPlan
 from .equalities import Equalities
 from .life import Life as LifeCycle
 from .parameters import Parameters
@@ -102,6 +103,7 @@ class BusinessUnit(TagsMixIn, Equalities):
     kill()                make dead, optionally recursive
     make_past()           put a younger version of financials in prior period
     recalculate()         reset financials, compute again, repeat for future
+    recalculate_dirty()   recompute only dirty units and their consumers
     reset_financials()    resets instance and (optionally) component financials
     set_financials()      attaches a Financials object from the right template
     synchronize()         set components to same life, optionally recursive
@@ -121,6 +123,7 @@ class BusinessUnit(TagsMixIn, Equalities):
         TagsMixIn.__init__(self, name)
 
         self._parameters = Parameters()
+        self._parameter_cache = None
         self._type = None
         self.id = ID()
         self.life = LifeCycle()
@@ -482,7 +485,7 @@ class BusinessUnit(TagsMixIn, Equalities):
         if not period:
             period = self.relationships.model.get_timeline().current_period
 
-        for unit in self.components.get_all():
+        for unit in self._get_fill_pool():
             unit.compute(statement_name, period=period)
 
         self._consolidate(statement_name, period)
@@ -542,6 +545,7 @@ class BusinessUnit(TagsMixIn, Equalities):
         result.summary = None
         result.valuation = None
         result._parameters = self._parameters.copy()
+        result._parameter_cache = None
 
         result._stage = None
         result.used = set()
@@ -666,6 +670,48 @@ class BusinessUnit(TagsMixIn, Equalities):
         if adjust_future and period and period.future:
             self.recalculate(adjust_future=True, period=period.future)
 
+    def recalculate_dirty(self, period=None):
+        """
+
+
+        BusinessUnit.recalculate_dirty() -> None
+
+        --``period`` is the first TimePeriod to recompute, defaults to current
+
+        Recompute only the units marked dirty on model.dependencies, plus every
+        unit that consolidates them, in ``period`` and all future periods.
+        Financials of other units are left as they are and consolidated as is.
+
+        Method falls back to recalculate() if tracking is off or the tracker is
+        stale.
+        """
+        model = self.relationships.model
+        tracker = model.dependencies
+        if not period:
+            period = self.get_current_period()
+
+        if tracker.stale or not tracker.enabled:
+            tracker.reset()
+            self.recalculate(adjust_future=True, period=period)
+            return
+
+        while period:
+            scope = tracker.get_scope(model, period.end)
+            if self.id.bbid in scope:
+                for bbid in scope:
+                    unit = model.bu_directory[bbid]
+                    unit._clear_period_financials(period)
+
+                tracker.scope = scope
+                try:
+                    self.fill_out(period=period)
+                finally:
+                    tracker.scope = None
+
+            period = period.future
+
+        tracker.clear_dirty()
+
     def recompute(self, statement_name, period=None, adjust_future=True):
         """
 
@@ -820,7 +866,11 @@ class BusinessUnit(TagsMixIn, Equalities):
             # make sure balance sheets have matching structures
             self.financials.check_balance_sheets()
 
-            fins = self.financials.copy(clean=True)
+            # populate_from_stored_values() replaces the starting balance
+            # sheet whenever there is a prior period, so skip copying it
+            fins = self.financials.copy(
+                clean=True, with_starting=period.past is None
+            )
             fins.relationships.set_parent(self)
             fins.period = period
             fins.populate_from_stored_values(period)
@@ -834,6 +884,9 @@ class BusinessUnit(TagsMixIn, Equalities):
 
             period.financials[self.id.bbid] = fins
 
+            if model:
+                model.period_cache.touch(period)
+
         return fins
     
     def get_parameters(self, period=None):
@@ -849,18 +902,8 @@ class BusinessUnit(TagsMixIn, Equalities):
         """
         if not period:
             period = self.get_current_period()
-        time_line = period.relationships.parent
 
-        # Specific parameters trump general ones. Start with time_line, then
-        # update for period (more specific). Driver trumps with own parameters.
-        params = dict()
-        if hasattr(time_line, 'parameters'):
-            params.update(time_line.parameters)
-        if hasattr(period, 'parameters'):
-            params.update(period.parameters)
-        params.update(self._parameters)
-        if hasattr(period, 'unit_parameters'):
-            params.update(period.unit_parameters.get(self.id.bbid, {}))
+        params = dict(self._get_parameter_layers(period))
 
         return params
 
@@ -878,7 +921,7 @@ class BusinessUnit(TagsMixIn, Equalities):
         balance to keep layout consistent.
         """
 
-        pool = self.components.get_all()
+        pool = self._get_fill_pool()
         for unit in pool:
             unit._check_start_balance(period)
 
@@ -895,6 +938,29 @@ class BusinessUnit(TagsMixIn, Equalities):
                     noclear=True
                 )
 
+    def _clear_period_financials(self, period):
+        """
+
+
+        BusinessUnit._clear_period_financials() -> None
+
+        --``period`` is a TimePeriod
+
+        Method drops instance financials from ``period`` and erases stored
+        values for instance lines, except hardcoded ones and those on the
+        starting balance sheet (which belong to the prior period). Next call
+        to get_financials() rebuilds the financials from the template.
+        """
+        period.financials.pop(self.id.bbid, None)
+
+        bbid_hexes = list()
+        for statement in self.financials.full_ordered:
+            if statement and statement is not self.financials.starting:
+                for line in statement.get_full_ordered():
+                    bbid_hexes.append(line.id.bbid.hex)
+
+        period.clear_lines(bbid_hexes)
+
     def _check_line(self, start_line, end_line):
         """
 
@@ -926,7 +992,7 @@ class BusinessUnit(TagsMixIn, Equalities):
         consolidation logic, updates balance sheets, then runs derivation logic.
         """
 
-        for unit in self.components.get_all():
+        for unit in self._get_fill_pool():
             unit._compute_ending_balance(period)
 
         financials = self.get_financials(period)
@@ -992,7 +1058,24 @@ class BusinessUnit(TagsMixIn, Equalities):
         if struct:
             xl_only = False
 
-        if sub_statement and top_statement:
+        if period and not struct:
+            model = self.relationships.model
+            model.dependencies.record_consolidation(sub.id.bbid, self.id.bbid)
+
+        plan = None
+        if sub_statement and top_statement and period and not struct:
+            plan = self._get_consolidation_plan(
+                sub, statement_name, sub_statement, top_statement
+            )
+
+        if plan:
+            plan.replay(
+                sub_statement,
+                top_statement,
+                xl_only=xl_only,
+                xl_label=sub.title,
+            )
+        elif sub_statement and top_statement:
             top_statement.increment(
                 sub_statement,
                 consolidating=True,
@@ -1049,8 +1132,119 @@ class BusinessUnit(TagsMixIn, Equalities):
         # look for drivers based on line name, line parent name, all line tags
         driver = line.get_driver()
         if driver:
+            model = self.relationships.model
+            model.dependencies.record_driver(driver.id.bbid, self.id.bbid)
+
             driver.workOnThis(line, bu=self, period=period)
 
+    def _get_consolidation_plan(self, sub, statement_name, sub_statement,
+                                top_statement):
+        """
+
+
+        BusinessUnit._get_consolidation_plan() -> ConsolidationPlan or None
+
+        --``sub`` is the BusinessUnit being consolidated
+        --``statement_name`` is the name of the financial statement
+        --``sub_statement`` is the period statement of ``sub``
+        --``top_statement`` is the period statement of instance
+
+        Method returns the plan for consolidating ``sub`` into instance,
+        compiling it on first use. Plans live on the model until the next
+        structure change. Method returns None if the statements cannot be
+        consolidated with a plan.
+        """
+        plans = self.relationships.model.consolidation_plans
+        key = (self.id.bbid, sub.id.bbid, statement_name)
+
+        plan = plans.get(key)
+        if plan is None or not plan.fits(sub_statement, top_statement):
+            plan = ConsolidationPlan.compile(sub_statement, top_statement)
+            plans[key] = plan
+
+        return plan
+
+    def _get_parameter_layers(self, period):
+        """
+
+
+        BusinessUnit._get_parameter_layers() -> dict
+
+        --``period`` TimePeriod
+
+        Method returns the merged parameters for ``period`` as a shared dict
+        that callers must not modify. Method keeps the last result and reuses
+        it until the period or the version of any layer changes. Layers that
+        are not Parameters objects cannot report changes, so they are merged
+        anew on every call.
+        """
+        time_line = period.relationships.parent
+
+        # Specific parameters trump general ones. Start with time_line, then
+        # update for period (more specific). Driver trumps with own parameters.
+        layers = list()
+        if hasattr(time_line, 'parameters'):
+            layers.append(time_line.parameters)
+        if hasattr(period, 'parameters'):
+            layers.append(period.parameters)
+        layers.append(self._parameters)
+
+        watched = list(layers)
+        if hasattr(period, 'unit_parameters'):
+            # outer dict tells us if the unit entry comes or goes
+            watched.append(period.unit_parameters)
+            unit_params = period.unit_parameters.get(self.id.bbid)
+            if unit_params is not None:
+                layers.append(unit_params)
+                watched.append(unit_params)
+
+        stamp = list()
+        for layer in watched:
+            if not isinstance(layer, Parameters):
+                stamp = None
+                break
+            stamp.append(layer.version)
+
+        cache = self._parameter_cache
+        if stamp is not None and cache is not None:
+            cached_period, cached_stamp, cached_params = cache
+            if cached_period is period and cached_stamp == stamp:
+                return cached_params
+
+        params = dict()
+        for layer in layers:
+            params.update(layer)
+
+        if stamp is not None:
+            self._parameter_cache = (period, stamp, params)
+
+        return params
+
+    def _get_fill_pool(self, ordered=False):
+        """
+
+
+        BusinessUnit._get_fill_pool() -> list
+
+        --``ordered`` bool; if True, return components in stable order
+
+        Method returns the components that fill_out() should recurse into.
+        During recalculate_dirty(), that is only the components within the
+        recalculation scope; otherwise it is all components.
+        """
+        if ordered:
+            pool = self.components.get_ordered()
+        else:
+            pool = self.components.get_all()
+
+        model = self.relationships.model
+        if model is not None:
+            scope = model.dependencies.scope
+            if scope is not None:
+                pool = [unit for unit in pool if unit.id.bbid in scope]
+
+        return pool
+
     def _load_starting_balance(self, period):
         """
 
@@ -1062,7 +1256,7 @@ class BusinessUnit(TagsMixIn, Equalities):
         ending balance sheet.
         """
 
-        pool = self.components.get_ordered()
+        pool = self._get_fill_pool(ordered=True)
         # Need stable order to make sure we pick up peer lines from units in
         # the same order. Otherwise, their order might switch and financials
         # would look different (even though the bottom line would be the same).
@@ -0,0 +1,285 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.consolidation_plan
+"""
+
+Module defines ConsolidationPlan, a precompiled list of line operations that
+consolidates one statement into another without name lookups.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+n/a
+
+CLASSES:
+ConsolidationPlan     flat list of line operations for Statement.increment()
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import bb_settings
+
+from .line_item import SPECIAL_CONSOLIDATION_LINE_PREFIX
+from .line_item import SPECIAL_CONSOLIDATION_LINE_SUFFIX
+
+
+
+
+# Constants
+# n/a
+
+# Classes
+class ConsolidationPlan:
+    """
+
+    ConsolidationPlan captures what Statement.increment() does when it
+    consolidates one statement into another, as a flat list of operations on
+    line indices. Period financials are all copies of the same template, so a
+    plan compiled in one period replays in every other period with the same
+    structure, skipping the name matching, consolidation line naming and
+    screening that increment() repeats for every line.
+
+    A plan only covers consolidation into existing lines. If the source
+    statement carries a line that increment() would copy into the target,
+    compile() returns None and callers should use increment() instead.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    operations            list of (source, target, consolidation line) indices
+    source_shape          tuple of (bbid, name) for each line in source
+    target_shape          tuple of (bbid, name) for each line in target
+
+    FUNCTIONS:
+    compile()             class method, returns plan for two statements or None
+    fits()                returns True if plan applies to two statements
+    replay()              consolidates source statement into target statement
+    ====================  ======================================================
+    """
+    def __init__(self):
+        self.operations = list()
+        self.source_shape = tuple()
+        self.target_shape = tuple()
+
+    @classmethod
+    def compile(cls, sub_statement, top_statement):
+        """
+
+
+        ConsolidationPlan.compile() -> ConsolidationPlan or None
+
+        --``sub_statement`` is the Statement being consolidated
+        --``top_statement`` is the Statement receiving the values
+
+        Method walks both statements the same way Statement.increment() does
+        and records each line operation. Method returns None if the
+        consolidation would change the structure of ``top_statement``.
+        """
+        source = cls._flatten(sub_statement)
+        target = cls._flatten(top_statement)
+
+        plan = cls()
+        plan.source_shape = cls._get_shape(source)
+        plan.target_shape = cls._get_shape(target)
+
+        source_index = {id(line): i for i, line in enumerate(source)}
+        target_index = {id(line): i for i, line in enumerate(target)}
+
+        try:
+            plan._add_component(
+                top_statement, sub_statement, source_index, target_index
+            )
+        except LookupError:
+            plan = None
+
+        return plan
+
+    def fits(self, sub_statement, top_statement):
+        """
+
+
+        ConsolidationPlan.fits() -> bool
+
+        --``sub_statement`` is the Statement being consolidated
+        --``top_statement`` is the Statement receiving the values
+
+        Method returns True if both statements hold the same lines, in the
+        same order, as the statements instance was compiled for. Lines match
+        on bbid and name, so a line swapped for another at the same position
+        does not fit.
+        """
+        source = self._get_shape(self._flatten(sub_statement))
+        result = source == self.source_shape
+        if result:
+            target = self._get_shape(self._flatten(top_statement))
+            result = target == self.target_shape
+
+        return result
+
+    def replay(self, sub_statement, top_statement, xl_only=False,
+               xl_label=None):
+        """
+
+
+        ConsolidationPlan.replay() -> None
+
+        --``sub_statement`` is the Statement being consolidated
+        --``top_statement`` is the Statement receiving the values
+        --``xl_only`` bool; if True, only record Excel consolidation sources
+        --``xl_label`` is the label for the Excel consolidation sources
+
+        Method consolidates values from ``sub_statement`` into
+        ``top_statement`` with the same results as
+        Statement.increment(consolidating=True).
+        """
+        source = self._flatten(sub_statement)
+        target = self._flatten(top_statement)
+
+        for source_i, target_i, con_i in self.operations:
+            external_line = source[source_i]
+            own_line = target[target_i]
+
+            if external_line.value is None:
+                own_line.xl_data.add_consolidated_source(
+                    external_line, label=xl_label
+                )
+                continue
+
+            label = xl_label
+            if con_i is not None:
+                # LineItem.increment() does not pass the label down to the
+                # consolidation line
+                own_line = target[con_i]
+                label = None
+                if not own_line.consolidate:
+                    continue
+
+            new_value = own_line.increment_value(external_line)
+
+            if not xl_only:
+                own_line.set_value(
+                    new_value, own_line.SIGNATURE_FOR_INCREMENTATION,
+                    override=True
+                )
+                own_line.tags.inherit_from(external_line.tags)
+                own_line._consolidated = True
+
+            own_line.xl_data.add_consolidated_source(external_line, label=label)
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _add_component(self, own, external, source_index, target_index):
+        """
+
+
+        ConsolidationPlan._add_component() -> None
+
+        --``own`` is the Statement or LineItem receiving values
+        --``external`` is the matching Statement or LineItem
+        --``source_index`` is a dict of id(line) : position in source
+        --``target_index`` is a dict of id(line) : position in target
+
+        Method mirrors BaseFinancialsComponent.increment(). Method raises
+        LookupError if increment() would add a line to ``own``.
+        """
+        if bb_settings.DEBUG_MODE:
+            pool = external._get_ordered_items_debug()
+        else:
+            pool = external._details.items()
+
+        for name, external_line in pool:
+            own_line = own._details.get(name)
+
+            if own_line is None:
+                if external_line.consolidate:
+                    raise LookupError(name)
+            elif own_line.consolidate:
+                self._add_line(
+                    own_line, external_line, source_index, target_index
+                )
+
+    def _add_line(self, own_line, external_line, source_index, target_index):
+        """
+
+
+        ConsolidationPlan._add_line() -> None
+
+        --``own_line`` is the LineItem receiving values
+        --``external_line`` is the matching LineItem
+        --``source_index`` is a dict of id(line) : position in source
+        --``target_index`` is a dict of id(line) : position in target
+
+        Method mirrors LineItem.increment(). Method records an operation, or
+        recurses into details if ``external_line`` sends them along. Method
+        raises LookupError if increment() would add a consolidation line.
+        """
+        if external_line._details and external_line.include_details:
+            self._add_component(
+                own_line, external_line, source_index, target_index
+            )
+            return
+
+        con_i = None
+        if own_line._details:
+            con_line_name = SPECIAL_CONSOLIDATION_LINE_PREFIX
+            con_line_name += external_line.name
+            con_line_name += SPECIAL_CONSOLIDATION_LINE_SUFFIX
+
+            con_line = own_line._details.get(con_line_name)
+            if con_line is None or con_line._details:
+                raise LookupError(con_line_name)
+
+            con_i = target_index[id(con_line)]
+
+        operation = (
+            source_index[id(external_line)],
+            target_index[id(own_line)],
+            con_i,
+        )
+        self.operations.append(operation)
+
+    @staticmethod
+    def _flatten(component):
+        """
+
+
+        ConsolidationPlan._flatten() -> list
+
+        --``component`` is a Statement or LineItem
+
+        Method returns every line under ``component``, depth-first, in
+        storage order. Copies of the same statement flatten the same way.
+        """
+        result = list()
+        for line in component._details.values():
+            result.append(line)
+            if line._details:
+                result.extend(ConsolidationPlan._flatten(line))
+
+        return result
+
+    @staticmethod
+    def _get_shape(lines):
+        """
+
+
+        ConsolidationPlan._get_shape() -> tuple
+
+        --``lines`` is a list of LineItems, as returned by _flatten()
+
+        Method returns a tuple of (bbid, name) for each line, in order.
+        """
+        return tuple((line.id.bbid, line.name) for line in lines)
@@ -163,6 +163,6 @@ class Container:
 
         Method removes obj with given BBID.
         """
-        obj = self.directory.pop(id, None)
+        obj = self.directory.pop(bbid, None)
         if obj:
-            self.by_name.pop(obj.name)
+            self.by_name.pop(obj.name.casefold(), None)
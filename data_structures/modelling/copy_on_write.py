@@ -0,0 +1,234 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.modelling.copy_on_write
+"""
+
+Module defines SharedView, a stand-in for an attribute that an object still
+shares with the object it was copied from. Reads go straight to the shared
+object. The first write, through the view or through any view of a nested
+object, makes the owner copy the attribute and applies the write to the copy.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+READ_METHODS          frozenset; method names that never change their instance
+
+FUNCTIONS:
+n/a
+
+CLASSES:
+SharedView            read-through, copy-on-write view of a shared attribute
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import copy
+
+
+
+
+# Constants
+READ_METHODS = frozenset([
+    'copy', 'count_asked', 'get', 'items', 'keys', 'to_database', 'values',
+])
+# Calling these through a view runs them on the shared object, without a copy.
+# Any other method call counts as a write.
+
+_CONTAINERS = (dict, list, set)
+
+# Classes
+class SharedView:
+    """
+
+    SharedView stands in for attribute ``name`` of ``owner`` while the owner
+    still shares it, or for an object nested in that attribute at ``path``.
+    Owner must provide _get_source(name), which returns the object the
+    attribute currently reads from, and _get_own(name), which copies a shared
+    attribute if necessary and returns the owner's own object.
+
+    Views resolve the path on every use, so a view obtained before the owner
+    copied the attribute keeps working on the copy afterwards. Stored
+    containers and objects read through a view come back as views too, so
+    writes such as line.guide.quality.increment() or
+    line.xl_format.font_format['bold'] = True reach the owner's copy. Values
+    computed by properties, numbers and strings come back as they are.
+    isinstance() and type checks through ``__class__`` see the class of the
+    shared object.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    n/a
+
+    FUNCTIONS:
+    n/a
+    ====================  ======================================================
+    """
+    __slots__ = ('_owner', '_name', '_path')
+
+    def __init__(self, owner, name, path=()):
+        object.__setattr__(self, '_owner', owner)
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_path', path)
+
+    @property
+    def __class__(self):
+        return type(self._resolve())
+
+    def __getattr__(self, attr):
+        target = self._resolve()
+        value = getattr(target, attr)
+
+        if callable(value):
+            if attr in READ_METHODS:
+                return value
+            return self._get_writer(attr)
+
+        if attr in getattr(target, '__dict__', ()):
+            return self._wrap(('attr', attr), value)
+
+        return value
+
+    def __setattr__(self, attr, value):
+        setattr(self._own(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._own(), attr)
+
+    def __getitem__(self, key):
+        return self._wrap(('item', key), self._resolve()[key])
+
+    def __setitem__(self, key, value):
+        self._own()[key] = value
+
+    def __delitem__(self, key):
+        del self._own()[key]
+
+    def __contains__(self, item):
+        return item in self._resolve()
+
+    def __iter__(self):
+        target = self._resolve()
+        if isinstance(target, list):
+            return iter([
+                self._wrap(('item', i), v) for i, v in enumerate(target)
+            ])
+
+        return iter(target)
+
+    def __len__(self):
+        return len(self._resolve())
+
+    def __bool__(self):
+        return bool(self._resolve())
+
+    def __eq__(self, other):
+        if isinstance(other, SharedView):
+            other = other._resolve()
+
+        return self._resolve() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._resolve())
+
+    def __repr__(self):
+        return repr(self._resolve())
+
+    def __copy__(self):
+        return copy.copy(self._resolve())
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._resolve(), memo)
+
+    def __reduce_ex__(self, protocol):
+        return SharedView, (self._owner, self._name, self._path)
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _get_writer(self, attr):
+        """
+
+
+        SharedView._get_writer() -> function
+
+        --``attr`` is the name of a method
+
+        Method returns a function that calls method ``attr`` on the owner's
+        own copy.
+        """
+        def write(*args, **kwargs):
+            return getattr(self._own(), attr)(*args, **kwargs)
+
+        return write
+
+    def _own(self):
+        """
+
+
+        SharedView._own() -> obj
+
+        Method makes the owner copy the attribute if it still shares it, then
+        returns the object at the view's path in the owner's copy.
+        """
+        return self._walk(self._owner._get_own(self._name))
+
+    def _resolve(self):
+        """
+
+
+        SharedView._resolve() -> obj
+
+        Method returns the object the view currently reads from.
+        """
+        return self._walk(self._owner._get_source(self._name))
+
+    def _walk(self, obj):
+        """
+
+
+        SharedView._walk() -> obj
+
+        --``obj`` is the attribute the view belongs to
+
+        Method follows the view's path from ``obj``.
+        """
+        for kind, step in self._path:
+            if kind == 'attr':
+                obj = getattr(obj, step)
+            else:
+                obj = obj[step]
+
+        return obj
+
+    def _wrap(self, step, value):
+        """
+
+
+        SharedView._wrap() -> obj
+
+        --``step`` is a tuple of ('attr', name) or ('item', key)
+        --``value`` is the object found at ``step``
+
+        Method returns a view of ``value`` if writing to it would change the
+        shared object, and ``value`` itself otherwise.
+        """
+        if isinstance(value, _CONTAINERS) or (
+            hasattr(value, '__dict__') and not callable(value)
+        ):
+            return SharedView(self._owner, self._name, self._path + (step,))
+
+        return value
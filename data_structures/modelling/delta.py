@@ -0,0 +1,492 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.delta
+"""
+
+Module splits a flat model from Model.to_database() into fragments (one per
+business unit, time line header and period, plus one per remaining top-level
+key) and tracks which fragments changed since a recorded base version.
+Fragments also frame the streaming format: one JSON line per fragment.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+DIGESTS_KEY           str; flat model key for fragment digests of a version
+VERSION_KEY           str; flat model key for the version of a flat model
+
+FUNCTIONS:
+apply_delta()         returns flat model with a delta applied
+dump_fragment()       writes one fragment to a text stream as a JSON line
+get_digest()          returns a stable digest of a fragment
+get_fragment_kind()   returns the kind of fragment a key refers to
+get_period_key()      returns the fragment key of a period
+iter_fragments()      yields fragments of a flat model, lazily
+join_fragments()      rebuilds a flat model from fragments
+load_fragments()      yields fragments read from a text stream
+split_fragments()     splits a flat model into fragments
+
+CLASSES:
+DeltaTracker          remembers fragment digests and period state of a base
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import hashlib
+import json
+import uuid
+
+from collections import OrderedDict
+
+from .parameters import Parameters
+
+
+
+
+# Constants
+DIGESTS_KEY = 'delta_digests'
+VERSION_KEY = 'delta_version'
+
+_SEP = '|'
+
+_MODEL = 'model'
+_PERIOD = 'period'
+_TAXO_UNIT = 'taxo'
+_TIMELINE = 'timeline'
+_UNIT = 'unit'
+
+# Functions
+def apply_delta(flat_model, delta):
+    """
+
+
+    apply_delta() -> dict
+
+    --``flat_model`` is the flat model of the delta's base version
+    --``delta`` is a dict returned by Model.to_delta()
+
+    Function returns a new flat model with the fragments in ``delta``
+    replaced or removed. Function raises ValueError if ``flat_model`` is not
+    the version ``delta`` was taken against.
+    """
+    if flat_model.get(VERSION_KEY) != delta['base']:
+        c = "Delta applies to version %s, model is version %s" % (
+            delta['base'], flat_model.get(VERSION_KEY)
+        )
+        raise ValueError(c)
+
+    fragments = split_fragments(flat_model)
+    digests = dict(flat_model.get(DIGESTS_KEY) or dict())
+
+    for key in delta['removed']:
+        fragments.pop(key, None)
+        digests.pop(key, None)
+
+    fragments.update(delta['changed'])
+    digests.update(delta['digests'])
+
+    result = join_fragments(fragments)
+    result[VERSION_KEY] = delta['version']
+    result[DIGESTS_KEY] = digests
+
+    return result
+
+
+def dump_fragment(stream, key, fragment):
+    """
+
+
+    dump_fragment() -> None
+
+    --``stream`` is a writable text file-like object
+    --``key`` is a fragment key, or VERSION_KEY or DIGESTS_KEY
+    --``fragment`` is a plain value from a flat model
+
+    Function writes ``key`` and ``fragment`` as one line of JSON. Dates and
+    other values json cannot write go out as strings, as they do to Portal.
+    """
+    stream.write(json.dumps([key, fragment], default=str))
+    stream.write('\n')
+
+
+def get_digest(fragment):
+    """
+
+
+    get_digest() -> str
+
+    --``fragment`` is a plain value from a flat model
+
+    Function returns a hex digest of ``fragment``. Equal fragments always get
+    the same digest.
+    """
+    try:
+        text = json.dumps(fragment, sort_keys=True, default=str)
+    except TypeError:
+        # keys that json cannot sort or write
+        text = repr(fragment)
+
+    result = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    return result
+
+
+def get_fragment_kind(key):
+    """
+
+
+    get_fragment_kind() -> str
+
+    --``key`` is a fragment key
+
+    Function returns 'model', 'unit', 'taxo', 'timeline' or 'period'.
+    """
+    return key.partition(_SEP)[0]
+
+
+def get_period_key(resolution, name, end):
+    """
+
+
+    get_period_key() -> str
+
+    --``resolution`` is the resolution of the period's time line
+    --``name`` is the name of the period's time line
+    --``end`` is the period end date, as a date or ISO string
+
+    Function returns the fragment key of a period.
+    """
+    return _SEP.join((_PERIOD, resolution, name, format(end)))
+
+
+def iter_fragments(flat_model):
+    """
+
+
+    iter_fragments() -> iter
+
+    --``flat_model`` is a dict returned by Model.to_database(); business
+    units, time lines and periods may be given as generators
+
+    Function yields (fragment key, fragment) tuples: top-level values first,
+    then units, then each time line header followed by its periods. Function
+    leaves out the delta version and digests, and pulls from generators in
+    ``flat_model`` only as fragments are consumed.
+    """
+    for k, v in flat_model.items():
+        if k in ('business_units', 'timelines', VERSION_KEY, DIGESTS_KEY):
+            continue
+        yield _SEP.join((_MODEL, k)), v
+
+    for flat_unit in flat_model.get('business_units') or list():
+        kind = _TAXO_UNIT if flat_unit.get('taxonomy') else _UNIT
+        yield _SEP.join((kind, flat_unit['bbid'])), flat_unit
+
+    for flat_line in flat_model.get('timelines') or list():
+        resolution = flat_line['resolution']
+        name = flat_line['name']
+
+        header = dict(flat_line)
+        flat_periods = header.pop('periods')
+        yield _SEP.join((_TIMELINE, resolution, name)), header
+
+        for flat_period in flat_periods:
+            key = get_period_key(resolution, name, flat_period['period_end'])
+            yield key, flat_period
+
+
+def join_fragments(fragments):
+    """
+
+
+    join_fragments() -> dict
+
+    --``fragments`` is a dict of fragment key : fragment
+
+    Function rebuilds a flat model from fragments returned by
+    split_fragments(). Periods follow their time line header.
+    """
+    result = dict()
+    units = list()
+    timelines = OrderedDict()
+    periods = OrderedDict()
+
+    for key, fragment in fragments.items():
+        kind, _, rest = key.partition(_SEP)
+        if kind == _MODEL:
+            result[rest] = fragment
+        elif kind in (_UNIT, _TAXO_UNIT):
+            units.append(fragment)
+        elif kind == _TIMELINE:
+            timelines[rest] = dict(fragment)
+        elif kind == _PERIOD:
+            line_key = rest.rpartition(_SEP)[0]
+            periods.setdefault(line_key, list()).append(fragment)
+
+    for line_key, flat_line in timelines.items():
+        flat_line['periods'] = periods.get(line_key, list())
+
+    result['business_units'] = units
+    result['timelines'] = list(timelines.values())
+
+    return result
+
+
+def load_fragments(stream):
+    """
+
+
+    load_fragments() -> iter
+
+    --``stream`` is a readable text file-like object
+
+    Function yields (key, fragment) tuples written by dump_fragment(), one
+    line at a time.
+    """
+    for line in stream:
+        if line.strip():
+            key, fragment = json.loads(line)
+            yield key, fragment
+
+
+def split_fragments(flat_model):
+    """
+
+
+    split_fragments() -> OrderedDict
+
+    --``flat_model`` is a dict returned by Model.to_database()
+
+    Function returns an ordered dict of fragment key : fragment. Function
+    leaves out the delta version and digests.
+    """
+    return OrderedDict(iter_fragments(flat_model))
+
+
+# Classes
+class DeltaTracker:
+    """
+
+    DeltaTracker remembers the fragment digests of the last version of a
+    model that was written out in full or as a delta, so Model.to_delta() can
+    emit only fragments that changed since.
+
+    Units, time line headers, drivers, the taxonomy and the other top-level
+    values are compared by digest. Periods hold most of the volume, so the
+    tracker also remembers their state; a period that is not ``dirty`` and
+    whose parameters and tags kept their versions is not serialized at all.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    digests               dict; fragment key : digest at version
+    stamps                dict; period fragment key : period state at version
+    version               str; version of the last recorded model, or None
+
+    FUNCTIONS:
+    diff()                returns delta between fragments and recorded version
+    get_clean()           returns keys of periods unchanged since version
+    load()                adopts a version read from the database
+    record()              adopts a freshly serialized model as the version
+    record_digests()      adopts fragment digests of a written model
+    ====================  ======================================================
+    """
+    def __init__(self):
+        self.digests = dict()
+        self.stamps = dict()
+        self.version = None
+
+    def diff(self, fragments, clean, periods):
+        """
+
+
+        DeltaTracker.diff() -> dict
+
+        --``fragments`` is a dict of fragment key : fragment, without clean
+        periods
+        --``clean`` is the set of period keys left out of ``fragments``
+        --``periods`` is a dict of period fragment key : TimePeriod
+
+        Method returns a delta of the fragments that changed or disappeared
+        since the recorded version, then records the result as the new
+        version.
+        """
+        digests = {key: get_digest(v) for key, v in fragments.items()}
+
+        changed = dict()
+        changed_digests = dict()
+        for key, digest in digests.items():
+            if self.digests.get(key) != digest:
+                changed[key] = fragments[key]
+                changed_digests[key] = digest
+
+        removed = [
+            key for key in self.digests
+            if key not in digests and key not in clean
+        ]
+
+        result = {
+            'base': self.version,
+            'version': uuid.uuid4().hex,
+            'changed': changed,
+            'digests': changed_digests,
+            'removed': removed,
+        }
+
+        for key in removed:
+            self.digests.pop(key)
+        self.digests.update(changed_digests)
+        self.version = result['version']
+        self._stamp(periods)
+
+        return result
+
+    def get_clean(self, periods):
+        """
+
+
+        DeltaTracker.get_clean() -> set
+
+        --``periods`` is a dict of period fragment key : TimePeriod
+
+        Method returns the keys of periods whose content cannot have changed
+        since the recorded version.
+        """
+        result = set()
+        for key, period in periods.items():
+            if period.dirty or key not in self.digests:
+                continue
+
+            stamp = self._get_stamp(period)
+            if stamp is not None and stamp == self.stamps.get(key):
+                result.add(key)
+
+        return result
+
+    def load(self, version, digests, periods):
+        """
+
+
+        DeltaTracker.load() -> None
+
+        --``version`` is the version of a flat model, or None
+        --``digests`` is a dict of fragment key : digest for that version
+        --``periods`` is a dict of period fragment key : TimePeriod
+
+        Method adopts a version read with Model.from_database(). Periods were
+        just built from that version, so they count as clean.
+        """
+        self.version = version
+        self.digests = dict(digests or dict())
+        self.stamps = dict()
+        if version is not None:
+            self._stamp(periods)
+
+    def record(self, flat_model, periods):
+        """
+
+
+        DeltaTracker.record() -> None
+
+        --``flat_model`` is a dict returned by Model.to_database()
+        --``periods`` is a dict of period fragment key : TimePeriod
+
+        Method records ``flat_model`` as a new version and writes the version
+        and fragment digests into it.
+        """
+        digests = {
+            key: get_digest(v) for key, v in iter_fragments(flat_model)
+        }
+        self.record_digests(digests, periods)
+
+        flat_model[VERSION_KEY] = self.version
+        flat_model[DIGESTS_KEY] = dict(self.digests)
+
+    def record_digests(self, digests, periods):
+        """
+
+
+        DeltaTracker.record_digests() -> str
+
+        --``digests`` is a dict of fragment key : digest of a written model
+        --``periods`` is a dict of period fragment key : TimePeriod
+
+        Method records ``digests`` as a new version and returns the version.
+        """
+        self.digests = dict(digests)
+        self.version = uuid.uuid4().hex
+        self.stamps = dict()
+        self._stamp(periods)
+
+        return self.version
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    @classmethod
+    def _get_stamp(cls, period):
+        """
+
+
+        DeltaTracker._get_stamp() -> tuple or None
+
+        --``period`` is a TimePeriod
+
+        Method returns a summary of the period state that line storage writes
+        do not cover, tags included. Method returns None if parameters hold a
+        plain dict, whose changes cannot be seen.
+        """
+        params = cls._get_parameters_stamp(period.parameters)
+        unit_params = cls._get_parameters_stamp(period.unit_parameters)
+        if params is None or unit_params is None:
+            return None
+
+        return (params, unit_params, period.tags.version, period.complete,
+                period.periods_used)
+
+    @classmethod
+    def _get_parameters_stamp(cls, params):
+        """
+
+
+        DeltaTracker._get_parameters_stamp() -> tuple or None
+
+        --``params`` is a Parameters object
+
+        Method returns the versions of ``params`` and every nested Parameters
+        object, or None if any nested dictionary is not a Parameters object.
+        """
+        if not isinstance(params, Parameters):
+            return None
+
+        result = [params.version]
+        for value in params.values():
+            if isinstance(value, dict):
+                nested = cls._get_parameters_stamp(value)
+                if nested is None:
+                    return None
+                result.append(nested)
+
+        return tuple(result)
+
+    def _stamp(self, periods):
+        """
+
+
+        DeltaTracker._stamp() -> None
+
+        --``periods`` is a dict of period fragment key : TimePeriod
+
+        Method remembers the state of each period and marks it clean.
+        """
+        for key, period in periods.items():
+            self.stamps[key] = self._get_stamp(period)
+            period.dirty = False
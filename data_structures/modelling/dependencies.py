@@ -0,0 +1,394 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.dependencies
+"""
+
+Module defines DependencyTracker, a record of which business units depend on
+which drivers, parameters and other units, used for incremental recalculation.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+n/a
+
+CLASSES:
+DependencyTracker     records unit dependencies and dirty units for a Model
+TrackedParameters     dict that remembers which keys a formula read
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+# n/a
+
+
+
+
+# Constants
+# n/a
+
+# Classes
+class TrackedParameters(dict):
+    """
+
+    Dictionary that records every key a formula reads. Iterating over the
+    instance counts as reading every key.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    used                  set; keys read from instance
+
+    FUNCTIONS:
+    n/a
+    ====================  ======================================================
+    """
+    def __init__(self, data):
+        dict.__init__(self, data)
+        self.used = set()
+
+    def __contains__(self, key):
+        self.used.add(key)
+        return dict.__contains__(self, key)
+
+    def __getitem__(self, key):
+        self.used.add(key)
+        return dict.__getitem__(self, key)
+
+    def __iter__(self):
+        self.used.update(dict.keys(self))
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        self.used.add(key)
+        return dict.get(self, key, default)
+
+    def items(self):
+        self.used.update(dict.keys(self))
+        return dict.items(self)
+
+    def keys(self):
+        self.used.update(dict.keys(self))
+        return dict.keys(self)
+
+    def values(self):
+        self.used.update(dict.keys(self))
+        return dict.values(self)
+
+
+class DependencyTracker:
+    """
+
+    DependencyTracker records, during fill_out(), which business units depend
+    on which drivers, parameters and other units. Callers mark drivers,
+    parameters or units as changed; the tracker then resolves the set of units
+    that must be recomputed in a given period.
+
+    Dependencies are tracked at the unit level. Formulas read freely from other
+    lines on the same unit, so a unit is the smallest piece of a period that
+    can be recomputed safely. Balances carry forward through time, so a unit
+    that is dirty in one period stays dirty in every later period.
+
+    Tracking is off by default, so fill_out() does not pay for it. Set
+    ``enabled`` to True before a full recalculation to start recording. While
+    tracking is off, record and mark methods do nothing, watch() returns
+    parameters as they are, and recalculate_dirty() runs a full
+    recalculation.
+
+    The tracker starts out ``stale``. Stale means the recorded dependencies
+    cannot be trusted (nothing recorded yet, tracking was switched on or off,
+    or stored values were wiped after a structure change), and callers should
+    run a full recalculation instead.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    by_driver             dict; driver bbid : set of unit bbids
+    by_parameter          dict; parameter name : set of unit bbids
+    consumers             dict; unit bbid : set of unit bbids consolidating it
+    dirty                 dict; unit bbid : period end date from which dirty
+    enabled               bool; True if instance records dependencies
+    scope                 set of unit bbids being recomputed, or None
+    stale                 bool; True if a full recalculation is required
+
+    FUNCTIONS:
+    clear_dirty()         forget dirty units
+    get_scope()           returns bbids of units to recompute in a period
+    mark_all()            flag tracker as stale
+    mark_driver()         mark every unit that ran a driver as dirty
+    mark_parameter()      mark every unit that read a parameter as dirty
+    mark_unit()           mark a unit as dirty
+    record_consolidation() record that one unit consolidates another
+    record_driver()       record that a unit ran a driver
+    record_parameters()   record the parameters a unit's formula read
+    reset()               forget all dependencies and dirty units
+    watch()               wrap formula parameters to record reads
+    ====================  ======================================================
+    """
+    def __init__(self):
+        self.by_driver = dict()
+        self.by_parameter = dict()
+        self.consumers = dict()
+        self.dirty = dict()
+        self.scope = None
+        self.stale = True
+
+        self._enabled = False
+
+    @property
+    def enabled(self):
+        """
+
+        ** property **
+
+        DependencyTracker.enabled() -> bool
+
+        True if instance records dependencies during fill_out().
+        """
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        """
+
+        ** property setter **
+
+        DependencyTracker.enabled() -> None
+
+        Switches tracking on or off. Method flags instance as stale, since
+        nothing was recorded while tracking was off.
+        """
+        value = bool(value)
+        if value != self._enabled:
+            self._enabled = value
+            self.reset()
+            self.mark_all()
+
+    def clear_dirty(self):
+        """
+
+
+        DependencyTracker.clear_dirty() -> None
+
+
+        Method forgets all dirty units, keeps recorded dependencies.
+        """
+        self.dirty.clear()
+
+    def get_scope(self, model, end):
+        """
+
+
+        DependencyTracker.get_scope() -> set
+
+        --``model`` is the Model that owns the units
+        --``end`` is the end date of the period to recompute
+
+        Method returns the bbids of every unit dirty at ``end``, along with
+        every unit that consolidates them, directly or through ancestors.
+        """
+        result = set()
+
+        queue = [
+            bbid for bbid, start in self.dirty.items()
+            if start is None or start <= end
+        ]
+        while queue:
+            bbid = queue.pop()
+            if bbid in result:
+                continue
+            result.add(bbid)
+
+            queue.extend(self.consumers.get(bbid, ()))
+
+            unit = model.bu_directory.get(bbid)
+            if unit is not None:
+                components = unit.relationships.parent
+                if components is not None:
+                    parent = components.relationships.parent
+                    if parent is not None:
+                        queue.append(parent.id.bbid)
+
+        return result
+
+    def mark_all(self):
+        """
+
+
+        DependencyTracker.mark_all() -> None
+
+
+        Method flags instance as stale. Next incremental recalculation will
+        fall back to a full recalculation.
+        """
+        self.stale = True
+
+    def mark_driver(self, driver_id, start=None):
+        """
+
+
+        DependencyTracker.mark_driver() -> None
+
+        --``driver_id`` is the bbid of a Driver whose data changed
+        --``start`` is the period end date from which the change applies; None
+        means every period
+
+        Method marks every unit that ran the driver as dirty.
+        """
+        if not self._enabled:
+            return
+
+        for bbid in self.by_driver.get(driver_id, ()):
+            self.mark_unit(bbid, start=start)
+
+    def mark_parameter(self, name, unit_id=None, start=None):
+        """
+
+
+        DependencyTracker.mark_parameter() -> None
+
+        --``name`` is the name of a parameter whose value changed
+        --``unit_id`` is the bbid of the unit whose parameter changed; None
+        for time line or period parameters
+        --``start`` is the period end date from which the change applies; None
+        means every period
+
+        Method marks every unit whose formulas read the parameter as dirty. If
+        ``unit_id`` is specified, only that unit can be affected.
+        """
+        if not self._enabled:
+            return
+
+        users = self.by_parameter.get(name, set())
+        if unit_id is not None:
+            users = users & {unit_id}
+
+        for bbid in users:
+            self.mark_unit(bbid, start=start)
+
+    def mark_unit(self, unit_id, start=None):
+        """
+
+
+        DependencyTracker.mark_unit() -> None
+
+        --``unit_id`` is the bbid of a unit that must be recomputed
+        --``start`` is the period end date from which the unit is dirty; None
+        means every period
+
+        Method marks the unit as dirty, keeping the earliest start date.
+        """
+        if not self._enabled:
+            return
+
+        if unit_id in self.dirty:
+            known = self.dirty[unit_id]
+            if known is None or start is None:
+                start = None
+            else:
+                start = min(known, start)
+
+        self.dirty[unit_id] = start
+
+    def record_consolidation(self, source_id, target_id):
+        """
+
+
+        DependencyTracker.record_consolidation() -> None
+
+        --``source_id`` is the bbid of the unit being consolidated
+        --``target_id`` is the bbid of the unit consolidating it
+
+        Method records that the target depends on the source.
+        """
+        if not self._enabled:
+            return
+
+        self.consumers.setdefault(source_id, set()).add(target_id)
+
+    def record_driver(self, driver_id, unit_id):
+        """
+
+
+        DependencyTracker.record_driver() -> None
+
+        --``driver_id`` is the bbid of a Driver
+        --``unit_id`` is the bbid of the unit that runs the driver
+
+        Method records that the unit depends on the driver.
+        """
+        if not self._enabled:
+            return
+
+        self.by_driver.setdefault(driver_id, set()).add(unit_id)
+
+    def record_parameters(self, params, driver, unit_id):
+        """
+
+
+        DependencyTracker.record_parameters() -> None
+
+        --``params`` is a TrackedParameters object passed to a formula
+        --``driver`` is the Driver that ran the formula
+        --``unit_id`` is the bbid of the unit the formula worked on
+
+        Method records that the unit depends on every parameter the formula
+        read, including the source names of converted parameters. No-op if
+        ``params`` was not wrapped by watch().
+        """
+        if not self._enabled or not isinstance(params, TrackedParameters):
+            return
+
+        used = set(params.used)
+        for param_name, var_name in driver.conversion_table.items():
+            if var_name in used:
+                used.add(param_name)
+        used.discard('period')
+
+        for name in used:
+            self.by_parameter.setdefault(name, set()).add(unit_id)
+
+    def reset(self):
+        """
+
+
+        DependencyTracker.reset() -> None
+
+
+        Method forgets all dependencies and dirty units. Call at the start of
+        a full recalculation, which records dependencies anew. Instance
+        stays stale while tracking is off.
+        """
+        self.by_driver.clear()
+        self.by_parameter.clear()
+        self.consumers.clear()
+        self.dirty.clear()
+        self.scope = None
+        self.stale = not self._enabled
+
+    def watch(self, params):
+        """
+
+
+        DependencyTracker.watch() -> TrackedParameters
+
+        --``params`` is the parameter dictionary built for a formula
+
+        Method returns a copy of params that records which keys are read. If
+        tracking is off, method returns ``params`` as is.
+        """
+        if not self._enabled:
+            return params
+
+        return TrackedParameters(params)
@@ -56,7 +56,6 @@ class DriverContainer(Container):
 
     FUNCTIONS:
     get_or_create()       retrieves or creates a driver matching provided info
-    get_or_create()       retrieves or creates a driver matching provided info
     ====================  ======================================================
     """
 
@@ -127,23 +126,9 @@ class DriverContainer(Container):
         Method retrieve a driver by name if it exists, or creates a new driver
         from the provided information.  Raises error if a driver with ``name``
         exists, but has attibutes that don't match provided data and formula.
+        Names match without regard to case, as add() stores them casefolded.
         """
-    def get_or_create(self, name, data, formula, run_on_past=False):
-        """
-
-
-        DriverContainer.get_or_create() -> Driver
-
-        --``name`` is the name of a Driver
-        --``data`` is a dictionary containing data for the Driver
-        --``formula`` is a formula object
-        --``run_on_past`` is a bool; whether to run the driver on past periods
-
-        Method retrieve a driver by name if it exists, or creates a new driver
-        from the provided information.  Raises error if a driver with ``name``
-        exists, but has attibutes that don't match provided data and formula.
-        """
-        driver = self.get_by_name(name)
+        driver = self.get_by_name(name.casefold())
 
         if not driver:
             driver = Driver(name)
@@ -165,15 +150,4 @@ class DriverContainer(Container):
                     " than those specified as arguments." % name
                 raise AssertionError(c)
 
-            # check formula
-            form_chk = driver.formula_bbid == formula.id.bbid
-
-            # check run_on_past
-            rop_chk = driver.run_on_past == run_on_past
-
-            if not all([data_chk, form_chk, rop_chk]):
-                c = "A driver named '%s' exists but has different attributes" \
-                    " than those specified as arguments." % name
-                raise AssertionError(c)
-
         return driver
@@ -151,6 +151,9 @@ class Driver(TagsMixIn):
         self.id = ID()
         self.parameters = Parameters()
         self.run_on_past = False
+
+        # unit bbid : params last built for that unit, see _build_params()
+        self._param_cache = dict()
         # OBSOLETE
         self.workConditions = dict()
         self.active = True
@@ -285,6 +288,7 @@ class Driver(TagsMixIn):
         result.tags = self.tags.copy()
         result.parameters = copy.deepcopy(self.parameters)
         result.formula_bbid = copy.copy(self.formula_bbid)
+        result._param_cache = dict()
 
         return result
 
@@ -354,8 +358,17 @@ class Driver(TagsMixIn):
             # formula_catalog.issue() only performs dict retrieval and
             # return for key.
 
+            if formula.batch_func is not None:
+                if self._work_from_batch(formula, line, bu, period):
+                    del formula
+                    return
+
             params = self._build_params(parent=bu, period=period)
 
+            model = bu.relationships.model
+            if model is not None:
+                params = model.dependencies.watch(params)
+
             if not bb_settings.PREP_FOR_EXCEL:
                 formula.func(line, bu, params, self.signature)
             else:
@@ -381,6 +394,9 @@ class Driver(TagsMixIn):
 
                 line.xl_data.add_derived_calculation(data_cluster)
 
+            if model is not None:
+                model.dependencies.record_parameters(params, self, bu.id.bbid)
+
             # Each function is "disposable", so we explicitly delete the
             # pointer after each use.
             del formula
@@ -430,10 +446,30 @@ class Driver(TagsMixIn):
         Method then converts uniquely named global parameters to standard
         formula arguments using instance.conversion_table. Result includes both
         the original and converted keys.
+
+        Method keeps the last result for each unit and returns a copy of it
+        while the unit's merged parameters (see
+        BusinessUnit._get_parameter_layers()), instance parameters and
+        conversion table stay the same. The copy is shallow, like a fresh
+        build: nested values are the same objects the layers hold, so
+        in-place changes to them show through without a new version.
         """
         if not period:
             period = parent.get_current_period()
-        params = parent.get_parameters(period)
+        base = parent._get_parameter_layers(period)
+
+        version = getattr(self.parameters, 'version', None)
+        cached = self._param_cache.get(parent.id.bbid)
+        if cached is not None and version is not None:
+            cached_base, cached_version, cached_table, cached_params = cached
+            if all((
+                cached_base is base,
+                cached_version == version,
+                cached_table == self.conversion_table,
+            )):
+                return dict(cached_params)
+
+        params = dict(base)
         params.update(self.parameters)
 
         converted = self._map_params_to_formula(params)
@@ -445,7 +481,51 @@ class Driver(TagsMixIn):
         # extra info needed by formulas
         params['period'] = period
 
-        return params
+        if version is not None:
+            table = copy.copy(self.conversion_table)
+            self._param_cache[parent.id.bbid] = (base, version, table, params)
+
+        return dict(params)
+
+    def _build_batch_params(self, parent, period):
+        """
+
+
+        Driver._build_batch_params() -> list
+
+        --``parent`` is the business unit the driver works on
+        --``period`` is the first TimePeriod in the batch
+
+        Return one parameter dictionary per period, from ``period`` through the
+        end of its time line, built as _build_params() would. Method folds
+        period parameters forward the way TimePeriod.combine_parameters() does,
+        without touching periods that have not been filled out yet.
+        """
+        time_line = period.relationships.parent
+
+        shared = dict()
+        unit_shared = dict()
+        result = list()
+        while period:
+            shared.update(period.parameters)
+            unit_shared.update(period.unit_parameters.get(parent.id.bbid, {}))
+
+            params = dict()
+            params.update(time_line.parameters)
+            params.update(shared)
+            params.update(parent._parameters)
+            params.update(unit_shared)
+            params.update(self.parameters)
+
+            converted = self._map_params_to_formula(params)
+            params.update(converted)
+
+            params['period'] = period
+            result.append(params)
+
+            period = period.future
+
+        return result
 
     def _check_data(self, parent=None):
         """
@@ -494,6 +574,58 @@ class Driver(TagsMixIn):
 
         return result
 
+    def _work_from_batch(self, formula, line, bu, period):
+        """
+
+
+        Driver._work_from_batch() -> bool
+
+        --``formula`` is the Formula issued for instance, with a batch_func
+        --``line`` is the LineItem to work on
+        --``bu`` is the business unit the driver works on
+        --``period`` is the TimePeriod being filled out
+
+        Method sets line value from the batch computed for the line during the
+        current extrapolation, running the batched formula for every remaining
+        period first if the batch does not continue into ``period``. Method
+        returns False if batching does not apply: outside of extrapolation,
+        on present or past periods, or when preparing for Excel, which needs
+        per-period calculation steps.
+        """
+        model = bu.relationships.model
+        if model is None or model.driver_batches is None:
+            return False
+
+        if bb_settings.PREP_FOR_EXCEL:
+            return False
+
+        tl = period.relationships.parent
+        if tl is not model.time_line or period.end <= tl.current_period.end:
+            return False
+
+        key = (self.id.bbid, bu.id.bbid, line.id.bbid)
+        values = model.driver_batches.get(key)
+
+        # values are consumed in time order, so a live batch starts at period
+        if not values or next(iter(values)) != period.end:
+            params_list = self._build_batch_params(bu, period)
+            params_list = [
+                model.dependencies.watch(params) for params in params_list
+            ]
+
+            output = formula.batch_func(line, bu, params_list, self.signature)
+
+            values = dict()
+            for params, value in zip(params_list, output):
+                values[params['period'].end] = value
+                model.dependencies.record_parameters(params, self, bu.id.bbid)
+
+            model.driver_batches[key] = values
+
+        line.set_value(values.pop(period.end), self.signature)
+
+        return True
+
     def _set_formula(self, F):
         """
 
@@ -385,22 +385,31 @@ class Financials:
             self.ending.increment(self.starting, consolidating=False,
                                   over_time=True)
 
-    def copy(self, clean=False):
+    def copy(self, clean=False, with_starting=True):
         """
 
 
         Financials.copy() -> Financials
 
+        --``clean`` bool; if True, copy structure without values
+        --``with_starting`` bool; if False, leave starting balance sheet empty
 
         Return a deep copy of instance.
 
         Method starts with a shallow copy and then substitutes deep copies
-        for the values of each attribute in instance.ORDER
+        for the values of each attribute in instance.ORDER. Callers that are
+        about to replace the starting balance sheet (e.g. with the ending
+        balance sheet of the prior period) can skip copying it.
         """
         new_instance = Financials()
         new_instance._full_order = self._full_order.copy()
 
+        starting_key = self.START_BAL_NAME.casefold()
         for key, stmt in self._statement_directory.items():
+            if key == starting_key and not with_starting:
+                new_instance._statement_directory[key] = None
+                continue
+
             new_statement = stmt.copy(clean=clean)
             new_statement.relationships.set_parent(new_instance)
             new_instance._statement_directory[key] = new_statement
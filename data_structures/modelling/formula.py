@@ -43,11 +43,23 @@ class Formula(TagsMixIn):
     Formula objects provide a lattice for identifying, tagging, and storing
     work functions in the formula catalog.
 
+    Content modules may also supply ``batch_func``, a version of the formula
+    that computes a line for a whole run of periods in one call:
+
+        batch_func(line, bu, params_list, signature) -> sequence of values
+
+    ``params_list`` holds one parameter dictionary per period, in time order,
+    starting with the period the driver is working on. Result must hold one
+    value per period. A batched formula may only rely on parameters and on
+    data that exists when it is called (e.g. the line's prior value), since
+    later periods are not filled out yet.
+
     ====================  ======================================================
     Attribute             Description
     ====================  ======================================================
 
     DATA:
+    batch_func            optional multi-period version of func, or None
     func                  placeholder for formula function from content module
     id                    instance of Platform.ID.ID class
     source                relative path of conent module that described obj
@@ -59,6 +71,7 @@ class Formula(TagsMixIn):
     """
     def __init__(self, name=None):
         TagsMixIn.__init__(self, name=name)
+        self.batch_func = None
         self.func = None
         self.id = ID()
         self.source = None
@@ -39,6 +39,7 @@ from data_structures.system.bbid import ID
 from data_structures.system.tags import Tags
 
 from .base_financial_component import BaseFinancialsComponent
+from .copy_on_write import SharedView
 from .history_line import HistoryLine
 from .line_item_usage import LineItemUsage
 
@@ -70,6 +71,15 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
     will automatically move its local value to a replica detail. After the
     operation, the instance value will be the sum of its old local value, now
     stored in the replica detail, and the other details.
+
+    Clean copies (the ones periods make from unit templates) share guide,
+    usage, workspace and xl_format with the line they were copied from.
+    While shared, each of those reads as a SharedView: reads go to the source
+    object, and the first write makes the instance copy it. Lines that only
+    read them, as chefs and drivers do, never pay for a copy. Until then,
+    changes to the source show through, so a template's format or usage
+    reaches period lines that did not set their own. Tags are always copied,
+    since they identify the line. Deep copies own everything they hold.
     ====================  ======================================================
     Attribute             Description
     ====================  ======================================================
@@ -134,11 +144,19 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
     SIGNATURE_FOR_INCREMENTATION = "Incremented "
     SIGNATURE_FOR_LINKING_STATEMENTS = "LineItem.link_to"
 
+    _SHARED_ON_CLEAN_COPY = ('guide', 'usage', 'workspace', 'xl_format')
+
     SUMMARY_PREFIX = ""  # "total "
 
     TAB_WIDTH = 3
 
     def __init__(self, name=None, value=None, parent=None, period=None):
+        self._shared = dict()
+        # attribute name : object shared with the source of a clean copy,
+        # copied on first write; see _get_own()
+        self._views = dict()
+        # attribute name : SharedView handed out for a shared attribute
+
         BaseFinancialsComponent.__init__(self,
                                          name=name,
                                          parent=parent,
@@ -172,6 +190,28 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
         self.xl_data = xl_mgmt.LineData(self)
         self.xl_format = xl_mgmt.LineFormat()
 
+    def __copy__(self):
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        result._shared = self._shared.copy()
+        result._views = dict()
+
+        return result
+
+    def __deepcopy__(self, memo):
+        # views point back at the original; give the copy its own objects
+        state = dict(self.__dict__)
+        for name, source in self._shared.items():
+            state['_' + name] = source
+        state['_shared'] = dict()
+        state['_views'] = dict()
+
+        result = self.__class__.__new__(self.__class__)
+        memo[id(self)] = result
+        result.__dict__.update(copy.deepcopy(state, memo))
+
+        return result
+
     def __str__(self):
         result = "\n".join(self._get_line_strings())
         result += "\n"
@@ -185,6 +225,14 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
         """
         return self._consolidate
 
+    @property
+    def guide(self):
+        return self._get_view('guide')
+
+    @guide.setter
+    def guide(self, value):
+        self._set_own('guide', value)
+
     @property
     def hardcoded(self):
         """
@@ -205,6 +253,19 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
             msg = "lineitem._include_details can only be set to a boolean value"
             raise(TypeError(msg))
 
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+
+        # parent order depends on position
+        parent = self.relationships.parent
+        if isinstance(parent, BaseFinancialsComponent):
+            parent._clear_lookup_cache()
+
     @property
     def replica(self):
         """
@@ -237,6 +298,14 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
     def sum_over_time(self, value):
         self.summary_type = 'sum' if value else None
 
+    @property
+    def usage(self):
+        return self._get_view('usage')
+
+    @usage.setter
+    def usage(self, value):
+        self._set_own('usage', value)
+
     @property
     def value(self):
         """
@@ -250,6 +319,22 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
 
         return result
 
+    @property
+    def workspace(self):
+        return self._get_view('workspace')
+
+    @workspace.setter
+    def workspace(self, value):
+        self._set_own('workspace', value)
+
+    @property
+    def xl_format(self):
+        return self._get_view('xl_format')
+
+    @xl_format.setter
+    def xl_format(self, value):
+        self._set_own('xl_format', value)
+
     @classmethod
     def from_database(cls, data, statement):
         """
@@ -341,7 +426,7 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
             'driver_id': self._driver_id.hex if self._driver_id else None,
             'link': False,
             'guide': self.guide.to_database(),
-            'workspace': self.workspace,
+            'workspace': self._get_source('workspace'),
             'usage': self.usage.to_database(),
         }
 
@@ -384,10 +469,13 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
             sig = self.SIGNATURE_FOR_VALUE_RESET
             self.set_value(None, sig, override=True)
 
-            format2keep = self.xl_format.copy()
+            # format still shared with the template has nothing to protect
+            own_format = 'xl_format' not in self._shared
+            if own_format:
+                format2keep = self.xl_format.copy()
             self.xl_data = xl_mgmt.LineData(self)
 
-            if keep_format:
+            if keep_format and own_format:
                 self.xl_format = format2keep
 
             self.update_stored_xl()
@@ -414,7 +502,18 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
         # Shallow copy, should pick up _local_value as is, and then create
         # independent containers for tags.
 
-        new_line.guide = copy.deepcopy(self.guide)
+        new_line._shared = dict()
+        new_line._views = dict()
+        if clean:
+            # share with the source until first write, see _get_own()
+            for name in self._SHARED_ON_CLEAN_COPY:
+                new_line._shared[name] = self._get_source(name)
+        else:
+            new_line.guide = copy.deepcopy(self._get_source('guide'))
+            new_line.usage = self._get_source('usage').copy()
+            new_line.workspace = self._get_source('workspace').copy()
+            new_line.xl_format = self._get_source('xl_format').copy()
+
         new_line.log = self.log[:]
         new_line._sum_over_time = self.sum_over_time
         new_line._include_details = self.include_details
@@ -422,10 +521,7 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
         new_line._driver_id = copy.copy(self._driver_id)
         new_line.set_consolidate(self._consolidate)
         new_line.id = copy.copy(self.id)
-        new_line.usage = self.usage.copy()
-        new_line.workspace = self.workspace.copy()
         new_line.xl_data = xl_mgmt.LineData(new_line)
-        new_line.xl_format = self.xl_format.copy()
 
         if not clean:
             new_line.set_hardcoded(self._hardcoded)
@@ -882,6 +978,81 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
 
             self.set_value(None, sig, override=True)
 
+    def _get_own(self, name):
+        """
+
+
+        LineItem._get_own() -> obj
+
+        --``name`` is one of _SHARED_ON_CLEAN_COPY
+
+        Return the instance's own object for attribute ``name``. If the
+        instance still shares that object with the source of a clean copy,
+        copy it first. SharedView calls this method on every write.
+        """
+        if name in self._shared:
+            source = self._shared[name]
+            if name == 'guide':
+                own = copy.deepcopy(source)
+            else:
+                own = source.copy()
+            self._set_own(name, own)
+
+        return getattr(self, '_' + name)
+
+    def _get_source(self, name):
+        """
+
+
+        LineItem._get_source() -> obj
+
+        --``name`` is one of _SHARED_ON_CLEAN_COPY
+
+        Return the object a copy of instance should start from for attribute
+        ``name``, without copying anything.
+        """
+        if name in self._shared:
+            return self._shared[name]
+
+        return getattr(self, '_' + name)
+
+    def _get_view(self, name):
+        """
+
+
+        LineItem._get_view() -> obj
+
+        --``name`` is one of _SHARED_ON_CLEAN_COPY
+
+        Return a SharedView of attribute ``name`` while the instance shares
+        it, and the instance's own object after that. Instance hands out the
+        same view every time, so callers can compare it by identity.
+        """
+        if name not in self._shared:
+            return getattr(self, '_' + name)
+
+        view = self._views.get(name)
+        if view is None:
+            view = SharedView(self, name)
+            self._views[name] = view
+
+        return view
+
+    def _set_own(self, name, value):
+        """
+
+
+        LineItem._set_own() -> None
+
+        --``name`` is one of _SHARED_ON_CLEAN_COPY
+        --``value`` is the instance's own object for attribute ``name``
+
+        Stop sharing attribute ``name`` and set it to ``value``.
+        """
+        self._shared.pop(name, None)
+        self._views.pop(name, None)
+        setattr(self, '_' + name, value)
+
     def _get_line_strings(self, indent=TAB_WIDTH):
         """
 
@@ -955,6 +1126,8 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
         replica = copy.copy(self)
         replica.tags = self.tags.copy()
         replica._details = dict()
+        replica._name_index = None
+        replica._ordered = None
         replica.xl_data = xl_mgmt.LineData(replica)
         replica.xl_format = self.xl_format.copy()
         replica.set_consolidate(self._consolidate)
@@ -964,3 +1137,4 @@ class LineItem(BaseFinancialsComponent, HistoryLine):
         replica.register(namespace=self.id.namespace)
 
         self._details[replica.tags.name] = replica
+        self._clear_lookup_cache()
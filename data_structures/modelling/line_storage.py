@@ -0,0 +1,424 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.line_storage
+"""
+
+Module defines ColumnarLineStorage, an array-backed store for line values
+shared by all periods in a TimeLine.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+n/a
+
+CLASSES:
+ColumnarLineStorage   typed-array store of line values, one row per period
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+from array import array
+
+
+
+
+# Constants
+# type codes stored in the ``types`` column for every (line, period) cell
+_ABSENT = -1  # period carries no record for the line
+_NONE = 0
+_FLOAT = 1
+_INT = 2
+_BOOL = 3
+_OBJECT = 4  # anything else lives in the object side table
+
+# largest int that survives a round trip through a double
+_MAX_EXACT_INT = 2 ** 53
+
+# Classes
+class ColumnarLineStorage:
+    """
+
+    Store that lays out line values, value types and hardcoded flags for a
+    whole TimeLine as contiguous typed arrays. Each line bbid owns one column
+    per attribute and each period owns one row in every column, so reads and
+    writes are plain index operations.
+
+    Values that do not fit a double (strings, Decimals, very large ints) go
+    into a side table keyed by (column, row). Excel data is already a flat dict
+    per line, so it stays in one dict per row.
+
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    columns               dict; line bbid hex : column index
+    rows                  dict; period end date : row index
+
+    FUNCTIONS:
+    add_row()             adds a row for a period, returns row index
+    clear_row()           drops all non-hardcoded records for a period
+    copy()                returns a deep copy of instance
+    get_hc()              returns the hardcoded flag for a line in a period
+    get_value()           returns the value for a line in a period
+    get_xl()              returns the flat xl data for a line in a period
+    has_record()          returns True if a period holds a record for a line
+    load_rows()           fills a period row from a list of database rows
+    set_hc()              sets the hardcoded flag for a line in a period
+    set_value()           sets the value for a line in a period
+    set_xl()              sets the flat xl data for a line in a period
+    to_rows()             returns a period row as a list of database rows
+    ====================  ======================================================
+    """
+    def __init__(self):
+        self.columns = dict()
+        self.rows = dict()
+
+        self._values = list()
+        self._types = list()
+        self._hardcoded = list()
+        self._objects = dict()
+        self._xl = list()
+
+    def add_row(self, end):
+        """
+
+
+        ColumnarLineStorage.add_row() -> int
+
+        --``end`` is the end date of the period that owns the row
+
+        Method appends a row to every column and returns its index. No-op if
+        a row already exists for ``end``.
+        """
+        row = self.rows.get(end)
+        if row is None:
+            row = len(self.rows)
+            self.rows[end] = row
+
+            for col in range(len(self._types)):
+                self._values[col].append(0.0)
+                self._types[col].append(_ABSENT)
+                self._hardcoded[col].append(0)
+
+            self._xl.append(dict())
+
+        return row
+
+    def clear_row(self, end, bbid_hexes=None):
+        """
+
+
+        ColumnarLineStorage.clear_row() -> None
+
+        --``end`` is the end date of the period to clear
+        --``bbid_hexes`` is an optional iterable of line BBID strings
+
+        Method drops every record in the row that is not hardcoded. If
+        ``bbid_hexes`` is specified, method only drops records for those lines.
+        """
+        row = self.rows.get(end)
+        if row is None:
+            return
+
+        if bbid_hexes is None:
+            cols = range(len(self._types))
+        else:
+            cols = [
+                self.columns[bbid_hex] for bbid_hex in bbid_hexes
+                if bbid_hex in self.columns
+            ]
+
+        xl = self._xl[row]
+        for col in cols:
+            if not self._hardcoded[col][row]:
+                self._types[col][row] = _ABSENT
+                self._objects.pop((col, row), None)
+
+        for bbid_hex in list(xl.keys()):
+            col = self.columns[bbid_hex]
+            if self._types[col][row] == _ABSENT:
+                xl.pop(bbid_hex)
+
+    def copy(self):
+        """
+
+
+        ColumnarLineStorage.copy() -> ColumnarLineStorage
+
+        Method returns a new instance with its own copies of every column.
+        """
+        result = ColumnarLineStorage()
+        result.columns = self.columns.copy()
+        result.rows = self.rows.copy()
+
+        result._values = [col[:] for col in self._values]
+        result._types = [col[:] for col in self._types]
+        result._hardcoded = [col[:] for col in self._hardcoded]
+        result._objects = self._objects.copy()
+        result._xl = [xl.copy() for xl in self._xl]
+
+        return result
+
+    def get_hc(self, end, bbid_hex):
+        """
+
+
+        ColumnarLineStorage.get_hc() -> bool
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+
+        Method returns the hardcoded flag for the line in the period.
+        """
+        row = self.rows.get(end)
+        col = self.columns.get(bbid_hex)
+        if row is None or col is None:
+            return False
+
+        return bool(self._hardcoded[col][row])
+
+    def get_value(self, end, bbid_hex):
+        """
+
+
+        ColumnarLineStorage.get_value() -> any primitive
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+
+        Method returns the value of the line in the period, typed as it was
+        stored, or None.
+        """
+        row = self.rows.get(end)
+        col = self.columns.get(bbid_hex)
+        if row is None or col is None:
+            return None
+
+        code = self._types[col][row]
+        if code == _FLOAT:
+            result = self._values[col][row]
+        elif code == _INT:
+            result = int(self._values[col][row])
+        elif code == _BOOL:
+            result = bool(self._values[col][row])
+        elif code == _OBJECT:
+            result = self._objects[(col, row)]
+        else:
+            result = None
+
+        return result
+
+    def get_xl(self, end, bbid_hex):
+        """
+
+
+        ColumnarLineStorage.get_xl() -> dict
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+
+        Method returns the flat xl data stored for the line in the period.
+        """
+        row = self.rows.get(end)
+        if row is None:
+            return dict()
+
+        return self._xl[row].get(bbid_hex, dict())
+
+    def has_record(self, end, bbid_hex):
+        """
+
+
+        ColumnarLineStorage.has_record() -> bool
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+
+        Method returns True if the period holds any record for the line.
+        """
+        row = self.rows.get(end)
+        col = self.columns.get(bbid_hex)
+        if row is None or col is None:
+            return False
+
+        return self._types[col][row] != _ABSENT
+
+    def load_rows(self, end, rows):
+        """
+
+
+        ColumnarLineStorage.load_rows() -> None
+
+        --``end`` is the end date of the period
+        --``rows`` is a list of dicts with typed values, as produced by
+        TimePeriod._deflate_line_storage()
+
+        Method writes each row into the period's row of the store.
+        """
+        for data in rows:
+            bbid_hex = data['bbid']
+            self.set_value(end, bbid_hex, data.get('value'))
+            self.set_hc(end, bbid_hex, data.get('hardcoded', False))
+
+            flat_xl = data.get('xl_data')
+            if flat_xl:
+                self.set_xl(end, bbid_hex, flat_xl)
+
+    def set_hc(self, end, bbid_hex, hardcoded):
+        """
+
+
+        ColumnarLineStorage.set_hc() -> None
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+        --``hardcoded`` is a bool
+
+        Method records the hardcoded flag for the line in the period.
+        """
+        row, col = self._locate(end, bbid_hex)
+        self._hardcoded[col][row] = 1 if hardcoded else 0
+
+    def set_value(self, end, bbid_hex, value):
+        """
+
+
+        ColumnarLineStorage.set_value() -> None
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+        --``value`` is any primitive
+
+        Method records the value for the line in the period along with its
+        type code.
+        """
+        row, col = self._locate(end, bbid_hex)
+        self._objects.pop((col, row), None)
+
+        if value is None:
+            code = _NONE
+        elif isinstance(value, bool):
+            self._values[col][row] = float(value)
+            code = _BOOL
+        elif isinstance(value, float):
+            self._values[col][row] = value
+            code = _FLOAT
+        elif isinstance(value, int) and abs(value) <= _MAX_EXACT_INT:
+            self._values[col][row] = float(value)
+            code = _INT
+        else:
+            self._objects[(col, row)] = value
+            code = _OBJECT
+
+        self._types[col][row] = code
+
+    def set_xl(self, end, bbid_hex, flat_xl):
+        """
+
+
+        ColumnarLineStorage.set_xl() -> None
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+        --``flat_xl`` is the dict produced by LineData.to_database()
+
+        Method records the flat xl data for the line in the period.
+        """
+        row, col = self._locate(end, bbid_hex)
+        self._xl[row][bbid_hex] = flat_xl
+
+    def to_rows(self, end):
+        """
+
+
+        ColumnarLineStorage.to_rows() -> list
+
+        --``end`` is the end date of the period
+
+        Method returns the records in the period's row as a list of dicts in
+        the same layout TimePeriod uses for database rows.
+        """
+        result = list()
+
+        row = self.rows.get(end)
+        if row is None:
+            return result
+
+        xl = self._xl[row]
+        for bbid_hex, col in self.columns.items():
+            if self._types[col][row] == _ABSENT:
+                continue
+
+            value = self.get_value(end, bbid_hex)
+            data = {
+                'bbid': bbid_hex,
+                'value': value,
+                'value_type': type(value).__name__,
+                'hardcoded': bool(self._hardcoded[col][row]),
+                'xl_data': xl.get(bbid_hex, dict()),
+            }
+            result.append(data)
+
+        return result
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _add_column(self, bbid_hex):
+        """
+
+
+        ColumnarLineStorage._add_column() -> int
+
+        --``bbid_hex`` is the string representation of a line BBID
+
+        Method adds a column for the line, sized to the current row count, and
+        returns its index.
+        """
+        col = len(self._types)
+        self.columns[bbid_hex] = col
+
+        size = len(self.rows)
+        self._values.append(array('d', bytes(8 * size)))
+        self._types.append(array('b', [_ABSENT]) * size)
+        self._hardcoded.append(array('b', bytes(size)))
+
+        return col
+
+    def _locate(self, end, bbid_hex):
+        """
+
+
+        ColumnarLineStorage._locate() -> tuple
+
+        --``end`` is the end date of the period
+        --``bbid_hex`` is the string representation of a line BBID
+
+        Method returns (row, column) for the cell, adding either if missing.
+        A cell that had no record becomes a record with a None value, the same
+        way TimePeriod starts a blank row on first write.
+        """
+        row = self.rows.get(end)
+        if row is None:
+            row = self.add_row(end)
+
+        col = self.columns.get(bbid_hex)
+        if col is None:
+            col = self._add_column(bbid_hex)
+
+        if self._types[col][row] == _ABSENT:
+            self._types[col][row] = _NONE
+
+        return row, col
@@ -36,12 +36,23 @@ from data_structures.system.bbid import ID
 from data_structures.modelling.business_unit import BusinessUnit
 from data_structures.modelling.line_item import LineItem
 from data_structures.modelling.dr_container import DriverContainer
+from data_structures.modelling.delta import DeltaTracker
+from data_structures.modelling.delta import DIGESTS_KEY, VERSION_KEY
+from data_structures.modelling.delta import apply_delta, get_period_key
+from data_structures.modelling.delta import dump_fragment, load_fragments
+from data_structures.modelling.delta import get_digest, get_fragment_kind
+from data_structures.modelling.delta import iter_fragments, join_fragments
+from data_structures.modelling.delta import split_fragments
+from data_structures.modelling.dependencies import DependencyTracker
+from data_structures.modelling.period_cache import PeriodCache
+from data_structures.modelling import snapshot
 from data_structures.system.tags import Tags
 from data_structures.system.tags_mixin import TagsMixIn
 from data_structures.system.summary_maker import SummaryMaker
 from dateutil.relativedelta import relativedelta
 from tools.parsing import date_from_iso
 from .time_line import TimeLine
+from .time_period import TimePeriod
 from .taxo_dir import TaxoDir
 from .taxonomy import Taxonomy
 
@@ -74,10 +85,16 @@ class Model(TagsMixIn):
 
     DATA:
     bu_directory          dict; key = bbid, val = business units
+    consolidation_plans   dict; (top bbid, sub bbid, statement) : plan
+    delta_tracker         instance of DeltaTracker; base version for deltas
+    dependencies          instance of DependencyTracker; for partial recalcs
+    driver_batches        dict of batched formula results during extrapolation
     drivers               instance of DriverContainer; stores Driver objects
     fiscal_year_end       P (date); fiscal year end, default is 12/31
     id                    instance of ID object, carries bbid for model
     interview             P; points to target BusinessUnit.interview
+    period_cache          instance of PeriodCache; limits future financials kept
+    profile_cache         dict; id of target : combined tag profile and stamp
     portal_data           dict; stores data from Portal related to the instance
     processing_status     P (str); name of processing stage ("intake", etc.)
     ref_date              P (date); reference date for Model, specifies current period
@@ -117,10 +134,16 @@ class Model(TagsMixIn):
     set_company()         method sets BusinessUnit as top-level company
     set_timeline()        method sets default timeline
     start()               sets _started and started to True
+    to_delta()            returns fragments changed since the delta base
+    to_snapshot()         returns compact binary snapshot of model
+    to_stream()           writes serialized model to a text stream
     transcribe()          append message and timestamp to transcript
 
     CLASS METHODS:
+    apply_delta()         static method, applies a delta to a flat model
     from_database()         class method, extracts model out of API-format
+    from_snapshot()       class method, extracts model out of binary snapshot
+    from_stream()         class method, reads model written by to_stream()
     ====================  ======================================================
 
     ``P`` indicates attributes decorated as properties. See attribute-level doc
@@ -143,6 +166,32 @@ class Model(TagsMixIn):
         # container for holding Drivers
         self.drivers = DriverContainer()
 
+        # digests of the last serialized version, for to_delta()
+        self.delta_tracker = DeltaTracker()
+
+        # record of unit dependencies, not serialized; rebuilt on full fill
+        # once dependencies.enabled is set
+        self.dependencies = DependencyTracker()
+
+        # compiled consolidation plans, valid until the next structure change
+        self.consolidation_plans = dict()
+
+        # (driver, unit, line) bbids : {period end : value}; only set while a
+        # time line extrapolates
+        self.driver_batches = None
+
+        # drops financials of least recently used future periods; they are
+        # rebuilt from stored values on demand
+        if bb_settings.DYNAMIC_EXTRAPOLATION:
+            budget = PeriodCache.DEFAULT_BUDGET
+        else:
+            budget = None
+        self.period_cache = PeriodCache(budget=budget)
+
+        # combined tag profiles of interview targets, checked against the
+        # versions of the Tags they were built from; not serialized
+        self.profile_cache = dict()
+
         # set and assign unique ID - models carry uuids in the origin namespace
         self.id = ID()
         self.id.assign(name)
@@ -411,13 +460,155 @@ class Model(TagsMixIn):
         M.portal_data.pop('title')
         M.portal_data.pop('bbid')
 
+        # the version just read is the base for the next delta
+        M.delta_tracker.load(
+            M.portal_data.pop(VERSION_KEY, None),
+            M.portal_data.pop(DIGESTS_KEY, None),
+            M._get_delta_periods(),
+        )
+
+        return M
+
+    @classmethod
+    def from_stream(cls, stream):
+        """
+
+        Model.from_stream(stream) -> Model
+
+        **CLASS METHOD**
+
+        --``stream`` is a readable text file-like object
+
+        Method reads a Model written by to_stream(). Method builds the model
+        from the top-level fragments and units, then adds time lines and
+        periods one line at a time, without building the full flat model.
+        """
+        M = None
+        structure = dict()
+        meta = dict()
+        time_line = None
+
+        for key, fragment in load_fragments(stream):
+            if key in (VERSION_KEY, DIGESTS_KEY):
+                meta[key] = fragment
+                continue
+
+            kind = get_fragment_kind(key)
+            if kind not in ('timeline', 'period'):
+                structure[key] = fragment
+                continue
+
+            if M is None:
+                M = cls.from_database(join_fragments(structure))
+                M.timelines = dict()
+
+            if kind == 'timeline':
+                fragment['periods'] = list()
+                time_line = TimeLine.from_database(fragment, model=M)
+                M.timelines[(fragment['resolution'], fragment['name'])] = \
+                    time_line
+            else:
+                TimePeriod.from_database(
+                    fragment, model=M, time_line=time_line
+                )
+
+        if M is None:
+            M = cls.from_database(join_fragments(structure))
+
+        # the version just read is the base for the next delta
+        M.delta_tracker.load(
+            meta.get(VERSION_KEY),
+            meta.get(DIGESTS_KEY),
+            M._get_delta_periods(),
+        )
+
         return M
 
-    def to_database(self):
+    @staticmethod
+    def apply_delta(flat_model, delta):
+        """
+
+        Model.apply_delta(flat_model, delta) -> dict
+
+        **STATIC METHOD**
+
+        --``flat_model`` is the flat model of the version ``delta`` is based on
+        --``delta`` is a dict returned by Model.to_delta()
+
+        Method returns a new flat model with the changes in ``delta``, ready
+        for Model.from_database() or for storage as the next base version.
+        Method raises ValueError if ``flat_model`` is a different version.
+        """
+        return apply_delta(flat_model, delta)
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """
+
+        Model.from_snapshot(data) -> Model
+
+        **CLASS METHOD**
+
+        Method extracts a Model from ``data``, a bytes object returned by
+        Model.to_snapshot(). Method raises ValueError if ``data`` is not a
+        readable snapshot.
+        """
+        return cls.from_database(snapshot.loads(data))
+
+    def to_database(self, track=False):
         """
 
         Model.to_database() -> dict
 
+        --``track`` is bool; whether to make the result the delta base
+
+        Method returns a serialized representation of self. If ``track`` is
+        True, method also records the result as the base version for the next
+        to_delta() call and stores the version and fragment digests in it.
+        """
+        result = self._to_database()
+        if track:
+            self.delta_tracker.record(result, self._get_delta_periods())
+
+        return result
+
+    def to_delta(self):
+        """
+
+        Model.to_delta() -> dict
+
+        Method returns the fragments of the serialized model that changed
+        since the base version: the last to_delta() call, to_database() or
+        to_stream() call with ``track``, or the tracked version read by
+        from_database(). Result is a dict with the ``base`` and new
+        ``version``, ``changed`` fragments keyed by fragment key, their
+        ``digests`` and ``removed`` keys. Periods
+        that were not touched since are not serialized at all. Method records
+        the result as the base version for the next call.
+
+        Method raises ValueError if instance has no base version.
+        """
+        tracker = self.delta_tracker
+        if tracker.version is None:
+            c = "Model has no base version; call to_database(track=True) " \
+                "first."
+            raise ValueError(c)
+
+        periods = self._get_delta_periods()
+        clean = tracker.get_clean(periods)
+        fragments = split_fragments(self._to_database(clean=clean))
+
+        return tracker.diff(fragments, clean, periods)
+
+    def _to_database(self, clean=frozenset(), lazy=False):
+        """
+
+
+        Model._to_database() -> dict
+
+        --``clean`` is a set of delta fragment keys of periods to leave out
+        --``lazy`` bool; if True, units, time lines and periods are generators
+
         Method returns a serialized representation of self.
         """
         result = dict()
@@ -438,33 +629,123 @@ class Model(TagsMixIn):
 
         # pre-process financials in the current period, make sure they get
         # serialized in th database to maintain structure data
-        bus = [bu.to_database() for bu in self.bu_directory.values()]
-        bus.extend(self.taxo_dir.to_database())
-        result['business_units'] = bus
+        bus = self._iter_units_database()
+        result['business_units'] = bus if lazy else list(bus)
         result['taxonomy'] = self.taxonomy.to_database()
 
         # serialized representation has a list of timelines attached
         # with (resolution, name) as properties
-        timelines = []
+        timelines = self._iter_timelines_database(clean=clean, lazy=lazy)
+        result['timelines'] = timelines if lazy else list(timelines)
+        result['drivers'] = self.drivers.to_database()
+        result['fiscal_year_end'] = self._fiscal_year_end
+
+        # One-way attributes (will not be used in de-serialization):
+        result['bbid'] = self.id.bbid.hex
+        result['title'] = self.title
+
+        return result
+
+    def _iter_timelines_database(self, clean=frozenset(), lazy=False):
+        """
+
+
+        Model._iter_timelines_database() -> iter
+
+        --``clean`` is a set of delta fragment keys of periods to leave out
+        --``lazy`` bool; if True, periods of each time line are a generator
+
+        Method yields a serialized representation of each time line, with
+        (resolution, name) as properties.
+        """
         for (resolution, name), time_line in self.timelines.items():
             data = {
                 'resolution': resolution,
                 'name': name,
             }
+            skip = {
+                end for end in time_line
+                if get_period_key(resolution, name, end) in clean
+            }
             # add serialized periods
-            data.update(time_line.to_database())
-            timelines.append(data)
+            data.update(time_line.to_database(skip=skip, lazy=lazy))
+            yield data
 
-        result['timelines'] = timelines
-        result['drivers'] = self.drivers.to_database()
-        result['fiscal_year_end'] = self._fiscal_year_end
+    def _iter_units_database(self):
+        """
 
-        # One-way attributes (will not be used in de-serialization):
-        result['bbid'] = self.id.bbid.hex
-        result['title'] = self.title
+
+        Model._iter_units_database() -> iter
+
+
+        Method yields a serialized representation of each business unit,
+        then of each taxonomy unit.
+        """
+        for bu in self.bu_directory.values():
+            yield bu.to_database()
+
+        yield from self.taxo_dir.to_database()
+
+    def _get_delta_periods(self):
+        """
+
+
+        Model._get_delta_periods() -> dict
+
+        Method returns a dict of delta fragment key : TimePeriod for every
+        period in every time line.
+        """
+        result = dict()
+        for (resolution, name), time_line in self.timelines.items():
+            for period in time_line.values():
+                key = get_period_key(resolution, name, period.end)
+                result[key] = period
 
         return result
 
+    def to_snapshot(self):
+        """
+
+        Model.to_snapshot() -> bytes
+
+        Method returns a compact binary representation of self that
+        Model.from_snapshot() reads back. Snapshot carries the same content as
+        to_database(), with period line values packed into columns. Snapshots
+        are smaller than the dict or json output, not faster: both directions
+        still go through to_database() and from_database().
+        """
+        return snapshot.dumps(self.to_database())
+
+    def to_stream(self, stream, track=False):
+        """
+
+        Model.to_stream() -> None
+
+        --``stream`` is a writable text file-like object
+        --``track`` is bool; whether to make the result the delta base
+
+        Method writes the same content as to_database() to ``stream``, one
+        JSON line per fragment (see delta module). Units and periods are
+        serialized one at a time and dropped once written, so the flat model
+        is never held in memory as a whole. If ``track`` is True, method also
+        records the result as the base version for the next to_delta() call
+        and writes the version and fragment digests after the fragments.
+        """
+        digests = dict()
+        for key, fragment in iter_fragments(self._to_database(lazy=True)):
+            if track:
+                digests[key] = get_digest(fragment)
+            dump_fragment(stream, key, fragment)
+
+        if not track:
+            return
+
+        periods = self._get_delta_periods()
+        version = self.delta_tracker.record_digests(digests, periods)
+
+        dump_fragment(stream, VERSION_KEY, version)
+        dump_fragment(stream, DIGESTS_KEY, digests)
+
     def calc_summaries(self):
         """
 
@@ -536,6 +817,15 @@ class Model(TagsMixIn):
             for per in tl.values():
                 per.clear()
 
+        # stored values are gone, partial recalculation no longer possible
+        self.dependencies.mark_all()
+
+        # structure changed, so line positions in plans are no longer valid
+        self.consolidation_plans.clear()
+
+        # spilled rows were read back by clear(), the spill file is dead
+        self.period_cache.close()
+
     def copy(self):
         """
 
@@ -0,0 +1,208 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.parallel_extrapolation
+"""
+
+Module fans extrapolation of independent business unit subtrees out to a pool
+of forked worker processes. Workers inherit the model at fork time, fill out
+their subtree in every future period and ship back the stored line values.
+The parent then loads those values and fills out the units above the subtrees
+on its own.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+extrapolate_in_pool() fill out subtrees in worker processes, return line rows
+fill_out_period()     load shipped rows into a period, fill out top units
+plan_subtrees()       split a company into subtree roots and top units
+
+CLASSES:
+n/a
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import logging
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+import bb_settings
+
+
+
+
+# Globals
+logger = logging.getLogger(bb_settings.LOGNAME_MAIN)
+
+_worker_state = dict()
+# Set in the parent right before the pool forks, so workers inherit the model
+# instead of unpickling it.
+
+# Functions
+def extrapolate_in_pool(time_line, seed, company, workers):
+    """
+
+
+    extrapolate_in_pool() -> tuple
+
+    --``time_line`` is the TimeLine to extrapolate
+    --``seed`` is the TimePeriod to extrapolate from, already filled out
+    --``company`` is the top BusinessUnit
+    --``workers`` is the maximum number of worker processes
+
+    Function fills out each subtree returned by plan_subtrees() in a separate
+    process and returns a tuple of (top unit bbids, dict of period end : list
+    of line rows). Function returns (None, None) if the platform cannot fork
+    or the company has no components to fan out.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return None, None
+
+    roots, top = plan_subtrees(company, workers)
+    if not roots:
+        return None, None
+
+    _worker_state['time_line'] = time_line
+    _worker_state['seed_end'] = seed.end
+
+    shipped = dict()
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=min(workers, len(roots)),
+                                 mp_context=context) as pool:
+            for bbid, by_period in pool.map(_extrapolate_subtree, roots):
+                logger.info('subtree %s extrapolated', bbid)
+                for end, rows in by_period.items():
+                    shipped.setdefault(end, list()).extend(rows)
+    finally:
+        _worker_state.clear()
+
+    return top, shipped
+
+
+def fill_out_period(company, period, top, rows):
+    """
+
+
+    fill_out_period() -> None
+
+    --``company`` is the top BusinessUnit
+    --``period`` is a cleared TimePeriod
+    --``top`` is the set of bbids for units above the subtree roots
+    --``rows`` is the list of line rows shipped back for the period
+
+    Function loads subtree line values into the period, then fills out only
+    the top units. Top units consolidate the subtree roots from the loaded
+    values.
+    """
+    period._load_line_storage(rows)
+
+    tracker = company.relationships.model.dependencies
+    tracker.scope = top
+    try:
+        company.fill_out(period=period)
+    finally:
+        tracker.scope = None
+
+
+def plan_subtrees(company, count):
+    """
+
+
+    plan_subtrees() -> tuple
+
+    --``company`` is the top BusinessUnit
+    --``count`` is the number of subtrees to aim for
+
+    Function returns a tuple of (list of subtree root bbids, set of top unit
+    bbids). Function starts with the company's components and keeps replacing
+    the largest subtree with its own components until there are at least
+    ``count`` roots or no root has components left. Replaced units join the
+    top set, which the parent fills out after loading subtree values.
+    """
+    top = {company.id.bbid}
+    roots = company.components.get_ordered()
+
+    while roots and len(roots) < count:
+        split = max(roots, key=lambda unit: len(unit.components))
+        if not split.components:
+            break
+
+        roots.remove(split)
+        roots.extend(split.components.get_ordered())
+        top.add(split.id.bbid)
+
+    return [unit.id.bbid for unit in roots], top
+
+
+def _extrapolate_subtree(bbid):
+    """
+
+
+    _extrapolate_subtree() -> tuple
+
+    --``bbid`` is the bbid of the subtree root
+
+    Function runs in a worker process. Function fills out the subtree in every
+    period after the seed, exactly as TimeLine.extrapolate() would, and returns
+    a tuple of (bbid, dict of period end : list of line rows for the subtree).
+    """
+    time_line = _worker_state['time_line']
+    seed = time_line[_worker_state['seed_end']]
+    unit = time_line.model.bu_directory[bbid]
+
+    bbid_hexes = set()
+    for sub in _walk_subtree(unit):
+        for statement in sub.financials.full_ordered:
+            if statement:
+                for line in statement.get_full_ordered():
+                    bbid_hexes.add(line.id.bbid.hex)
+
+    result = dict()
+    for period in time_line.iter_ordered(open=seed.end):
+        if period.end > seed.end:
+            period.clear()
+            period.tags = seed.tags.extrapolate_to(period.tags)
+            period.combine_parameters()
+
+            unit.fill_out(period=period)
+
+            rows = period._deflate_line_storage()
+            result[period.end] = [
+                row for row in rows if row['bbid'] in bbid_hexes
+            ]
+
+            # drop used up periods to keep worker size low
+            if period.past and period.past.past:
+                if period.past.past.end > seed.end:
+                    period.past.past.financials.clear()
+
+    return bbid, result
+
+
+def _walk_subtree(unit):
+    """
+
+
+    _walk_subtree() -> list
+
+    --``unit`` is a BusinessUnit
+
+    Function returns a list of unit and all of its descendants.
+    """
+    result = [unit]
+    for sub in unit.components.get_all():
+        result.extend(_walk_subtree(sub))
+
+    return result
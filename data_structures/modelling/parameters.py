@@ -26,6 +26,8 @@ Parameters            dictionary with overwrite controls
 
 
 # Imports
+import itertools
+
 from pydoc import locate
 
 import bb_exceptions
@@ -38,18 +40,30 @@ from tools.parsing import date_from_iso
 # Constants
 # n/a
 
+# Globals
+_versions = itertools.count()
+# Shared across instances, so two containers only carry the same version if
+# one is an unmodified copy of the other.
+
 # Classes
 class Parameters(dict):
     """
 
     Dictionary-type container that monitors whether keys overwrite existing
-    data on add() calls.
+    data on add() calls. Instance draws a new ``version`` on every change, so
+    callers can cache values derived from its contents.
+
+    ``version`` only tracks the instance's own keys. Changing a nested value
+    in place (e.g. params['schedule'].append(x)) does not draw a new version.
+    Caches built on ``version`` must therefore hold nested values by
+    reference, never copies or values computed from them, so that they see
+    such changes the same way a fresh merge would.
     ====================  ======================================================
     Attribute             Description
     ====================  ======================================================
 
     DATA:
-    n/a
+    version               int; changes whenever instance contents change
 
     FUNCTIONS:
     add()                 add data, throw exception for overlap with known keys
@@ -58,6 +72,43 @@ class Parameters(dict):
     """
     def __init__(self):
         dict.__init__(self)
+        self.version = next(_versions)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self.version = next(_versions)
+
+    def __ior__(self, other):
+        dict.update(self, other)
+        self.version = next(_versions)
+        return self
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self.version = next(_versions)
+
+    def clear(self):
+        dict.clear(self)
+        self.version = next(_versions)
+
+    def pop(self, *args):
+        result = dict.pop(self, *args)
+        self.version = next(_versions)
+        return result
+
+    def popitem(self):
+        result = dict.popitem(self)
+        self.version = next(_versions)
+        return result
+
+    def setdefault(self, key, default=None):
+        result = dict.setdefault(self, key, default)
+        self.version = next(_versions)
+        return result
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self.version = next(_versions)
 
     def add(self, new_data, overwrite=False):
         """
@@ -0,0 +1,220 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.period_cache
+"""
+
+Module defines PeriodCache, a least-recently-used limit on how many future
+periods keep rich financials in memory.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+n/a
+
+CLASSES:
+PeriodCache           evicts financials of least recently used future periods
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import os
+import pickle
+import tempfile
+import threading
+
+from collections import OrderedDict
+
+
+
+
+# Constants
+# n/a
+
+# Globals
+_file_lock = threading.Lock()
+# Guards seek-and-read on platforms without os.pread, such as Windows.
+
+# Classes
+class PeriodCache:
+    """
+
+    PeriodCache tracks future periods that hold rich financials and keeps at
+    most ``budget`` of them. When a period falls out of the budget, the cache
+    clears its financials dictionary. Every value, hardcoded flag and piece of
+    xl data is already in the period's line storage, so the next call to
+    BusinessUnit.get_financials() for that period rebuilds the financials
+    transparently (and Model.populate_xl_data() restores xl data for chefs).
+
+    If ``spill`` is True, the cache also writes the line records of evicted
+    periods to a temporary file and drops them from memory. TimePeriod reads
+    them back on first access. Spilling pickles every evicted period, so it
+    is off unless the caller asks for it. Periods that keep their records in
+    a shared ColumnarLineStorage are not spilled; the columns are compact
+    already.
+
+    Periods up to and including the current period are never evicted. Topics
+    and interviews work on them directly.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    budget                int; periods to keep financials for, None for no limit
+    spill                 bool; whether to write evicted line records to disk
+    spill_dir             str; directory for the spill file, None for default
+
+    FUNCTIONS:
+    close()               forget tracked periods and close the spill file
+    load()                returns the line records spilled at a location
+    touch()               mark period as recently used, evict over budget
+    ====================  ======================================================
+    """
+    DEFAULT_BUDGET = 3
+
+    def __init__(self, budget=None, spill=False, spill_dir=None):
+        self.budget = budget
+        self.spill = spill
+        self.spill_dir = spill_dir
+
+        self._file = None
+        self._file_pid = None
+        self._periods = OrderedDict()
+
+    def close(self):
+        """
+
+
+        PeriodCache.close() -> None
+
+
+        Method forgets tracked periods and closes the spill file. Periods that
+        were spilled before the call keep their location and can still be read
+        while the file object stays referenced.
+        """
+        self._periods.clear()
+        self._file = None
+        self._file_pid = None
+
+    @staticmethod
+    def load(location):
+        """
+
+
+        PeriodCache.load() -> list
+
+        --``location`` is a tuple of (file, offset, size) from a spill
+
+        Method returns the line records written at ``location``. Where
+        os.pread is available, method reads without moving the file position,
+        so forked processes sharing the file do not disturb each other.
+        Elsewhere (Windows, where there is no fork) method seeks and reads
+        under a lock.
+        """
+        spill_file, offset, size = location
+        if hasattr(os, 'pread'):
+            data = os.pread(spill_file.fileno(), size, offset)
+        else:
+            with _file_lock:
+                spill_file.seek(offset)
+                data = spill_file.read(size)
+
+        return pickle.loads(data)
+
+    def touch(self, period):
+        """
+
+
+        PeriodCache.touch() -> None
+
+        --``period`` is a TimePeriod that was just used
+
+        Method marks ``period`` as most recently used and evicts the least
+        recently used periods beyond the budget. No-op if budget is None or
+        ``period`` is not in the future.
+        """
+        if self.budget is None:
+            return
+
+        time_line = period.relationships.parent
+        current = getattr(time_line, 'current_period', None)
+        if current is None or period.end <= current.end:
+            return
+
+        key = id(period)
+        if key in self._periods:
+            self._periods.move_to_end(key)
+        else:
+            self._periods[key] = period
+
+        # most recent period always stays, whatever the budget
+        while len(self._periods) > max(self.budget, 1):
+            _, stale = self._periods.popitem(last=False)
+            self._evict(stale)
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _evict(self, period):
+        """
+
+
+        PeriodCache._evict() -> None
+
+        --``period`` is a TimePeriod
+
+        Method clears period financials and, if spilling, moves the period's
+        line records to the spill file.
+        """
+        period.financials.clear()
+
+        if self.spill and period.line_storage is None:
+            rows = period._deflate_line_storage()
+            if rows:
+                period._spill_line_storage(self._write(rows))
+
+    def _get_file(self):
+        """
+
+
+        PeriodCache._get_file() -> file
+
+        Method returns the spill file for the current process, opening a new
+        one on first use or after a fork.
+        """
+        pid = os.getpid()
+        if self._file is None or self._file_pid != pid:
+            self._file = tempfile.TemporaryFile(dir=self.spill_dir)
+            self._file_pid = pid
+
+        return self._file
+
+    def _write(self, rows):
+        """
+
+
+        PeriodCache._write() -> tuple
+
+        --``rows`` is a list of line record dicts
+
+        Method appends rows to the spill file and returns their location.
+        """
+        spill_file = self._get_file()
+        data = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+
+        with _file_lock:
+            offset = spill_file.seek(0, os.SEEK_END)
+            spill_file.write(data)
+            spill_file.flush()
+
+        return spill_file, offset, len(data)
@@ -0,0 +1,701 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+# Blackbird Environment
+# Module: data_structures.modelling.snapshot
+"""
+
+Module defines a compact binary codec for the flat model produced by
+Model.to_database(). Structure is written once as tagged values, with every
+repeated string stored by reference. Period line records are written as
+packed columns per time line: one shared table of line bbids, then typed
+arrays of line indices, values, value types and hardcoded flags per period.
+
+Codec only uses the standard library (struct, array) and only emits plain
+data, so loading a snapshot cannot run code. Reader checks every count,
+index and tag against the data it has, and raises ValueError for any
+snapshot it cannot decode.
+
+Snapshots trade size, not speed: Model.from_snapshot() still rebuilds the
+model through from_database(), so decoding costs about as much as the dict
+path.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+MAGIC                 bytes; first bytes of every snapshot
+VERSION               int; snapshot layout version
+
+FUNCTIONS:
+dumps()               returns snapshot bytes for a flat model dict
+loads()               returns flat model dict from snapshot bytes
+
+CLASSES:
+SnapshotReader        decodes values and packed columns from a buffer
+SnapshotWriter        encodes values and packed columns into a buffer
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import decimal
+import io
+import struct
+import sys
+import uuid
+
+from array import array
+
+
+
+
+# Constants
+MAGIC = b'BBSN'
+VERSION = 1
+
+# value tags
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INT = b'i'
+_BIG_INT = b'I'
+_FLOAT = b'd'
+_STR = b's'
+_STR_REF = b'r'
+_BYTES = b'b'
+_LIST = b'l'
+_TUPLE = b't'
+_DICT = b'm'
+_DATE = b'D'
+_DATETIME = b'W'
+_UUID = b'U'
+_DECIMAL = b'K'
+
+# kinds of line values in packed columns
+_KIND_NONE = 0
+_KIND_FLOAT = 1
+_KIND_INT = 2
+_KIND_BOOL = 3
+_KIND_OBJECT = 4
+
+# largest int that survives a round trip through a double
+_MAX_EXACT_INT = 2 ** 53
+
+# deepest nesting of lists, tuples and dicts the reader accepts
+_MAX_DEPTH = 100
+
+# failures of a decoded value that mean the snapshot is corrupt
+_DECODE_ERRORS = (
+    ArithmeticError,
+    AttributeError,
+    IndexError,
+    KeyError,
+    TypeError,
+)
+
+_LENGTH = struct.Struct('<I')
+_INT64 = struct.Struct('<q')
+_DOUBLE = struct.Struct('<d')
+_HEADER = struct.Struct('<4sB')
+
+_SWAP = sys.byteorder != 'little'
+
+# Functions
+def dumps(flat_model):
+    """
+
+
+    dumps() -> bytes
+
+    --``flat_model`` is a dict returned by Model.to_database()
+
+    Function returns a binary snapshot of ``flat_model``. Function does not
+    modify ``flat_model``.
+    """
+    writer = SnapshotWriter()
+    writer.write_model(flat_model)
+
+    return writer.getvalue()
+
+
+def loads(data):
+    """
+
+
+    loads() -> dict
+
+    --``data`` is a bytes-like snapshot returned by dumps()
+
+    Function returns a flat model dict that Model.from_database() accepts.
+    Function raises ValueError if ``data`` is not a snapshot of a known
+    version or cannot be decoded.
+    """
+    reader = SnapshotReader(data)
+
+    return reader.read_model()
+
+
+# Classes
+class SnapshotWriter:
+    """
+
+    SnapshotWriter encodes a flat model into a growing buffer.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    n/a
+
+    FUNCTIONS:
+    getvalue()            returns bytes written so far
+    write_columns()       writes period line records as packed columns
+    write_model()         writes header, structure and period columns
+    write_value()         writes a tagged plain value
+    ====================  ======================================================
+    """
+    def __init__(self):
+        self._buffer = io.BytesIO()
+        self._strings = dict()
+
+    def getvalue(self):
+        """
+
+
+        SnapshotWriter.getvalue() -> bytes
+
+
+        Method returns the bytes written so far.
+        """
+        return self._buffer.getvalue()
+
+    def write_columns(self, periods):
+        """
+
+
+        SnapshotWriter.write_columns() -> None
+
+        --``periods`` is the list of flat periods of one time line
+
+        Method writes the line records of every period as packed columns. The
+        line bbid table is shared by all periods in the time line.
+        """
+        line_index = dict()
+        type_index = dict()
+        for flat_period in periods:
+            for row in flat_period['financials_values']:
+                line_index.setdefault(row['bbid'], len(line_index))
+                type_index.setdefault(row.get('value_type'), len(type_index))
+
+        self.write_value(list(line_index))
+        self.write_value(list(type_index))
+
+        for flat_period in periods:
+            rows = flat_period['financials_values']
+
+            lines = array('I')
+            kinds = array('b')
+            values = array('d')
+            types = array('H')
+            hardcoded = array('b')
+            objects = list()
+            xl_data = dict()
+
+            for i, row in enumerate(rows):
+                value = row.get('value')
+                if value is None:
+                    kind = _KIND_NONE
+                    number = 0.0
+                elif isinstance(value, bool):
+                    kind = _KIND_BOOL
+                    number = float(value)
+                elif isinstance(value, float):
+                    kind = _KIND_FLOAT
+                    number = value
+                elif isinstance(value, int) and abs(value) < _MAX_EXACT_INT:
+                    kind = _KIND_INT
+                    number = float(value)
+                else:
+                    kind = _KIND_OBJECT
+                    number = 0.0
+                    objects.append(value)
+
+                lines.append(line_index[row['bbid']])
+                kinds.append(kind)
+                values.append(number)
+                types.append(type_index[row.get('value_type')])
+                hardcoded.append(1 if row.get('hardcoded') else 0)
+
+                if row.get('xl_data'):
+                    xl_data[i] = row['xl_data']
+
+            self._write_length(len(rows))
+            for column in (lines, kinds, values, types, hardcoded):
+                self._write_array(column)
+
+            self.write_value(objects)
+            self.write_value(xl_data)
+
+    def write_model(self, flat_model):
+        """
+
+
+        SnapshotWriter.write_model() -> None
+
+        --``flat_model`` is a dict returned by Model.to_database()
+
+        Method writes the snapshot header, then the model structure with line
+        records left out, then the line records of each time line.
+        """
+        self._buffer.write(_HEADER.pack(MAGIC, VERSION))
+
+        structure = dict(flat_model)
+        timelines = list()
+        columns = list()
+        for flat_line in flat_model.get('timelines') or list():
+            flat_line = dict(flat_line)
+            periods = flat_line.pop('periods')
+            shells = list()
+            for flat_period in periods:
+                shell = dict(flat_period)
+                shell.pop('financials_values')
+                shells.append(shell)
+            flat_line['periods'] = shells
+
+            timelines.append(flat_line)
+            columns.append(periods)
+
+        if 'timelines' in flat_model:
+            structure['timelines'] = timelines
+
+        self.write_value(structure)
+        for periods in columns:
+            self.write_columns(periods)
+
+    def write_value(self, value):
+        """
+
+
+        SnapshotWriter.write_value() -> None
+
+        --``value`` is a plain value: None, bool, int, float, str, bytes,
+        list, tuple, dict, date, datetime, UUID or Decimal
+
+        Method writes ``value`` with a one byte tag. Method raises TypeError
+        for any other type.
+        """
+        write = self._buffer.write
+
+        if value is None:
+            write(_NONE)
+        elif value is True:
+            write(_TRUE)
+        elif value is False:
+            write(_FALSE)
+        elif isinstance(value, str):
+            known = self._strings.get(value)
+            if known is None:
+                self._strings[value] = len(self._strings)
+                write(_STR)
+                self._write_bytes(value.encode('utf-8'))
+            else:
+                write(_STR_REF)
+                self._write_length(known)
+        elif isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                write(_INT)
+                write(_INT64.pack(value))
+            else:
+                write(_BIG_INT)
+                self._write_bytes(str(value).encode('ascii'))
+        elif isinstance(value, float):
+            write(_FLOAT)
+            write(_DOUBLE.pack(value))
+        elif isinstance(value, dict):
+            write(_DICT)
+            self._write_length(len(value))
+            for k, v in value.items():
+                self.write_value(k)
+                self.write_value(v)
+        elif isinstance(value, (list, tuple)):
+            write(_TUPLE if isinstance(value, tuple) else _LIST)
+            self._write_length(len(value))
+            for item in value:
+                self.write_value(item)
+        # datetime is a subclass of date, check it first
+        elif isinstance(value, datetime.datetime):
+            write(_DATETIME)
+            self._write_bytes(value.isoformat().encode('ascii'))
+        elif isinstance(value, datetime.date):
+            write(_DATE)
+            self._write_length(value.toordinal())
+        elif isinstance(value, uuid.UUID):
+            write(_UUID)
+            write(value.bytes)
+        elif isinstance(value, decimal.Decimal):
+            write(_DECIMAL)
+            self._write_bytes(str(value).encode('ascii'))
+        elif isinstance(value, (bytes, bytearray)):
+            write(_BYTES)
+            self._write_bytes(bytes(value))
+        else:
+            c = "Cannot write %s to snapshot" % type(value).__name__
+            raise TypeError(c)
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _write_array(self, column):
+        """
+
+
+        SnapshotWriter._write_array() -> None
+
+        --``column`` is an array
+
+        Method writes the column length and its items in little endian order.
+        """
+        if _SWAP:
+            column = array(column.typecode, column)
+            column.byteswap()
+
+        self._write_length(len(column))
+        self._buffer.write(column.tobytes())
+
+    def _write_bytes(self, data):
+        """
+
+
+        SnapshotWriter._write_bytes() -> None
+
+        --``data`` is bytes
+
+        Method writes the length of ``data``, then ``data``.
+        """
+        self._write_length(len(data))
+        self._buffer.write(data)
+
+    def _write_length(self, number):
+        """
+
+
+        SnapshotWriter._write_length() -> None
+
+        --``number`` is a non-negative int below 2 ** 32
+
+        Method writes ``number`` as an unsigned 32-bit int.
+        """
+        self._buffer.write(_LENGTH.pack(number))
+
+
+class SnapshotReader:
+    """
+
+    SnapshotReader decodes a snapshot written by SnapshotWriter.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    n/a
+
+    FUNCTIONS:
+    read_columns()        reads packed columns back into period line records
+    read_model()          reads header, structure and period columns
+    read_value()          reads a tagged plain value
+    ====================  ======================================================
+    """
+    def __init__(self, data):
+        self._data = memoryview(data)
+        self._offset = 0
+        self._depth = 0
+        self._strings = list()
+
+    def read_columns(self, periods):
+        """
+
+
+        SnapshotReader.read_columns() -> None
+
+        --``periods`` is the list of flat periods of one time line
+
+        Method reads the line records of every period and stores them in the
+        period under ``financials_values``. Method raises ValueError if the
+        columns do not match each other or the line and type tables.
+        """
+        line_table = self.read_value()
+        type_table = self.read_value()
+        if not (isinstance(line_table, list) and
+                isinstance(type_table, list)):
+            raise ValueError("Model snapshot has malformed line tables")
+
+        for flat_period in periods:
+            count = self._read_length()
+            lines = self._read_array('I').tolist()
+            kinds = self._read_array('b').tolist()
+            values = self._read_array('d').tolist()
+            types = self._read_array('H').tolist()
+            hardcoded = self._read_array('b').tolist()
+            objects = self.read_value()
+            xl_data = self.read_value()
+
+            columns = (lines, kinds, values, types, hardcoded)
+            if any(len(column) != count for column in columns):
+                raise ValueError("Model snapshot columns differ in length")
+            if lines and max(lines) >= len(line_table):
+                raise ValueError("Model snapshot line index out of range")
+            if types and max(types) >= len(type_table):
+                raise ValueError("Model snapshot type index out of range")
+            if any(not _KIND_NONE <= kind <= _KIND_OBJECT for kind in kinds):
+                raise ValueError("Model snapshot has unknown value kind")
+            if not isinstance(objects, list) or \
+                    len(objects) != kinds.count(_KIND_OBJECT):
+                raise ValueError("Model snapshot value list is malformed")
+            if not (isinstance(xl_data, dict) and
+                    all(isinstance(v, dict) for v in xl_data.values())):
+                raise ValueError("Model snapshot xl data is malformed")
+
+            objects = iter(objects)
+            rows = list()
+            for i in range(count):
+                kind = kinds[i]
+                if kind == _KIND_FLOAT:
+                    value = values[i]
+                elif kind == _KIND_INT:
+                    value = int(values[i])
+                elif kind == _KIND_BOOL:
+                    value = bool(values[i])
+                elif kind == _KIND_OBJECT:
+                    value = next(objects)
+                else:
+                    value = None
+
+                row = {
+                    'bbid': line_table[lines[i]],
+                    'value': value,
+                    'value_type': type_table[types[i]],
+                    'hardcoded': bool(hardcoded[i]),
+                    'xl_data': xl_data.get(i) or dict(),
+                }
+                rows.append(row)
+
+            flat_period['financials_values'] = rows
+
+    def read_model(self):
+        """
+
+
+        SnapshotReader.read_model() -> dict
+
+
+        Method checks the snapshot header and returns the flat model. Method
+        raises ValueError if the snapshot is of another version, is corrupt
+        or has data left over.
+        """
+        if len(self._data) < _HEADER.size:
+            raise ValueError("Data is too short to be a model snapshot")
+
+        magic, version = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError("Data is not a model snapshot")
+        if version != VERSION:
+            c = "Unsupported model snapshot version: %s" % version
+            raise ValueError(c)
+        self._offset = _HEADER.size
+
+        try:
+            result = self.read_value()
+            if not isinstance(result, dict):
+                raise ValueError("Model snapshot does not hold a model")
+
+            for flat_line in result.get('timelines') or list():
+                periods = flat_line['periods']
+                if not (isinstance(periods, list) and
+                        all(isinstance(p, dict) for p in periods)):
+                    raise ValueError("Model snapshot periods are malformed")
+                self.read_columns(periods)
+        except _DECODE_ERRORS as error:
+            c = "Model snapshot is corrupt near offset %s" % self._offset
+            raise ValueError(c) from error
+
+        if self._offset != len(self._data):
+            raise ValueError("Model snapshot has trailing data")
+
+        return result
+
+    def read_value(self):
+        """
+
+
+        SnapshotReader.read_value() -> obj
+
+
+        Method reads the next tagged value. Method raises ValueError if the
+        value is corrupt, refers to an unknown string or nests deeper than
+        _MAX_DEPTH.
+        """
+        tag = self._take(1).tobytes()
+
+        try:
+            if tag in (_DICT, _LIST, _TUPLE):
+                result = self._read_container(tag)
+            else:
+                result = self._read_scalar(tag)
+        except _DECODE_ERRORS as error:
+            c = "Cannot decode snapshot tag %r near offset %s"
+            raise ValueError(c % (tag, self._offset)) from error
+
+        return result
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _read_array(self, typecode):
+        """
+
+
+        SnapshotReader._read_array() -> array
+
+        --``typecode`` is the array type code of the column
+
+        Method reads a column written by SnapshotWriter._write_array().
+        """
+        result = array(typecode)
+        size = self._read_length() * result.itemsize
+        result.frombytes(self._take(size))
+        if _SWAP:
+            result.byteswap()
+
+        return result
+
+    def _read_bytes(self):
+        """
+
+
+        SnapshotReader._read_bytes() -> bytes
+
+
+        Method reads a length-prefixed run of bytes.
+        """
+        return self._take(self._read_length()).tobytes()
+
+    def _read_container(self, tag):
+        """
+
+
+        SnapshotReader._read_container() -> dict, list or tuple
+
+        --``tag`` is the tag of a dict, list or tuple
+
+        Method reads the items of a container. Every item takes at least one
+        byte, so a count larger than the data left raises ValueError before
+        any item is read.
+        """
+        count = self._read_length()
+        if count > len(self._data) - self._offset:
+            c = "Model snapshot count %s runs past the end of data" % count
+            raise ValueError(c)
+
+        if self._depth >= _MAX_DEPTH:
+            raise ValueError("Model snapshot nests values too deeply")
+        self._depth += 1
+
+        if tag == _DICT:
+            result = dict()
+            for _ in range(count):
+                k = self.read_value()
+                result[k] = self.read_value()
+        else:
+            result = [self.read_value() for _ in range(count)]
+            if tag == _TUPLE:
+                result = tuple(result)
+
+        self._depth -= 1
+
+        return result
+
+    def _read_length(self):
+        """
+
+
+        SnapshotReader._read_length() -> int
+
+
+        Method reads an unsigned 32-bit int.
+        """
+        return _LENGTH.unpack(self._take(_LENGTH.size))[0]
+
+    def _read_scalar(self, tag):
+        """
+
+
+        SnapshotReader._read_scalar() -> obj
+
+        --``tag`` is the tag of any value other than a container
+
+        Method reads a value that holds no other values.
+        """
+        if tag == _NONE:
+            result = None
+        elif tag == _TRUE:
+            result = True
+        elif tag == _FALSE:
+            result = False
+        elif tag == _STR:
+            result = self._read_bytes().decode('utf-8')
+            self._strings.append(result)
+        elif tag == _STR_REF:
+            index = self._read_length()
+            if index >= len(self._strings):
+                c = "Model snapshot refers to unknown string %s" % index
+                raise ValueError(c)
+            result = self._strings[index]
+        elif tag == _INT:
+            result = _INT64.unpack(self._take(_INT64.size))[0]
+        elif tag == _BIG_INT:
+            result = int(self._read_bytes().decode('ascii'))
+        elif tag == _FLOAT:
+            result = _DOUBLE.unpack(self._take(_DOUBLE.size))[0]
+        elif tag == _DATETIME:
+            text = self._read_bytes().decode('ascii')
+            result = datetime.datetime.fromisoformat(text)
+        elif tag == _DATE:
+            result = datetime.date.fromordinal(self._read_length())
+        elif tag == _UUID:
+            result = uuid.UUID(bytes=self._take(16).tobytes())
+        elif tag == _DECIMAL:
+            result = decimal.Decimal(self._read_bytes().decode('ascii'))
+        elif tag == _BYTES:
+            result = self._read_bytes()
+        else:
+            c = "Unknown snapshot tag %r at offset %s" % (tag, self._offset - 1)
+            raise ValueError(c)
+
+        return result
+
+    def _take(self, size):
+        """
+
+
+        SnapshotReader._take() -> memoryview
+
+        --``size`` is the number of bytes to read
+
+        Method returns the next ``size`` bytes and advances the offset.
+        Method raises ValueError if the snapshot ends early.
+        """
+        end = self._offset + size
+        if end > len(self._data):
+            raise ValueError("Model snapshot ends unexpectedly")
+
+        result = self._data[self._offset:end]
+        self._offset = end
+
+        return result
@@ -197,7 +197,9 @@ class Statement(BaseFinancialsComponent):
         return result
 
     def copy(self, check_include_details=False, clean=False):
-        result = BaseFinancialsComponent.copy(self)
+        result = BaseFinancialsComponent.copy(
+            self, check_include_details=check_include_details, clean=clean
+        )
         result.display_type = self.display_type
         result.compute = self.compute
         result.balance_sheet = self.balance_sheet
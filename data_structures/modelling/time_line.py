@@ -38,6 +38,8 @@ import tools.for_printing as views
 from data_structures.system.bbid import ID
 from data_structures.system.summary_maker import SummaryMaker
 from tools.parsing import date_from_iso
+from .line_storage import ColumnarLineStorage
+from . import parallel_extrapolation
 from .parameters import Parameters
 from .time_period import TimePeriod
 
@@ -65,6 +67,7 @@ class TimeLine(dict):
     DATA:
     current_period        P; pointer to the period that represents the present
     id                    instance of PlatformComponents.ID class, for interface
+    line_storage          ColumnarLineStorage shared by all periods, or None
     master                TimePeriod; unit templates that fall outside of time
     name                  str; corresponds with Model.time_line key
     parameters            Parameters object, specifies shared parameters
@@ -77,12 +80,14 @@ class TimeLine(dict):
     clear_future()        delete content from future periods
     extrapolate()         use seed to fill out all future periods in instance
     extrapolate_dates()   use seed to fill out a range of dates
+    iter_extrapolate()    extrapolate, yielding each period as it is finished
     find_period()         returns period that contains queried time point
     get_segments()        split time line into past, present, and future
     get_ordered()         returns list of periods ordered by end point
     link()                connect adjacent periods
     revert_current()      go back to the prior current period
     update_current()      updates current_period for reference or actual date
+    use_columnar_storage() moves period line values into a ColumnarLineStorage
     ====================  ======================================================
     """
     DEFAULT_PERIODS_FORWARD = 60
@@ -103,6 +108,7 @@ class TimeLine(dict):
         self.parameters = Parameters()
         self.has_been_extrapolated = False
         self.ref_date = None
+        self.line_storage = None
 
         self.id.set_namespace(model.id.bbid)
 
@@ -186,16 +192,24 @@ class TimeLine(dict):
 
         return new
 
-    def to_database(self):
+    def to_database(self, skip=None, lazy=False):
         """
 
         TimeLine.to_database() -> dict
 
+        --``skip`` is a set of end dates of periods to leave out, or None
+        --``lazy`` bool; if True, periods are serialized by a generator as
+        they are consumed
+
         Method yields a serialized representation of self.
         """
-        periods = [
+        periods = (
             period.to_database() for period in self.values()
-        ]
+            if not skip or period.end not in skip
+        )
+        if not lazy:
+            periods = list(periods)
+
         result = {
             'periods': periods,
             'interval': self.interval,
@@ -346,9 +360,14 @@ class TimeLine(dict):
         Method returns a copy of the instance.
         """
         result = copy.copy(self)
+        if self.line_storage is not None:
+            result.line_storage = self.line_storage.copy()
+
         for key, value in self.items():
             result[key] = value.copy()
             result[key].relationships.set_parent(result)
+            if result.line_storage is not None:
+                result[key]._line_storage = result.line_storage
         result.has_been_extrapolated = self.has_been_extrapolated
         return result
 
@@ -401,16 +420,50 @@ class TimeLine(dict):
         """
         return list(self.iter_ordered())
 
-    def extrapolate(self, seed=None, calc_summaries=True):
+    def extrapolate(self, seed=None, calc_summaries=True, workers=None):
         """
 
 
         TimeLine.extrapolate() -> None
 
+        --``workers`` is the number of processes to fill out subtrees with
 
         Extrapolate current period to future dates.  Make quarterly and annual
         financial summaries.  Updates all summaries contained in
         instance.summaries.
+
+        If ``workers`` is above 1, method fills out independent subtrees of
+        the company in forked worker processes first, then fills out the units
+        above them here, consolidating from the values the workers shipped.
+        """
+        for _ in self.iter_extrapolate(
+            seed=seed, calc_summaries=calc_summaries, workers=workers
+        ):
+            pass
+
+    def iter_extrapolate(self, seed=None, calc_summaries=True, workers=None):
+        """
+
+
+        TimeLine.iter_extrapolate() -> iter
+
+        --``seed`` is the TimePeriod to extrapolate from, default is current
+        --``calc_summaries`` bool; if True, build quarterly and annual summaries
+        --``workers`` is the number of processes to fill out subtrees with
+
+        Generator version of extrapolate(). Method yields a tuple of (period,
+        list of summary periods) for the seed and then for every following
+        period as soon as it is filled out, so callers can serialize or chop
+        each period and let it go before the next one is computed.
+
+        Summary periods are yielded once they are complete. SummaryMaker
+        closes a quarter or year when the first period after it arrives, so a
+        summary usually comes with the period that follows it. The last
+        summaries come with the last period.
+
+        If the caller stops early, method still restores model state, but the
+        remaining periods are left as they were and the time line is not
+        marked as extrapolated.
         """
         print('--------EXTRAPOLATE----------')
         if seed is None:
@@ -420,40 +473,67 @@ class TimeLine(dict):
 
         company.consolidate_fins_structure()
 
+        # full pass below records dependencies anew
+        self.model.dependencies.reset()
+
+        # let batched formulas fill future periods in one call per line
+        self.model.driver_batches = dict()
+
         if seed.past:
             company.recalculate(period=seed.past, adjust_future=False)
         company.recalculate(period=seed, adjust_future=False)
 
+        top = None
+        if workers and workers > 1:
+            top, shipped = parallel_extrapolation.extrapolate_in_pool(
+                self, seed, company, workers
+            )
+
         summary_maker = SummaryMaker(self.model)
+        summarize = bb_settings.MAKE_ANNUAL_SUMMARIES and calc_summaries
 
-        for period in self.iter_ordered(open=seed.end):
-            if period.end > seed.end:
-                logger.info(period.end)
+        periods = list(self.iter_ordered(open=seed.end))
+        try:
+            for period in periods:
+                if period.end > seed.end:
+                    logger.info(period.end)
 
-                # reset content and directories
-                period.clear()
+                    # reset content and directories
+                    period.clear()
+
+                    # combine tags
+                    period.tags = seed.tags.extrapolate_to(period.tags)
 
-                # combine tags
-                period.tags = seed.tags.extrapolate_to(period.tags)
+                    # propagate parameters from past to current
+                    period.combine_parameters()
 
-                # propagate parameters from past to current
-                period.combine_parameters()
+                    # copy and fill out content
+                    if top is None:
+                        company.fill_out(period=period)
+                    else:
+                        parallel_extrapolation.fill_out_period(
+                            company, period, top, shipped.pop(period.end, [])
+                        )
 
-                # copy and fill out content
-                company.fill_out(period=period)
+                if summarize:
+                    if period.end >= self.current_period.end:
+                        summary_maker.parse_period(period)
 
-            if bb_settings.MAKE_ANNUAL_SUMMARIES and calc_summaries:
-                if period.end >= self.current_period.end:
-                    summary_maker.parse_period(period)
+                    # nothing follows the last period to close its summaries
+                    if period is periods[-1]:
+                        summary_maker.wrap()
 
-            # drop future periods that have been used up to keep size low
-            if bb_settings.DYNAMIC_EXTRAPOLATION:
-                if period.past and period.past.past:
-                    if period.past.past.end > self.current_period.end:
-                        period.past.past.financials.clear()
+                # drop least recently used future periods to keep size low;
+                # evicted periods rebuild on get_financials()
+                self.model.period_cache.touch(period)
 
-        if bb_settings.MAKE_ANNUAL_SUMMARIES and calc_summaries:
-            summary_maker.wrap()
+                yield period, summary_maker.pop_closed()
+        finally:
+            if top is not None:
+                # dependencies recorded in worker processes are lost
+                self.model.dependencies.mark_all()
+
+            self.model.driver_batches = None
 
         # import devhooks
         # devhooks.picksize(self)
@@ -602,6 +682,25 @@ class TimeLine(dict):
         result = [past_dates, [ref_end], future_dates]
         return result
 
+    def use_columnar_storage(self):
+        """
+
+
+        TimeLine.use_columnar_storage() -> ColumnarLineStorage
+
+        Method switches every period in instance from per-period line
+        dictionaries to a single ColumnarLineStorage, moving existing values
+        over. Periods added later attach to the same store. No-op if instance
+        already uses columnar storage.
+        """
+        if self.line_storage is None:
+            self.line_storage = ColumnarLineStorage()
+
+            for period in self.iter_ordered():
+                period.set_line_storage(self.line_storage)
+
+        return self.line_storage
+
     # *************************************************************************#
     #                           NON-PUBLIC METHODS                             #
     # *************************************************************************#
@@ -654,6 +753,9 @@ class TimeLine(dict):
         # have their own bbids.
         period.relationships.set_parent(self)
 
+        if self.line_storage is not None:
+            period.set_line_storage(self.line_storage)
+
         # end dates of the past and future periods
         try:
             period.past_end = max(
@@ -41,6 +41,7 @@ from pydoc import locate
 from tools.parsing import date_from_iso
 
 from .parameters import Parameters
+from .period_cache import PeriodCache
 
 
 
@@ -82,9 +83,12 @@ class TimePeriod(TagsMixIn):
     end                   datetime.date; last date in period
     next_end              datetime.date; end of following period
     past_end              datetime.date; end of preceding period
+    dirty                 bool; True if stored lines changed since last save
     financials            dict {bbid: Financials)
     id                    instance of ID class
     length                float; seconds between start and end
+    line_storage          p; ColumnarLineStorage shared with TimeLine or None
+    spilled               p; bool, True if line values were spilled to disk
     parameters            Parameters object, specifies shared parameters
     relationships         instance of Relationships class
     summary               string, Summary Period = None, 'annual', 'quarterly'
@@ -92,12 +96,14 @@ class TimePeriod(TagsMixIn):
     FUNCTIONS:
     __str__               basic print, shows starts, ends,
     clear()               clears financials dictionary
+    clear_lines()         clears stored values for specific lines
     combine_parameters()  propagate preceeding period's parameters to self.
     copy()                returns new TimePeriod with a copy of financials
     extrapolate_to()      updates inheritance then delegates to Tags
     ex_to_default()       creates result from seed, sets to target start/end
     get_units()           return list of units from bbid pool
     get_lowest_units()    return list of units w/o components from bbid pool
+    set_line_storage()    moves line values into a shared columnar store
     ====================  ======================================================
     """
     def __init__(self, start_date, end_date, parent=None, **kargs):
@@ -119,14 +125,26 @@ class TimePeriod(TagsMixIn):
         self.parameters = Parameters()
         self.unit_parameters = Parameters()
 
+        self._spilled = None
+        # (file, offset, size) of line values written out by PeriodCache;
+        # read back into _line_item_storage on first access.
+        self._pending_rows = None
+        # database rows kept as received by from_database(); inflated into
+        # _line_item_storage on first access.
         self._line_item_storage = dict()
         # {"value": value of any primitive type,
         #  "xl_data": flat LineData object without styles info,
         #  "hardcoded": bool}
+        self._line_storage = None
+        # ColumnarLineStorage owned by parent TimeLine; when set, it replaces
+        # _line_item_storage as the data hoard for this period.
 
         self.complete = True
         self.periods_used = 1
 
+        # set by line storage writes, cleared by Model.delta_tracker
+        self.dirty = True
+
         # The current approach to indexing units within a period assumes that
         # Blackbird will rarely remove existing units from a model. both
         # The ``bu`` and ``ty`` directories are static: they do not know if
@@ -209,6 +227,62 @@ class TimePeriod(TagsMixIn):
         """
         pass
 
+    @property
+    def line_storage(self):
+        """
+
+        ** property **
+
+        TimePeriod.line_storage() -> ColumnarLineStorage or None
+
+        Columnar store that holds line values for this period, if the parent
+        TimeLine uses one.
+        """
+        return self._line_storage
+
+    @property
+    def spilled(self):
+        """
+
+        ** property **
+
+        TimePeriod.spilled() -> bool
+
+        True if line values for this period were written to disk by the
+        model's PeriodCache and have not been read back yet.
+        """
+        return self._spilled is not None
+
+    @property
+    def _line_item_storage(self):
+        """
+
+        ** property **
+
+        TimePeriod._line_item_storage() -> dict
+
+        Dictionary of bbid hex : line row. If the rows were spilled to disk,
+        or not inflated since from_database(), property loads them first.
+        """
+        if self._spilled is not None or self._pending_rows is not None:
+            self._restore_line_storage()
+
+        return self._line_items
+
+    @_line_item_storage.setter
+    def _line_item_storage(self, value):
+        """
+
+        ** property setter **
+
+        TimePeriod._line_item_storage() -> None
+
+        Replaces line rows, forgets any spilled or pending copy.
+        """
+        self._spilled = None
+        self._pending_rows = None
+        self._line_items = value
+
     @classmethod
     def from_database(cls, portal_data, model, **kargs):
         """
@@ -237,7 +311,8 @@ class TimePeriod(TagsMixIn):
             )
         )
 
-        new._inflate_line_storage(portal_data['financials_values'])
+        # most requests read one or two periods, so inflate on first access
+        new._pending_rows = portal_data['financials_values']
 
         # convert unit_parameters keys to UUID
         for k, v in Parameters.from_database(portal_data['unit_parameters'],
@@ -278,6 +353,11 @@ class TimePeriod(TagsMixIn):
         Method erases all Financials data.
         """
         self.financials = dict()
+        self.dirty = True
+        if self._line_storage is not None:
+            self._line_storage.clear_row(self.end)
+            return
+
         keys = self._line_item_storage.keys()
         keys = list(keys)
         for key in keys:
@@ -286,6 +366,27 @@ class TimePeriod(TagsMixIn):
             if not hc:
                 self._line_item_storage.pop(key)
 
+    def clear_lines(self, bbid_hexes):
+        """
+
+
+        TimePeriod.clear_lines() -> None
+
+        --``bbid_hexes`` is an iterable of line BBID strings
+
+        Method erases stored records for the specified lines, except for
+        hardcoded ones. Method does not touch the financials dictionary.
+        """
+        self.dirty = True
+        if self._line_storage is not None:
+            self._line_storage.clear_row(self.end, bbid_hexes=bbid_hexes)
+            return
+
+        for key in bbid_hexes:
+            value = self._line_item_storage.get(key)
+            if value is not None and not value.get('hardcoded', False):
+                self._line_item_storage.pop(key)
+
     def copy(self, clean=False):
         """
 
@@ -334,7 +435,7 @@ class TimePeriod(TagsMixIn):
             pair_keys = this_dict.keys() | past_dict.keys()
             for bbid in pair_keys:
                 # create our unit_parameters for this bbid if missing
-                this_parm = this_dict.setdefault(bbid, {})
+                this_parm = this_dict.setdefault(bbid, Parameters())
                 past_parm = past_dict.get(bbid, {})
                 # update our unit_parameters with past parameters
                 comb = past_parm.copy()
@@ -439,17 +540,15 @@ class TimePeriod(TagsMixIn):
         --``bbid_hex`` is the string representation of a BBID
 
         Method returns the value of the specified line.  Method retrieves
-        value from _line_item_storage and returns.
+        value from _line_item_storage and returns. Values are stored with their
+        original type (see _inflate_line_storage()), so no conversion is needed.
         """
+        if self._line_storage is not None:
+            return self._line_storage.get_value(self.end, bbid_hex)
+
         line_dict = self._line_item_storage.get(bbid_hex, None)
         if line_dict:
-            val = line_dict.get('value', None)
-            typ = line_dict.get('value_type', float)
-
-            if val is not None:
-                val = locate(typ)(val)
-
-            stored_value = val
+            stored_value = line_dict.get('value', None)
         else:
             stored_value = None
 
@@ -469,14 +568,17 @@ class TimePeriod(TagsMixIn):
         """
         stored_xl = LineData(line)
 
-        line_dict = self._line_item_storage.get(bbid_hex, None)
-        if line_dict:
-            model = self.relationships.parent.model
+        if self._line_storage is not None:
+            flat_xl = self._line_storage.get_xl(self.end, bbid_hex)
+        else:
+            line_dict = self._line_item_storage.get(bbid_hex, None) or {}
             flat_xl = line_dict.get('xl_data', {})
-            if flat_xl:
-                stored_xl = LineData.from_database(flat_xl,
-                                                   model,
-                                                   line)
+
+        if flat_xl:
+            model = self.relationships.parent.model
+            stored_xl = LineData.from_database(flat_xl,
+                                               model,
+                                               line)
 
         return stored_xl
 
@@ -490,6 +592,8 @@ class TimePeriod(TagsMixIn):
 
         Method returns the hardcoded attribute for the line in this period.
         """
+        if self._line_storage is not None:
+            return self._line_storage.get_hc(self.end, bbid_hex)
 
         line_dict = self._line_item_storage.get(bbid_hex, None)
         if line_dict:
@@ -511,6 +615,11 @@ class TimePeriod(TagsMixIn):
         """
 
         # THIS SHOULD NOT BE RUN BY TOPICS
+        self.dirty = True
+        if self._line_storage is not None:
+            self._line_storage.set_value(self.end, line.id.bbid.hex, line.value)
+            return
+
         if line.id.bbid.hex in self._line_item_storage:
             line_dict = self._line_item_storage[line.id.bbid.hex]
         else:
@@ -535,6 +644,13 @@ class TimePeriod(TagsMixIn):
         data hoard.
         """
         # THIS SHOULD NOT BE RUN BY TOPICS
+        self.dirty = True
+        if self._line_storage is not None:
+            self._line_storage.set_xl(
+                self.end, line.id.bbid.hex, line.xl_data.to_database()
+            )
+            return
+
         if line.id.bbid.hex in self._line_item_storage:
             line_dict = self._line_item_storage[line.id.bbid.hex]
         else:
@@ -545,6 +661,13 @@ class TimePeriod(TagsMixIn):
 
     def update_line_hardcoded(self, line):
         # THIS SHOULD NOT BE RUN BY TOPICS
+        self.dirty = True
+        if self._line_storage is not None:
+            self._line_storage.set_hc(
+                self.end, line.id.bbid.hex, line.hardcoded
+            )
+            return
+
         if line.id.bbid.hex in self._line_item_storage:
             line_dict = self._line_item_storage[line.id.bbid.hex]
         else:
@@ -553,6 +676,32 @@ class TimePeriod(TagsMixIn):
 
         line_dict['hardcoded'] = line.hardcoded
 
+    def set_line_storage(self, storage):
+        """
+
+
+        TimePeriod.set_line_storage() -> None
+
+        --``storage`` is a ColumnarLineStorage object or None
+
+        Method moves the line records held by this period into ``storage`` and
+        makes ``storage`` the data hoard for subsequent reads and writes. If
+        ``storage`` is None, method moves records back into a per-period
+        dictionary.
+        """
+        if storage is self._line_storage:
+            return
+
+        rows = self._deflate_line_storage()
+
+        self._line_item_storage = dict()
+        self._line_storage = storage
+
+        if storage is not None:
+            storage.add_row(self.end)
+
+        self._load_line_storage(rows)
+
     # ************************************************************************#
     #                           NON-PUBLIC METHODS                            #
     # ************************************************************************#
@@ -566,6 +715,9 @@ class TimePeriod(TagsMixIn):
         Method flattens _line_item_storage dictionary into a list of dicts
         representing rows in the database.
         """
+        if self._line_storage is not None:
+            return self._line_storage.to_rows(self.end)
+
         lines_out = list()
         for bbid, row in self._line_item_storage.items():
             row['bbid'] = bbid
@@ -580,7 +732,60 @@ class TimePeriod(TagsMixIn):
         TimePeriod._inflate_line_storage() -> None
 
         Method recreates _line_item_storage dictionary from a list of dicts
-        representing rows in the database.
+        representing rows in the database. Method casts each value to its
+        stored type once, here, so that reads can return values as is.
         """
         for row in rows:
-            self._line_item_storage[row['bbid']] = row
+            val = row.get('value', None)
+            typ = row.get('value_type', None)
+            if val is not None:
+                row['value'] = locate(typ or 'float')(val)
+
+        self._load_line_storage(rows)
+
+    def _restore_line_storage(self):
+        """
+
+
+        TimePeriod._restore_line_storage() -> None
+
+        Method reads spilled line rows back into memory, or inflates rows
+        kept since from_database().
+        """
+        if self._pending_rows is not None:
+            rows = self._pending_rows
+            self._pending_rows = None
+            self._line_items = dict()
+            self._inflate_line_storage(rows)
+        else:
+            rows = PeriodCache.load(self._spilled)
+            self._spilled = None
+            self._line_items = {row['bbid']: row for row in rows}
+
+    def _spill_line_storage(self, location):
+        """
+
+
+        TimePeriod._spill_line_storage() -> None
+
+        --``location`` is a tuple of (file, offset, size) holding line rows
+
+        Method drops line rows from memory. Rows are read back from
+        ``location`` on first access.
+        """
+        self._line_items = dict()
+        self._spilled = location
+
+    def _load_line_storage(self, rows):
+        """
+
+
+        TimePeriod._load_line_storage() -> None
+
+        Method writes a list of typed row dicts into the active data hoard.
+        """
+        if self._line_storage is not None:
+            self._line_storage.load_rows(self.end, rows)
+        else:
+            for row in rows:
+                self._line_item_storage[row['bbid']] = row
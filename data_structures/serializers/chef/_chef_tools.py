@@ -18,7 +18,7 @@ n/a
 FUNCTIONS:
 add_links_to_selectors function adds VB macros to link cells in sheets
 add_scenario_selector function adds a scenario selector cell to the sheet
-calculate_formulas    function opens-saves-closes Excel book do calculations
+calculate_formulas    function computes formulas and saves values into the book
 check_alignment       function checks that line is correctly aligned
 check_filename_ext    function checks that file has correct extension
 close_excel_by_force  function closes Excel application by force
@@ -52,10 +52,14 @@ if SCENARIO_SELECTORS:
     import win32gui
     import win32process
 
+if os.name == 'nt':
+    import winreg
+
 from openpyxl.worksheet.datavalidation import DataValidation
 
 from .cell_styles import CellStyles
 from .field_names import FieldNames
+from .formula_evaluator import FormulaEvaluator, write_cached_values
 
 
 
@@ -187,17 +191,28 @@ def add_scenario_selector(sheet, column, row, selections):
                                                row)
 
 
-def calculate_formulas(filename):
+def calculate_formulas(filename, evaluate=False):
     """
 
 
-    update_formulas -> None
+    calculate_formulas -> None
 
     --``filename`` must be the string path for the file to check, real path
-
-    This function opens an Excel file, saves, and closes the file.
+    --``evaluate`` is bool; True to use FormulaEvaluator even if Excel exists
+
+    This function opens, saves, and closes an Excel file in Excel so that
+    Excel will calculate formula values. Where Excel is not installed, or
+    if ``evaluate`` is True, function computes the formulas with
+    FormulaEvaluator instead and writes the results into the file as cached
+    values. Formulas outside the evaluator's subset, and cells that depend
+    on them, are then left without cached values.
     """
-    _write_run_temp_vbs_file(filename, _OPEN_SAVE_CLOSE_VBS_FILE)
+    if evaluate or not _excel_installed():
+        book = xlio.load_workbook(filename)
+        values = FormulaEvaluator(book).evaluate()
+        write_cached_values(filename, values)
+    else:
+        _write_run_temp_vbs_file(filename, _OPEN_SAVE_CLOSE_VBS_FILE)
 
 
 def check_alignment(line):
@@ -485,6 +500,28 @@ def set_param_rows(line, sheet):
     #                          NON-PUBLIC METHODS                             #
     #*************************************************************************#
 
+def _excel_installed():
+    """
+
+
+    _excel_installed -> bool
+
+    Function returns True if Excel is registered for automation on this
+    machine, which the VBS files need.
+    """
+    if os.name != 'nt':
+        return False
+
+    try:
+        key = winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, 'Excel.Application')
+    except OSError:
+        return False
+
+    winreg.CloseKey(key)
+
+    return True
+
+
 def _write_run_temp_vbs_file(filename, vbs_file):
     """
 
@@ -20,6 +20,7 @@ n/a
 
 CLASSES:
 BB_Workbook           workbook where each sheet has a SheetData record set
+WrittenWorksheet      write-only sheet that saves XML written elsewhere
 ====================  =========================================================
 """
 
@@ -29,8 +30,13 @@ BB_Workbook           workbook where each sheet has a SheetData record set
 # Imports
 import openpyxl as xlio
 
+from copy import copy
+from itertools import chain
+
 from chef_settings import COLLAPSE_ROWS, DEFAULT_SCENARIOS, \
     SCENARIO_SELECTORS, SAVE_NAMED_RANGES
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.writer.write_only import WriteOnlyWorksheet
 
 from ._chef_tools import check_filename_ext
 from .data_management import SheetData
@@ -46,7 +52,12 @@ if COLLAPSE_ROWS or SCENARIO_SELECTORS:
 
 
 # Constants
-# n/a
+STREAMED_SHEET_ATTRS = (
+    'auto_filter', 'column_dimensions', 'data_validations', 'print_options',
+    'page_margins', 'page_setup', 'protection', 'row_dimensions',
+    'sheet_format', 'sheet_properties', 'sheet_state', 'sort_state', 'views',
+)
+# Worksheet settings carried over to the write-only copy of a sheet.
 
 # Module Globals
 # n/a
@@ -68,8 +79,11 @@ class BB_Workbook(xlio.Workbook):
 
     FUNCTIONS:
     create_sheet()        returns sheet with a SheetData instance at sheet.bb
+    get_index()           returns position of sheet, or of its streamed copy
     save()                saves workbook to file and runs test on contents
     set_scenario_names()  sets scenario_names attribute
+    set_sheet_xml()       replaces finished sheet with its written XML
+    stream_sheet()        replaces finished sheet with a write-only copy
     ====================  ======================================================
     """
     def __init__(self, *pargs, **kwargs):
@@ -77,6 +91,7 @@ class BB_Workbook(xlio.Workbook):
         self.scenario_names = None
         self.original_tab_count = 0
         self.drivers_tab_name = TabNames.SCENARIOS
+        self._streamed = dict()
 
     @staticmethod
     def convert(book):
@@ -146,6 +161,23 @@ class BB_Workbook(xlio.Workbook):
 
         return sheet
 
+    def get_index(self, worksheet):
+        """
+
+
+        BB_Workbook.get_index() -> int
+
+        --``worksheet`` is a sheet in this workbook
+
+        Return position of ``worksheet`` in the workbook. Sheets replaced by
+        stream_sheet() resolve to the position of their write-only copy, so
+        callers can keep using the sheet they chopped into.
+        """
+        worksheet = self._streamed.get(worksheet, worksheet)
+
+        # Workbook.get_index() is deprecated and warns on every call
+        return self._sheets.index(worksheet)
+
     def save(self, filename):
         """
 
@@ -194,6 +226,71 @@ class BB_Workbook(xlio.Workbook):
             if k not in self.scenario_names:
                 self.scenario_names.append(k.title())
 
+    def set_sheet_xml(self, sheet, xml, comments=None, rels=None):
+        """
+
+
+        BB_Workbook.set_sheet_xml() -> WrittenWorksheet
+
+        --``sheet`` must be a finished Worksheet in this workbook
+        --``xml`` is the worksheet XML written from ``sheet``
+        --``comments`` is the list of comment records collected with ``xml``
+        --``rels`` is the RelationshipList collected with ``xml``
+
+        Method replaces ``sheet`` with a WrittenWorksheet at the same position
+        that saves ``xml`` as is. Use it for XML written in another process,
+        where comments and relationships have to travel with the XML. Then
+        ``sheet`` drops its cell dictionary, as in stream_sheet().
+        """
+        written = self._swap_sheet(sheet, WrittenWorksheet)
+        written.xml = xml
+        if comments:
+            written._comments = comments
+        if rels is not None:
+            written._rels = rels
+
+        sheet._cells = dict()
+
+        return written
+
+    def stream_sheet(self, sheet):
+        """
+
+
+        BB_Workbook.stream_sheet() -> WriteOnlyWorksheet
+
+        --``sheet`` must be a finished Worksheet in this workbook
+
+        Method replaces ``sheet`` with a write-only copy at the same position.
+        The copy writes cells to a temporary file in row order and shares the
+        workbook style tables, then ``sheet`` drops its cell dictionary.
+
+        Cells that line items still point to through xl_data stay alive, as
+        chefs use them to build references into the sheet. All other cells
+        are freed. Any later write to ``sheet`` will not reach the saved file.
+        """
+        stream = self._swap_sheet(sheet, WriteOnlyWorksheet)
+
+        rows = dict()
+        for (row, col), cell in sheet._cells.items():
+            rows.setdefault(row, dict())[col] = cell
+
+        last_row = max(chain(rows, sheet.row_dimensions), default=0)
+        for row in range(1, last_row + 1):
+            cells = rows.get(row)
+            if not cells:
+                stream.append([])
+                continue
+
+            values = [None] * max(cells)
+            for col, cell in cells.items():
+                values[col - 1] = self._copy_cell(stream, cell)
+            stream.append(values)
+
+        sheet._cells = dict()
+
+        return stream
+
     # *************************************************************************#
     #                           NON-PUBLIC METHODS                             #
     # *************************************************************************#
@@ -217,3 +314,91 @@ class BB_Workbook(xlio.Workbook):
                                                sheet.bb.scenario_selector)
 
         return sources_dict
+
+    @staticmethod
+    def _copy_cell(stream, cell):
+        """
+
+
+        BB_Workbook._copy_cell() -> Cell or None
+
+        --``stream`` is the WriteOnlyWorksheet receiving the cell
+        --``cell`` is a cell on the sheet being streamed
+
+        Return a write-only cell with the value, type, style and comment of
+        ``cell``, or None if ``cell`` would not be written at all.
+        """
+        if cell._value is None and not cell.has_style and not cell._comment:
+            return None
+
+        new_cell = WriteOnlyCell(stream)
+        new_cell._value = cell._value
+        new_cell.data_type = cell.data_type
+        new_cell._style = copy(cell._style)
+        if cell._comment:
+            new_cell.comment = cell._comment
+
+        return new_cell
+
+    def _swap_sheet(self, sheet, sheet_class):
+        """
+
+
+        BB_Workbook._swap_sheet() -> WriteOnlyWorksheet
+
+        --``sheet`` must be a Worksheet in this workbook
+        --``sheet_class`` is WriteOnlyWorksheet or a subclass
+
+        Method puts a new ``sheet_class`` instance in the position of
+        ``sheet``, with the same title, SheetData and sheet settings.
+        """
+        index = self._sheets.index(sheet)
+        del self._sheets[index]
+        # remove the draft first, otherwise the copy gets a deduplicated title
+
+        new_sheet = sheet_class(self, sheet.title)
+        self._sheets.insert(index, new_sheet)
+        self._streamed[sheet] = new_sheet
+
+        new_sheet.bb = sheet.bb
+        for attr in STREAMED_SHEET_ATTRS:
+            setattr(new_sheet, attr, getattr(sheet, attr))
+
+        return new_sheet
+
+
+class WrittenWorksheet(WriteOnlyWorksheet):
+    """
+
+    Write-only sheet whose XML was written elsewhere, usually in a worker
+    process. Saving the workbook writes the stored XML unchanged.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    xml                   bytes; complete worksheet XML
+
+    FUNCTIONS:
+    n/a
+    ====================  ======================================================
+    """
+    def __init__(self, parent, title):
+        WriteOnlyWorksheet.__init__(self, parent, title)
+        self.xml = None
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _write(self):
+        """
+
+
+        WrittenWorksheet._write() -> bytes
+
+        Method returns the stored XML. Called by the openpyxl writer on save.
+        """
+        self._cleanup()
+
+        return self.xml
@@ -31,12 +31,14 @@ import openpyxl as xlio
 
 from openpyxl.styles import Border, Side, Font, Alignment, PatternFill
 from openpyxl.styles.colors import WHITE, BLACK
+from openpyxl.writer.write_only import WriteOnlyWorksheet
 
 from chef_settings import AREA_BORDER
 
 from .data_types import NumberFormats
 from .data_types import TypeCodes
 from .field_names import FieldNames
+from .style_registry import get_registry
 
 
 
@@ -64,6 +66,7 @@ class CellStyles:
     n/a
 
     FUNCTIONS:
+    apply_saved_styles()  restores cell styles saved from a base file
     format_alignment()    format horizontal alignment of text
     format_area_label()   format label cell and row for sheet Areas
     format_bold()         makes font bold
@@ -80,10 +83,42 @@ class CellStyles:
     format_parameter()    format number in parameter cells
     format_scenario_label()  format scenario label cells (black with white text)
     format_scenario_selector_cell() format scenario selector cells
+    format_sheet_borders() adds line item borders on a single sheet
     format_sub_header_label() formats sub-header cells
     ====================  =====================================================
     """
 
+    @staticmethod
+    def apply_saved_styles(sheet, styles):
+        """
+
+
+        CellStyles.apply_saved_styles() -> None
+
+        --``sheet`` is an instance of openpyxl.worksheet
+        --``styles`` is a dict of coordinate : cell style dict for ``sheet``,
+        as saved by ModelChef.save_styles_from_file()
+
+        Function sets number format, font, border and fill of every cell in
+        ``sheet`` that has saved styles. Function leaves ``styles`` as it is,
+        so the same styles can be applied more than once.
+        """
+        for cell in sheet.get_cell_collection():
+            cell_dict = styles.get(cell.coordinate, None)
+            if cell_dict:
+                cell.number_format = cell_dict["number_format"]
+
+                cell.font = Font(**cell_dict["font"])
+
+                border_dict = dict(cell_dict["border"])
+                sides_dict = border_dict.pop('sides')
+                for side, info in sides_dict.items():
+                    side_obj = Side(**info)
+                    border_dict[side] = side_obj
+                cell.border = Border(**border_dict)
+
+                cell.fill = PatternFill(**cell_dict["fill"])
+
     @staticmethod
     def format_alignment(cell, alignment):
         """
@@ -96,7 +131,8 @@ class CellStyles:
 
         Sets horizontal text alignment in cell.
         """
-        cell.alignment = Alignment(horizontal=alignment)
+        registry = get_registry(cell)
+        registry.apply(cell, alignment=registry.alignment(horizontal=alignment))
 
     @staticmethod
     def format_area_label(sheet, label, row_num, col_num=None):
@@ -112,7 +148,7 @@ class CellStyles:
 
         Format area/statement label and dividing border
         """
-        side = Side(border_style='double')
+        registry = get_registry(sheet)
 
         if col_num:
             col = get_column_letter(col_num)
@@ -121,17 +157,16 @@ class CellStyles:
 
         cell_cos = col + str(row_num)
         cell = sheet[cell_cos]
-        cell.font = Font(bold=True)
+        registry.apply(cell, font=registry.font(bold=True))
         cell.set_explicit_value(label.title(),
                                 data_type=TypeCodes.FORMULA_CACHE_STRING)
 
         if AREA_BORDER:
+            border = registry.border('double', ['top'])
             rows = sheet.iter_rows(row_offset=row_num - 1)
             row = rows.__next__()
             for cell in row:
-                border = Border(top=cell.border.top)
-                border.top = side
-                cell.border = border
+                registry.apply(cell, border=border)
 
     @staticmethod
     def format_bold(cell):
@@ -144,7 +179,8 @@ class CellStyles:
 
         Sets font to bold within cell.
         """
-        cell.font = Font(bold=True)
+        registry = get_registry(cell)
+        registry.apply(cell, font=registry.font(bold=True))
 
     @staticmethod
     def format_border(cell, top=False, bottom=False, left=False, right=False,
@@ -163,28 +199,24 @@ class CellStyles:
 
         Sets horizontal text alignment in cell.
         """
+        registry = get_registry(cell)
 
-        side = Side(border_style=border_style)
-        # no_side = Side(border_style=None)
-
-        border = Border(top=cell.border.top,
-                        bottom=cell.border.bottom,
-                        left=cell.border.left,
-                        right=cell.border.right)
-
+        sides = list()
         if top:
-            border.top = side
+            sides.append('top')
 
         if bottom:
-            border.bottom = side
+            sides.append('bottom')
 
         if left:
-            border.left = side
+            sides.append('left')
 
         if right:
-            border.right = side
+            sides.append('right')
 
-        cell.border = border
+        base = cell._style.borderId if cell._style else None
+        border = registry.border(border_style, sides, base=base)
+        registry.apply(cell, border=border)
 
     @staticmethod
     def format_border_group(sheet, st_col, ed_col, st_row, ed_row,
@@ -203,119 +235,52 @@ class CellStyles:
 
         Draws thin border around group of cells defined by starting and ending
         rows and columns.
+
+        Edge cells get a fresh border, except along the bottom of a group that
+        spans several rows and columns, where cells keep their other sides.
+        Method builds each border once per edge position and applies its id
+        to the whole edge.
         """
-        side = Side(border_style=border_style)
-
-        # SET TOP BORDER
-        row = st_row
-        for c in range(st_col, ed_col + 1):
-            cell = sheet.cell(column=c, row=row)
-            border = Border(top=cell.border.top)
-            border.top = side
-            cell.border = border
-
-        # SET LEFT BORDER
-        col = st_col
-        for r in range(st_row, ed_row + 1):
-            cell = sheet.cell(column=col, row=r)
-            border = Border(left=cell.border.left)
-            border.left = side
-            cell.border = border
-
-        # SET RIGHT BORDER
-        col = ed_col
-        if st_col != ed_col:
-            for r in range(st_row, ed_row + 1):
-                cell = sheet.cell(column=col, row=r)
-                border = Border(right=cell.border.right)
-                border.right = side
-                cell.border = border
-        else:
-            for r in range(st_row, ed_row + 1):
-                cell = sheet.cell(column=col, row=r)
-                border = Border(right=cell.border.right,
-                                left=cell.border.left)
-                border.left = side
-                border.right = side
-                cell.border = border
-
-        # SET TOP AND BOTTOM BORDERS
-        row = ed_row
-        if st_row != ed_row:
-            for c in range(st_col, ed_col + 1):
-                cell = sheet.cell(column=c, row=row)
-                border = Border(bottom=cell.border.bottom,
-                                left=cell.border.left,
-                                top=cell.border.top,
-                                right=cell.border.right)
-                border.bottom = side
-                cell.border = border
-        else:
-            for c in range(st_col, ed_col + 1):
-                cell = sheet.cell(column=c, row=row)
-                border = Border(bottom=cell.border.bottom,
-                                left=cell.border.left,
-                                top=cell.border.top,
-                                right=cell.border.right)
-                border.top = side
-                border.bottom = side
-                cell.border = border
-
-        if st_col != ed_col:
-            # SET UPPER-LEFT CORNER BORDER
-            cell = sheet.cell(column=st_col, row=st_row)
-            border = Border(bottom=cell.border.bottom, left=cell.border.left,
-                            top=cell.border.top, right=cell.border.right)
-            border.top = side
-            border.left = side
-            cell.border = border
-
-            # SET UPPER-RIGHT CORNER BORDER
-            cell = sheet.cell(column=ed_col, row=st_row)
-            border = Border(bottom=cell.border.bottom, left=cell.border.left,
-                            top=cell.border.top, right=cell.border.right)
-            border.top = side
-            border.right = side
-            cell.border = border
-
-            # SET LOWER-LEFT CORNER BORDER
-            cell = sheet.cell(column=st_col, row=ed_row)
-            border = Border(bottom=cell.border.bottom, left=cell.border.left,
-                            top=cell.border.top, right=cell.border.right)
-            border.bottom = side
-            border.left = side
-            cell.border = border
-
-            # SET LOWER-RIGHT CORNER BORDER
-            cell = sheet.cell(column=ed_col, row=ed_row)
-            border = Border(bottom=cell.border.bottom, left=cell.border.left,
-                            top=cell.border.top, right=cell.border.right)
-            border.bottom = side
-            border.right = side
-            cell.border = border
+        registry = get_registry(sheet)
+        top, bottom, left, right = 'top', 'bottom', 'left', 'right'
+
+        outline = dict()
+        if st_col == ed_col and st_row == ed_row:
+            outline[(st_col, st_row)] = (top, bottom, left, right)
+
+        elif st_row == ed_row:
+            for c in range(st_col + 1, ed_col):
+                outline[(c, st_row)] = (top, bottom)
+            outline[(st_col, st_row)] = (top, bottom, left)
+            outline[(ed_col, st_row)] = (top, bottom, right)
+
+        elif st_col == ed_col:
+            for r in range(st_row + 1, ed_row):
+                outline[(st_col, r)] = (left, right)
+            outline[(st_col, st_row)] = (top, left, right)
+            outline[(st_col, ed_row)] = (bottom, left, right)
 
         else:
-            # SET TOP CELL BORDER
-            cell = sheet.cell(column=st_col, row=st_row)
-            border = Border(top=cell.border.top,
-                            bottom=cell.border.bottom,
-                            left=cell.border.left,
-                            right=cell.border.right)
-            border.top = side
-            border.left = side
-            border.right = side
-            cell.border = border
-
-            # SET BOTTOM CELL BORDER
-            cell = sheet.cell(column=st_col, row=ed_row)
-            border = Border(top=cell.border.top,
-                            bottom=cell.border.bottom,
-                            left=cell.border.left,
-                            right=cell.border.right)
-            border.bottom = side
-            border.left = side
-            border.right = side
-            cell.border = border
+            for c in range(st_col + 1, ed_col):
+                outline[(c, st_row)] = (top,)
+            for r in range(st_row + 1, ed_row):
+                outline[(st_col, r)] = (left,)
+                outline[(ed_col, r)] = (right,)
+            outline[(st_col, st_row)] = (top, left)
+            outline[(ed_col, st_row)] = (top, right)
+            outline[(st_col, ed_row)] = (bottom, left)
+            outline[(ed_col, ed_row)] = (bottom, right)
+
+            # bottom edge adds to whatever border the cells already have
+            for c in range(st_col + 1, ed_col):
+                cell = sheet.cell(column=c, row=ed_row)
+                base = cell._style.borderId if cell._style else None
+                border = registry.border(border_style, [bottom], base=base)
+                registry.apply(cell, border=border)
+
+        for (c, r), sides in outline.items():
+            cell = sheet.cell(column=c, row=r)
+            registry.apply(cell, border=registry.border(border_style, sides))
 
     @staticmethod
     def format_calculation(cell):
@@ -331,7 +296,10 @@ class CellStyles:
         # font = Font(italic=True, color=CALCULATION_COLOR)
         # cell.font = font
 
-        cell.number_format = NumberFormats.DEFAULT_PARAMETER_FORMAT
+        registry = get_registry(cell)
+        number_format = NumberFormats.DEFAULT_PARAMETER_FORMAT
+        format_id = registry.number_format(number_format)
+        registry.apply(cell, number_format=format_id)
 
     @staticmethod
     def format_consolidated_label(cell):
@@ -344,7 +312,8 @@ class CellStyles:
 
         Format cells which are labels for consolidating logic.
         """
-        cell.font = Font(italic=True)
+        registry = get_registry(cell)
+        registry.apply(cell, font=registry.font(italic=True))
 
     @staticmethod
     def format_date(cell):
@@ -357,8 +326,10 @@ class CellStyles:
 
         Format cells containing dates to conform with Chef standard.
         """
-
-        cell.number_format = NumberFormats.DEFAULT_DATE_FORMAT
+        registry = get_registry(cell)
+        number_format = NumberFormats.DEFAULT_DATE_FORMAT
+        format_id = registry.number_format(number_format)
+        registry.apply(cell, number_format=format_id)
 
     @staticmethod
     def format_hardcoded(cell):
@@ -371,8 +342,9 @@ class CellStyles:
 
         Format cells containing hardcoded values to conform with Chef standard.
         """
-        font = Font(color=HARDCODED_COLOR, bold=False)
-        cell.font = font
+        registry = get_registry(cell)
+        font = registry.font(color=HARDCODED_COLOR, bold=False)
+        registry.apply(cell, font=font)
 
     @staticmethod
     def format_header_label(cell, alignment=None, color=BLACK,
@@ -393,13 +365,15 @@ class CellStyles:
 
         Headers at the top, white on black.
         """
+        registry = get_registry(cell)
         if alignment:
-            cell.alignment = Alignment(horizontal=alignment)
+            registry.apply(
+                cell, alignment=registry.alignment(horizontal=alignment)
+            )
 
-        cell.font = Font(color=font_color, bold=bold, size=font_size, name=name)
-        cell.fill = PatternFill(start_color=color,
-                                end_color=color,
-                                fill_type='solid')
+        font = registry.font(color=font_color, bold=bold, size=font_size,
+                             name=name)
+        registry.apply(cell, font=font, fill=registry.fill(color))
 
     @staticmethod
     def format_integer(cell):
@@ -412,7 +386,10 @@ class CellStyles:
 
         Format cells containing integers to conform with Chef standard.
         """
-        cell.number_format = NumberFormats.INTEGER_FORMAT
+        registry = get_registry(cell)
+        number_format = NumberFormats.INTEGER_FORMAT
+        format_id = registry.number_format(number_format)
+        registry.apply(cell, number_format=format_id)
 
     @staticmethod
     def format_line(line):
@@ -429,23 +406,25 @@ class CellStyles:
 
         use_format = line.xl_format.number_format or NumberFormats.DEFAULT_LINE_FORMAT
 
-        if line.xl_data.derived.cell:
-            line.xl_data.derived.cell.number_format = use_format
-
-        if line.xl_data.consolidated.cell:
-            line.xl_data.consolidated.cell.number_format = use_format
-
-        for cell in line.xl_data.consolidated.array:
-            cell.number_format = use_format
-
-        if line.xl_data.detailed.cell:
-            line.xl_data.detailed.cell.number_format = use_format
-
-        if line.xl_data.cell:
-            line.xl_data.cell.number_format = use_format
+        cells = [
+            line.xl_data.derived.cell,
+            line.xl_data.consolidated.cell,
+            line.xl_data.detailed.cell,
+            line.xl_data.cell,
+        ]
+        cells.extend(line.xl_data.consolidated.array)
+        cells = [cell for cell in cells if cell]
+        if not cells:
+            return
+
+        registry = get_registry(cells[0])
+        number_format = registry.number_format(use_format)
+        for cell in cells:
+            registry.apply(cell, number_format=number_format)
 
         if line.xl_format.font_format:
-            line.xl_data.cell.font = Font(**line.xl_format.font_format)
+            font = registry.font(**line.xl_format.font_format)
+            registry.apply(line.xl_data.cell, font=font)
 
     @staticmethod
     def format_line_borders(book):
@@ -457,36 +436,60 @@ class CellStyles:
         --``book`` is the workbook to format
 
         Function manipulates workbook in place, adding borders to rows where
-        line items request them.
+        line items request them. Streamed sheets are skipped, they get their
+        borders before streaming.
         """
         for sheet in book.worksheets:
 
-            if not getattr(sheet, 'bb', None):
+            if isinstance(sheet, WriteOnlyWorksheet):
                 continue
 
-            if not sheet.bb.line_directory:
-                continue
+            CellStyles.format_sheet_borders(sheet)
+
+    @staticmethod
+    def format_sheet_borders(sheet):
+        """
+
 
-            # go through all lines in sheet.bb.line_directory and add border
-            # formatting, if any
-            param_area = getattr(sheet.bb, FieldNames.PARAMETERS)
-            st_col = param_area.columns.by_name[FieldNames.VALUES]
-            if 'time_line' in sheet.bb.area_names:
-                ed_col = min((sheet.bb.time_line.columns.ending,
-                              sheet.max_column))
-            else:
-                ed_col = sheet.max_column - 1
+        CellStyles.format_sheet_borders() -> None
 
-            for xl_data, xl_format in sheet.bb.line_directory.values():
-                row = xl_data.cell.row
-                border = xl_format.border
+        --``sheet`` is the worksheet to format
+
+        Function manipulates sheet in place, adding borders to rows where
+        line items request them. Sheets that already have their borders are
+        skipped.
+        """
+        if not getattr(sheet, 'bb', None):
+            return
+
+        if sheet.bb.bordered:
+            return
+
+        if not sheet.bb.line_directory:
+            return
+
+        # go through all lines in sheet.bb.line_directory and add border
+        # formatting, if any
+        param_area = getattr(sheet.bb, FieldNames.PARAMETERS)
+        st_col = param_area.columns.by_name[FieldNames.VALUES]
+        if 'time_line' in sheet.bb.area_names:
+            ed_col = min((sheet.bb.time_line.columns.ending,
+                          sheet.max_column))
+        else:
+            ed_col = sheet.max_column - 1
+
+        for xl_data, xl_format in sheet.bb.line_directory.values():
+            row = xl_data.cell.row
+            border = xl_format.border
+
+            if not border:
+                continue
 
-                if not border:
-                    continue
+            CellStyles.format_border_group(sheet, st_col=st_col,
+                                           ed_col=ed_col, st_row=row,
+                                           ed_row=row, border_style=border)
 
-                CellStyles.format_border_group(sheet, st_col=st_col,
-                                               ed_col=ed_col, st_row=row,
-                                               ed_row=row, border_style=border)
+        sheet.bb.bordered = True
 
     @staticmethod
     def format_parameter(cell):
@@ -499,8 +502,14 @@ class CellStyles:
 
         Format cells containing parameters to conform with Chef standard.
         """
-        cell.number_format = NumberFormats.DEFAULT_PARAMETER_FORMAT
-        cell.alignment = Alignment(horizontal='right')
+        registry = get_registry(cell)
+        registry.apply(
+            cell,
+            number_format=registry.number_format(
+                NumberFormats.DEFAULT_PARAMETER_FORMAT
+            ),
+            alignment=registry.alignment(horizontal='right'),
+        )
 
     @staticmethod
     def format_scenario_label(cell):
@@ -618,6 +618,7 @@ class SheetData:
     ====================  =====================================================
 
     DATA:
+    bordered              bool; whether line borders were added to the sheet
     general               instance of Area; represents whole sheet
     current_row           int; holds index of the current row in the sheet
     current_column        int; holds index of the current column in the sheet
@@ -637,6 +638,7 @@ class SheetData:
 
     def __init__(self):
 
+        self.bordered = False
         self.general = Area()
         self.current_row = None
         self.current_column = None
@@ -0,0 +1,1036 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.serializers.chef.formula_evaluator
+"""
+
+Module computes formula cells of a Chef workbook in Python, without Excel.
+Evaluator covers the formulas Chef writes: links and sums across sheets,
+arithmetic and comparisons from driver steps, and a small set of functions.
+Cells whose formulas fall outside that subset, and every cell that depends on
+them, are left without a value.
+====================  =========================================================
+Attribute             Description
+====================  =========================================================
+
+DATA:
+ARITY                 dict; function name : (fewest, most) arguments
+FUNCTIONS             dict of supported Excel function names
+
+FUNCTIONS:
+write_cached_values() writes computed values into formula cells of a file
+
+CLASSES:
+ErrorValue            Excel error value, raised while computing a formula
+FormulaEvaluator      computes formula cells of a workbook in dependency order
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import os
+import re
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+from posixpath import dirname, join, normpath
+
+from openpyxl.compat import safe_string
+from openpyxl.formula import Tokenizer
+from openpyxl.formula.tokenizer import Token
+from openpyxl.utils import column_index_from_string, coordinate_from_string
+from openpyxl.utils.datetime import to_excel
+from openpyxl.xml.constants import PKG_REL_NS, REL_NS, SHEET_MAIN_NS
+
+
+
+
+# Constants
+INFIX_POWER = {
+    '=': 1, '<>': 1, '<': 1, '>': 1, '<=': 1, '>=': 1,
+    '&': 2,
+    '+': 3, '-': 3,
+    '*': 4, '/': 4,
+    '^': 5,
+}
+PREFIX_POWER = 6
+# Excel negates before exponentiation, so =-2^2 is 4.
+
+_MAIN = '{%s}' % SHEET_MAIN_NS
+_REF = re.compile(
+    r"^(?:(?:'(?P<quoted>(?:[^']|'')+)'|(?P<plain>[^'!]+))!)?"
+    r"\$?(?P<column>[A-Za-z]{1,3})\$?(?P<row>\d+)$"
+)
+_SHEET_RANGE = re.compile(
+    r"(?P<sheet>'(?:[^']|'')+'|[A-Za-z_][\w.]*)"
+    r"(?P<start>!\$?[A-Za-z]{1,3}\$?\d+):(?P=sheet)!"
+)
+# Chef writes ranges as 'Sheet'!A1:'Sheet'!A5, which the openpyxl tokenizer
+# rejects; the evaluator reads them as 'Sheet'!A1:A5.
+
+# Module Globals
+_UNSUPPORTED = object()
+# Stored for cells whose formula the evaluator cannot compute.
+
+# Classes
+class ErrorValue(Exception):
+    """
+
+    Excel error value, such as #DIV/0!. Evaluator raises it so that errors
+    propagate through every enclosing operation until IFERROR() or the top of
+    the cell catches it, which is how Excel treats them.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    code                  str; Excel error code, e.g. "#VALUE!"
+
+    FUNCTIONS:
+    n/a
+    ====================  ======================================================
+    """
+    def __init__(self, code):
+        Exception.__init__(self, code)
+        self.code = code
+
+
+class _Unsupported(Exception):
+    """
+
+    Raised for formulas the evaluator cannot compute.
+    """
+    pass
+
+
+class FormulaEvaluator:
+    """
+
+    FormulaEvaluator computes every formula cell of an openpyxl workbook.
+    Evaluator parses each formula once, orders cells so that every cell comes
+    after the formula cells it references, then computes them in that order.
+    Ordering does not recurse, so long chains of periods are fine. Cells on
+    a circular reference compute to 0, as in Excel with iterative calculation
+    off; cells that read them see 0 as well.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    book                  obj; openpyxl workbook with formulas as strings
+    values                dict; (sheet title, row, column) : computed value
+
+    FUNCTIONS:
+    evaluate()            computes all formula cells, returns values
+    ====================  ======================================================
+    """
+    def __init__(self, book):
+        self.book = book
+        self.values = dict()
+
+        self._circular = set()
+        self._formulas = dict()
+        self._parsed = dict()
+        self._sheets = dict()
+
+        for sheet in book.worksheets:
+            title = sheet.title
+            self._sheets[title] = sheet
+            for (row, col), cell in sheet._cells.items():
+                if cell.data_type == 'f' and cell.value:
+                    self._formulas[(title, row, col)] = cell.value
+
+    def evaluate(self):
+        """
+
+
+        FormulaEvaluator.evaluate() -> dict
+
+        Method computes all formula cells and returns instance.values. Values
+        are floats, strings, bools, or ErrorValue instances; a formula that
+        comes out blank, such as =A2 on an empty A2, is 0 as in Excel. Cells
+        that could not be computed are left out. Arithmetic failures that
+        Excel would report, such as overflow, come back as #NUM!.
+        """
+        for key in self._get_order():
+            if key in self._circular:
+                self.values[key] = 0
+                continue
+
+            try:
+                node = self._parse(key)
+                value = self._evaluate(node, key[0])
+                if isinstance(value, list):
+                    raise ErrorValue('#VALUE!')
+            except ErrorValue as error:
+                value = error
+            except ArithmeticError:
+                value = ErrorValue('#NUM!')
+            except _Unsupported:
+                value = _UNSUPPORTED
+
+            if value is None:
+                value = 0
+
+            self.values[key] = value
+
+        return {
+            k: v for k, v in self.values.items() if v is not _UNSUPPORTED
+        }
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _evaluate(self, node, title):
+        """
+
+
+        FormulaEvaluator._evaluate() -> object
+
+        --``node`` is a parsed formula node
+        --``title`` is the title of the sheet the formula lives on
+
+        Method returns the value of ``node``. Ranges come back as a list of
+        rows.
+        """
+        kind = node[0]
+
+        if kind == 'value':
+            return node[1]
+
+        if kind == 'cell':
+            return self._get_value(node[1] or title, node[2], node[3])
+
+        if kind == 'range':
+            sheet = node[1] or title
+            min_col, min_row, max_col, max_row = node[2:]
+            return [
+                [self._get_value(sheet, row, col)
+                 for col in range(min_col, max_col + 1)]
+                for row in range(min_row, max_row + 1)
+            ]
+
+        if kind == 'prefix':
+            value = _to_number(self._evaluate(node[2], title))
+            return -value if node[1] == '-' else value
+
+        if kind == 'percent':
+            return _to_number(self._evaluate(node[1], title)) / 100
+
+        if kind == 'infix':
+            left = self._evaluate(node[2], title)
+            right = self._evaluate(node[3], title)
+            return _apply_infix(node[1], left, right)
+
+        if kind == 'function':
+            name, args = node[1], node[2]
+            if name in LAZY_FUNCTIONS:
+                return LAZY_FUNCTIONS[name](self, args, title)
+            values = [self._evaluate(arg, title) for arg in args]
+            return FUNCTIONS[name](*values)
+
+        raise _Unsupported(kind)
+
+    def _get_dependencies(self, key):
+        """
+
+
+        FormulaEvaluator._get_dependencies() -> list
+
+        --``key`` is a (sheet title, row, column) tuple of a formula cell
+
+        Method returns keys of formula cells that ``key`` references. Method
+        returns an empty list if the formula cannot be parsed; that cell will
+        fail on its own when evaluated.
+        """
+        try:
+            node = self._parse(key)
+        except _Unsupported:
+            return list()
+
+        result = list()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            kind = node[0]
+            if kind == 'cell':
+                dep = (node[1] or key[0], node[2], node[3])
+                if dep in self._formulas:
+                    result.append(dep)
+            elif kind == 'range':
+                sheet = node[1] or key[0]
+                min_col, min_row, max_col, max_row = node[2:]
+                for row in range(min_row, max_row + 1):
+                    for col in range(min_col, max_col + 1):
+                        if (sheet, row, col) in self._formulas:
+                            result.append((sheet, row, col))
+            elif kind in ('prefix', 'infix'):
+                stack.extend(node[2:])
+            elif kind == 'percent':
+                stack.append(node[1])
+            elif kind == 'function':
+                stack.extend(node[2])
+
+        return result
+
+    def _get_order(self):
+        """
+
+
+        FormulaEvaluator._get_order() -> list
+
+        Method returns formula cell keys so that each one comes after the
+        formula cells it references. Method walks the dependency graph with an
+        explicit stack instead of recursion and adds the cells of every cycle
+        it finds to instance._circular.
+        """
+        order = list()
+        state = dict()
+        # 1 while a cell is on the stack, 2 once it is ordered
+
+        for start in self._formulas:
+            if start in state:
+                continue
+
+            state[start] = 1
+            stack = [(start, iter(self._get_dependencies(start)))]
+            while stack:
+                key, deps = stack[-1]
+                for dep in deps:
+                    if dep not in state:
+                        state[dep] = 1
+                        stack.append(
+                            (dep, iter(self._get_dependencies(dep)))
+                        )
+                        break
+                    if state[dep] == 1:
+                        # back edge: dep and everything above it form a cycle
+                        for item, _ in reversed(stack):
+                            self._circular.add(item)
+                            if item == dep:
+                                break
+                else:
+                    stack.pop()
+                    state[key] = 2
+                    order.append(key)
+
+        return order
+
+    def _get_value(self, title, row, col):
+        """
+
+
+        FormulaEvaluator._get_value() -> object
+
+        --``title`` is a sheet title
+        --``row`` and ``col`` are cell indices
+
+        Method returns the value of a cell, computed or constant. Dates are
+        returned as Excel serial numbers.
+        """
+        key = (title, row, col)
+        if key in self._formulas:
+            value = self.values[key]
+            if value is _UNSUPPORTED:
+                raise _Unsupported(key)
+            if isinstance(value, ErrorValue):
+                raise value
+            return value
+
+        sheet = self._sheets.get(title)
+        if sheet is None:
+            raise ErrorValue('#REF!')
+
+        cell = sheet._cells.get((row, col))
+        if cell is None:
+            return None
+
+        value = cell.value
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            value = to_excel(value)
+        elif cell.data_type == 'e':
+            raise ErrorValue(value)
+
+        return value
+
+    def _parse(self, key):
+        """
+
+
+        FormulaEvaluator._parse() -> tuple
+
+        --``key`` is a (sheet title, row, column) tuple of a formula cell
+
+        Method returns the parsed formula for ``key``, parsing it on first
+        use.
+        """
+        if key not in self._parsed:
+            formula = _SHEET_RANGE.sub(r'\g<sheet>\g<start>:',
+                                       self._formulas[key])
+            try:
+                tokens = [
+                    t for t in Tokenizer(formula).items
+                    if t.type != Token.WSPACE
+                ]
+                node = _Parser(tokens).parse()
+            except Exception:
+                # tokenizer errors as well as _Unsupported
+                node = _UNSUPPORTED
+            self._parsed[key] = node
+
+        node = self._parsed[key]
+        if node is _UNSUPPORTED:
+            raise _Unsupported(key)
+
+        return node
+
+
+class _Parser:
+    """
+
+    Precedence-climbing parser over openpyxl formula tokens. Nodes are tuples
+    whose first item names their kind.
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self):
+        node = self._expression(0)
+        if self.position != len(self.tokens):
+            raise _Unsupported('trailing tokens')
+
+        return node
+
+    def _expression(self, min_power):
+        node = self._operand()
+
+        while self.position < len(self.tokens):
+            token = self.tokens[self.position]
+
+            if token.type == Token.OP_POST and token.value == '%':
+                self.position += 1
+                node = ('percent', node)
+                continue
+
+            if token.type != Token.OP_IN:
+                break
+
+            power = INFIX_POWER.get(token.value)
+            if power is None:
+                raise _Unsupported(token.value)
+            if power <= min_power:
+                break
+
+            self.position += 1
+            right = self._expression(power)
+            node = ('infix', token.value, node, right)
+
+        return node
+
+    def _next(self):
+        if self.position >= len(self.tokens):
+            raise _Unsupported('unexpected end')
+
+        token = self.tokens[self.position]
+        self.position += 1
+
+        return token
+
+    def _peek(self):
+        if self.position >= len(self.tokens):
+            return None
+
+        return self.tokens[self.position]
+
+    def _operand(self):
+        token = self._next()
+
+        if token.type == Token.OP_PRE:
+            return ('prefix', token.value, self._expression(PREFIX_POWER))
+
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            node = self._expression(0)
+            closer = self._next()
+            if closer.type != Token.PAREN:
+                raise _Unsupported(closer.value)
+            return node
+
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self._function(token.value[:-1].upper())
+
+        if token.type == Token.OPERAND:
+            return _parse_operand(token)
+
+        raise _Unsupported(token.value)
+
+    def _function(self, name):
+        if name not in FUNCTIONS and name not in LAZY_FUNCTIONS:
+            raise _Unsupported(name)
+
+        args = list()
+        token = self._peek()
+        closed = token is not None and token.type == Token.FUNC and \
+            token.subtype == Token.CLOSE
+        if closed:
+            self.position += 1
+
+        while not closed:
+            token = self._peek()
+            if token is not None and (
+                token.type == Token.SEP or
+                (token.type == Token.FUNC and token.subtype == Token.CLOSE)
+            ):
+                # empty argument, as in IF(A1,,1)
+                args.append(('value', None))
+            else:
+                args.append(self._expression(0))
+
+            token = self._next()
+            if token.type == Token.SEP and token.subtype == Token.ARG:
+                continue
+            if token.type == Token.FUNC and token.subtype == Token.CLOSE:
+                closed = True
+            else:
+                raise _Unsupported(token.value)
+
+        fewest, most = ARITY[name]
+        if len(args) < fewest or (most is not None and len(args) > most):
+            # Excel refuses such formulas outright
+            raise _Unsupported(name)
+
+        return ('function', name, args)
+
+
+# Functions
+def write_cached_values(filename, values):
+    """
+
+
+    write_cached_values() -> None
+
+    --``filename`` is the path of an xlsx file
+    --``values`` is a dict of (sheet title, row, column) : value
+
+    Function writes ``values`` into the cached value of the matching formula
+    cells in ``filename``. Formulas stay as they are, so Excel still
+    recalculates on open. Readers that only look at cached values, like
+    openpyxl with data_only=True, see the computed numbers.
+    """
+    by_sheet = dict()
+    for (title, row, col), value in values.items():
+        by_sheet.setdefault(title, dict())[(row, col)] = value
+
+    for prefix, uri in (('', SHEET_MAIN_NS), ('r', REL_NS)):
+        ET.register_namespace(prefix, uri)
+
+    folder = os.path.dirname(os.path.abspath(filename))
+    handle, temp_name = tempfile.mkstemp(suffix='.xlsx', dir=folder)
+    os.close(handle)
+
+    try:
+        with zipfile.ZipFile(filename) as source, \
+                zipfile.ZipFile(temp_name, 'w', zipfile.ZIP_DEFLATED) as out:
+            paths = _get_sheet_paths(source)
+            for info in source.infolist():
+                data = source.read(info.filename)
+                title = paths.get(info.filename)
+                if title in by_sheet:
+                    data = _fill_sheet_xml(data, by_sheet[title])
+                out.writestr(info, data)
+
+        os.replace(temp_name, filename)
+    except Exception:
+        os.remove(temp_name)
+        raise
+
+
+def _apply_infix(op, left, right):
+    """
+
+
+    _apply_infix() -> object
+
+    Function applies Excel infix operator ``op`` to two values.
+    """
+    if isinstance(left, list) or isinstance(right, list):
+        raise ErrorValue('#VALUE!')
+
+    if op in ('=', '<>', '<', '>', '<=', '>='):
+        return _compare(op, left, right)
+
+    if op == '&':
+        return _to_text(left) + _to_text(right)
+
+    left = _to_number(left)
+    right = _to_number(right)
+
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if op == '/':
+        if right == 0:
+            raise ErrorValue('#DIV/0!')
+        return left / right
+    if op == '^':
+        try:
+            return float(left ** right)
+        except (ZeroDivisionError, OverflowError, TypeError):
+            raise ErrorValue('#NUM!')
+
+    raise _Unsupported(op)
+
+
+def _compare(op, left, right):
+    """
+
+
+    _compare() -> bool
+
+    Function compares two values the way Excel does: blanks match the type of
+    the other side, numbers sort before text before logicals, and text
+    compares without case.
+    """
+    if left is None:
+        left = '' if isinstance(right, str) else 0
+    if right is None:
+        right = '' if isinstance(left, str) else 0
+
+    def rank(value):
+        if isinstance(value, bool):
+            return 2, value
+        if isinstance(value, str):
+            return 1, value.lower()
+        return 0, value
+
+    left, right = rank(left), rank(right)
+
+    if op == '=':
+        return left == right
+    if op == '<>':
+        return left != right
+    if op == '<':
+        return left < right
+    if op == '>':
+        return left > right
+    if op == '<=':
+        return left <= right
+
+    return left >= right
+
+
+def _fill_sheet_xml(data, values):
+    """
+
+
+    _fill_sheet_xml() -> bytes
+
+    --``data`` is worksheet XML
+    --``values`` is a dict of (row, column) : value for that sheet
+
+    Function returns ``data`` with cached values set on formula cells.
+    """
+    root = ET.fromstring(data)
+
+    for cell in root.iter(_MAIN + 'c'):
+        if cell.find(_MAIN + 'f') is None:
+            continue
+
+        column, row = coordinate_from_string(cell.get('r'))
+        key = (row, column_index_from_string(column))
+        if key not in values:
+            continue
+
+        value = values[key]
+        element = cell.find(_MAIN + 'v')
+        if element is None:
+            element = ET.SubElement(cell, _MAIN + 'v')
+
+        if isinstance(value, ErrorValue):
+            cell.set('t', 'e')
+            element.text = value.code
+        elif isinstance(value, bool):
+            cell.set('t', 'b')
+            element.text = '1' if value else '0'
+        elif isinstance(value, str):
+            cell.set('t', 'str')
+            element.text = value
+        else:
+            cell.attrib.pop('t', None)
+            element.text = safe_string(value or 0)
+
+    return ET.tostring(root, encoding='UTF-8')
+
+
+def _get_sheet_paths(archive):
+    """
+
+
+    _get_sheet_paths() -> dict
+
+    --``archive`` is an open xlsx ZipFile
+
+    Function returns a dict of archive path : sheet title for every
+    worksheet in the package.
+    """
+    workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+    rels = ET.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+
+    targets = dict()
+    for rel in rels.iter('{%s}Relationship' % PKG_REL_NS):
+        target = rel.get('Target')
+        if target.startswith('/'):
+            target = target[1:]
+        else:
+            target = normpath(join(dirname('xl/workbook.xml'), target))
+        targets[rel.get('Id')] = target
+
+    result = dict()
+    for sheet in workbook.iter(_MAIN + 'sheet'):
+        rel_id = sheet.get('{%s}id' % REL_NS)
+        if rel_id in targets:
+            result[targets[rel_id]] = sheet.get('name')
+
+    return result
+
+
+def _parse_operand(token):
+    """
+
+
+    _parse_operand() -> tuple
+
+    --``token`` is an openpyxl OPERAND token
+
+    Function returns a value, cell or range node for ``token``.
+    """
+    value = token.value
+
+    if token.subtype == Token.NUMBER:
+        return ('value', float(value))
+
+    if token.subtype == Token.TEXT:
+        return ('value', value[1:-1].replace('""', '"'))
+
+    if token.subtype == Token.LOGICAL:
+        return ('value', value.upper() == 'TRUE')
+
+    if token.subtype == Token.ERROR:
+        raise _Unsupported(value)
+
+    parts = [_parse_reference(part) for part in value.split(':')]
+    if len(parts) == 1:
+        return ('cell',) + parts[0]
+    if len(parts) != 2:
+        raise _Unsupported(value)
+
+    (sheet, row_1, col_1), (other, row_2, col_2) = parts
+    if other is not None and other != sheet:
+        raise _Unsupported(value)
+
+    return (
+        'range', sheet,
+        min(col_1, col_2), min(row_1, row_2),
+        max(col_1, col_2), max(row_1, row_2),
+    )
+
+
+def _parse_reference(text):
+    """
+
+
+    _parse_reference() -> tuple
+
+    --``text`` is a single cell reference, e.g. "'Sheet 1'!$B$4"
+
+    Function returns a tuple of (sheet title or None, row, column).
+    """
+    match = _REF.match(text)
+    if not match:
+        # named ranges, whole rows and columns
+        raise _Unsupported(text)
+
+    sheet = match.group('quoted')
+    if sheet is not None:
+        sheet = sheet.replace("''", "'")
+    else:
+        sheet = match.group('plain')
+
+    row = int(match.group('row'))
+    col = column_index_from_string(match.group('column').upper())
+
+    return sheet, row, col
+
+
+def _flatten(values):
+    """
+
+
+    _flatten() -> list
+
+    Function returns function arguments with ranges expanded. Range members
+    are returned as (True, value), direct arguments as (False, value), since
+    Excel coerces the two differently.
+    """
+    result = list()
+    for value in values:
+        if isinstance(value, list):
+            for row in value:
+                for item in row:
+                    if isinstance(item, ErrorValue):
+                        raise item
+                    result.append((True, item))
+        else:
+            result.append((False, value))
+
+    return result
+
+
+def _numbers(values):
+    """
+
+
+    _numbers() -> list
+
+    Function returns numbers from function arguments. Text, logicals and
+    blanks inside ranges are skipped; direct arguments are coerced.
+    """
+    result = list()
+    for in_range, value in _flatten(values):
+        if in_range:
+            if isinstance(value, (int, float)) and \
+                    not isinstance(value, bool):
+                result.append(value)
+        elif value is not None:
+            result.append(_to_number(value))
+
+    return result
+
+
+def _to_bool(value):
+    """
+
+
+    _to_bool() -> bool
+
+    Function converts a value to an Excel logical.
+    """
+    if isinstance(value, list):
+        raise ErrorValue('#VALUE!')
+    if value is None:
+        return False
+    if isinstance(value, str):
+        if value.upper() in ('TRUE', 'FALSE'):
+            return value.upper() == 'TRUE'
+        raise ErrorValue('#VALUE!')
+
+    return bool(value)
+
+
+def _to_number(value):
+    """
+
+
+    _to_number() -> float
+
+    Function converts a value to a number for arithmetic.
+    """
+    if isinstance(value, list):
+        raise ErrorValue('#VALUE!')
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            raise ErrorValue('#VALUE!')
+
+    return value
+
+
+def _to_text(value):
+    """
+
+
+    _to_text() -> str
+
+    Function converts a value to text for concatenation.
+    """
+    if isinstance(value, list):
+        raise ErrorValue('#VALUE!')
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+
+    return str(value)
+
+
+# Excel functions
+def _xl_abs(value):
+    return abs(_to_number(value))
+
+
+def _xl_and(*values):
+    items = [v for r, v in _flatten(values) if not (r and (
+        v is None or isinstance(v, str)))]
+    if not items:
+        raise ErrorValue('#VALUE!')
+
+    return all(_to_bool(v) for v in items)
+
+
+def _xl_average(*values):
+    numbers = _numbers(values)
+    if not numbers:
+        raise ErrorValue('#DIV/0!')
+
+    return sum(numbers) / len(numbers)
+
+
+def _xl_hlookup(value, table, row, approximate=True):
+    if not isinstance(table, list):
+        raise ErrorValue('#VALUE!')
+
+    row = int(_to_number(row))
+    if row < 1 or row > len(table):
+        raise ErrorValue('#REF!')
+
+    keys = table[0]
+    found = None
+    if approximate is None or _to_bool(approximate):
+        for index, key in enumerate(keys):
+            if key is not None and _compare('<=', key, value):
+                found = index
+            else:
+                break
+    else:
+        for index, key in enumerate(keys):
+            if key is not None and _compare('=', key, value):
+                found = index
+                break
+
+    if found is None:
+        raise ErrorValue('#N/A')
+
+    result = table[row - 1][found]
+    if isinstance(result, ErrorValue):
+        raise result
+
+    return result
+
+
+def _xl_if(evaluator, args, title):
+    condition = _to_bool(evaluator._evaluate(args[0], title))
+    if condition:
+        if len(args) < 2:
+            return True
+        return evaluator._evaluate(args[1], title)
+
+    if len(args) < 3:
+        return False
+
+    return evaluator._evaluate(args[2], title)
+
+
+def _xl_iferror(evaluator, args, title):
+    try:
+        return evaluator._evaluate(args[0], title)
+    except ErrorValue:
+        return evaluator._evaluate(args[1], title)
+
+
+def _xl_max(*values):
+    return max(_numbers(values), default=0)
+
+
+def _xl_min(*values):
+    return min(_numbers(values), default=0)
+
+
+def _xl_not(value):
+    return not _to_bool(value)
+
+
+def _xl_or(*values):
+    items = [v for r, v in _flatten(values) if not (r and (
+        v is None or isinstance(v, str)))]
+    if not items:
+        raise ErrorValue('#VALUE!')
+
+    return any(_to_bool(v) for v in items)
+
+
+def _xl_round(value, digits):
+    # Excel rounds halves away from zero
+    value = Decimal(repr(float(_to_number(value))))
+    digits = int(_to_number(digits))
+    if not value.is_finite() or value.as_tuple().exponent >= -digits:
+        # nothing below the rounding place, e.g. ROUND(1E+30,2)
+        return float(value)
+    if value.adjusted() < -digits - 1:
+        # rounding place is above the leading digit, e.g. ROUND(4,-2)
+        return 0.0
+
+    with localcontext() as context:
+        context.rounding = ROUND_HALF_UP
+        result = value.quantize(Decimal(1).scaleb(-digits))
+
+    return float(result)
+
+
+def _xl_sum(*values):
+    return sum(_numbers(values))
+
+
+FUNCTIONS = {
+    'ABS': _xl_abs,
+    'AND': _xl_and,
+    'AVERAGE': _xl_average,
+    'HLOOKUP': _xl_hlookup,
+    'MAX': _xl_max,
+    'MIN': _xl_min,
+    'NOT': _xl_not,
+    'OR': _xl_or,
+    'ROUND': _xl_round,
+    'SUM': _xl_sum,
+}
+
+LAZY_FUNCTIONS = {
+    'IF': _xl_if,
+    'IFERROR': _xl_iferror,
+}
+# Functions that receive unevaluated argument nodes, so that only the branch
+# Excel would use gets computed.
+
+ARITY = {
+    'ABS': (1, 1),
+    'AND': (1, None),
+    'AVERAGE': (1, None),
+    'HLOOKUP': (3, 4),
+    'IF': (1, 3),
+    'IFERROR': (2, 2),
+    'MAX': (1, None),
+    'MIN': (1, None),
+    'NOT': (1, 1),
+    'OR': (1, None),
+    'ROUND': (2, 2),
+    'SUM': (1, None),
+}
+# Argument counts Excel accepts; None means no upper limit.
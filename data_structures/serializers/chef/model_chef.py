@@ -36,7 +36,8 @@ import openpyxl as xlio
 import bb_settings
 import chef_settings
 
-from openpyxl.styles import Alignment, PatternFill, Font, Border, Side
+from openpyxl.styles import Alignment
+from openpyxl.writer.write_only import WriteOnlyWorksheet
 
 from .bb_workbook import BB_Workbook as Workbook
 from .cell_styles import CellStyles
@@ -81,17 +82,36 @@ class ModelChef:
     ====================  =====================================================
     """
 
-    def chop_model(self, model, base_file=None, include_ids=False):
+    def chop_model(self, model, base_file=None, include_ids=False,
+                   write_only=False, workers=None, cache=None):
         """
 
 
         ModelChef.chop_model -> BB_Workbook
 
         --``model`` is an instance of Blackbird Engine model
+        --``write_only`` bool; stream unit sheets to disk as they finish
+        --``workers`` int; number of processes to write unit sheet XML with
+        --``cache`` SheetCache; unit sheets kept from earlier exports
 
         Method delegates to UnitChef to chop BusinessUnits and returns an
         instance of BB_Workbook.  BB_Workbook contains an Excel workbook with
         dynamic links.
+
+        If ``write_only`` is True, every unit sheet is laid out and resolved
+        as usual, then replaced by an openpyxl write-only sheet that streams
+        its rows in order. Workbook contents are the same, but cell objects
+        of finished sheets are released instead of living until save(). Styles
+        saved from ``base_file`` are applied to each unit sheet before it is
+        streamed or written in a worker.
+
+        If ``workers`` is above 1, unit sheets of each timeline are laid out
+        and filled here first, then written to XML in parallel worker
+        processes. See UnitChef.chop_multi().
+
+        If ``cache`` is given, unit sheets whose inputs did not change since
+        an earlier export with the same cache are rebuilt from it instead of
+        chopped. Pass the same SheetCache to every export of a model.
         """
         model.populate_xl_data()
 
@@ -100,6 +120,7 @@ class ModelChef:
             preserved_styles = self.save_styles_from_file(obook)
             book = Workbook.convert(obook)
         else:
+            preserved_styles = None
             book = Workbook()
 
         book = GarnishChef.add_garnishes(model, book=book)
@@ -109,12 +130,16 @@ class ModelChef:
         structure_chef.chop(book)
 
         proj = model.get_timeline(resolution='monthly', name='default')
-        unit_chef = UnitChef(model, timeline=proj, include_ids=include_ids)
+        unit_chef = UnitChef(model, timeline=proj, include_ids=include_ids,
+                             write_only=write_only, workers=workers,
+                             cache=cache, styles=preserved_styles)
         unit_chef.chop_multi(book)
 
         actl = model.get_timeline(resolution='monthly', name='actual')
         if actl:
-            unit_chef = UnitChef(model, timeline=actl)
+            unit_chef = UnitChef(model, timeline=actl, write_only=write_only,
+                                 workers=workers, cache=cache,
+                                 styles=preserved_styles)
             unit_chef.chop_multi(book, tab_name='Actual')
 
         if bb_settings.MAKE_ANNUAL_SUMMARIES:
@@ -298,20 +323,10 @@ class ModelChef:
             if worksheet.title == skip_sheet:
                 continue
 
+            if isinstance(worksheet, WriteOnlyWorksheet):
+                continue
+
             if worksheet.title in styles:
-                sheet_styles = styles[worksheet.title]
-                for cell in worksheet.get_cell_collection():
-                    cell_dict = sheet_styles.get(cell.coordinate, None)
-                    if cell_dict:
-                        cell.number_format = cell_dict["number_format"]
-
-                        cell.font = Font(**cell_dict["font"])
-
-                        border_dict = cell_dict["border"]
-                        sides_dict = border_dict.pop('sides')
-                        for side, info in sides_dict.items():
-                            side_obj = Side(**info)
-                            border_dict[side] = side_obj
-                        cell.border = Border(**border_dict)
-
-                        cell.fill = PatternFill(**cell_dict["fill"])
\ No newline at end of file
+                CellStyles.apply_saved_styles(
+                    worksheet, styles[worksheet.title]
+                )
@@ -0,0 +1,173 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.serializers.chef.parallel_sheets
+"""
+
+Module fans XML generation for finished unit sheets out to a pool of forked
+worker processes. Chefs lay out and fill every sheet in the parent first, so
+tab names, rows and cross-sheet references are all settled before the fork.
+Workers inherit the workbook, write the XML for their share of sheets and ship
+it back. The parent then swaps each sheet for its XML.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+plan_batches()        split sheets into batches of similar cell counts
+register_tables()     add styles and strings of a sheet to workbook tables
+write_in_pool()       write sheet XML in worker processes, merge into workbook
+
+CLASSES:
+n/a
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor
+
+
+
+
+# Constants
+# n/a
+
+# Module Globals
+_worker_state = dict()
+# Set in the parent right before the pool forks, so workers inherit the
+# workbook instead of unpickling it.
+
+# Functions
+def plan_batches(sheets, count):
+    """
+
+
+    plan_batches() -> list
+
+    --``sheets`` is a list of Worksheets
+    --``count`` is the number of batches to aim for
+
+    Function returns a list of at most ``count`` lists of sheets. Function
+    hands out the largest sheets first, each to the batch with the fewest
+    cells so far.
+    """
+    batches = [list() for i in range(min(count, len(sheets)))]
+    loads = [0] * len(batches)
+
+    for sheet in sorted(sheets, key=lambda s: len(s._cells), reverse=True):
+        lightest = loads.index(min(loads))
+        batches[lightest].append(sheet)
+        loads[lightest] += len(sheet._cells)
+
+    return batches
+
+
+def register_tables(sheet):
+    """
+
+
+    register_tables() -> None
+
+    --``sheet`` is a Worksheet
+
+    Function adds the style combination of every styled cell and dimension,
+    and every string value, on ``sheet`` to the workbook tables. Openpyxl
+    fills those tables while writing, so without this pass each worker would
+    number styles and shared strings its own way.
+    """
+    strings = sheet.parent.shared_strings
+
+    for cell in sheet._cells.values():
+        if cell.has_style:
+            cell.style_id
+        if cell.data_type == 's' and cell._value is not None:
+            strings.add(cell._value)
+
+    for dimension in sheet.row_dimensions.values():
+        dimension.style_id
+
+    for dimension in sheet.column_dimensions.values():
+        dimension.style_id
+
+
+def write_in_pool(book, sheets, workers):
+    """
+
+
+    write_in_pool() -> bool
+
+    --``book`` is the BB_Workbook that holds ``sheets``
+    --``sheets`` is a list of finished Worksheets
+    --``workers`` is the maximum number of worker processes
+
+    Function writes the XML for ``sheets`` in separate processes and replaces
+    each sheet with its XML through BB_Workbook.set_sheet_xml(). Function
+    returns False, leaving the workbook untouched, if the platform cannot fork
+    or there is nothing to write.
+    """
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        return False
+
+    if not sheets:
+        return False
+
+    for sheet in sheets:
+        register_tables(sheet)
+
+    batches = [
+        [book.get_index(sheet) for sheet in batch]
+        for batch in plan_batches(sheets, workers)
+    ]
+
+    _worker_state['book'] = book
+
+    written = list()
+    try:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=len(batches),
+                                 mp_context=context) as pool:
+            for result in pool.map(_write_batch, batches):
+                written.extend(result)
+    finally:
+        _worker_state.clear()
+
+    # swapping keeps positions, so indices from before the fork still hold
+    for index, xml, comments, rels in written:
+        sheet = book._sheets[index]
+        book.set_sheet_xml(sheet, xml, comments=comments, rels=rels)
+
+    return True
+
+
+def _write_batch(indices):
+    """
+
+
+    _write_batch() -> list
+
+    --``indices`` is a list of sheet positions in the workbook
+
+    Function runs in a worker process. Function writes each sheet the way the
+    openpyxl writer would on save and returns a list of (index, xml, comment
+    records, relationships) tuples.
+    """
+    book = _worker_state['book']
+
+    result = list()
+    for index in indices:
+        sheet = book._sheets[index]
+        xml = sheet._write()
+        result.append((index, xml, sheet._comments, sheet._rels))
+
+    return result
@@ -0,0 +1,597 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.serializers.chef.sheet_cache
+"""
+
+Module defines a cache of chopped unit sheets, keyed by a content hash of
+everything UnitChef reads to build a sheet. A later export of a similar model
+rebuilds unchanged unit sheets from the cache instead of chopping them again.
+====================  =========================================================
+Attribute             Description
+====================  =========================================================
+
+DATA:
+XL_DATA_FIELDS        names of LineData fields that record sheet placement
+XL_DATA_PARTS         names of LineData sub-ranges that record placement
+
+FUNCTIONS:
+n/a
+
+CLASSES:
+SheetCache            stores finished unit sheets and line placements by key
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import time
+
+from collections import OrderedDict
+from copy import copy, deepcopy
+
+from openpyxl.cell.cell import Cell
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS
+from openpyxl.worksheet.worksheet import Worksheet
+
+from data_structures.modelling.delta import get_digest
+
+from .bb_workbook import STREAMED_SHEET_ATTRS
+from .style_registry import get_registry
+
+
+
+
+# Constants
+SHEET_ATTRS = tuple(
+    attr for attr in STREAMED_SHEET_ATTRS
+    if attr not in ('column_dimensions', 'row_dimensions')
+)
+# Sheet settings stored with each entry, dimensions are stored separately.
+
+XL_DATA_FIELDS = ('array', 'cell', 'ending', 'sheet', 'starting')
+XL_DATA_PARTS = ('', 'consolidated', 'derived', 'detailed', 'reference')
+# '' stands for the LineData itself.
+
+_SOURCE = ('source',)
+_SHEET = ('sheet',)
+
+# Module Globals
+# n/a
+
+# Classes
+class _Uncacheable(Exception):
+    """
+
+    Raised when a chopped sheet points outside itself in a way the cache
+    cannot replay.
+    """
+    pass
+
+
+class SheetCache:
+    """
+
+    SheetCache keeps finished unit sheets between exports. Keep one instance
+    around, e.g. on an export worker, and pass it to ModelChef.chop_model().
+
+    A key covers the unit (structure, parameters, life, line values, drivers
+    and excel data), the periods and parameters of the time line, the content
+    of the drivers tab the unit links to, chopping options, the tab name the
+    unit would get, and the coordinates of every cell outside the unit that
+    its lines consolidate, reference or feed into drivers. Children are
+    chopped first, so a parent misses only when a child moved the cells it
+    links to, not whenever a child value changes.
+
+    An entry holds the cells, styles, dimensions and settings of the finished
+    sheet, plus where each line of the unit landed on it. Restoring an entry
+    rebuilds the sheet and points every line's xl_data at the new cells, so
+    parents, summaries and reports link to it as if it was just chopped.
+    ====================  =====================================================
+    Attribute             Description
+    ====================  =====================================================
+
+    DATA:
+    chop_seconds          float; time UnitChef spent chopping missed sheets
+    hits                  int; number of sheets restored from the cache
+    key_seconds           float; time spent computing keys in get_key()
+    max_entries           int; entries to keep, least recently used go first
+    misses                int; number of sheets that had to be chopped
+
+    FUNCTIONS:
+    clear()               drops all entries
+    get_context()         returns digest of book-level inputs to unit sheets
+    get_key()             returns cache key of a unit sheet
+    restore()             rebuilds a unit sheet from the cache
+    store()               saves a finished unit sheet under a key
+    ====================  =====================================================
+    """
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.chop_seconds = 0.0
+        self.hits = 0
+        self.key_seconds = 0.0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+
+    def clear(self):
+        """
+
+
+        SheetCache.clear() -> None
+
+        Method drops all entries and resets counters.
+        """
+        self._entries.clear()
+        self.chop_seconds = 0.0
+        self.hits = 0
+        self.key_seconds = 0.0
+        self.misses = 0
+
+    def get_context(self, book, timeline, **options):
+        """
+
+
+        SheetCache.get_context() -> str
+
+        --``book`` must be a BB_Workbook
+        --``timeline`` is the TimeLine being chopped
+        --``options`` are chopping options, e.g. values_only=True
+
+        Method returns a digest of inputs shared by all unit sheets of one
+        UnitChef run: the options, the periods of ``timeline`` and the
+        contents of the drivers tab that unit sheets link to.
+        """
+        drivers = book.get_sheet_by_name(book.drivers_tab_name)
+        cells = sorted(
+            (key, cell.value) for key, cell in drivers._cells.items()
+        )
+
+        now = timeline.current_period
+        context = [
+            sorted(options.items()),
+            timeline.name,
+            now.end if now else None,
+            [period.end for period in timeline.iter_ordered()],
+            get_digest(cells),
+        ]
+
+        return get_digest(context)
+
+    def get_key(self, context, unit, timeline, title):
+        """
+
+
+        SheetCache.get_key() -> str
+
+        --``context`` is the digest from get_context()
+        --``unit`` is the BusinessUnit about to be chopped
+        --``timeline`` is the TimeLine being chopped
+        --``title`` is the tab name the unit sheet would get
+
+        Method returns the key of the sheet ``unit`` would chop into. Call it
+        after the unit's children are chopped, so that their cells are known.
+
+        Key serializes every statement of every period, which costs about as
+        much as chopping the sheet itself; compare instance.key_seconds with
+        instance.chop_seconds to see what the cache saves on a given model.
+        Statements shared between periods, such as a starting balance sheet
+        that is the prior ending balance sheet, are serialized once.
+        """
+        start = time.perf_counter()
+        bbid = unit.id.bbid
+        parts = [context, title, unit.to_database()]
+
+        serialized = dict()
+        for period in timeline.iter_ordered():
+            fins = unit.get_financials(period)
+            statements = list()
+            for statement in fins.full_ordered:
+                if not statement:
+                    statements.append(None)
+                    continue
+                if id(statement) not in serialized:
+                    serialized[id(statement)] = statement.to_database()
+                statements.append(serialized[id(statement)])
+
+            lines = list()
+            for line in _iter_period_lines(fins):
+                sources = [
+                    _get_address(source) for source in _get_sources(line)
+                ]
+                lines.append(
+                    (line.id.bbid.hex, line.xl_data.to_database(), sources)
+                )
+
+            parts.append((
+                period.end,
+                list(period.parameters.to_database(target='parameters')),
+                period.unit_parameters.get(bbid),
+                statements,
+                lines,
+            ))
+
+        result = get_digest(parts)
+        self.key_seconds += time.perf_counter() - start
+
+        return result
+
+    def restore(self, key, book, unit, timeline, index=None):
+        """
+
+
+        SheetCache.restore() -> Worksheet or None
+
+        --``key`` is a key from get_key()
+        --``book`` must be a BB_Workbook
+        --``unit`` is the BusinessUnit the sheet belongs to
+        --``timeline`` is the TimeLine being chopped
+        --``index`` is optionally the index at which to insert the tab
+
+        Method adds the sheet stored under ``key`` to ``book`` and points the
+        xl_data of the unit and its lines at it. Method returns None, and
+        changes nothing, on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry['title'] in book:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        sheet = book.create_sheet(entry['title'], index)
+        sheet.bb.scenario_selector = entry['scenario_selector']
+
+        registry = get_registry(book)
+        styles = [_make_style(book, registry, s) for s in entry['styles']]
+
+        for row, col, value, data_type, style, comment in entry['cells']:
+            cell = Cell(sheet, row=row, col_idx=col)
+            cell._value = value
+            cell.data_type = data_type
+            if style is not None:
+                cell._style = copy(styles[style])
+            if comment is not None:
+                cell.comment = copy(comment)
+            sheet._cells[(row, col)] = cell
+
+        for attr, stored in (('row_dimensions', entry['rows']),
+                             ('column_dimensions', entry['columns'])):
+            dimensions = getattr(sheet, attr)
+            for dimension, style in stored:
+                dimension = copy(dimension)
+                dimension.parent = sheet
+                if style is not None:
+                    dimension._style = copy(styles[style])
+                dimensions[dimension.index] = dimension
+
+        for attr, value in entry['settings'].items():
+            setattr(sheet, attr, deepcopy(value))
+        sheet.page_setup._parent = sheet
+        sheet._merged_cells = list(entry['merged'])
+
+        sheet.bb.bordered = entry['bordered']
+
+        unit.xl.set_sheet(sheet)
+        for place, line in _iter_lines(unit, timeline):
+            state = entry['lines'].get(place)
+            if state is not None:
+                _unpack_line(line, sheet, state)
+
+        return sheet
+
+    def store(self, key, sheet, unit, timeline):
+        """
+
+
+        SheetCache.store() -> bool
+
+        --``key`` is a key from get_key()
+        --``sheet`` is the finished sheet for ``unit``
+        --``unit`` is the BusinessUnit the sheet belongs to
+        --``timeline`` is the TimeLine being chopped
+
+        Method saves ``sheet`` and the placement of the lines of ``unit`` on
+        it under ``key``. Call it once the sheet will not change anymore.
+        Method returns False if the sheet cannot be replayed from the cache.
+        """
+        try:
+            lines = dict()
+            for place, line in _iter_lines(unit, timeline):
+                lines[place] = _pack_line(line, sheet)
+        except _Uncacheable:
+            return False
+
+        book = sheet.parent
+        style_index = dict()
+        styles = list()
+
+        def add_style(style):
+            if not style:
+                return None
+            style = tuple(style)
+            if style not in style_index:
+                style_index[style] = len(styles)
+                styles.append(_get_style(book, style))
+            return style_index[style]
+
+        cells = list()
+        for (row, col), cell in sheet._cells.items():
+            comment = copy(cell._comment) if cell._comment else None
+            cells.append((
+                row, col, cell._value, cell.data_type,
+                add_style(cell._style), comment,
+            ))
+
+        rows = [
+            (copy(dimension), add_style(dimension._style))
+            for dimension in sheet.row_dimensions.values()
+        ]
+        columns = [
+            (copy(dimension), add_style(dimension._style))
+            for dimension in sheet.column_dimensions.values()
+        ]
+
+        # entries must not share settings objects with the live sheet
+        memo = {id(sheet): None}
+        settings = {
+            attr: deepcopy(getattr(sheet, attr), memo) for attr in SHEET_ATTRS
+        }
+
+        self._entries[key] = dict(
+            bordered=sheet.bb.bordered,
+            cells=cells,
+            columns=columns,
+            lines=lines,
+            merged=list(sheet._merged_cells),
+            rows=rows,
+            scenario_selector=sheet.bb.scenario_selector,
+            settings=settings,
+            styles=styles,
+            title=sheet.title,
+        )
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return True
+
+
+# Functions
+def _get_address(line):
+    """
+
+
+    _get_address() -> tuple or None
+
+    --``line`` is a LineItem
+
+    Function returns (sheet title, coordinate) of the cell ``line`` was
+    chopped into, or None if it has not been chopped yet.
+    """
+    cell = line.xl_data.cell
+    if cell is None:
+        return None
+
+    return cell.parent.title, cell.coordinate
+
+
+def _get_sources(line):
+    """
+
+
+    _get_sources() -> list
+
+    --``line`` is a LineItem
+
+    Function returns the lines whose cells the chopped ``line`` may link to:
+    consolidation sources, the reference source and driver references.
+    """
+    xl_data = line.xl_data
+    result = list(xl_data.consolidated.sources)
+
+    if xl_data.reference.source:
+        result.append(xl_data.reference.source)
+
+    for calc in xl_data.derived.calculations:
+        for value in (calc.references or dict()).values():
+            if hasattr(value, 'xl_data'):
+                result.append(value)
+
+    return result
+
+
+def _get_style(book, style):
+    """
+
+
+    _get_style() -> tuple
+
+    --``book`` is the workbook that owns ``style``
+    --``style`` is a tuple of StyleArray ids
+
+    Function returns the style objects behind the ids in ``style``, so that
+    they can be added to another workbook.
+    """
+    (font, fill, border, number_format, protection, alignment,
+     pivot_button, quote_prefix, xf_id) = style
+
+    if number_format in BUILTIN_FORMATS:
+        number_format = BUILTIN_FORMATS[number_format]
+    else:
+        number_format = book._number_formats[number_format - 164]
+
+    return (
+        book._fonts[font], book._fills[fill], book._borders[border],
+        number_format, book._protections[protection],
+        book._alignments[alignment], pivot_button, quote_prefix, xf_id,
+    )
+
+
+def _iter_lines(unit, timeline):
+    """
+
+
+    _iter_lines() -> iterator
+
+    --``unit`` is a BusinessUnit
+    --``timeline`` is a TimeLine
+
+    Function yields (place, line) for every line of ``unit`` in every
+    period of ``timeline``. Place is (period end, statement position, line
+    bbid hex); the position keeps apart the starting and ending balance
+    sheets of a period, whose lines share bbids.
+    """
+    for period in timeline.iter_ordered():
+        fins = unit.get_financials(period)
+        for position, statement in enumerate(fins.full_ordered):
+            if not statement:
+                continue
+            for line in statement.get_full_ordered():
+                yield (period.end, position, line.id.bbid.hex), line
+
+
+def _iter_period_lines(fins):
+    """
+
+
+    _iter_period_lines() -> iterator
+
+    --``fins`` is a Financials instance
+
+    Function yields every line of every statement in ``fins``.
+    """
+    for statement in fins.full_ordered:
+        if statement:
+            yield from statement.get_full_ordered()
+
+
+def _make_style(book, registry, style):
+    """
+
+
+    _make_style() -> StyleArray
+
+    --``book`` is the workbook to add the style to
+    --``registry`` is the StyleRegistry of ``book``
+    --``style`` is a tuple from _get_style()
+
+    Function adds the objects in ``style`` to the tables of ``book`` and
+    returns a StyleArray that points to them.
+    """
+    (font, fill, border, number_format, protection, alignment,
+     pivot_button, quote_prefix, xf_id) = style
+
+    return StyleArray([
+        book._fonts.add(font), book._fills.add(fill),
+        book._borders.add(border), registry.number_format(number_format),
+        book._protections.add(protection), book._alignments.add(alignment),
+        pivot_button, quote_prefix, xf_id,
+    ])
+
+
+def _pack(value, sheet, line):
+    """
+
+
+    _pack() -> object
+
+    --``value`` is a field value from a LineData
+    --``sheet`` is the sheet being stored
+    --``line`` is the line that owns ``value``
+
+    Function returns ``value`` with cells and sheets swapped for markers that
+    _unpack() can resolve against a restored sheet. Function raises
+    _Uncacheable for pointers it cannot resolve later.
+    """
+    if isinstance(value, Cell):
+        if value.parent is sheet:
+            return ('cell', value.coordinate)
+        source = line.xl_data.reference.source
+        if source is not None and value is source.xl_data.cell:
+            return _SOURCE
+        raise _Uncacheable(value)
+
+    if isinstance(value, Worksheet):
+        if value is sheet:
+            return _SHEET
+        raise _Uncacheable(value)
+
+    if isinstance(value, list):
+        return [_pack(item, sheet, line) for item in value]
+
+    return value
+
+
+def _pack_line(line, sheet):
+    """
+
+
+    _pack_line() -> dict
+
+    --``line`` is a LineItem
+    --``sheet`` is the sheet being stored
+
+    Function returns the placement fields of line.xl_data, keyed by (part,
+    field) as in XL_DATA_PARTS and XL_DATA_FIELDS.
+    """
+    result = dict()
+    for part in XL_DATA_PARTS:
+        holder = getattr(line.xl_data, part) if part else line.xl_data
+        fields = vars(holder)
+        for field in XL_DATA_FIELDS:
+            if field in fields:
+                result[(part, field)] = _pack(fields[field], sheet, line)
+
+    return result
+
+
+def _unpack(value, sheet, line):
+    """
+
+
+    _unpack() -> object
+
+    --``value`` is a value returned by _pack()
+    --``sheet`` is the restored sheet
+    --``line`` is the line that owns ``value``
+
+    Function resolves markers from _pack() on the restored sheet.
+    """
+    if isinstance(value, tuple):
+        if value == _SHEET:
+            return sheet
+        if value == _SOURCE:
+            return line.xl_data.reference.source.xl_data.cell
+        return sheet[value[1]]
+
+    if isinstance(value, list):
+        return [_unpack(item, sheet, line) for item in value]
+
+    return value
+
+
+def _unpack_line(line, sheet, state):
+    """
+
+
+    _unpack_line() -> None
+
+    --``line`` is a LineItem
+    --``sheet`` is the restored sheet
+    --``state`` is a dict from _pack_line()
+
+    Function sets the placement fields of line.xl_data from ``state``.
+    """
+    for (part, field), value in state.items():
+        holder = getattr(line.xl_data, part) if part else line.xl_data
+        setattr(holder, field, _unpack(value, sheet, line))
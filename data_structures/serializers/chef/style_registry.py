@@ -0,0 +1,225 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.serializers.chef.style_registry
+"""
+
+Module defines a per-workbook registry of shared style ids.
+====================  =========================================================
+Attribute             Description
+====================  =========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+get_registry()        returns the StyleRegistry of a workbook, sheet or cell
+
+CLASSES:
+StyleRegistry         creates each distinct style once, applies it by id
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import openpyxl as xlio
+
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.numbers import BUILTIN_FORMATS_REVERSE
+
+
+
+
+# Constants
+BORDER_SIDES = ('top', 'bottom', 'left', 'right')
+STYLE_KEYS = dict(
+    font='fontId',
+    fill='fillId',
+    border='borderId',
+    number_format='numFmtId',
+    alignment='alignmentId',
+)
+# Keyword of StyleRegistry.apply() : slot in an openpyxl StyleArray.
+
+# Module Globals
+# n/a
+
+# Functions
+def get_registry(obj):
+    """
+
+
+    get_registry() -> StyleRegistry
+
+    --``obj`` is an openpyxl workbook, worksheet or cell
+
+    Function returns the registry of the workbook that ``obj`` belongs to,
+    creating it on first use.
+    """
+    book = obj
+    while not isinstance(book, xlio.Workbook):
+        book = book.parent
+
+    registry = getattr(book, '_style_registry', None)
+    if registry is None:
+        registry = StyleRegistry(book)
+        book._style_registry = registry
+
+    return registry
+
+
+# Classes
+class StyleRegistry:
+    """
+
+    Openpyxl keeps fonts, fills, borders, alignments and number formats in
+    workbook-level tables and stores only table indices on each cell. Setting
+    cell.font = Font(...) builds and validates a new style object and hashes
+    it to find its index, for every cell.
+
+    StyleRegistry builds each distinct style once per workbook, remembers its
+    index and writes the index straight into the cell's style array. Cells
+    with the same formatting end up sharing one entry in styles.xml.
+    ====================  =====================================================
+    Attribute             Description
+    ====================  =====================================================
+
+    DATA:
+    book                  obj; openpyxl workbook that owns the style tables
+
+    FUNCTIONS:
+    alignment()           returns alignment id for Alignment keyword arguments
+    apply()               sets style ids on a cell
+    border()              returns border id for a set of sides
+    fill()                returns id of solid fill in a color
+    font()                returns font id for Font keyword arguments
+    number_format()       returns number format id for a format string
+    ====================  =====================================================
+    """
+    def __init__(self, book):
+        self.book = book
+        self._ids = dict()
+
+    def alignment(self, **kwargs):
+        """
+
+
+        StyleRegistry.alignment() -> int
+
+        Method returns the table index of Alignment(**kwargs).
+        """
+        key = ('alignment', tuple(sorted(kwargs.items())))
+        if key not in self._ids:
+            style = Alignment(**kwargs)
+            self._ids[key] = self.book._alignments.add(style)
+
+        return self._ids[key]
+
+    @staticmethod
+    def apply(cell, **ids):
+        """
+
+
+        StyleRegistry.apply() -> None
+
+        --``cell`` is an openpyxl cell
+        --``ids`` maps keys of STYLE_KEYS to ids from this registry
+
+        Method writes style ids into the style array of ``cell``, leaving the
+        rest of its formatting alone.
+        """
+        if not cell._style:
+            cell._style = StyleArray()
+
+        for key, value in ids.items():
+            setattr(cell._style, STYLE_KEYS[key], value)
+
+    def border(self, border_style, sides, base=None):
+        """
+
+
+        StyleRegistry.border() -> int
+
+        --``border_style`` is any openpyxl border style, e.g. 'thin'
+        --``sides`` is an iterable of names from BORDER_SIDES
+        --``base`` is an optional border id to start from
+
+        Method returns the table index of a border that draws ``sides`` in
+        ``border_style``. If ``base`` is given, the other sides keep their
+        look from the base border. Diagonals are never carried over.
+        """
+        sides = frozenset(sides)
+        key = ('border', border_style, sides, base)
+        if key not in self._ids:
+            kwargs = dict()
+            if base is not None:
+                old = self.book._borders[base]
+                for name in BORDER_SIDES:
+                    kwargs[name] = getattr(old, name)
+
+            side = Side(border_style=border_style)
+            for name in sides:
+                kwargs[name] = side
+
+            self._ids[key] = self.book._borders.add(Border(**kwargs))
+
+        return self._ids[key]
+
+    def fill(self, color):
+        """
+
+
+        StyleRegistry.fill() -> int
+
+        --``color`` is a hex color string
+
+        Method returns the table index of a solid fill in ``color``.
+        """
+        key = ('fill', color)
+        if key not in self._ids:
+            style = PatternFill(start_color=color, end_color=color,
+                                fill_type='solid')
+            self._ids[key] = self.book._fills.add(style)
+
+        return self._ids[key]
+
+    def font(self, **kwargs):
+        """
+
+
+        StyleRegistry.font() -> int
+
+        Method returns the table index of Font(**kwargs).
+        """
+        key = ('font', tuple(sorted(kwargs.items())))
+        if key not in self._ids:
+            style = Font(**kwargs)
+            self._ids[key] = self.book._fonts.add(style)
+
+        return self._ids[key]
+
+    def number_format(self, number_format):
+        """
+
+
+        StyleRegistry.number_format() -> int
+
+        --``number_format`` is an Excel number format string
+
+        Method returns the id of ``number_format``, built-in formats first.
+        """
+        key = ('number_format', number_format)
+        if key not in self._ids:
+            if number_format in BUILTIN_FORMATS_REVERSE:
+                idx = BUILTIN_FORMATS_REVERSE[number_format]
+            else:
+                idx = self.book._number_formats.add(number_format) + 164
+            self._ids[key] = idx
+
+        return self._ids[key]
@@ -30,17 +30,19 @@ UnitChef              class containing methods to chop BusinessUnits into
 
 # Imports
 import openpyxl as xlio
+import time
 
 from .cell_styles import CellStyles
 from .line_chef import LineChef
+from .parallel_sheets import write_in_pool
 from .sheet_style import SheetStyle
+from .style_registry import get_registry
 from .unit_fins_chef import UnitFinsChef
 from .unit_info_chef import UnitInfoChef
 
 from chef_settings import (
     APPLY_COLOR_TO_DECEMBER, DECEMBER_COLOR, VALUATION_TAB_COLOR
 )
-from openpyxl.styles import PatternFill
 
 
 
@@ -80,8 +82,12 @@ class UnitChef:
     ====================  =====================================================
 
     DATA:
+    cache                 obj; SheetCache to reuse unchanged unit sheets from
     model                 obj; instance of Blackbird model
+    styles                dict; cell styles saved from a base file, by sheet
     timeline              obj; instance of Timeline from which to pull financials
+    workers               int; processes to write unit sheet XML with
+    write_only            bool; stream each finished unit sheet to disk
 
     FUNCTIONS:
     chop_company()        returns sheet with a SheetData instance at sheet.bb,
@@ -91,9 +97,17 @@ class UnitChef:
                           makes and fills Valuation tab
     ====================  =====================================================
     """
-    def __init__(self, model, timeline=None, include_ids=False):
+    def __init__(self, model, timeline=None, include_ids=False,
+                 write_only=False, workers=None, cache=None, styles=None):
+        self.cache = cache
         self.model = model
         self.include_ids = include_ids
+        self.styles = styles
+        self.write_only = write_only
+        self.workers = workers
+
+        self._context = None
+        self._finished = list()
 
         if timeline is not None:
             self.timeline = timeline
@@ -120,11 +134,29 @@ class UnitChef:
         If `values_only` = True, only chop company unit (no recursion) and
         write all financial values as hardcoded.  This option is used for
         reports.
+
+        If instance.write_only is True, each unit sheet gets its line borders
+        and any saved styles from instance.styles as soon as it is complete,
+        and is then streamed to disk through BB_Workbook.stream_sheet().
+        Children are streamed before their parent is chopped, but cells that
+        line items point to through xl_data stay in memory until the export
+        is done, since parents build references from them.
+
+        If instance.workers is above 1, the top level call first chops every
+        unit as usual, which settles tab names, layout and links. Then it
+        writes the XML of all finished unit sheets in a pool of worker
+        processes and swaps it into ``book``.
+
+        If instance.cache is a SheetCache, each unit sheet is looked up there
+        once the unit's children are done. A hit rebuilds the sheet from the
+        cache; a miss chops it as usual, adds line borders and stores it.
+        Either way the sheet is not bordered again afterwards.
         """
         model = self.model
         timeline = self.timeline
 
         # top level entry: get the company
+        top = not unit
         if not unit:
             unit = model.get_company()
 
@@ -141,53 +173,46 @@ class UnitChef:
             self.chop_multi(book, child, values_only=values_only,
                             tab_color=tab_color)
 
-        # 2.   Chop the parent
-        #
-        # In this block, we have to set the current row to the place where the
-        # last area ends before running the breadth-wise routines. Otherwise,
-        # they would treat the ending row of the last period as their own
-        # starting row, and the spreadsheet would look like a staircase.
-
-        # 2.1.   set up the unit sheet and spread params
+        # 2.   Chop the parent, unless the cache has its sheet
         info_chef = UnitInfoChef(model, timeline)
-        sheet = info_chef.create_unit_sheet(
-            book=book, unit=unit, index=index, values_only=values_only,
-            name=tab_name, tab_color=tab_color,
-        )
 
-        if not values_only:
-            # 2.2.   spread life
-            info_chef.unit_life(sheet, unit)
-
-            # 2.3. add unit size
-            info_chef.add_unit_size(sheet, unit)
-
-        # 2.4.  spread fins
-        fins_chef = UnitFinsChef(model, timeline)
-        fins_chef.chop_financials(sheet, unit, values_only=values_only,
-                                  include_ids=self.include_ids)
-
-        # 2.5 add area and statement labels and sheet formatting
-        SheetStyle.style_sheet(sheet)
+        sheet = None
+        if self.cache is not None:
+            if top or self._context is None:
+                self._context = self.cache.get_context(
+                    book, timeline, values_only=values_only,
+                    include_ids=self.include_ids, tab_color=tab_color,
+                )
+            title = info_chef.get_sheet_name(book, unit, name=tab_name)
+            key = self.cache.get_key(self._context, unit, timeline, title)
+            sheet = self.cache.restore(key, book, unit, timeline, index=index)
+
+        if sheet is None:
+            start = time.perf_counter()
+            sheet = self._chop_unit(
+                book, unit, info_chef, index=index, values_only=values_only,
+                tab_name=tab_name, tab_color=tab_color,
+            )
+
+            if self.cache is not None:
+                # bordered once here; later passes skip bordered sheets
+                if not values_only:
+                    CellStyles.format_sheet_borders(sheet)
+                self.cache.chop_seconds += time.perf_counter() - start
+                self.cache.store(key, sheet, unit, timeline)
 
         if not values_only:
-            # 2.6 add selector cell
-            #   Make scenario label cells
-            info_chef.add_scenario_selector_logic(book, sheet)
-
-        # Color the December columns
-        if APPLY_COLOR_TO_DECEMBER and not values_only:
-            for date, column in sheet.bb.time_line.columns.by_name.items():
-                if date.month == 12:
-                    for row in range(1, sheet.max_row + 1):
-                        cell = sheet.cell(column=column, row=row)
-                        cell.fill = PatternFill(start_color=DECEMBER_COLOR,
-                                                end_color=DECEMBER_COLOR,
-                                                fill_type='solid')
-
-        body_rows = sheet.bb.row_axis.get_group('body')
-        label_col = sheet.bb.col_axis.get_group('head')
-        self.add_labels(sheet, body_rows.groups, label_col)
+            if self.workers and self.workers > 1:
+                CellStyles.format_sheet_borders(sheet)
+                self._apply_styles(sheet)
+                self._finished.append(sheet)
+            elif self.write_only:
+                CellStyles.format_sheet_borders(sheet)
+                self._apply_styles(sheet)
+                book.stream_sheet(sheet)
+
+        if top and self._finished:
+            self._write_finished(book)
 
         return sheet
 
@@ -340,3 +365,109 @@ class UnitChef:
                 ):
                     row = sheet.row_dimensions[rownum]
                     row.hidden = True
+
+    # *************************************************************************#
+    #                           NON-PUBLIC METHODS                             #
+    # *************************************************************************#
+
+    def _apply_styles(self, sheet):
+        """
+
+
+        UnitChef._apply_styles() -> None
+
+        --``sheet`` is a finished unit sheet
+
+        Method applies styles saved from a base file to ``sheet``. Streamed
+        sheets and sheets written in workers are skipped when ModelChef applies
+        saved styles to the whole book, so they need them before they leave.
+        """
+        if self.styles and sheet.title in self.styles:
+            CellStyles.apply_saved_styles(sheet, self.styles[sheet.title])
+
+    def _chop_unit(self, book, unit, info_chef, index, values_only=False,
+                   tab_name='', tab_color=''):
+        """
+
+
+        UnitChef._chop_unit() -> Worksheet
+
+        --``book`` must be a Workbook
+        --``unit`` must be an instance of BusinessUnit
+        --``info_chef`` is the UnitInfoChef for instance.timeline
+        --``index`` is the index at which to insert the tab
+
+        Method creates the sheet for ``unit`` alone and fills it with
+        parameters, life, financials, labels and formatting. Children must be
+        chopped already.
+        """
+        model = self.model
+        timeline = self.timeline
+
+        # 2.   Chop the parent
+        #
+        # In this block, we have to set the current row to the place where the
+        # last area ends before running the breadth-wise routines. Otherwise,
+        # they would treat the ending row of the last period as their own
+        # starting row, and the spreadsheet would look like a staircase.
+
+        # 2.1.   set up the unit sheet and spread params
+        sheet = info_chef.create_unit_sheet(
+            book=book, unit=unit, index=index, values_only=values_only,
+            name=tab_name, tab_color=tab_color,
+        )
+
+        if not values_only:
+            # 2.2.   spread life
+            info_chef.unit_life(sheet, unit)
+
+            # 2.3. add unit size
+            info_chef.add_unit_size(sheet, unit)
+
+        # 2.4.  spread fins
+        fins_chef = UnitFinsChef(model, timeline)
+        fins_chef.chop_financials(sheet, unit, values_only=values_only,
+                                  include_ids=self.include_ids)
+
+        # 2.5 add area and statement labels and sheet formatting
+        SheetStyle.style_sheet(sheet)
+
+        if not values_only:
+            # 2.6 add selector cell
+            #   Make scenario label cells
+            info_chef.add_scenario_selector_logic(book, sheet)
+
+        # Color the December columns
+        if APPLY_COLOR_TO_DECEMBER and not values_only:
+            registry = get_registry(book)
+            fill = registry.fill(DECEMBER_COLOR)
+            for date, column in sheet.bb.time_line.columns.by_name.items():
+                if date.month == 12:
+                    for row in range(1, sheet.max_row + 1):
+                        cell = sheet.cell(column=column, row=row)
+                        registry.apply(cell, fill=fill)
+
+        body_rows = sheet.bb.row_axis.get_group('body')
+        label_col = sheet.bb.col_axis.get_group('head')
+        self.add_labels(sheet, body_rows.groups, label_col)
+
+        return sheet
+
+    def _write_finished(self, book):
+        """
+
+
+        UnitChef._write_finished() -> None
+
+        --``book`` must be a BB_Workbook
+
+        Method writes XML for unit sheets collected during chop_multi() in a
+        worker pool. If the pool cannot run, sheets are streamed in this
+        process when instance.write_only is True, or left for save() to write.
+        """
+        sheets, self._finished = self._finished, list()
+
+        if not write_in_pool(book, sheets, self.workers):
+            if self.write_only:
+                for sheet in sheets:
+                    book.stream_sheet(sheet)
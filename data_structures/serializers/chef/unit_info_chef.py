@@ -91,6 +91,7 @@ class UnitInfoChef:
     add_scenario_selector_logic() adds logic to use scenario selector to sheet
     add_unit_size()       adds unit's size to sheet
     create_unit_sheet()   creates tab for unit's information
+    get_sheet_name()      returns the tab name a unit sheet will get
     unit_life()           adds unit life information over time
     ====================  =====================================================
     """
@@ -312,20 +313,7 @@ class UnitInfoChef:
         calculations, no consolidation, so Life, Events, and Drivers sections
         will not be written to the sheet.
         """
-        if not name:
-            name = unit.tags.title
-
-        if name in book:
-            rev_name = name + " ..." + str(unit.id.bbid)[-8:]
-            name = rev_name
-
-            if name in book:
-                name = str(unit.id.bbid)
-
-        name = name.translate(bad_char_table)
-        name = name[:self.MAX_TITLE_CHARACTERS]
-        # Replace forbidden characters, make sure name is within length limits
-
+        name = self.get_sheet_name(book, unit, name=name)
         sheet = book.create_sheet(name, index)
 
         req_rows = len(unit.components.by_name) // self.MAX_LINKS_PER_CELL
@@ -391,6 +379,36 @@ class UnitInfoChef:
         # Return sheet
         return sheet
 
+    def get_sheet_name(self, book, unit, name=None):
+        """
+
+
+        UnitInfoChef.get_sheet_name() -> str
+
+        --``book`` must be a Workbook
+        --``unit`` must be an instance of BusinessUnit
+        --``name`` is the name to give the tab
+
+        Returns the tab name create_unit_sheet() would give ``unit`` in
+        ``book`` right now. Names already in ``book`` get the end of the unit
+        bbid appended.
+        """
+        if not name:
+            name = unit.tags.title
+
+        if name in book:
+            rev_name = name + " ..." + str(unit.id.bbid)[-8:]
+            name = rev_name
+
+            if name in book:
+                name = str(unit.id.bbid)
+
+        name = name.translate(bad_char_table)
+        name = name[:self.MAX_TITLE_CHARACTERS]
+        # Replace forbidden characters, make sure name is within length limits
+
+        return name
+
     def unit_life(self, sheet, unit, current_only=False):
         """
 
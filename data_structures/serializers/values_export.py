@@ -0,0 +1,417 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.serializers.values_export
+"""
+
+Module exports line values of a model as flat columns, one row per unit,
+statement, line and period, for jobs that only need the numbers. Values are
+read straight from period line storage, through the unit's template
+financials, so no period Financials are built and no workbook is involved.
+
+Columns can be written as CSV or as a compact binary file. The binary layout
+reuses the snapshot codec: repeated text is stored once per column and
+indexed, and values, dates and flags go out as packed arrays.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+COLUMNS               tuple; names of exported columns, in order
+MAGIC                 bytes; first bytes of every binary values file
+VERSION               int; binary layout version
+
+FUNCTIONS:
+collect_values()      returns exported columns of a model as a dict of lists
+iter_values()         yields one exported row per unit, line and period
+read_columns()        returns columns from a binary values file
+write_columns()       writes values of a model as a binary columnar file
+write_csv()           writes values of a model as CSV
+
+CLASSES:
+ValuesReader          decodes a binary values file
+ValuesWriter          encodes columns into a binary values file
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import csv
+import datetime
+import struct
+
+from array import array
+
+from data_structures.modelling.snapshot import SnapshotReader, SnapshotWriter
+
+
+
+
+# Constants
+COLUMNS = (
+    'unit_id', 'unit_name', 'statement', 'line_id', 'line_name', 'tags',
+    'period', 'value', 'hardcoded',
+)
+TEXT_COLUMNS = ('unit_id', 'unit_name', 'statement', 'line_id', 'line_name',
+                'tags')
+# Columns stored as an index into a per-column table of distinct strings.
+
+MAGIC = b'BBVX'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sB')
+
+TAG_SEPARATOR = ';'
+
+# kinds of values in the packed value column
+_KIND_NONE = 0
+_KIND_FLOAT = 1
+_KIND_INT = 2
+_KIND_BOOL = 3
+_KIND_OBJECT = 4
+
+# largest int that survives a round trip through a double
+_MAX_EXACT_INT = 2 ** 53
+
+# Module Globals
+# n/a
+
+# Functions
+def collect_values(model, timeline=None):
+    """
+
+
+    collect_values() -> dict
+
+    --``model`` is a Blackbird Engine model
+    --``timeline`` is optionally the TimeLine to export, default time line if
+      omitted
+
+    Function returns a dict of column name : list of values, with keys in
+    COLUMNS order.
+    """
+    result = {name: list() for name in COLUMNS}
+    appenders = [result[name].append for name in COLUMNS]
+
+    for row in iter_values(model, timeline=timeline):
+        for append, value in zip(appenders, row):
+            append(value)
+
+    return result
+
+
+def iter_values(model, timeline=None):
+    """
+
+
+    iter_values() -> iterator
+
+    --``model`` is a Blackbird Engine model
+    --``timeline`` is optionally the TimeLine to export, default time line if
+      omitted
+
+    Function yields one tuple per unit, statement, line and period, with
+    items in COLUMNS order. Lines that sum their details get the sum of the
+    detail values, as LineItem.value does. A starting balance sheet after the
+    first period shows the ending balance of the period before, the same way
+    Financials.populate_from_stored_values() links them.
+    """
+    if timeline is None:
+        timeline = model.get_timeline()
+
+    periods = list(timeline.iter_ordered())
+
+    for unit in model.bu_directory.values():
+        unit_id = unit.id.bbid.hex
+        unit_name = unit.name
+        fins = unit.financials
+
+        for statement in fins.full_ordered:
+            if statement is None:
+                continue
+
+            statement_name = statement.name
+            starting = statement is fins.starting
+
+            for i, period in enumerate(periods):
+                if starting and i > 0:
+                    # later starting balance sheets are the prior ending one
+                    source = periods[i - 1]
+                    lines = fins.ending.get_full_ordered()
+                else:
+                    source = period
+                    lines = statement.get_full_ordered()
+
+                values = dict()
+                for line in lines:
+                    yield (
+                        unit_id,
+                        unit_name,
+                        statement_name,
+                        line.id.bbid.hex,
+                        line.name,
+                        TAG_SEPARATOR.join(sorted(line.tags.all)),
+                        period.end,
+                        _get_value(line, source, values),
+                        source.get_line_hc(line.id.bbid.hex),
+                    )
+
+
+def read_columns(filename):
+    """
+
+
+    read_columns() -> dict
+
+    --``filename`` is the path of a file from write_columns()
+
+    Function returns a dict of column name : list of values, as returned by
+    collect_values().
+    """
+    with open(filename, 'rb') as stream:
+        data = stream.read()
+
+    return ValuesReader(data).read_table()
+
+
+def write_columns(model, filename, timeline=None):
+    """
+
+
+    write_columns() -> int
+
+    --``model`` is a Blackbird Engine model
+    --``filename`` is the path to write to
+    --``timeline`` is optionally the TimeLine to export
+
+    Function writes the values of ``model`` as a binary columnar file and
+    returns the number of rows written.
+    """
+    columns = collect_values(model, timeline=timeline)
+
+    writer = ValuesWriter()
+    writer.write_table(columns)
+
+    with open(filename, 'wb') as stream:
+        stream.write(writer.getvalue())
+
+    return len(columns['period'])
+
+
+def write_csv(model, stream, timeline=None):
+    """
+
+
+    write_csv() -> int
+
+    --``model`` is a Blackbird Engine model
+    --``stream`` is a text stream opened with newline=''
+    --``timeline`` is optionally the TimeLine to export
+
+    Function writes a header row and the values of ``model`` to ``stream``
+    and returns the number of rows written. Periods are written as ISO dates,
+    hardcoded flags as 1 or 0 and blank values as empty fields.
+    """
+    writer = csv.writer(stream)
+    writer.writerow(COLUMNS)
+
+    count = 0
+    for row in iter_values(model, timeline=timeline):
+        row = list(row)
+        row[6] = row[6].isoformat()
+        row[8] = 1 if row[8] else 0
+        writer.writerow(row)
+        count += 1
+
+    return count
+
+
+def _get_value(line, period, values):
+    """
+
+
+    _get_value() -> obj
+
+    --``line`` is a LineItem of a unit's template financials
+    --``period`` is the TimePeriod to read from
+    --``values`` is a dict of line bbid hex : value already read
+
+    Function returns the value of ``line`` in ``period``.
+    """
+    bbid_hex = line.id.bbid.hex
+    if bbid_hex in values:
+        return values[bbid_hex]
+
+    details = line.get_ordered()
+    if details and line.sum_details:
+        result = None
+        for detail in details:
+            value = _get_value(detail, period, values)
+            if value is not None:
+                result = (result or 0) + value
+    else:
+        result = period.get_line_value(bbid_hex)
+
+    values[bbid_hex] = result
+
+    return result
+
+
+# Classes
+class ValuesWriter(SnapshotWriter):
+    """
+
+    ValuesWriter encodes export columns into a growing buffer. Text columns
+    become a table of distinct strings plus an array of indices; periods
+    become date ordinals; values are split into kinds, doubles and a list of
+    anything that does not fit a double.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    n/a
+
+    FUNCTIONS:
+    write_table()         writes header and columns
+    ====================  ======================================================
+    """
+    def write_table(self, columns):
+        """
+
+
+        ValuesWriter.write_table() -> None
+
+        --``columns`` is a dict returned by collect_values()
+
+        Method writes the header, the row count and every column in COLUMNS
+        order.
+        """
+        self._buffer.write(_HEADER.pack(MAGIC, VERSION))
+
+        count = len(columns['period'])
+        self._write_length(count)
+
+        for name in TEXT_COLUMNS:
+            table = dict()
+            indices = array('I')
+            for text in columns[name]:
+                indices.append(table.setdefault(text, len(table)))
+            self.write_value(list(table))
+            self._write_array(indices)
+
+        self._write_array(
+            array('I', [end.toordinal() for end in columns['period']])
+        )
+
+        kinds = array('b')
+        numbers = array('d')
+        objects = list()
+        for value in columns['value']:
+            if value is None:
+                kind = _KIND_NONE
+                number = 0.0
+            elif isinstance(value, bool):
+                kind = _KIND_BOOL
+                number = float(value)
+            elif isinstance(value, float):
+                kind = _KIND_FLOAT
+                number = value
+            elif isinstance(value, int) and abs(value) < _MAX_EXACT_INT:
+                kind = _KIND_INT
+                number = float(value)
+            else:
+                kind = _KIND_OBJECT
+                number = 0.0
+                objects.append(value)
+
+            kinds.append(kind)
+            numbers.append(number)
+
+        self._write_array(kinds)
+        self._write_array(numbers)
+        self.write_value(objects)
+
+        self._write_array(
+            array('b', [1 if hc else 0 for hc in columns['hardcoded']])
+        )
+
+
+class ValuesReader(SnapshotReader):
+    """
+
+    ValuesReader decodes a file written by ValuesWriter.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    n/a
+
+    FUNCTIONS:
+    read_table()          checks header, returns columns
+    ====================  ======================================================
+    """
+    def read_table(self):
+        """
+
+
+        ValuesReader.read_table() -> dict
+
+        Method checks the header and returns a dict of column name : list of
+        values. Method raises ValueError if the data is not a values file of
+        a known version.
+        """
+        if len(self._data) < _HEADER.size:
+            raise ValueError("Data is too short to be a values file")
+
+        magic, version = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ValueError("Data is not a values file")
+        if version != VERSION:
+            c = "Unsupported values file version: %s" % version
+            raise ValueError(c)
+        self._offset = _HEADER.size
+
+        count = self._read_length()
+        result = dict()
+
+        for name in TEXT_COLUMNS:
+            table = self.read_value()
+            indices = self._read_array('I')
+            result[name] = [table[i] for i in indices]
+
+        result['period'] = [
+            datetime.date.fromordinal(n) for n in self._read_array('I')
+        ]
+
+        kinds = self._read_array('b')
+        numbers = self._read_array('d')
+        objects = iter(self.read_value())
+
+        values = list()
+        for kind, number in zip(kinds, numbers):
+            if kind == _KIND_FLOAT:
+                value = number
+            elif kind == _KIND_INT:
+                value = int(number)
+            elif kind == _KIND_BOOL:
+                value = bool(number)
+            elif kind == _KIND_OBJECT:
+                value = next(objects)
+            else:
+                value = None
+            values.append(value)
+        result['value'] = values
+
+        result['hardcoded'] = [bool(hc) for hc in self._read_array('b')]
+
+        if len(result['period']) != count:
+            raise ValueError("Values file columns do not match its row count")
+
+        return {name: result[name] for name in COLUMNS}
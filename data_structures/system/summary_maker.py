@@ -57,6 +57,7 @@ class SummaryMaker:
     ====================  =====================================================
 
     DATA:
+    closed                list; summary periods completed since last pop_closed
     fiscal_year_end       date; end of fiscal year default = 12/31/current year
     summaries             dict; holds Timeline objects keyed by interval
     bu_bbid               id of the unit being summarized
@@ -65,6 +66,7 @@ class SummaryMaker:
     copy                  copy of the object
     init_summaries        basic initialization of the summary dictionaries
     parse_period          receive a period from the outside, work on it
+    pop_closed            return and forget summary periods completed so far
     which_quarter         determine which quarter and year a period falls into
     add                   monthly -> quarterly, quarterly -> summary
     flush                 round out a summary
@@ -88,6 +90,7 @@ class SummaryMaker:
         self.complete_periods = dict()
         self.period_sources = dict()
         self.period = None
+        self.closed = list()
 
         self.onkey = None
 
@@ -146,6 +149,21 @@ class SummaryMaker:
         # push month to quarters
         self.add(period)
 
+    def pop_closed(self):
+        """
+
+
+        SummaryMaker.pop_closed() -> list
+
+        Method returns summary periods completed since the last call, in the
+        order they were completed, and forgets them. A quarter completes
+        before the year that contains it.
+        """
+        result = self.closed
+        self.closed = list()
+
+        return result
+
     def which_quarter(self):
         """
 
@@ -297,6 +315,7 @@ class SummaryMaker:
             full = (target.periods_used == self.complete_periods[self.onkey])
             target.complete = full
             # target_fins.filled = True
+            self.closed.append(target)
 
             # cascade from quarterly to annual
             if self.onkey == self.QUARTERLY_KEY:
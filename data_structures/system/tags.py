@@ -28,13 +28,17 @@ Tags                  composition class that provides tagging and naming
 
 
 # imports
+import itertools
+
 from tools.parsing import deCase
 
 
 
 
 # globals
-# n/a
+_versions = itertools.count()
+# Shared across instances, so a new or replaced Tags object never carries the
+# version of the one it replaced.
 
 
 # classes
@@ -54,6 +58,9 @@ class Tags:
 
     New tags are added to the optional list by default. Removing a tag from an
     object removes it from both required and optional lists simultaneously.
+
+    Instance draws a new ``version`` whenever its tags, name or title change,
+    so callers can cache profiles built from its contents.
     ====================  ======================================================
     Attribute             Description
     ====================  ======================================================
@@ -63,6 +70,7 @@ class Tags:
     name                  property; name of object described by instance
     optional              property; set of all optional tags
     required              property; set of all required tags
+    version               int; changes whenever instance contents change
 
     FUNCTIONS:
     copy()                returns a copy of an object with own tag lists
@@ -87,6 +95,7 @@ class Tags:
         self._cased_name = None
         self._name = None
         self._title = None
+        self.version = next(_versions)
         self.set_name(name)
 
     @property
@@ -186,6 +195,7 @@ class Tags:
 
         self._cased_name = name
         self._name = deCase(name)
+        self.version = next(_versions)
 
     def set_title(self, title):
         """
@@ -201,6 +211,7 @@ class Tags:
             title = title.strip()
 
         self._title = title
+        self.version = next(_versions)
 
     def add(self, *newTags, field="opt"):
         """
@@ -225,6 +236,8 @@ class Tags:
             tag = deCase(tag)
             real_thing.add(tag)
 
+        self.version = next(_versions)
+
     def remove(self, badTag):
         """
 
@@ -240,6 +253,8 @@ class Tags:
             if badTag in source:
                 source.remove(badTag)
 
+        self.version = next(_versions)
+
     @classmethod
     def from_database(cls, data):
         """
@@ -258,6 +273,7 @@ class Tags:
         new._required = set(data['required'])
         new._prohibited = set(data['prohibited'])
         new._optional = set(data['optional'])
+        new.version = next(_versions)
 
         return new
 
@@ -0,0 +1,230 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.sample_model
+"""
+
+Small, fully deterministic model for unit tests. Formulas live in a local
+catalog, so tests do not depend on content modules or topic scripts.
+====================  =========================================================
+Attribute             Description
+====================  =========================================================
+
+DATA:
+REF_DATE              reference date of every sample model
+UNIT_RATES            dict; unit name : monthly growth rate
+
+FUNCTIONS:
+get_unit()            returns the unit with a given name
+get_values()          returns every line value in every unit and period
+make_model()          returns a sample model that is ready to extrapolate
+read_cells()          returns contents and styles of every cell in a file
+
+CLASSES:
+SampleModelCase       TestCase that connects Drivers to the sample catalog
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import types
+import unittest
+
+import openpyxl as xlio
+
+from data_structures.modelling.business_unit import BusinessUnit
+from data_structures.modelling.driver import Driver
+from data_structures.modelling.formula import Formula
+from data_structures.modelling.line_item import LineItem
+from data_structures.modelling.model import Model
+
+
+
+
+# Constants
+REF_DATE = datetime.date(2017, 1, 15)
+UNIT_RATES = {'north': 1.1, 'south': 1.2, 'east': 0.9}
+
+_BIRTH = datetime.date(2000, 1, 1)
+
+# Functions
+def _grow(line, bu, params, signature):
+    # past value times rate, or base in the first period
+    value = params['base']
+    past = params['period'].past
+    if past is not None:
+        past_line = bu.get_financials(past).income.find_first(line.name)
+        if past_line is not None and past_line.value is not None:
+            value = past_line.value * params['rate']
+
+    line.set_value(value, signature)
+
+
+def _flat(line, bu, params, signature):
+    line.set_value(params['monthly cost'], signature)
+
+
+def _make_formula(name, func):
+    formula = Formula(name)
+    formula.func = func
+    formula.id.assign(name)
+
+    return formula
+
+
+_FORMULAS = [_make_formula('grow', _grow), _make_formula('flat', _flat)]
+_CATALOG = types.SimpleNamespace(
+    by_id={formula.id.bbid: formula for formula in _FORMULAS},
+    by_name={formula.tags.name: formula for formula in _FORMULAS},
+)
+_CATALOG.issue = _CATALOG.by_id.__getitem__
+_MANAGER = types.SimpleNamespace(local_catalog=_CATALOG)
+
+
+def get_unit(model, name):
+    """
+
+
+    get_unit() -> BusinessUnit
+
+    --``model`` is a Model built by make_model()
+    --``name`` is the name of a unit
+
+    Function returns the unit in ``model`` named ``name``.
+    """
+    for unit in model.bu_directory.values():
+        if unit.name == name:
+            return unit
+
+
+def get_values(model):
+    """
+
+
+    get_values() -> dict
+
+    --``model`` is a Model built by make_model()
+
+    Function returns a dictionary of (unit name, period end, line name) :
+    value for every income line in every unit and period of the default
+    time line.
+    """
+    result = dict()
+    for period in model.time_line.iter_ordered():
+        for unit in model.bu_directory.values():
+            fins = unit.get_financials(period)
+            for line in fins.income.get_full_ordered():
+                result[(unit.name, period.end, line.name)] = line.value
+
+    return result
+
+
+def make_model(rates=None, monthly_cost=5.0):
+    """
+
+
+    make_model() -> Model
+
+    --``rates`` is a dict of unit name : growth rate, defaults to UNIT_RATES
+    --``monthly_cost`` is the time line parameter read by every cost line
+
+    Function returns a model whose company consolidates one child per entry
+    in ``rates``. Each child has a ``revenue`` line that grows by the unit's
+    ``rate`` parameter from a driver ``base`` of 100, and a ``cost`` line
+    that reads the ``monthly cost`` time line parameter. Caller must connect
+    Drivers to the sample catalog first (see SampleModelCase).
+    """
+    if rates is None:
+        rates = UNIT_RATES
+
+    model = Model('sample')
+    model._ref_date = REF_DATE
+    model.time_line.build(REF_DATE)
+    model.time_line.parameters.add({'monthly cost': monthly_cost})
+
+    company = BusinessUnit('company')
+    model.set_company(company)
+    model.target = company
+
+    grow = _CATALOG.by_name['grow']
+    flat = _CATALOG.by_name['flat']
+    cost_driver = model.drivers.get_or_create('cost', dict(), flat)
+
+    for name, rate in sorted(rates.items()):
+        unit = BusinessUnit(name)
+        unit.life.events[unit.life.KEY_CONCEPTION] = _BIRTH
+        unit.life.events[unit.life.KEY_BIRTH] = _BIRTH
+        unit.parameters.add({'rate': rate})
+        company.add_component(unit)
+
+        driver = model.drivers.get_or_create(
+            'revenue ' + name, {'base': 100.0}, grow
+        )
+        revenue = LineItem('revenue')
+        revenue.assign_driver(driver.id.bbid)
+        unit.financials.income.append(revenue)
+
+        cost = LineItem('cost')
+        cost.assign_driver(cost_driver.id.bbid)
+        unit.financials.income.append(cost)
+
+    return model
+
+
+def read_cells(path):
+    """
+
+
+    read_cells() -> dict
+
+    --``path`` is the path to a saved workbook
+
+    Function returns a dict of (sheet title, coordinate) : (value, number
+    format, font, fill, border) for every cell in the workbook at ``path``
+    that has a value or a style. Styles are compared by repr.
+    """
+    result = dict()
+    book = xlio.load_workbook(path)
+    for sheet in book.worksheets:
+        for row in sheet.iter_rows():
+            for cell in row:
+                if cell.value is None and not cell.has_style:
+                    continue
+                result[sheet.title, cell.coordinate] = (
+                    cell.value, cell.number_format, repr(cell.font),
+                    repr(cell.fill), repr(cell.border),
+                )
+
+    return result
+
+
+# Classes
+class SampleModelCase(unittest.TestCase):
+    """
+
+    TestCase that points Driver at the sample formula catalog for the
+    duration of each test.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    n/a
+
+    FUNCTIONS:
+    setUp()               connects Driver to the sample catalog
+    tearDown()            restores the previous formula manager
+    ====================  ======================================================
+    """
+    def setUp(self):
+        self._old_manager = Driver._FM
+        Driver._set_formula_manager(_MANAGER)
+
+    def tearDown(self):
+        Driver._set_formula_manager(self._old_manager)
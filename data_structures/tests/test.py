@@ -17,6 +17,7 @@ With coverage (from one folder up):
 Test Case             Target
 ====================  =========================================================
 component_get_ordered Working of order_by parameter in components.get_ordered.
+metadata_sheet_parity Streamed BB Metadata tab matches a full workbook load.
 ====================  =========================================================
 """
 
@@ -24,13 +25,18 @@ component_get_ordered Working of order_by parameter in components.get_ordered.
 
 
 # Imports
+import datetime
+import io
 import unittest
 
+import openpyxl as xlio
+
 import simple_portal
 from data_structures.modelling import common_events
 from test_suite.scripts.retail_3_low_sga_five_new import answers as R3
 from test_suite.scripts.retail_4_no_new_stores import answers as R4
 from test_suite.scripts.retail_5_no_marketing import answers as R5
+from tools.xl_parsing.sheet_reader import read_metadata_sheet
 
 
 
@@ -72,5 +78,41 @@ class component_get_ordered(unittest.TestCase):
                 birth_date_old = birth_date_new
 
 
+class metadata_sheet_parity(unittest.TestCase):
+    def test(self):
+        book = xlio.Workbook()
+        sheet = book.active
+        sheet.title = 'BB Metadata'
+        sheet['A1'] = 'name'
+        sheet['B1'] = 1.5
+        sheet['C1'] = 7
+        sheet['D1'] = True
+        sheet['A3'] = datetime.datetime(2017, 1, 31)
+        sheet['C3'] = 2
+        # saved without a cached result, as openpyxl writes formulas
+        sheet['D3'] = '=C3*2'
+
+        stream = io.BytesIO()
+        book.save(stream)
+
+        stream.seek(0)
+        streamed = read_metadata_sheet(stream)
+
+        for data_only, view in ((True, streamed), (False, streamed.formulas)):
+            stream.seek(0)
+            full = xlio.load_workbook(stream, data_only=data_only)
+            loaded = full['BB Metadata']
+            self.assertEqual(streamed.max_row, loaded.max_row)
+            self.assertEqual(streamed.max_column, loaded.max_column)
+            for row in loaded.iter_rows():
+                for cell in row:
+                    mine = view.cell(cell.coordinate)
+                    self.assertEqual(mine.value, cell.value, cell.coordinate)
+                    self.assertEqual(mine.number_format, cell.number_format)
+
+        self.assertIsNone(streamed.cell('D3').value)
+        self.assertEqual(streamed.formulas.cell('D3').value, '=C3*2')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,106 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_consolidation_plan
+"""
+
+Unit tests for data_structures.modelling.consolidation_plan
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+plan_fits_lines       fits() compares lines in order, not just line counts.
+plan_matches_increment replay() gives the same values as increment().
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import unittest
+
+from data_structures.modelling.consolidation_plan import ConsolidationPlan
+from data_structures.modelling.line_item import LineItem
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, get_values
+from data_structures.tests.sample_model import make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class plan_fits_lines(SampleModelCase):
+    def test(self):
+        model = make_model()
+        model.time_line.extrapolate()
+
+        # period statements are restricted, so work on the unit templates
+        company = model.get_company()
+        north = get_unit(model, 'north')
+        top = company.financials.income
+        sub = north.financials.income
+
+        plan = ConsolidationPlan.compile(sub, top)
+        self.assertIsNotNone(plan)
+        self.assertTrue(plan.fits(sub, top))
+        self.assertTrue(plan.fits(sub.copy(), top.copy()))
+
+        # same number of lines, different line in the last position
+        changed = sub.copy()
+        changed.find_first('cost', remove=True)
+        changed.append(LineItem('other'))
+        self.assertEqual(
+            len(plan._flatten(changed)), len(plan._flatten(sub))
+        )
+        self.assertFalse(plan.fits(changed, top))
+
+        # same lines in a different order
+        reordered = sub.copy()
+        revenue = reordered.find_first('revenue', remove=True)
+        reordered.append(revenue)
+        self.assertFalse(plan.fits(reordered, top))
+
+        # another unit's lines share names but not bbids
+        south = get_unit(model, 'south')
+        self.assertFalse(plan.fits(south.financials.income, top))
+
+        # the model recompiles a plan that no longer fits
+        key = (company.id.bbid, north.id.bbid, 'income')
+        model.consolidation_plans[key] = plan
+        result = company._get_consolidation_plan(north, 'income', changed, top)
+        self.assertIsNot(result, plan)
+        self.assertIs(model.consolidation_plans[key], result)
+
+
+class plan_matches_increment(SampleModelCase):
+    def test(self):
+        model = make_model()
+        model.time_line.extrapolate()
+        expected = get_values(model)
+
+        period = model.time_line.current_period
+        company = model.get_company()
+        top = company.financials.income.copy()
+        top.reset()
+
+        for unit in company.components.get_ordered():
+            sub = unit.get_financials(period).income
+            plan = ConsolidationPlan.compile(sub, top)
+            self.assertIsNotNone(plan)
+            plan.replay(sub, top)
+
+        for line in top.get_full_ordered():
+            key = (company.name, period.end, line.name)
+            self.assertAlmostEqual(line.value, expected[key])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_copy_on_write
+"""
+
+Unit tests for data_structures.modelling.copy_on_write and the line
+attributes that period lines share with their unit templates
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+shared_until_write    Reads share template objects, writes copy them first.
+shared_view_stays     Views taken before a write keep working afterwards.
+tags_copied_eagerly   Period line tags never follow template tag changes.
+deep_copy_owns_all    Deep copies own their objects and stay in sync.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import copy
+import unittest
+
+from data_structures.guidance.guide import Guide
+from data_structures.serializers.chef.data_management import LineFormat
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class _LineCase(SampleModelCase):
+    def setUp(self):
+        SampleModelCase.setUp(self)
+        self.model = make_model()
+        unit = get_unit(self.model, 'north')
+        period = self.model.time_line.current_period
+
+        self.template = unit.financials.income.find_first('revenue')
+        self.line = unit.get_financials(period).income.find_first('revenue')
+
+
+class shared_until_write(_LineCase):
+    def test(self):
+        line = self.line
+        template = self.template
+        self.assertEqual(
+            set(line._shared), {'guide', 'usage', 'workspace', 'xl_format'}
+        )
+
+        # reads, including nested ones, leave everything shared
+        self.assertIsNone(line.xl_format.number_format)
+        self.assertEqual(line.xl_format.font_format, dict())
+        self.assertEqual(line.usage.to_database(), template.usage.to_database())
+        self.assertEqual(line.guide.quality.standard,
+                         template.guide.quality.standard)
+        self.assertNotIn('k', line.workspace)
+        self.assertIsInstance(line.xl_format, LineFormat)
+        self.assertIsInstance(line.guide, Guide)
+        self.assertEqual(len(line._shared), 4)
+
+        # template changes show through while shared
+        template.xl_format.number_format = '0.0'
+        self.assertEqual(line.xl_format.number_format, '0.0')
+
+        # nested writes copy the attribute first
+        line.xl_format.font_format['bold'] = True
+        self.assertNotIn('xl_format', line._shared)
+        self.assertEqual(template.xl_format.font_format, dict())
+        self.assertEqual(line.xl_format.font_format, {'bold': True})
+        self.assertEqual(line.xl_format.number_format, '0.0')
+
+        line.guide.quality.set_standard(3)
+        self.assertNotIn('guide', line._shared)
+        self.assertEqual(line.guide.quality.standard, 3)
+        self.assertNotEqual(template.guide.quality.standard, 3)
+
+        line.usage.behavior['x'] = 1
+        self.assertNotIn('x', template.usage.behavior)
+
+        line.workspace['k'] = 1
+        self.assertNotIn('k', template.workspace)
+        self.assertEqual(line._shared, dict())
+
+        # once copied, template changes no longer show through
+        template.xl_format.number_format = '0.00'
+        self.assertEqual(line.xl_format.number_format, '0.0')
+
+
+class shared_view_stays(_LineCase):
+    def test(self):
+        line = self.line
+        view = line.xl_format
+        self.assertIs(line.xl_format, view)
+
+        view.blank_row_after = True
+        self.assertTrue(line.xl_format.blank_row_after)
+        self.assertTrue(view.blank_row_after)
+        self.assertFalse(self.template.xl_format.blank_row_after)
+
+        # assigning replaces the shared object outright
+        fmt = LineFormat()
+        line.xl_format = fmt
+        self.assertIs(line.xl_format, fmt)
+
+        # a clean copy of a line that owns its format shares the new one
+        fresh = line.copy(clean=True)
+        self.assertIs(fresh._shared['xl_format'], fmt)
+
+
+class tags_copied_eagerly(_LineCase):
+    def test(self):
+        line = self.line
+        template = self.template
+        self.assertIsNot(line.tags, template.tags)
+        self.assertNotIn('tags', line._shared)
+
+        title = line.title
+        template.set_title('changed')
+        self.assertEqual(line.title, title)
+
+        template.tags.add('template only')
+        self.assertNotIn('template only', line.tags.all)
+
+        line.tags.add('line only')
+        self.assertNotIn('line only', template.tags.all)
+
+
+class deep_copy_owns_all(_LineCase):
+    def test(self):
+        line = self.line
+        template = self.template
+        view = line.xl_format
+
+        result = copy.deepcopy(line)
+        self.assertEqual(result._shared, dict())
+        self.assertEqual(result._views, dict())
+        self.assertIsInstance(result.__dict__['_xl_format'], LineFormat)
+        self.assertIsNot(result.xl_format, template.xl_format)
+        self.assertEqual(result.name, line.name)
+
+        # the original still shares with the template
+        self.assertIn('xl_format', line._shared)
+        self.assertIs(line.xl_format, view)
+
+        result.xl_format.number_format = 'copy'
+        result.workspace['k'] = 1
+        self.assertIsNone(line.xl_format.number_format)
+        self.assertIsNone(template.xl_format.number_format)
+        self.assertNotIn('k', line.workspace)
+
+        line.xl_format.number_format = 'line'
+        self.assertEqual(result.xl_format.number_format, 'copy')
+        self.assertIsNone(template.xl_format.number_format)
+
+
+if __name__ == '__main__':
+    unittest.main()
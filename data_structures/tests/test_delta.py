@@ -0,0 +1,105 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_delta
+"""
+
+Unit tests for data_structures.modelling.delta and Model.to_delta()
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+delta_round_trip      Base plus delta equals a fresh full serialization.
+delta_period_tags     Tag changes keep a period out of the clean set.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import unittest
+
+from data_structures.modelling.delta import DIGESTS_KEY, VERSION_KEY
+from data_structures.modelling.model import Model
+from data_structures.system.tags import Tags
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class _DeltaCase(SampleModelCase):
+    def setUp(self):
+        SampleModelCase.setUp(self)
+        self.model = make_model()
+        self.model.time_line.extrapolate()
+        for unit in self.model.bu_directory.values():
+            unit.interview.set_path()
+
+    def get_clean(self):
+        model = self.model
+        return model.delta_tracker.get_clean(model._get_delta_periods())
+
+
+class delta_round_trip(_DeltaCase):
+    def test(self):
+        model = self.model
+        base = model.to_database(track=True)
+        period = model.time_line.current_period
+        self.assertEqual(self.get_clean(), set(model._get_delta_periods()))
+
+        period.parameters['delta'] = 1.0
+        get_unit(model, 'south').parameters['rate'] = 2.0
+        delta = model.to_delta()
+        self.assertEqual(delta['base'], base[VERSION_KEY])
+        self.assertTrue(delta['changed'])
+
+        result = Model.apply_delta(base, delta)
+        expected = model.to_database()
+        for flat in (result, expected):
+            flat.pop(VERSION_KEY, None)
+            flat.pop(DIGESTS_KEY, None)
+        self.assertEqual(result, expected)
+
+        # nothing changed since, so nothing goes out
+        delta = model.to_delta()
+        self.assertEqual(delta['changed'], dict())
+        self.assertEqual(delta['removed'], list())
+
+
+class delta_period_tags(_DeltaCase):
+    def test(self):
+        model = self.model
+        model.to_database(track=True)
+        periods = model._get_delta_periods()
+        key = next(k for k, p in periods.items()
+                   if p is model.time_line.current_period)
+        period = periods[key]
+        self.assertIn(key, self.get_clean())
+
+        period.tags.add('changed')
+        self.assertNotIn(key, self.get_clean())
+        model.to_delta()
+        self.assertIn(key, self.get_clean())
+
+        period.set_title('renamed')
+        self.assertNotIn(key, self.get_clean())
+        model.to_delta()
+
+        # a replaced tags object counts as a change too
+        period.tags = Tags()
+        self.assertNotIn(key, self.get_clean())
+        self.assertEqual(self.get_clean(), set(periods) - {key})
+
+
+if __name__ == '__main__':
+    unittest.main()
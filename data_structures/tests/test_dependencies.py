@@ -0,0 +1,150 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_dependencies
+"""
+
+Unit tests for data_structures.modelling.dependencies
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+tracking_off          Default fill_out() records nothing; recalc is full.
+tracking_records      Enabled tracker records drivers, params, consumers.
+partial_matches_full  recalculate_dirty() matches a fresh full extrapolation.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import unittest
+
+from data_structures.modelling.dependencies import TrackedParameters
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, get_values
+from data_structures.tests.sample_model import make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class tracking_off(SampleModelCase):
+    def test(self):
+        model = make_model()
+        tracker = model.dependencies
+        self.assertFalse(tracker.enabled)
+
+        params = {'rate': 1.0}
+        self.assertIs(tracker.watch(params), params)
+
+        model.time_line.extrapolate()
+        self.assertTrue(tracker.stale)
+        self.assertEqual(tracker.by_driver, dict())
+        self.assertEqual(tracker.by_parameter, dict())
+        self.assertEqual(tracker.consumers, dict())
+
+        tracker.mark_unit(model.get_company().id.bbid)
+        self.assertEqual(tracker.dirty, dict())
+
+        # with tracking off, a partial recalculation is a full one
+        north = get_unit(model, 'north')
+        north.parameters['rate'] = 2.0
+        model.get_company().recalculate_dirty()
+
+        fresh = make_model(rates={'north': 2.0, 'south': 1.2, 'east': 0.9})
+        fresh.time_line.extrapolate()
+        self.assertEqual(get_values(model), get_values(fresh))
+
+
+class tracking_records(SampleModelCase):
+    def test(self):
+        model = make_model()
+        tracker = model.dependencies
+        tracker.enabled = True
+        self.assertTrue(tracker.stale)
+        self.assertIsInstance(tracker.watch(dict()), TrackedParameters)
+
+        model.time_line.extrapolate()
+        self.assertFalse(tracker.stale)
+
+        company = model.get_company()
+        units = {
+            unit.name: unit.id.bbid for unit in company.components.get_all()
+        }
+        self.assertEqual(
+            tracker.by_parameter['rate'], set(units.values())
+        )
+        self.assertEqual(
+            tracker.by_parameter['monthly cost'], set(units.values())
+        )
+        cost = model.drivers.get_by_name('cost')
+        self.assertEqual(
+            tracker.by_driver[cost.id.bbid], set(units.values())
+        )
+        for bbid in units.values():
+            self.assertEqual(tracker.consumers[bbid], {company.id.bbid})
+
+        tracker.mark_parameter('rate', unit_id=units['north'])
+        start = model.time_line.current_period.end
+        scope = tracker.get_scope(model, start)
+        self.assertEqual(scope, {units['north'], company.id.bbid})
+
+        # switching tracking off forgets what was recorded
+        tracker.enabled = False
+        self.assertTrue(tracker.stale)
+        self.assertEqual(tracker.by_parameter, dict())
+        self.assertEqual(tracker.dirty, dict())
+
+
+class partial_matches_full(SampleModelCase):
+    def test(self):
+        model = make_model()
+        model.dependencies.enabled = True
+        model.time_line.extrapolate()
+
+        company = model.get_company()
+        north = get_unit(model, 'north')
+        before = get_values(model)
+
+        # unit parameter, from the first period on
+        north.parameters['rate'] = 1.5
+        model.dependencies.mark_parameter('rate', unit_id=north.id.bbid)
+        self.assertFalse(model.dependencies.stale)
+        company.recalculate_dirty()
+
+        fresh = make_model(rates={'north': 1.5, 'south': 1.2, 'east': 0.9})
+        fresh.time_line.extrapolate()
+        after = get_values(model)
+        self.assertEqual(after, get_values(fresh))
+        self.assertNotEqual(after, before)
+
+        # untouched units kept their values
+        for key, value in before.items():
+            if key[0] in ('south', 'east'):
+                self.assertEqual(after[key], value)
+
+        # time line parameter, read by every unit
+        model.time_line.parameters['monthly cost'] = 7.0
+        model.dependencies.mark_parameter('monthly cost')
+        company.recalculate_dirty()
+
+        fresh = make_model(
+            rates={'north': 1.5, 'south': 1.2, 'east': 0.9},
+            monthly_cost=7.0,
+        )
+        fresh.time_line.extrapolate()
+        self.assertEqual(get_values(model), get_values(fresh))
+        self.assertEqual(model.dependencies.dirty, dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,321 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_formula_evaluator
+"""
+
+Unit tests for data_structures.serializers.chef.formula_evaluator and the
+calculate_formulas() tool built on it
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+evaluator_operators   Arithmetic, precedence, text and comparison operators.
+evaluator_functions   Supported functions, ranges and cross-sheet links.
+evaluator_errors      Error values propagate; unsupported cells are left out.
+evaluator_blanks      Blank results and circular references compute to 0.
+calculate_choice      calculate_formulas() uses Excel unless missing or asked.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+import openpyxl as xlio
+
+from data_structures.serializers.chef import _chef_tools
+from data_structures.serializers.chef.formula_evaluator import ErrorValue
+from data_structures.serializers.chef.formula_evaluator import (
+    FormulaEvaluator
+)
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+def _evaluate(cells, other=None):
+    """
+
+
+    _evaluate() -> dict
+
+    --``cells`` is a dict of coordinate : value for the first sheet
+    --``other`` is a dict of coordinate : value for a sheet named 'Other Book'
+
+    Function builds a workbook and returns coordinate : computed value for
+    its formula cells, with cells on 'Other Book' keyed as 'Other Book!A1'.
+    """
+    book = xlio.Workbook()
+    sheet = book.active
+    for coordinate, value in cells.items():
+        sheet[coordinate] = value
+
+    if other is not None:
+        extra = book.create_sheet('Other Book')
+        for coordinate, value in other.items():
+            extra[coordinate] = value
+
+    result = dict()
+    for (title, row, col), value in FormulaEvaluator(book).evaluate().items():
+        coordinate = xlio.utils.get_column_letter(col) + str(row)
+        if title != sheet.title:
+            coordinate = title + '!' + coordinate
+        result[coordinate] = value
+
+    return result
+
+
+def _codes(values):
+    return {
+        k: v.code for k, v in values.items() if isinstance(v, ErrorValue)
+    }
+
+
+class evaluator_operators(unittest.TestCase):
+    def test(self):
+        values = _evaluate({
+            'A1': 6,
+            'A2': 4,
+            'B1': '=A1+A2*2',
+            'B2': '=(A1+A2)*2',
+            'B3': '=A1/A2-A1',
+            'B4': '=-2^2',
+            'B5': '=2^3^2',
+            'B6': '=50%*A1',
+            'B7': '="a"&A1&TRUE',
+            'B8': '=A1>A2',
+            'B9': '="abc"="ABC"',
+            'B10': '=1<"a"',
+            'B11': '="b"<TRUE',
+            'B12': '=A1<>6',
+            'B13': '=A1>=6',
+            'B14': '="3"+1',
+            'B15': '=TRUE+1',
+        })
+
+        self.assertEqual(values['B1'], 14)
+        self.assertEqual(values['B2'], 20)
+        self.assertEqual(values['B3'], -4.5)
+        self.assertEqual(values['B4'], 4)
+        # Excel works left to right: (2^3)^2
+        self.assertEqual(values['B5'], 64)
+        self.assertEqual(values['B6'], 3)
+        self.assertEqual(values['B7'], 'a6TRUE')
+        self.assertIs(values['B8'], True)
+        self.assertIs(values['B9'], True)
+        self.assertIs(values['B10'], True)
+        self.assertIs(values['B11'], True)
+        self.assertIs(values['B12'], False)
+        self.assertIs(values['B13'], True)
+        self.assertEqual(values['B14'], 4)
+        self.assertEqual(values['B15'], 2)
+
+
+class evaluator_functions(unittest.TestCase):
+    def test(self):
+        values = _evaluate(
+            {
+                'A1': 1,
+                'A2': 'text',
+                'A3': 3,
+                'A4': None,
+                'B1': '=SUM(A1:A4)',
+                'B2': '=SUM(A1,A3,"2")',
+                'B3': '=AVERAGE(A1:A4)',
+                'B4': '=MAX(A1:A4,-1)',
+                'B5': '=MIN(A1:A3)',
+                'B6': '=ROUND(2.5,0)+ROUND(-2.5,0)+ROUND(1.005,2)',
+                'B7': '=ROUND(1234,-2)',
+                'B8': '=ABS(-A3)',
+                'B9': '=IF(A1>2,"big","small")',
+                'B10': '=IF(A1,A3)',
+                'B11': '=IF(FALSE,1/0,7)',
+                'B12': '=IFERROR(1/0,"caught")',
+                'B13': '=AND(A1,TRUE)+OR(FALSE,A4)*10+NOT(A1)*100',
+                'B14': "=SUM('Other Book'!A1:'Other Book'!A3)",
+                'B15': "='Other Book'!A2*2",
+                'B16': '=HLOOKUP(2,C1:E2,2)',
+                'B17': '=HLOOKUP(2.5,C1:E2,2,TRUE)',
+                'B18': '=SUM(B1,B2)',
+                'C1': 1,
+                'D1': 2,
+                'E1': 3,
+                'C2': 'one',
+                'D2': 'two',
+                'E2': 'three',
+            },
+            other={'A1': 10, 'A2': 20, 'A3': 30, 'B1': '=SUM(A1:A3)'},
+        )
+
+        self.assertEqual(values['B1'], 4)
+        self.assertEqual(values['B2'], 6)
+        self.assertEqual(values['B3'], 2)
+        self.assertEqual(values['B4'], 3)
+        self.assertEqual(values['B5'], 1)
+        # halves round away from zero, on the decimal value
+        self.assertEqual(values['B6'], 1.01)
+        self.assertEqual(values['B7'], 1200)
+        self.assertEqual(values['B8'], 3)
+        self.assertEqual(values['B9'], 'small')
+        self.assertEqual(values['B10'], 3)
+        self.assertEqual(values['B11'], 7)
+        self.assertEqual(values['B12'], 'caught')
+        self.assertEqual(values['B13'], 1)
+        self.assertEqual(values['B14'], 60)
+        self.assertEqual(values['B15'], 40)
+        self.assertEqual(values['B16'], 'two')
+        self.assertEqual(values['B17'], 'two')
+        self.assertEqual(values['B18'], 10)
+        self.assertEqual(values['Other Book!B1'], 60)
+
+
+class evaluator_errors(unittest.TestCase):
+    def test(self):
+        values = _evaluate({
+            'A1': 0,
+            'A2': '#N/A',
+            'A3': 'text',
+            'B1': '=1/A1',
+            'B2': '=B1+1',
+            'B3': '=A2',
+            'B4': '=SUM(A1:A2)',
+            'B5': '=A3*2',
+            'B6': "='No Sheet'!A1",
+            'B7': '=AVERAGE(A3)',
+            'B8': '=HLOOKUP(9,A1:A1,1,FALSE)',
+            'B9': '=10^400',
+            'B10': '=IFERROR(B2,0)',
+            'C1': '=VLOOKUP(1,A1:A3,1)',
+            'C2': '=C1+1',
+            'C3': '=SUM(1,2',
+            'C4': '=Named',
+        })
+
+        self.assertEqual(_codes(values), {
+            'B1': '#DIV/0!',
+            'B2': '#DIV/0!',
+            'B3': '#N/A',
+            'B4': '#N/A',
+            'B5': '#VALUE!',
+            'B6': '#REF!',
+            'B7': '#VALUE!',
+            'B8': '#N/A',
+            'B9': '#NUM!',
+        })
+        self.assertEqual(values['B10'], 0)
+
+        # functions, references and syntax outside the subset leave the cell
+        # and its dependents without a value
+        for coordinate in ('C1', 'C2', 'C3', 'C4'):
+            self.assertNotIn(coordinate, values)
+
+
+class evaluator_blanks(unittest.TestCase):
+    def test(self):
+        values = _evaluate({
+            'A1': '=A2',
+            'A3': '=IF(TRUE,)',
+            'A4': '=A2&""',
+            'A5': '=A2=0',
+            'B1': '=B2+1',
+            'B2': '=B1*2',
+            'B3': '=B2+5',
+            'B4': '=B4',
+            'C1': '=C2',
+            'C2': '=C3',
+            'C3': '=C1+C4',
+            'C4': 1,
+        })
+
+        # an empty reference computes to 0, not to a blank
+        self.assertEqual(values['A1'], 0)
+        self.assertIsNot(values['A1'], None)
+        self.assertEqual(values['A3'], 0)
+        self.assertEqual(values['A4'], '')
+        self.assertIs(values['A5'], True)
+
+        # every cell on a cycle is 0; cells that read one see 0
+        for coordinate in ('B1', 'B2', 'B4', 'C1', 'C2', 'C3'):
+            self.assertEqual(values[coordinate], 0, coordinate)
+        self.assertEqual(values['B3'], 5)
+
+
+class calculate_choice(unittest.TestCase):
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.xlsx')
+        os.close(handle)
+        self._make()
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def _make(self):
+        book = xlio.Workbook()
+        sheet = book.active
+        sheet['A1'] = 2
+        sheet['A2'] = '=A1*3'
+        sheet['A3'] = '=A4'
+        book.save(self.filename)
+
+    def _cached(self):
+        book = xlio.load_workbook(self.filename, data_only=True)
+        sheet = book.active
+        return sheet['A2'].value, sheet['A3'].value
+
+    def test(self):
+        vbs = os.path.join(
+            _chef_tools._VBS_PATH, _chef_tools._OPEN_SAVE_CLOSE_VBS_FILE
+        )
+        self.assertTrue(os.path.isfile(vbs))
+
+        with mock.patch.object(_chef_tools, '_write_run_temp_vbs_file') as run:
+            # Excel installed: Excel calculates
+            with mock.patch.object(
+                _chef_tools, '_excel_installed', return_value=True
+            ):
+                _chef_tools.calculate_formulas(self.filename)
+                run.assert_called_once_with(
+                    self.filename, _chef_tools._OPEN_SAVE_CLOSE_VBS_FILE
+                )
+                self.assertEqual(self._cached(), (None, None))
+
+                # unless the caller asks for the evaluator
+                _chef_tools.calculate_formulas(self.filename, evaluate=True)
+                self.assertEqual(run.call_count, 1)
+                self.assertEqual(self._cached(), (6, 0))
+
+            # no Excel: the evaluator steps in
+            self._make()
+            self.assertEqual(self._cached(), (None, None))
+            with mock.patch.object(
+                _chef_tools, '_excel_installed', return_value=False
+            ):
+                _chef_tools.calculate_formulas(self.filename)
+                self.assertEqual(run.call_count, 1)
+
+        self.assertEqual(self._cached(), (6, 0))
+
+        # formulas stay in place for Excel to recalculate
+        sheet = xlio.load_workbook(self.filename).active
+        self.assertEqual(sheet['A2'].value, '=A1*3')
+
+        if os.name != 'nt':
+            self.assertFalse(_chef_tools._excel_installed())
+
+
+if __name__ == '__main__':
+    unittest.main()
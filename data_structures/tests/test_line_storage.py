@@ -0,0 +1,195 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_line_storage
+"""
+
+Unit tests for data_structures.modelling.line_storage
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+columnar_round_trip   Values keep their type through set_value()/get_value().
+columnar_growth       Rows and columns added late start out absent.
+columnar_hardcoded    Hardcoded flags survive clear_row() and copy().
+columnar_time_line    TimeLine.use_columnar_storage() keeps period records.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import decimal
+import types
+import unittest
+import uuid
+
+from data_structures.modelling.line_storage import ColumnarLineStorage
+from data_structures.modelling.model import Model
+
+
+
+
+# Globals
+JAN = datetime.date(2017, 1, 31)
+FEB = datetime.date(2017, 2, 28)
+MAR = datetime.date(2017, 3, 31)
+
+# Tests
+class columnar_round_trip(unittest.TestCase):
+    def test(self):
+        store = ColumnarLineStorage()
+        values = [
+            1.5, 0.0, -3, 2 ** 53, 2 ** 60, True, False, None, 'text',
+            decimal.Decimal('1.10'),
+        ]
+        for i, value in enumerate(values):
+            store.set_value(JAN, 'line%s' % i, value)
+
+        for i, value in enumerate(values):
+            result = store.get_value(JAN, 'line%s' % i)
+            self.assertEqual(result, value)
+            self.assertIs(type(result), type(value))
+            self.assertTrue(store.has_record(JAN, 'line%s' % i))
+
+        # overwriting an object with a number drops the side table entry
+        store.set_value(JAN, 'line8', 4.0)
+        self.assertEqual(store.get_value(JAN, 'line8'), 4.0)
+        self.assertNotIn((store.columns['line8'], 0), store._objects)
+
+        rows = {row['bbid']: row for row in store.to_rows(JAN)}
+        self.assertEqual(len(rows), len(values))
+        self.assertEqual(rows['line2']['value'], -3)
+        self.assertEqual(rows['line2']['value_type'], 'int')
+
+        other = ColumnarLineStorage()
+        other.load_rows(JAN, store.to_rows(JAN))
+        self.assertEqual(other.to_rows(JAN), store.to_rows(JAN))
+
+
+class columnar_growth(unittest.TestCase):
+    def test(self):
+        store = ColumnarLineStorage()
+        store.set_value(JAN, 'a', 1.0)
+        store.set_value(FEB, 'a', 2.0)
+
+        # a column added after two rows exist is absent in both
+        store.set_value(MAR, 'b', 3.0)
+        self.assertEqual(store.rows, {JAN: 0, FEB: 1, MAR: 2})
+        self.assertFalse(store.has_record(JAN, 'b'))
+        self.assertFalse(store.has_record(FEB, 'b'))
+        self.assertIsNone(store.get_value(JAN, 'b'))
+        self.assertFalse(store.has_record(MAR, 'a'))
+
+        for col in range(len(store.columns)):
+            self.assertEqual(len(store._values[col]), 3)
+            self.assertEqual(len(store._types[col]), 3)
+            self.assertEqual(len(store._hardcoded[col]), 3)
+
+        # add_row() is a no-op for a known period
+        self.assertEqual(store.add_row(FEB), 1)
+        self.assertEqual(len(store.rows), 3)
+
+        # unknown rows and columns read as empty
+        self.assertIsNone(store.get_value(datetime.date(2016, 1, 1), 'a'))
+        self.assertIsNone(store.get_value(JAN, 'missing'))
+        self.assertEqual(store.get_xl(JAN, 'missing'), dict())
+        self.assertEqual(store.to_rows(datetime.date(2016, 1, 1)), list())
+
+
+class columnar_hardcoded(unittest.TestCase):
+    def test(self):
+        store = ColumnarLineStorage()
+        store.set_value(JAN, 'hc', 10.0)
+        store.set_hc(JAN, 'hc', True)
+        store.set_xl(JAN, 'hc', {'format': 'hc'})
+        store.set_value(JAN, 'calc', 20.0)
+        store.set_xl(JAN, 'calc', {'format': 'calc'})
+
+        copied = store.copy()
+
+        store.clear_row(JAN)
+        self.assertTrue(store.get_hc(JAN, 'hc'))
+        self.assertEqual(store.get_value(JAN, 'hc'), 10.0)
+        self.assertEqual(store.get_xl(JAN, 'hc'), {'format': 'hc'})
+        self.assertFalse(store.has_record(JAN, 'calc'))
+        self.assertEqual(store.get_xl(JAN, 'calc'), dict())
+
+        # the copy keeps its own columns
+        self.assertTrue(copied.get_hc(JAN, 'hc'))
+        self.assertEqual(copied.get_value(JAN, 'calc'), 20.0)
+        self.assertEqual(copied.get_xl(JAN, 'calc'), {'format': 'calc'})
+        copied.set_hc(JAN, 'hc', False)
+        self.assertTrue(store.get_hc(JAN, 'hc'))
+
+        # clearing named lines only touches those lines
+        copied.clear_row(JAN, bbid_hexes=['hc', 'unknown'])
+        self.assertFalse(copied.has_record(JAN, 'hc'))
+        self.assertTrue(copied.has_record(JAN, 'calc'))
+
+
+class columnar_time_line(unittest.TestCase):
+    def test(self):
+        model = Model('columnar')
+        model._ref_date = datetime.date(2017, 1, 15)
+        time_line = model.time_line
+        time_line.build(model.ref_date)
+
+        periods = list(time_line.iter_ordered())[:3]
+        lines = [_make_line(1.0), _make_line(7), _make_line('x', True)]
+        for i, period in enumerate(periods):
+            for line in lines:
+                period.update_line_value(line)
+                period.update_line_hardcoded(line)
+            lines[0].value += i
+
+        expected = [_get_records(period, lines) for period in periods]
+
+        store = time_line.use_columnar_storage()
+        self.assertIs(time_line.use_columnar_storage(), store)
+        self.assertEqual(len(store.columns), len(lines))
+        for period, records in zip(periods, expected):
+            self.assertIs(period.line_storage, store)
+            self.assertEqual(_get_records(period, lines), records)
+
+        # copies do not share the store
+        copied = time_line.copy()
+        copied_period = copied[periods[0].end]
+        self.assertIsNot(copied.line_storage, store)
+        self.assertIs(copied_period.line_storage, copied.line_storage)
+        lines[0].value = -1.0
+        copied_period.update_line_value(lines[0])
+        bbid_hex = lines[0].id.bbid.hex
+        self.assertEqual(copied_period.get_line_value(bbid_hex), -1.0)
+        self.assertEqual(_get_records(periods[0], lines), expected[0])
+
+        # moving back to per-period dicts keeps the records
+        for period, records in zip(periods, expected):
+            period.set_line_storage(None)
+            self.assertIsNone(period.line_storage)
+            self.assertEqual(_get_records(period, lines), records)
+
+
+def _make_line(value, hardcoded=False):
+    bbid = types.SimpleNamespace(bbid=uuid.uuid4())
+    return types.SimpleNamespace(id=bbid, value=value, hardcoded=hardcoded)
+
+
+def _get_records(period, lines):
+    result = list()
+    for line in lines:
+        bbid_hex = line.id.bbid.hex
+        value = period.get_line_value(bbid_hex)
+        result.append((value, type(value), period.get_line_hc(bbid_hex)))
+
+    return result
+
+
+if __name__ == '__main__':
+    unittest.main()
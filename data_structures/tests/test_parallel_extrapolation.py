@@ -0,0 +1,100 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_parallel_extrapolation
+"""
+
+Unit tests for data_structures.modelling.parallel_extrapolation
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+pool_matches_serial   extrapolate(workers=n) matches a serial extrapolation.
+pool_fallback         Company without components extrapolates serially.
+subtree_plan          plan_subtrees() splits the largest subtree first.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import multiprocessing
+import unittest
+
+from data_structures.modelling import parallel_extrapolation
+from data_structures.modelling.business_unit import BusinessUnit
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, get_values
+from data_structures.tests.sample_model import make_model
+
+
+
+
+# Globals
+CAN_FORK = 'fork' in multiprocessing.get_all_start_methods()
+
+# Tests
+@unittest.skipUnless(CAN_FORK, 'platform cannot fork worker processes')
+class pool_matches_serial(SampleModelCase):
+    def test(self):
+        serial = make_model()
+        serial.time_line.extrapolate()
+        expected = get_values(serial)
+
+        for workers in (2, 3, 8):
+            model = make_model()
+            model.dependencies.enabled = True
+            model.time_line.extrapolate(workers=workers)
+
+            self.assertEqual(get_values(model), expected)
+            self.assertTrue(model.time_line.has_been_extrapolated)
+            # dependencies recorded in workers are lost
+            self.assertTrue(model.dependencies.stale)
+
+
+class pool_fallback(SampleModelCase):
+    def test(self):
+        model = make_model(rates=dict())
+        company = model.get_company()
+        seed = model.time_line.current_period
+
+        result = parallel_extrapolation.extrapolate_in_pool(
+            model.time_line, seed, company, 4
+        )
+        self.assertEqual(result, (None, None))
+
+        model.time_line.extrapolate(workers=4)
+        self.assertTrue(model.time_line.has_been_extrapolated)
+
+
+class subtree_plan(SampleModelCase):
+    def test(self):
+        model = make_model()
+        company = model.get_company()
+        north = get_unit(model, 'north')
+        for name in ('north 1', 'north 2', 'north 3'):
+            north.add_component(BusinessUnit(name))
+
+        roots, top = parallel_extrapolation.plan_subtrees(company, 2)
+        self.assertEqual(len(roots), 3)
+        self.assertEqual(top, {company.id.bbid})
+
+        roots, top = parallel_extrapolation.plan_subtrees(company, 4)
+        names = {model.bu_directory[bbid].name for bbid in roots}
+        self.assertEqual(
+            names, {'south', 'east', 'north 1', 'north 2', 'north 3'}
+        )
+        self.assertEqual(top, {company.id.bbid, north.id.bbid})
+
+        # leaves cannot split any further
+        roots, top = parallel_extrapolation.plan_subtrees(company, 100)
+        self.assertEqual(len(roots), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
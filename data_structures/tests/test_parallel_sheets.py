@@ -0,0 +1,102 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_parallel_sheets
+"""
+
+Unit tests for data_structures.serializers.chef.parallel_sheets
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+pool_sheets_match     chop_model(workers=n) saves the same cells and styles.
+pool_sheets_batches   plan_batches() spreads cells evenly over batches.
+pool_sheets_nothing   write_in_pool() leaves an empty sheet list alone.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import multiprocessing
+import os
+import tempfile
+import types
+import unittest
+
+from data_structures.serializers.chef import parallel_sheets
+from data_structures.serializers.chef.bb_workbook import BB_Workbook
+from data_structures.serializers.chef.bb_workbook import WrittenWorksheet
+from data_structures.serializers.chef.model_chef import ModelChef
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import make_model, read_cells
+
+
+
+
+# Globals
+CAN_FORK = 'fork' in multiprocessing.get_all_start_methods()
+
+# Tests
+@unittest.skipUnless(CAN_FORK, 'platform cannot fork worker processes')
+class pool_sheets_match(SampleModelCase):
+    def test(self):
+        # chopping leaves xl data on the model, so export fresh models
+        def chop(**kwargs):
+            model = make_model()
+            model.time_line.extrapolate()
+            return model, ModelChef().chop_model(model, **kwargs)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'serial.xlsx')
+            chop()[1].save(path)
+            expected = read_cells(path)
+
+            runs = [(2, False), (3, False), (8, True)]
+            for workers, write_only in runs:
+                model, book = chop(workers=workers, write_only=write_only)
+                written = [sheet for sheet in book.worksheets
+                           if isinstance(sheet, WrittenWorksheet)]
+                self.assertEqual(len(written), len(model.bu_directory))
+
+                path = os.path.join(folder, '%s.xlsx' % workers)
+                book.save(path)
+                self.assertEqual(read_cells(path), expected)
+
+
+class pool_sheets_batches(unittest.TestCase):
+    def test(self):
+        sizes = [50, 10, 40, 30, 20, 5]
+        sheets = [types.SimpleNamespace(_cells=dict.fromkeys(range(size)))
+                  for size in sizes]
+
+        batches = parallel_sheets.plan_batches(sheets, 3)
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(
+            sorted(id(s) for batch in batches for s in batch),
+            sorted(id(s) for s in sheets),
+        )
+        loads = sorted(
+            sum(len(s._cells) for s in batch) for batch in batches
+        )
+        self.assertEqual(loads, [50, 50, 55])
+
+        # never more batches than sheets
+        self.assertEqual(len(parallel_sheets.plan_batches(sheets[:2], 8)), 2)
+        self.assertEqual(parallel_sheets.plan_batches(list(), 4), list())
+
+
+class pool_sheets_nothing(unittest.TestCase):
+    def test(self):
+        book = BB_Workbook()
+        self.assertFalse(parallel_sheets.write_in_pool(book, list(), 4))
+        self.assertEqual(parallel_sheets._worker_state, dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
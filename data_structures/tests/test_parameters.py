@@ -0,0 +1,142 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_parameters
+"""
+
+Unit tests for parameter versions and the parameter caches built on them
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+parameters_version    Every way of changing Parameters draws a new version.
+param_cache_nested    Cached driver params see nested in-place changes.
+param_cache_isolated  Changing returned params leaves the caches intact.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import copy
+import unittest
+
+from data_structures.modelling.parameters import Parameters
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class parameters_version(unittest.TestCase):
+    def test(self):
+        params = Parameters()
+        seen = {params.version}
+
+        def check():
+            self.assertNotIn(params.version, seen)
+            seen.add(params.version)
+
+        params['a'] = 1
+        check()
+        params.add({'b': 2})
+        check()
+        params.update(c=3)
+        check()
+        params |= {'d': 4}
+        check()
+        self.assertEqual(params['d'], 4)
+        params.setdefault('e', 5)
+        check()
+        params.pop('e')
+        check()
+        del params['d']
+        check()
+        params.popitem()
+        check()
+        params.clear()
+        check()
+
+        # a copy is a separate container with its own version
+        params['a'] = [1]
+        result = params.copy()
+        self.assertNotEqual(result.version, params.version)
+        self.assertIsInstance(result, Parameters)
+        self.assertEqual(copy.deepcopy(params), params)
+
+        # nested changes do not reach the version
+        version = params.version
+        params['a'].append(2)
+        self.assertEqual(params.version, version)
+
+
+class param_cache_nested(SampleModelCase):
+    def test(self):
+        model = make_model()
+        unit = get_unit(model, 'north')
+        period = model.time_line.current_period
+        driver = model.drivers.get_by_name('revenue north')
+
+        schedule = Parameters()
+        schedule['2017'] = 1.0
+        unit.parameters['schedule'] = schedule
+        unit.parameters['steps'] = [1, 2]
+
+        first = driver._build_params(unit, period)
+        cached = driver._param_cache[unit.id.bbid]
+
+        # nested changes keep every version as it is, so the caches hit
+        schedule['2017'] = 2.0
+        unit.parameters['steps'].append(3)
+        second = driver._build_params(unit, period)
+        self.assertIs(driver._param_cache[unit.id.bbid], cached)
+        self.assertIsNot(second, first)
+
+        # and a hit returns what a fresh merge would
+        fresh = dict(unit.get_parameters(period))
+        fresh.update(driver.parameters)
+        fresh['period'] = period
+        self.assertEqual(second, fresh)
+        self.assertEqual(second['schedule']['2017'], 2.0)
+        self.assertEqual(second['steps'], [1, 2, 3])
+
+        # top level changes draw a new version and rebuild
+        unit.parameters['rate'] = 3.0
+        third = driver._build_params(unit, period)
+        self.assertIsNot(driver._param_cache[unit.id.bbid], cached)
+        self.assertEqual(third['rate'], 3.0)
+
+
+class param_cache_isolated(SampleModelCase):
+    def test(self):
+        model = make_model()
+        unit = get_unit(model, 'north')
+        period = model.time_line.current_period
+        driver = model.drivers.get_by_name('revenue north')
+
+        first = driver._build_params(unit, period)
+        first['rate'] = -1.0
+        first['extra'] = True
+
+        second = driver._build_params(unit, period)
+        self.assertEqual(second['rate'], unit.parameters['rate'])
+        self.assertNotIn('extra', second)
+
+        merged = unit.get_parameters(period)
+        merged['rate'] = -1.0
+        self.assertEqual(
+            unit.get_parameters(period)['rate'], unit.parameters['rate']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
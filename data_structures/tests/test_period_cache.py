@@ -0,0 +1,170 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_period_cache
+"""
+
+Unit tests for data_structures.modelling.period_cache
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+cache_budget          Only ``budget`` future periods keep rich financials.
+cache_spill           Spilled periods read back the same values.
+cache_spill_no_pread  Spill file reads work without os.pread (Windows).
+cache_never_evicts    Current and past periods, and budget None, stay put.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import os
+import tempfile
+import types
+import unittest
+
+from unittest import mock
+
+from data_structures.modelling import period_cache
+from data_structures.modelling.period_cache import PeriodCache
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_values, make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class cache_budget(SampleModelCase):
+    def test(self):
+        unbounded = make_model()
+        unbounded.time_line.extrapolate()
+        expected = get_values(unbounded)
+
+        model = make_model()
+        model.period_cache = PeriodCache(budget=2)
+        model.time_line.extrapolate()
+
+        current = model.time_line.current_period
+        future = [
+            period for period in model.time_line.iter_ordered()
+            if period.end > current.end
+        ]
+        rich = [period for period in future if period.financials]
+        self.assertEqual(len(rich), 2)
+        self.assertEqual(rich, future[-2:])
+        self.assertFalse(any(period.spilled for period in future))
+
+        # evicted periods rebuild from stored values
+        self.assertEqual(get_values(model), expected)
+
+
+class cache_spill(SampleModelCase):
+    def test(self):
+        unbounded = make_model()
+        unbounded.time_line.extrapolate()
+        expected = get_values(unbounded)
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            model = make_model()
+            model.period_cache = PeriodCache(
+                budget=2, spill=True, spill_dir=spill_dir
+            )
+            model.time_line.extrapolate()
+
+            # all but the past, current and two most recent periods
+            periods = list(model.time_line.iter_ordered())
+            spilled = [period for period in periods if period.spilled]
+            self.assertEqual(len(spilled), len(periods) - 4)
+            self.assertEqual(spilled[0].past, model.time_line.current_period)
+
+            period = spilled[0]
+            rows = PeriodCache.load(period._spilled)
+            self.assertTrue(rows)
+            self.assertEqual(period._line_items, dict())
+
+            # first access reads the rows back
+            bbid_hex = rows[0]['bbid']
+            self.assertEqual(period.get_line_value(bbid_hex), rows[0]['value'])
+            self.assertFalse(period.spilled)
+
+            self.assertEqual(get_values(model), expected)
+            model.period_cache.close()
+
+            # columnar stores are not spilled
+            model = make_model()
+            model.time_line.use_columnar_storage()
+            model.period_cache = PeriodCache(
+                budget=2, spill=True, spill_dir=spill_dir
+            )
+            model.time_line.extrapolate()
+            self.assertFalse(
+                any(p.spilled for p in model.time_line.iter_ordered())
+            )
+            self.assertEqual(get_values(model), expected)
+
+
+class cache_spill_no_pread(unittest.TestCase):
+    def test(self):
+        cache = PeriodCache(budget=1, spill=True)
+        first = [{'bbid': 'a', 'value': 1.0, 'hardcoded': False}]
+        second = [{'bbid': 'b', 'value': 'x', 'hardcoded': True}]
+
+        no_pread = types.SimpleNamespace(
+            SEEK_END=os.SEEK_END, getpid=os.getpid
+        )
+        with mock.patch.object(period_cache, 'os', no_pread):
+            first_at = cache._write(first)
+            second_at = cache._write(second)
+            self.assertEqual(PeriodCache.load(second_at), second)
+            self.assertEqual(PeriodCache.load(first_at), first)
+
+        # the same file reads the same way with os.pread
+        self.assertEqual(PeriodCache.load(first_at), first)
+        self.assertEqual(first_at[0], second_at[0])
+        self.assertEqual(second_at[1], first_at[2])
+        first_at[0].close()
+
+
+class cache_never_evicts(SampleModelCase):
+    def test(self):
+        model = make_model()
+        model.period_cache = PeriodCache(budget=1)
+        time_line = model.time_line
+        current = time_line.current_period
+        company = model.get_company()
+
+        company.get_financials(current.past)
+        company.get_financials(current)
+        for period in (current.past, current):
+            model.period_cache.touch(period)
+        self.assertEqual(len(model.period_cache._periods), 0)
+        self.assertTrue(current.financials)
+        self.assertTrue(current.past.financials)
+
+        later = time_line[datetime.date(2017, 3, 31)]
+        company.get_financials(current.future)
+        company.get_financials(later)
+        self.assertFalse(current.future.financials)
+        self.assertTrue(later.financials)
+        self.assertTrue(current.financials)
+
+        # no budget, no tracking
+        model.period_cache = PeriodCache()
+        company.get_financials(current.future)
+        model.period_cache.touch(later)
+        self.assertEqual(len(model.period_cache._periods), 0)
+        self.assertTrue(current.future.financials)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_sheet_cache
+"""
+
+Unit tests for data_structures.serializers.chef.sheet_cache
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+cache_hit_matches     Sheets and xl_data from hits match a fresh chop.
+cache_borders_once    Missed sheets get their line borders only once.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import copy
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from openpyxl.cell.cell import Cell
+from openpyxl.worksheet.worksheet import Worksheet
+
+from data_structures.modelling.model import Model
+from data_structures.serializers.chef.cell_styles import CellStyles
+from data_structures.serializers.chef.model_chef import ModelChef
+from data_structures.serializers.chef.sheet_cache import SheetCache
+from data_structures.serializers.chef.sheet_cache import XL_DATA_FIELDS
+from data_structures.serializers.chef.sheet_cache import XL_DATA_PARTS
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import make_model, read_cells
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+def _get_placements(model):
+    """
+
+
+    _get_placements() -> dict
+
+    --``model`` is a chopped model
+
+    Function returns the placement fields of the xl_data of every line in
+    the default time line, with cells and sheets swapped for their titles
+    and coordinates so that two chopped models can be compared.
+    """
+    def describe(value):
+        if isinstance(value, Cell):
+            return value.parent.title, value.coordinate
+        if isinstance(value, Worksheet):
+            return value.title
+        if isinstance(value, list):
+            return [describe(item) for item in value]
+        return value
+
+    result = dict()
+    for unit in model.bu_directory.values():
+        for period in model.time_line.iter_ordered():
+            fins = unit.get_financials(period)
+            for position, statement in enumerate(fins.full_ordered):
+                if not statement:
+                    continue
+                for line in statement.get_full_ordered():
+                    for part in XL_DATA_PARTS:
+                        holder = getattr(line.xl_data, part) if part \
+                            else line.xl_data
+                        fields = vars(holder)
+                        for field in XL_DATA_FIELDS:
+                            key = (unit.name, period.end, position,
+                                   line.name, part, field)
+                            result[key] = describe(fields.get(field))
+
+    return result
+
+
+class _CacheCase(SampleModelCase):
+    def setUp(self):
+        SampleModelCase.setUp(self)
+        model = make_model()
+        for unit in model.bu_directory.values():
+            unit.interview.set_path()
+        model.time_line.extrapolate()
+
+        # loaded copies share bbids, so their sheets share cache keys
+        self.flat = model.to_database()
+
+    def get_model(self):
+        return Model.from_database(copy.deepcopy(self.flat))
+
+
+class cache_hit_matches(_CacheCase):
+    def test(self):
+        cache = SheetCache()
+
+        with tempfile.TemporaryDirectory() as folder:
+            fresh = self.get_model()
+            path = os.path.join(folder, 'fresh.xlsx')
+            ModelChef().chop_model(fresh).save(path)
+            expected = read_cells(path)
+
+            ModelChef().chop_model(self.get_model(), cache=cache)
+            units = len(fresh.bu_directory)
+            self.assertEqual((cache.hits, cache.misses), (0, units))
+            self.assertGreater(cache.key_seconds, 0)
+            self.assertGreater(cache.chop_seconds, 0)
+
+            model = self.get_model()
+            chop_seconds = cache.chop_seconds
+            path = os.path.join(folder, 'cached.xlsx')
+            ModelChef().chop_model(model, cache=cache).save(path)
+            self.assertEqual((cache.hits, cache.misses), (units, units))
+            self.assertEqual(cache.chop_seconds, chop_seconds)
+
+            self.assertEqual(read_cells(path), expected)
+            self.assertEqual(_get_placements(model), _get_placements(fresh))
+
+
+class cache_borders_once(_CacheCase):
+    def test(self):
+        def count_borders(**kwargs):
+            with mock.patch.object(
+                CellStyles, 'format_border_group',
+                wraps=CellStyles.format_border_group,
+            ) as border:
+                book = ModelChef().chop_model(self.get_model(), **kwargs)
+            return border.call_count, book
+
+        expected, book = count_borders(write_only=True)
+        self.assertTrue(expected)
+        self.assertTrue(all(
+            sheet.bb.bordered for sheet in book.worksheets
+            if getattr(sheet, 'bb', None) and sheet.bb.line_directory
+        ))
+
+        cache = SheetCache()
+        for write_only in (True, False):
+            self.assertEqual(
+                count_borders(write_only=write_only, cache=cache)[0],
+                expected,
+            )
+            cache.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_snapshot
+"""
+
+Unit tests for data_structures.modelling.snapshot
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+snapshot_values       Every plain value type reads back as written.
+snapshot_model        Model.from_snapshot() rebuilds the same model values.
+snapshot_truncated    Every truncated snapshot raises ValueError.
+snapshot_corrupt      Flipped bytes give ValueError or a dict, nothing else.
+snapshot_invalid      Bad refs, counts, indices and tags raise ValueError.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import decimal
+import struct
+import unittest
+import uuid
+
+from data_structures.modelling import snapshot
+from data_structures.modelling.model import Model
+from data_structures.modelling.snapshot import SnapshotWriter
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_values, make_model
+
+
+
+
+# Globals
+FLAT_MODEL = {
+    'name': 'sample',
+    'tags': ['a', 'b', 'a'],
+    'timelines': [
+        {
+            'resolution': 'monthly',
+            'periods': [
+                {
+                    'period': datetime.date(2017, 1, 31),
+                    'financials_values': [
+                        {'bbid': 'x', 'value': 1.5, 'value_type': 'float',
+                         'hardcoded': False, 'xl_data': dict()},
+                        {'bbid': 'y', 'value': 7, 'value_type': None,
+                         'hardcoded': True, 'xl_data': {'row': 4}},
+                        {'bbid': 'z', 'value': 'text', 'value_type': 'str',
+                         'hardcoded': False, 'xl_data': dict()},
+                    ],
+                },
+                {
+                    'period': datetime.date(2017, 2, 28),
+                    'financials_values': [
+                        {'bbid': 'x', 'value': None, 'value_type': 'float',
+                         'hardcoded': False, 'xl_data': dict()},
+                        {'bbid': 'y', 'value': True, 'value_type': None,
+                         'hardcoded': False, 'xl_data': dict()},
+                    ],
+                },
+            ],
+        },
+    ],
+}
+
+
+def header():
+    return struct.pack('<4sB', snapshot.MAGIC, snapshot.VERSION)
+
+
+def encode(value):
+    writer = SnapshotWriter()
+    writer.write_value(value)
+
+    return header() + writer.getvalue()
+
+
+# Tests
+class snapshot_values(unittest.TestCase):
+    def test(self):
+        value = {
+            'none': None,
+            'bools': [True, False],
+            'ints': (0, -1, 2 ** 62, -2 ** 80),
+            'floats': [0.5, -1e300],
+            'text': ['é', 'é', ''],
+            'bytes': b'\x00\xff',
+            'dates': [datetime.date(2017, 1, 1),
+                      datetime.datetime(2017, 1, 1, 12, 30)],
+            'uuid': uuid.UUID(int=7),
+            'decimal': decimal.Decimal('1.25'),
+            3: {(1, 2): 'tuple key'},
+        }
+        writer = SnapshotWriter()
+        writer.write_value(value)
+        reader = snapshot.SnapshotReader(writer.getvalue())
+        self.assertEqual(reader.read_value(), value)
+
+        self.assertEqual(snapshot.loads(snapshot.dumps(FLAT_MODEL)),
+                         FLAT_MODEL)
+        with self.assertRaises(TypeError):
+            snapshot.dumps({'bad': object()})
+
+
+class snapshot_model(SampleModelCase):
+    def test(self):
+        model = make_model()
+        model.time_line.extrapolate()
+        for unit in model.bu_directory.values():
+            unit.interview.set_path()
+
+        flat = model.to_database()
+        data = model.to_snapshot()
+        self.assertEqual(snapshot.loads(data), flat)
+
+        result = Model.from_snapshot(data)
+        self.assertEqual(get_values(result), get_values(model))
+
+
+class snapshot_truncated(unittest.TestCase):
+    def test(self):
+        data = snapshot.dumps(FLAT_MODEL)
+        for end in range(len(data)):
+            with self.assertRaises(ValueError):
+                snapshot.loads(data[:end])
+
+        with self.assertRaises(ValueError):
+            snapshot.loads(data + b'N')
+
+
+class snapshot_corrupt(unittest.TestCase):
+    def test(self):
+        data = snapshot.dumps(FLAT_MODEL)
+        for i in range(len(data)):
+            for byte in (0x00, 0x01, 0x7f, 0xff, data[i] ^ 0x01):
+                corrupt = bytearray(data)
+                corrupt[i] = byte
+                try:
+                    result = snapshot.loads(bytes(corrupt))
+                except ValueError:
+                    continue
+                self.assertIsInstance(result, dict)
+
+
+class snapshot_invalid(unittest.TestCase):
+    def test(self):
+        cases = [
+            # unknown tag
+            header() + b'?',
+            # string reference before any string
+            header() + b'r' + struct.pack('<I', 0),
+            # count far larger than the data
+            header() + b'l' + struct.pack('<I', 2 ** 32 - 1),
+            # unhashable dict key
+            header() + b'm\x01\x00\x00\x00' + b'l\x00\x00\x00\x00' + b'N',
+            # bad decimal, bad date and bad big int text
+            header() + b'K' + struct.pack('<I', 3) + b'1.x',
+            header() + b'D' + struct.pack('<I', 0),
+            header() + b'I' + struct.pack('<I', 2) + b'--',
+            # not a model
+            encode([1, 2]),
+            encode({'timelines': 5}),
+            encode({'timelines': [{'periods': [1]}]}),
+            # too deeply nested
+            header() + b'l\x01\x00\x00\x00' * 200 + b'N',
+        ]
+        for data in cases:
+            with self.assertRaises(ValueError):
+                snapshot.loads(data)
+
+        # a line index past the end of the line table
+        data = bytearray(snapshot.dumps(FLAT_MODEL))
+        lines = struct.pack('<III', 0, 1, 2)
+        start = data.index(lines)
+        data[start:start + len(lines)] = struct.pack('<III', 0, 1, 9)
+        with self.assertRaises(ValueError):
+            snapshot.loads(bytes(data))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,243 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_style_registry
+"""
+
+Unit tests for data_structures.serializers.chef.style_registry
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+registry_shares_ids   Equal styles get one table entry and one id per book.
+registry_styles       Ids resolve to the same styles as openpyxl objects.
+registry_border       Single cell borders match assigning Border objects.
+registry_border_group Group outlines match assigning Border objects.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import itertools
+import unittest
+
+import openpyxl as xlio
+
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+from data_structures.serializers.chef.cell_styles import CellStyles
+from data_structures.serializers.chef.style_registry import get_registry
+
+
+
+
+# Globals
+ALL_SIDES = ('top', 'bottom', 'left', 'right')
+GROUPS = [
+    # st_col, ed_col, st_row, ed_row
+    (3, 3, 4, 4),
+    (2, 6, 4, 4),
+    (3, 3, 2, 7),
+    (2, 6, 2, 7),
+    (2, 3, 2, 3),
+]
+
+
+def set_border(cell, keep, *sides, border_style='thin'):
+    """
+
+    set_border() -> None
+
+    Function sets a border on ``cell`` the way chefs did before the style
+    registry: a new Border with the ``keep`` sides of the old one, then
+    ``sides`` drawn in ``border_style``.
+    """
+    old = cell.border
+    border = Border(**{name: getattr(old, name) for name in keep})
+    side = Side(border_style=border_style)
+    for name in sides:
+        setattr(border, name, side)
+    cell.border = border
+
+
+def reference_group(sheet, st_col, ed_col, st_row, ed_row):
+    """
+
+    reference_group() -> None
+
+    Function draws a group outline the way CellStyles.format_border_group()
+    did by assigning Border objects, pass by pass.
+    """
+    cell = lambda c, r: sheet.cell(column=c, row=r)
+
+    for c in range(st_col, ed_col + 1):
+        set_border(cell(c, st_row), ['top'], 'top')
+    for r in range(st_row, ed_row + 1):
+        set_border(cell(st_col, r), ['left'], 'left')
+    for r in range(st_row, ed_row + 1):
+        if st_col != ed_col:
+            set_border(cell(ed_col, r), ['right'], 'right')
+        else:
+            set_border(cell(ed_col, r), ['left', 'right'], 'left', 'right')
+    for c in range(st_col, ed_col + 1):
+        if st_row != ed_row:
+            set_border(cell(c, ed_row), ALL_SIDES, 'bottom')
+        else:
+            set_border(cell(c, ed_row), ALL_SIDES, 'top', 'bottom')
+
+    if st_col != ed_col:
+        set_border(cell(st_col, st_row), ALL_SIDES, 'top', 'left')
+        set_border(cell(ed_col, st_row), ALL_SIDES, 'top', 'right')
+        set_border(cell(st_col, ed_row), ALL_SIDES, 'bottom', 'left')
+        set_border(cell(ed_col, ed_row), ALL_SIDES, 'bottom', 'right')
+    else:
+        set_border(cell(st_col, st_row), ALL_SIDES, 'top', 'left', 'right')
+        set_border(cell(st_col, ed_row), ALL_SIDES, 'bottom', 'left', 'right')
+
+
+def prefill(sheet):
+    """
+
+    prefill() -> None
+
+    Function gives a block of cells mixed existing borders, diagonals and
+    fonts, so tests can see what group borders keep and what they drop.
+    """
+    thick = Side(border_style='thick')
+    for c, r in itertools.product(range(1, 9), range(1, 10)):
+        cell = sheet.cell(column=c, row=r)
+        if (c + r) % 3 == 0:
+            cell.border = Border(top=thick, right=thick)
+        elif (c + r) % 3 == 1:
+            cell.border = Border(bottom=thick, diagonal=thick,
+                                 diagonalUp=True)
+        cell.font = Font(italic=bool(c % 2))
+
+
+def get_borders(sheet):
+    """
+
+    get_borders() -> dict
+
+    Function returns the border sides, diagonal and italic flag of every cell
+    in the block prefill() fills.
+    """
+    result = dict()
+    for c, r in itertools.product(range(1, 9), range(1, 10)):
+        cell = sheet.cell(column=c, row=r)
+        result[c, r] = {name: getattr(cell.border, name).style
+                        for name in ALL_SIDES + ('diagonal',)}
+        result[c, r]['up'] = cell.border.diagonalUp
+        result[c, r]['font'] = cell.font.i
+
+    return result
+
+
+# Tests
+class registry_shares_ids(unittest.TestCase):
+    def test(self):
+        book = xlio.Workbook()
+        sheet = book.active
+        registry = get_registry(sheet.cell(row=1, column=1))
+        self.assertIs(get_registry(book), registry)
+        self.assertIs(get_registry(sheet), registry)
+
+        fonts = len(book._fonts)
+        first = registry.font(bold=True, color='ff0000')
+        self.assertEqual(registry.font(color='ff0000', bold=True), first)
+        self.assertEqual(len(book._fonts), fonts + 1)
+
+        self.assertEqual(registry.fill('ffff00'), registry.fill('ffff00'))
+        self.assertEqual(registry.border('thin', ['top', 'left']),
+                         registry.border('thin', ('left', 'top')))
+
+        # built-in formats keep their id, others follow openpyxl's offset
+        self.assertEqual(registry.number_format('0.00'), 2)
+        custom = registry.number_format('#,##0.0;(#,##0.0)')
+        self.assertGreaterEqual(custom, 164)
+        self.assertEqual(registry.number_format('#,##0.0;(#,##0.0)'), custom)
+
+        # a new book starts its own registry
+        self.assertIsNot(get_registry(xlio.Workbook()), registry)
+
+
+class registry_styles(unittest.TestCase):
+    def test(self):
+        book = xlio.Workbook()
+        sheet = book.active
+        registry = get_registry(book)
+
+        cell = sheet.cell(row=1, column=1)
+        cell.font = Font(italic=True)
+        registry.apply(
+            cell,
+            font=registry.font(bold=True, color='00ff0000'),
+            fill=registry.fill('00ffff00'),
+            alignment=registry.alignment(horizontal='right'),
+            number_format=registry.number_format('#,##0.0;(#,##0.0)'),
+        )
+        self.assertEqual(cell.font, Font(bold=True, color='00ff0000'))
+        self.assertEqual(cell.fill, PatternFill(
+            start_color='00ffff00', end_color='00ffff00', fill_type='solid'
+        ))
+        self.assertEqual(cell.alignment, Alignment(horizontal='right'))
+        self.assertEqual(cell.number_format, '#,##0.0;(#,##0.0)')
+
+        # apply() only touches the slots it is given
+        other = sheet.cell(row=2, column=1)
+        other.number_format = '0%'
+        CellStyles.format_bold(other)
+        self.assertTrue(other.font.b)
+        self.assertEqual(other.number_format, '0%')
+
+
+class registry_border(unittest.TestCase):
+    def test(self):
+        options = list(itertools.product((False, True), repeat=4))
+        old_book = xlio.Workbook()
+        new_book = xlio.Workbook()
+        for book in (old_book, new_book):
+            prefill(book.active)
+
+        for i, flags in enumerate(options):
+            c, r = i % 8 + 1, i // 8 + 1
+            sides = [name for name, on in zip(ALL_SIDES, flags) if on]
+            set_border(old_book.active.cell(column=c, row=r), ALL_SIDES,
+                       *sides, border_style='medium')
+            CellStyles.format_border(
+                new_book.active.cell(column=c, row=r),
+                border_style='medium', **dict(zip(ALL_SIDES, flags))
+            )
+
+        self.assertEqual(get_borders(new_book.active),
+                         get_borders(old_book.active))
+
+
+class registry_border_group(unittest.TestCase):
+    def test(self):
+        for group in GROUPS:
+            old_book = xlio.Workbook()
+            new_book = xlio.Workbook()
+            for book in (old_book, new_book):
+                prefill(book.active)
+
+            reference_group(old_book.active, *group)
+            CellStyles.format_border_group(new_book.active, *group)
+            self.assertEqual(get_borders(new_book.active),
+                             get_borders(old_book.active), group)
+
+            # drawing the same group twice settles on the same borders
+            reference_group(old_book.active, *group)
+            CellStyles.format_border_group(new_book.active, *group)
+            self.assertEqual(get_borders(new_book.active),
+                             get_borders(old_book.active), group)
+
+
+if __name__ == '__main__':
+    unittest.main()
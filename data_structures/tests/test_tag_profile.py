@@ -0,0 +1,164 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_tag_profile
+"""
+
+Unit tests for the profile cache of tools.for_tag_operations
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+profile_cache_hit     Unchanged sources reuse the cached profile, as a copy.
+profile_invalidation  Tag, name, parent, path and model changes rebuild it.
+profile_cache_size    Cache clears once it holds PROFILE_CACHE_SIZE entries.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import unittest
+
+from unittest import mock
+
+from data_structures.modelling.line_item import LineItem
+from data_structures.modelling.statement import Statement
+from data_structures.system.tags import Tags
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, make_model
+from tools import for_tag_operations
+from tools.for_tag_operations import build_combo_profile
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class _ProfileCase(SampleModelCase):
+    def setUp(self):
+        SampleModelCase.setUp(self)
+        self.model = make_model()
+        self.unit = get_unit(self.model, 'north')
+        self.model.target = self.unit
+        for unit in self.model.bu_directory.values():
+            unit.interview.set_path()
+
+        # target sits under a parent line, so its grandparent is a statement
+        self.statement = self.unit.financials.income
+        self.parent = LineItem('parent')
+        self.target = LineItem('target')
+        self.parent.append(self.target)
+        self.statement.append(self.parent)
+
+    def get_fresh(self):
+        # the same profile, built without the cache
+        cache = self.model.profile_cache
+        self.model.profile_cache = None
+        try:
+            return build_combo_profile(self.target, self.model)
+        finally:
+            self.model.profile_cache = cache
+
+    def check(self):
+        result = build_combo_profile(self.target, self.model)
+        self.assertEqual(result, self.get_fresh())
+
+        return result
+
+
+class profile_cache_hit(_ProfileCase):
+    def test(self):
+        first = self.check()
+        self.assertIn('target', first)
+        self.assertIn('parent', first)
+        self.assertIn('income statement', first)
+        self.assertEqual(len(self.model.profile_cache), 1)
+
+        # a hit returns the stored profile, as a new set every time
+        entry = self.model.profile_cache[id(self.target)]
+        marked = entry[:3] + (entry[3] | {'from cache'},)
+        self.model.profile_cache[id(self.target)] = marked
+
+        second = build_combo_profile(self.target, self.model)
+        self.assertIn('from cache', second)
+        self.assertIsNot(second, first)
+
+        second.add('changed by caller')
+        self.assertNotIn('changed by caller',
+                         build_combo_profile(self.target, self.model))
+
+        # profiles are not saved with the model
+        self.assertNotIn('profile_cache', self.model.to_database())
+
+
+class profile_invalidation(_ProfileCase):
+    def test(self):
+        self.check()
+
+        self.target.tags.add('target tag')
+        self.assertIn('target tag', self.check())
+
+        self.target.tags.remove('target tag')
+        self.assertNotIn('target tag', self.check())
+
+        self.target.set_name('renamed')
+        self.assertIn('renamed', self.check())
+
+        self.parent.tags.add('parent tag', field='req')
+        self.assertIn('parent tag', self.check())
+
+        self.statement.tags.add('statement tag')
+        self.assertIn('statement tag', self.check())
+
+        self.unit.stage.path.tags.add('path tag')
+        self.assertIn('path tag', self.check())
+
+        self.model.tags.add('model tag')
+        self.assertIn('model tag', self.check())
+
+        # a replaced Tags object and a replaced path
+        tags = Tags()
+        self.parent.tags._copy_tags_to(tags)
+        tags.set_name('parent')
+        tags.add('new object')
+        self.parent.tags = tags
+        self.assertIn('new object', self.check())
+
+        self.unit.stage.set_path(Statement())
+        self.assertNotIn('path tag', self.check())
+
+        # moving the target to another parent
+        other = LineItem('other parent')
+        self.statement.append(other)
+        self.parent.find_first('renamed', remove=True)
+        other.append(self.target)
+        profile = self.check()
+        self.assertIn('other parent', profile)
+        self.assertNotIn('parent', profile)
+
+
+class profile_cache_size(_ProfileCase):
+    def test(self):
+        lines = [LineItem('line %s' % i) for i in range(3)]
+        for line in lines:
+            self.statement.append(line)
+
+        with mock.patch.object(for_tag_operations, 'PROFILE_CACHE_SIZE', 2):
+            build_combo_profile(lines[0], self.model)
+            build_combo_profile(lines[1], self.model)
+            self.assertEqual(len(self.model.profile_cache), 2)
+
+            build_combo_profile(lines[2], self.model)
+            self.assertEqual(list(self.model.profile_cache), [id(lines[2])])
+
+
+if __name__ == '__main__':
+    unittest.main()
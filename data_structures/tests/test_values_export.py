@@ -0,0 +1,168 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_values_export
+"""
+
+Unit tests for data_structures.serializers.values_export
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+export_matches_lines  Exported rows match LineItem.value of period lines.
+export_csv            CSV output matches the exported rows.
+export_binary         Binary output reads back the same columns and types.
+export_binary_invalid Reading data that is not a values file raises ValueError.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import csv
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from data_structures.serializers import values_export
+from data_structures.serializers.values_export import COLUMNS
+from data_structures.serializers.values_export import ValuesReader
+from data_structures.serializers.values_export import ValuesWriter
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, make_model
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class _ExportCase(SampleModelCase):
+    def setUp(self):
+        SampleModelCase.setUp(self)
+        self.model = make_model()
+        self.model.time_line.extrapolate()
+
+        # a hardcoded line, so the flag column has both values
+        unit = get_unit(self.model, 'north')
+        period = self.model.time_line.current_period
+        line = unit.get_financials(period).income.find_first('cost')
+        line.set_value(-7.0, 'test', override=True)
+        line.set_hardcoded(True)
+
+
+class export_matches_lines(_ExportCase):
+    def test(self):
+        model = self.model
+        rows = list(values_export.iter_values(model))
+
+        expected = dict()
+        for unit in model.bu_directory.values():
+            names = [
+                statement.name if statement else None
+                for statement in unit.financials.full_ordered
+            ]
+            for period in model.time_line.iter_ordered():
+                fins = unit.get_financials(period)
+                for position, statement in enumerate(fins.full_ordered):
+                    if not statement:
+                        continue
+                    for line in statement.get_full_ordered():
+                        key = (unit.id.bbid.hex, names[position],
+                               line.id.bbid.hex, period.end)
+                        expected[key] = (
+                            unit.name, line.name, line.value, line.hardcoded
+                        )
+
+        result = dict()
+        for row in rows:
+            (unit_id, unit_name, statement, line_id, line_name, tags,
+             period, value, hardcoded) = row
+            key = (unit_id, statement, line_id, period)
+            self.assertNotIn(key, result)
+            result[key] = (unit_name, line_name, value, hardcoded)
+
+        self.assertEqual(result, expected)
+        self.assertIn(True, [row[-1] for row in rows])
+        self.assertIn(
+            -7.0, [row[7] for row in rows if row[4] == 'cost']
+        )
+
+
+class export_csv(_ExportCase):
+    def test(self):
+        rows = list(values_export.iter_values(self.model))
+
+        stream = io.StringIO(newline='')
+        count = values_export.write_csv(self.model, stream)
+        self.assertEqual(count, len(rows))
+
+        stream.seek(0)
+        reader = csv.reader(stream)
+        self.assertEqual(tuple(next(reader)), COLUMNS)
+
+        written = list(reader)
+        self.assertEqual(len(written), len(rows))
+        for row, line in zip(rows, written):
+            self.assertEqual(line[:6], list(row[:6]))
+            self.assertEqual(line[6], row[6].isoformat())
+            if row[7] is None:
+                self.assertEqual(line[7], '')
+            else:
+                self.assertEqual(float(line[7]), row[7])
+            self.assertEqual(line[8], '1' if row[8] else '0')
+
+
+class export_binary(_ExportCase):
+    def test(self):
+        expected = values_export.collect_values(self.model)
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'values.bin')
+            count = values_export.write_columns(self.model, path)
+            self.assertEqual(count, len(expected['period']))
+            self.assertEqual(values_export.read_columns(path), expected)
+
+        # every kind of value keeps its type
+        values = [None, 1.5, 2, True, False, 2 ** 60, -2 ** 53, 'text']
+        size = len(values)
+        columns = {name: ['x'] * size for name in COLUMNS}
+        columns['period'] = [datetime.date(2017, 1, 31)] * size
+        columns['value'] = values
+        columns['hardcoded'] = [True, False] * (size // 2)
+
+        writer = ValuesWriter()
+        writer.write_table(columns)
+        result = ValuesReader(writer.getvalue()).read_table()
+
+        self.assertEqual(result, columns)
+        self.assertEqual(
+            [type(value) for value in result['value']],
+            [type(value) for value in values],
+        )
+
+
+class export_binary_invalid(unittest.TestCase):
+    def test(self):
+        columns = {name: list() for name in COLUMNS}
+        writer = ValuesWriter()
+        writer.write_table(columns)
+        data = writer.getvalue()
+        self.assertEqual(ValuesReader(data).read_table(), columns)
+
+        for bad in (b'', b'BB', b'XXXX' + data[4:],
+                    data[:4] + b'\x09' + data[5:]):
+            with self.assertRaises(ValueError):
+                ValuesReader(bad).read_table()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_write_only
+"""
+
+Unit tests for write-only export through ModelChef.chop_model()
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+write_only_parity     Write-only export saves the same cells and styles.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import os
+import tempfile
+import unittest
+
+import openpyxl as xlio
+
+from openpyxl.styles import Font, PatternFill
+
+from data_structures.serializers.chef.model_chef import ModelChef
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import make_model, read_cells
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+class write_only_parity(SampleModelCase):
+    def test(self):
+        # chopping leaves xl data on the model, so export fresh models
+        def chop(**kwargs):
+            model = make_model()
+            model.time_line.extrapolate()
+            return ModelChef().chop_model(model, **kwargs)
+
+        with tempfile.TemporaryDirectory() as folder:
+            base = os.path.join(folder, 'base.xlsx')
+            chop().save(base)
+
+            # mark a few cells of a unit sheet in the base file
+            book = xlio.load_workbook(base)
+            sheet = book['north']
+            marked = [cell for row in sheet.iter_rows(max_row=8)
+                      for cell in row if cell.value is not None]
+            self.assertTrue(marked)
+            for cell in marked:
+                cell.font = Font(italic=True, color='00ff0000')
+                cell.fill = PatternFill('solid', fgColor='00ffff00')
+            book.save(base)
+
+            results = list()
+            for write_only in (False, True):
+                path = os.path.join(folder, '%s.xlsx' % write_only)
+                chop(base_file=base, write_only=write_only).save(path)
+                results.append(read_cells(path))
+
+            full, streamed = results
+            self.assertEqual(streamed, full)
+            for cell in marked:
+                font = full[sheet.title, cell.coordinate][2]
+                self.assertIn('00ff0000', font)
+
+
+if __name__ == '__main__':
+    unittest.main()
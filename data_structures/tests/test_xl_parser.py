@@ -0,0 +1,247 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_xl_parser
+"""
+
+Unit tests for tools.xl_parsing.xl_parser.revise_projections()
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+revise_in_place       In-place revision matches the full rebuild, no new model.
+revise_old_lines      Lines left out of the upload match the full rebuild.
+revise_line_keys      Line keys hold every ancestor, so same names differ.
+revise_falls_back     New lines or statements fall back to the full rebuild.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import datetime
+import io
+import unittest
+
+from unittest import mock
+
+import openpyxl as xlio
+
+from data_structures.modelling.line_item import LineItem
+from data_structures.modelling.model import Model
+from data_structures.modelling.statement import Statement
+from tools.xl_parsing import xl_parser
+
+
+
+
+# Globals
+_HEADER = ['STATEMENT', 'LINE_TITLE', 'LINE_NAME', 'LINE_PARENT_NAME',
+           'PARSE_FORMULA']
+_ROWS = [
+    ('Income Statement', 'Revenue', 'revenue', None),
+    ('Income Statement', 'North', 'north', 'revenue'),
+    ('Income Statement', 'South', 'south', 'revenue'),
+    ('Income Statement', 'Cost', 'cost', None),
+]
+_MONTHS = (1, 2, 3)
+
+# Tests
+def _make_upload(values, rows=_ROWS, actual_months=1):
+    """
+
+
+    _make_upload() -> BytesIO
+
+    --``values`` is a dict of line name : list of values, one per month
+    --``rows`` is a list of (statement, title, name, parent name)
+    --``actual_months`` is the number of leading months that are actuals
+
+    Function returns an upload workbook with a BB Metadata tab covering
+    January to March 2017.
+    """
+    book = xlio.Workbook()
+    sheet = book.active
+    sheet.title = 'bb_metadata'
+
+    dates = [datetime.datetime(2017, month, 28) for month in _MONTHS]
+    sheet.append(_HEADER + dates)
+
+    kinds = ['Actual'] * actual_months
+    kinds += ['Forecast'] * (len(_MONTHS) - actual_months)
+    sheet.append([None] * len(_HEADER) + kinds)
+
+    for row in rows:
+        line_values = values.get(row[2], [None] * len(_MONTHS))
+        sheet.append(list(row) + [None] + list(line_values))
+
+    stream = io.BytesIO()
+    book.save(stream)
+    stream.seek(0)
+    return stream
+
+
+def _get_state(model):
+    """
+
+
+    _get_state() -> dict
+
+    --``model`` is an Engine Model built from uploads
+
+    Function returns the statement settings, and the value and hardcoded
+    flag of every line in the upload months of both time lines, keyed by
+    names. Starting balance sheets are left out, since they hold the ending
+    balance of the period before; the full rebuild starts its time line
+    with an empty period of its own.
+    """
+    ends = [xl_parser._get_month(datetime.date(2017, month, 1))[1]
+            for month in _MONTHS]
+
+    result = dict()
+    company = model.get_company()
+    starting = company.financials.starting.name
+    for statement in company.financials.full_ordered:
+        if statement:
+            result[statement.name] = (statement.visible,
+                                      statement.display_type)
+
+    for name in ('default', 'actual'):
+        time_line = model.get_timeline('monthly', name=name)
+        for period in time_line.iter_ordered():
+            if period.end not in ends:
+                continue
+
+            fins = company.get_financials(period)
+            for statement in fins.full_ordered:
+                if not statement or statement.name == starting:
+                    continue
+                for line in statement.get_full_ordered():
+                    key = (name, period.end, statement.name, line.name)
+                    result[key] = (line.value, line.hardcoded)
+
+    return result
+
+
+class _ReviseCase(unittest.TestCase):
+    def get_model(self, values, rows=_ROWS):
+        upload = _make_upload(values, rows=rows)
+        return xl_parser.add_projections(upload, Model('test'))
+
+    def revise(self, old_values, new_values, old_rows=_ROWS, new_rows=_ROWS):
+        """
+
+        Returns the state of the full rebuild and of the in-place revision
+        of the same old model and upload.
+        """
+        old_model = self.get_model(old_values, rows=old_rows)
+        upload = _make_upload(new_values, rows=new_rows)
+        full = xl_parser.revise_projections(upload, old_model)
+        self.assertIsNot(full, old_model)
+
+        old_model = self.get_model(old_values, rows=old_rows)
+        upload = _make_upload(new_values, rows=new_rows)
+        with mock.patch.object(xl_parser, 'Model') as new_model:
+            result = xl_parser.revise_projections(upload, old_model,
+                                                  in_place=True)
+            self.assertFalse(new_model.called)
+        self.assertIs(result, old_model)
+
+        return _get_state(full), _get_state(result)
+
+
+class revise_in_place(_ReviseCase):
+    def test(self):
+        old_values = {
+            'north': [1, 2, 3], 'south': [4, 5, 6], 'cost': [-1, -1, -1]
+        }
+        # January is an actual, so the old hardcoded value wins there
+        new_values = {
+            'north': [9, 2, 7], 'south': [4, None, 6], 'cost': [-1, -1, -2]
+        }
+
+        full, result = self.revise(old_values, new_values)
+        self.assertEqual(result, full)
+
+        end = datetime.date(2017, 1, 31)
+        key = ('default', end, 'income statement', 'north')
+        self.assertEqual(result[key], (1, True))
+        key = ('default', datetime.date(2017, 2, 28), 'income statement',
+               'south')
+        self.assertEqual(result[key], (None, False))
+        key = ('default', datetime.date(2017, 3, 31), 'income statement',
+               'revenue')
+        self.assertEqual(result[key], (13, False))
+
+
+class revise_old_lines(_ReviseCase):
+    def test(self):
+        old_rows = _ROWS + [('Income Statement', 'Other', 'other', None)]
+        old_values = {
+            'north': [1, 2, 3], 'south': [4, 5, 6], 'cost': [-1, -1, -1],
+            'other': [7, 8, 9],
+        }
+        new_values = {
+            'north': [1, 2, 3], 'south': [4, 5, 6], 'cost': [-1, -1, -2]
+        }
+
+        full, result = self.revise(old_values, new_values, old_rows=old_rows)
+        self.assertEqual(result, full)
+
+        # the actual is kept, the projections are cleared
+        for month, expected in ((1, (7, True)), (2, (None, False)),
+                                (3, (None, False))):
+            end = xl_parser._get_month(datetime.date(2017, month, 1))[1]
+            key = ('default', end, 'income statement', 'other')
+            self.assertEqual(result[key], expected)
+
+
+class revise_line_keys(unittest.TestCase):
+    def test(self):
+        statement = Statement('Income Statement')
+        lines = list()
+        for top in ('east', 'west'):
+            parent = LineItem('stores')
+            line = LineItem('rent')
+            parent.append(line)
+            group = LineItem(top)
+            group.append(parent)
+            statement.append(group)
+            lines.append(line)
+
+        keys = [xl_parser._get_line_key(line) for line in lines]
+        self.assertEqual(keys[0], ('income statement', ('east', 'stores'),
+                                   'rent'))
+        self.assertNotEqual(keys[0], keys[1])
+
+        for line, (name, ancestors, line_name) in zip(lines, keys):
+            self.assertIs(statement.find_first(*ancestors, line_name), line)
+
+
+class revise_falls_back(_ReviseCase):
+    def test(self):
+        values = {'north': [1, 2, 3], 'south': [4, 5, 6], 'cost': [-1, -1, -1]}
+        extra = [
+            [('Income Statement', 'Other', 'other', None)],
+            [('Other Statement', 'Other', 'other', None)],
+        ]
+        for rows in extra:
+            old_model = self.get_model(values)
+            upload = _make_upload(values, rows=_ROWS + rows)
+            result = xl_parser.revise_projections(upload, old_model,
+                                                  in_place=True)
+            self.assertIsNot(result, old_model)
+
+            statement = result.get_company().financials.get_statement(
+                rows[0][0]
+            )
+            self.assertIsNotNone(statement.find_first('other'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: data_structures.tests.test_yenta
+"""
+
+Unit tests for the tag index of flow.yenta.Yenta
+Usage (from one folder up):
+    python -m unittest
+====================  =========================================================
+Test Case             Target
+====================  =========================================================
+index_matches_scan    find_eligible() with the index matches a full scan.
+index_follows_catalog Index rebuilds when topics come and go, clears on
+                      disconnect, and respects ``pool``.
+====================  =========================================================
+"""
+
+
+
+
+# Imports
+import types
+import unittest
+import uuid
+
+from data_structures.system.tags import Tags
+from data_structures.tests.sample_model import SampleModelCase
+from data_structures.tests.sample_model import get_unit, make_model
+from flow.yenta import Yenta
+
+
+
+
+# Globals
+# n/a
+
+# Tests
+def _make_topic(name, optional=(), required=(), prohibited=(),
+                repeatable=False):
+    tags = Tags(name)
+    for tag in optional:
+        tags.add(tag)
+    for tag in required:
+        tags.add(tag, field='req')
+    for tag in prohibited:
+        tags.add(tag, field='prohibited')
+
+    return types.SimpleNamespace(tags=tags, repeatable=repeatable)
+
+
+class _YentaCase(SampleModelCase):
+    def setUp(self):
+        SampleModelCase.setUp(self)
+        self.old_tm = Yenta.TM
+
+        self.model = make_model()
+        unit = get_unit(self.model, 'north')
+        self.model.target = unit
+        unit.interview.set_path()
+        self.target = unit.financials.income.find_first('revenue')
+
+        topics = [
+            _make_topic('revenue', optional=['growth']),
+            _make_topic('sales', optional=['revenue', 'growth']),
+            _make_topic('revenue', required=['missing tag']),
+            _make_topic('revenue', prohibited=['income statement']),
+            _make_topic('cost', optional=['growth']),
+            _make_topic('revenue'),
+            _make_topic('revenue', repeatable=True),
+        ]
+        self.ids = [uuid.UUID(int=i + 1) for i in range(len(topics))]
+        self.catalog = types.SimpleNamespace(
+            by_id=dict(zip(self.ids, topics))
+        )
+
+        # the last two topics are used
+        self.model.target.used.update(self.ids[-2:])
+
+        Yenta.set_topic_manager(
+            types.SimpleNamespace(local_catalog=self.catalog)
+        )
+
+    def tearDown(self):
+        if self.old_tm is None:
+            Yenta.disconnect()
+        else:
+            Yenta.set_topic_manager(self.old_tm)
+        SampleModelCase.tearDown(self)
+
+    def check(self, yenta, **kwargs):
+        # trace=True scans every topic in the pool without the index
+        result = yenta.find_eligible(self.target, self.model, **kwargs)
+        expected = yenta.find_eligible(self.target, self.model, trace=True,
+                                       **kwargs)
+        self.assertEqual(result, expected)
+
+        return result
+
+
+class index_matches_scan(_YentaCase):
+    def test(self):
+        yenta = Yenta()
+        ids = self.ids
+
+        self.assertEqual(Yenta.tag_index['revenue'],
+                         {ids[0], ids[1], ids[2], ids[3], ids[5], ids[6]})
+        self.assertEqual(Yenta.tag_index['sales'], {ids[1]})
+
+        self.assertEqual(self.check(yenta), [ids[0], ids[1], ids[6]])
+
+        # the statement name is only on the combined profile
+        self.assertEqual(self.check(yenta, combined=False),
+                         [ids[0], ids[1], ids[3], ids[6]])
+
+        # target criteria narrow the topics down
+        self.target.tags.add('growth', field='req')
+        self.assertEqual(self.check(yenta), [ids[0], ids[1]])
+
+        self.target.tags.add('no such tag', field='req')
+        self.assertEqual(self.check(yenta), list())
+
+
+class index_follows_catalog(_YentaCase):
+    def test(self):
+        yenta = Yenta()
+        ids = self.ids
+        by_id = self.catalog.by_id
+
+        # new topics are found without an explicit rebuild
+        extra = uuid.UUID(int=100)
+        by_id[extra] = _make_topic('revenue', optional=['new'])
+        self.assertIn(extra, self.check(yenta))
+        self.assertIn(extra, Yenta.tag_index['new'])
+
+        del by_id[ids[0]]
+        self.assertNotIn(ids[0], self.check(yenta))
+        self.assertNotIn(ids[0], Yenta.tag_index['growth'])
+
+        # a pool limits the topics reviewed
+        self.assertEqual(self.check(yenta, pool=[ids[1], ids[4]]), [ids[1]])
+
+        # same size changes need build_index()
+        by_id[ids[0]] = by_id.pop(extra)
+        Yenta.build_index()
+        self.assertEqual(self.check(yenta), [ids[0], ids[1], ids[6]])
+
+        # a new catalog gets its own index
+        Yenta.set_topic_manager(types.SimpleNamespace(
+            local_catalog=types.SimpleNamespace(by_id={extra: by_id[ids[1]]})
+        ))
+        self.assertEqual(self.check(yenta), [extra])
+
+        Yenta.disconnect()
+        self.assertIsNone(Yenta.tag_index)
+        self.assertIsNone(Yenta._indexed)
+
+
+if __name__ == '__main__':
+    unittest.main()
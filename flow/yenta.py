@@ -70,10 +70,12 @@ class Yenta():
 
     DATA:
     scores                dict; topic id k, [raw_score, rel_score] value
+    tag_index             CLASS; dict of tag : set of topic ids with that tag
     TM                    CLASS; pointer to TopicManager w populated catalog
     work                  instance storage for selection work; used for trace
 
     FUNCTION:
+    build_index()         CLASS; index catalog topics by tag
     check_topic_name()    check if topic matches target
     disconnect()          CLASS; set TM to None
     find_eligible()       return a list of 0+ ids for topics w all required tags
@@ -89,6 +91,37 @@ class Yenta():
     # for monitoring topic selection between questions
     diary = []
 
+    tag_index = None
+    _indexed = None
+    # catalog identity and size when tag_index was built
+
+    @classmethod
+    def build_index(cls):
+        """
+
+
+        Yenta.build_index() -> None
+
+
+        **CLASS METHOD**
+
+        Method maps every tag on a catalog topic, including the topic's name,
+        to the set of bbids of topics that carry it. find_eligible() then
+        intersects these sets instead of checking every topic in the catalog.
+        Method runs when the TopicManager is set and again whenever the
+        catalog gains or loses topics.
+        """
+        catalog = cls.TM.local_catalog
+
+        index = dict()
+        for bbid, topic in catalog.by_id.items():
+            topic_tags = topic.tags
+            for tag in topic_tags.all | {topic_tags.name}:
+                index.setdefault(tag, set()).add(bbid)
+
+        cls.tag_index = index
+        cls._indexed = (id(catalog), len(catalog.by_id))
+
     @classmethod
     def disconnect(cls):
         """
@@ -102,6 +135,8 @@ class Yenta():
         Method clears class TopicManager pointer (sets class.TM to None).
         """
         cls.TM = None
+        cls.tag_index = None
+        cls._indexed = None
 
     @classmethod
     def set_topic_manager(cls,new_TM):
@@ -113,9 +148,11 @@ class Yenta():
 
         **CLASS METHOD**
 
-        Method sets class TopicManager pointer to new_TM.
+        Method sets class TopicManager pointer to new_TM and indexes its
+        catalog.
         """
         cls.TM = new_TM
+        cls.build_index()
 
     def __init__(self):
         self.scores = dict()
@@ -214,6 +251,11 @@ class Yenta():
         (2) whether the **target's** tags include each of the tags required by
             topic, if any.
 
+        Method finds the topics that pass (1) by intersecting tag_index entries
+        for each target criterion, and runs the remaining checks on those
+        topics only. With ``trace`` True, method checks every topic in the pool
+        so the trace covers them all.
+
         Eligible topics are those that satisfy both conditions. If ``combined``
         is True, method evaluates condition (2) with respect to target's
         combined profile. In other words, if ``combined`` is True, method will
@@ -239,8 +281,14 @@ class Yenta():
         else:
             targ_profile = build_basic_profile(target)
         #
-        if not pool:
-            pool = self.TM.local_catalog.by_id.keys()
+        if trace:
+            if not pool:
+                pool = self.TM.local_catalog.by_id.keys()
+        else:
+            candidates = self._match_criterion(targ_criterion)
+            if pool:
+                candidates.intersection_update(pool)
+            pool = candidates
         pool = sorted(pool)
         # sort pool into list to maintain stable evaluation order and results
 
@@ -500,6 +548,43 @@ class Yenta():
 
         return winner
 
+    #*************************************************************************#
+    #                          NON-PUBLIC METHODS                             #
+    #*************************************************************************#
+
+    def _match_criterion(self, criterion):
+        """
+
+
+        Yenta._match_criterion(criterion) -> set
+
+
+        Method returns the set of bbids for catalog topics whose tags or name
+        include every tag in ``criterion``. Method rebuilds the class index
+        first if the catalog changed since it was built.
+        """
+        catalog = self.TM.local_catalog
+        if self._indexed != (id(catalog), len(catalog.by_id)):
+            self.build_index()
+
+        index = self.tag_index
+        result = None
+        # start with the rarest tag to keep intermediate sets small
+        for tag in sorted(criterion, key=lambda t: len(index.get(t, ()))):
+            matches = index.get(tag)
+            if not matches:
+                return set()
+
+            if result is None:
+                result = set(matches)
+            else:
+                result &= matches
+
+        if result is None:
+            result = set(catalog.by_id)
+
+        return result
+
 # Connect Yenta class to TopicManager so Yenta can access catalog
 TopicManager.populate()
 Yenta.set_topic_manager(TopicManager)
@@ -15,7 +15,7 @@ Attribute             Description
 ====================  ==========================================================
 
 DATA:
-n/a
+PROFILE_CACHE_SIZE    int; most combined profiles a model keeps
 
 FUNCTIONS:
 build_basic_profile() return a set of target tags, used as simple criteria
@@ -37,7 +37,7 @@ n/a
 
 
 # globals
-# n/a
+PROFILE_CACHE_SIZE = 1000
 
 # functions
 def build_basic_profile(target):
@@ -72,6 +72,11 @@ def build_combo_profile(target, model):
     When target is a LineItem, target's parent will usually be a line or a
     Financials object and its grandparent will usually be a line, Financials
     object, or a BusinessUnit.
+
+    Profiles are cached on model.profile_cache. A cached profile is reused
+    while target, parent, grandparent, path and model carry the same Tags
+    objects at the same versions, so any tag or name change on one of them
+    rebuilds the profile. Function returns a new set every time.
     """
 
     parent_rels = getattr(target, "relationships", None)
@@ -80,29 +85,50 @@ def build_combo_profile(target, model):
     grandpa_rels = getattr(parent, "relationships", None)
     grandpa = getattr(grandpa_rels, "parent", None)
 
+    try:
+        path = model.target.stage.path
+    except AttributeError:
+        path = None
+
     parent_tags = getattr(parent, "tags", None)
+    grandpa_tags = getattr(grandpa, "tags", None)
+    path_tags = getattr(path, "tags", None)
+
+    sources = (target.tags, parent_tags, grandpa_tags, path_tags, model.tags)
+    stamp = tuple(getattr(tags, "version", None) for tags in sources)
+
+    cache = getattr(model, "profile_cache", None)
+    if cache is not None:
+        entry = cache.get(id(target))
+        if entry is not None:
+            cached_target, cached_sources, cached_stamp, profile = entry
+            if cached_target is target and cached_stamp == stamp and all(
+                a is b for a, b in zip(cached_sources, sources)
+            ):
+                return set(profile)
+
     parent_name = getattr(parent_tags, "name", None)
     tags_up_one = getattr(parent_tags, "all", set())
     if parent_name:
          tags_up_one.add(parent_name)
 
-    grandpa_tags = getattr(grandpa, "tags", None)
     grandpa_name = getattr(grandpa_tags, "name", None)
     tags_up_two = getattr(grandpa_tags, "all", set())
     if grandpa_name:
         tags_up_two.add(grandpa_name)
 
-    criteria = target.tags.all | {target.tags.name}
-
-    try:
-        path_tags = model.target.stage.path.tags.all
-    except AttributeError:
-        path_tags = set()
+    tags_on_path = getattr(path_tags, "all", set())
 
-    criteria = criteria | tags_up_one | tags_up_two | path_tags
+    criteria = target.tags.all | {target.tags.name}
+    criteria = criteria | tags_up_one | tags_up_two | tags_on_path
     criteria = criteria | set(model.tags.all) | {model.tags.name}
     criteria = set(c.casefold() for c in criteria if c)
 
+    if cache is not None:
+        if len(cache) >= PROFILE_CACHE_SIZE:
+            cache.clear()
+        cache[id(target)] = (target, sources, stamp, frozenset(criteria))
+
     return criteria
 
 
@@ -0,0 +1,381 @@
+# PROPRIETARY AND CONFIDENTIAL
+# Property of Blackbird Logical Applications, LLC
+# Copyright Blackbird Logical Applications, LLC 2017
+# NOT TO BE CIRCULATED OR REPRODUCED WITHOUT PRIOR WRITTEN APPROVAL
+
+# Blackbird Environment
+# Module: tools.xl_parsing.sheet_reader
+"""
+
+Module reads the BB Metadata tab of an uploaded workbook in one streaming
+pass. The workbook is opened read-only, so other tabs are never parsed, and
+each cell's cached value and formula are taken from the same XML element.
+The result is a compact grid that answers the subset of the openpyxl
+Worksheet interface xl_parser uses.
+====================  ==========================================================
+Attribute             Description
+====================  ==========================================================
+
+DATA:
+n/a
+
+FUNCTIONS:
+find_metadata_title() returns title of the BB Metadata tab in a workbook
+read_metadata_sheet() returns the BB Metadata tab as a StreamedSheet
+
+CLASSES:
+FormulaView           StreamedSheet cells with formulas in place of values
+StreamedCell          one cell of a StreamedSheet
+StreamedSheet         grid of cells read from one worksheet
+====================  ==========================================================
+"""
+
+
+
+
+# Imports
+import bb_exceptions
+import openpyxl as xlio
+
+from openpyxl.cell.read_only import _cast_number
+from openpyxl.cell.text import Text
+from openpyxl.formula.translate import Translator
+from openpyxl.styles import is_date_format
+from openpyxl.styles.numbers import BUILTIN_FORMATS
+from openpyxl.utils import coordinate_to_tuple, get_column_letter
+from openpyxl.utils.datetime import from_excel
+from openpyxl.worksheet.read_only import (
+    CELL_TAG, FORMULA_TAG, INLINE_TAG, ROW_TAG, VALUE_TAG
+)
+from openpyxl.xml.functions import iterparse, safe_iterator
+
+from . import parser_settings as ps
+
+
+
+
+# Constants
+# n/a
+
+# Module Globals
+# n/a
+
+# Functions
+def find_metadata_title(book):
+    """
+
+
+    find_metadata_title() -> str
+
+    --``book`` is an openpyxl Workbook
+
+    Function returns the title of the first tab whose name is one of
+    BB_METADATA_NAMES. Function raises BBAnalyticalError if there is none.
+    """
+    for title in book.sheetnames:
+        if title.casefold() in ps.BB_METADATA_NAMES:
+            return title
+
+    c = "No BB Metadata Tab!"
+    raise bb_exceptions.BBAnalyticalError(c)
+
+
+def read_metadata_sheet(xl_serial):
+    """
+
+
+    read_metadata_sheet() -> StreamedSheet
+
+    --``xl_serial`` is a path or file-like object of an Excel workbook
+
+    Function opens ``xl_serial`` read-only, streams the rows of the BB
+    Metadata tab and closes the workbook.
+    """
+    book = xlio.load_workbook(xl_serial, read_only=True)
+    try:
+        title = find_metadata_title(book)
+        result = StreamedSheet.from_worksheet(book[title])
+    finally:
+        book.close()
+
+    return result
+
+
+# Classes
+class StreamedCell:
+    """
+
+    StreamedCell holds what xl_parser reads from a cell: the cached value, the
+    formula (if any) and the number format.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    col_idx               int; column number, starting at 1
+    coordinate            str; A1-style address
+    formula               str or None; formula with leading "="
+    number_format         str; Excel number format
+    parent                StreamedSheet; sheet holding the cell
+    row                   int; row number, starting at 1
+    value                 obj; cached value of the cell
+
+    FUNCTIONS:
+    n/a
+    ====================  ======================================================
+    """
+    __slots__ = ('parent', 'row', 'col_idx', 'value', 'formula',
+                 'number_format')
+
+    def __init__(self, parent, row, col_idx, value=None, formula=None,
+                 number_format='General'):
+        self.parent = parent
+        self.row = row
+        self.col_idx = col_idx
+        self.value = value
+        self.formula = formula
+        self.number_format = number_format
+
+    @property
+    def coordinate(self):
+        return get_column_letter(self.col_idx) + str(self.row)
+
+
+class StreamedSheet:
+    """
+
+    StreamedSheet is a read-only grid of StreamedCells. Every row is padded
+    to the widest row, as openpyxl pads worksheet rows.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    columns               tuple; tuples of cells, one per column
+    formulas              FormulaView; the same grid with formulas as values
+    max_column            int; number of columns
+    max_row               int; number of rows
+    rows                  list; tuples of cells, one per row
+    title                 str; name of the tab the sheet was read from
+
+    FUNCTIONS:
+    cell()                returns cell by coordinate or row and column
+    from_worksheet()      class method, streams a read-only worksheet
+    iter_rows()           yields rows in a range
+    ====================  ======================================================
+    """
+    def __init__(self, title):
+        self.title = title
+        self.formulas = FormulaView(self)
+        self._rows = list()
+        self.max_column = 0
+
+    @property
+    def columns(self):
+        return tuple(zip(*self._rows))
+
+    @property
+    def max_row(self):
+        return len(self._rows)
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @classmethod
+    def from_worksheet(cls, worksheet):
+        """
+
+
+        StreamedSheet.from_worksheet() -> StreamedSheet
+
+        --``worksheet`` is an openpyxl ReadOnlyWorksheet
+
+        Method parses the sheet XML row by row and discards each element once
+        its cells are stored. Cached values are converted the way openpyxl
+        converts them, dates included. Shared formulas are translated to each
+        cell, as a full workbook load would.
+        """
+        book = worksheet.parent
+        strings = worksheet.shared_strings
+        base_date = book.excel_base_date
+
+        result = cls(worksheet.title)
+        formats = dict()
+        masters = dict()
+        rows = dict()
+
+        row = 0
+        for _event, element in iterparse(worksheet.xml_source, tag=[ROW_TAG]):
+            if element.tag != ROW_TAG:
+                continue
+
+            row = int(element.get('r', row + 1))
+            column = 0
+            for item in safe_iterator(element, CELL_TAG):
+                coordinate = item.get('r')
+                if coordinate:
+                    row, column = coordinate_to_tuple(coordinate)
+                else:
+                    column += 1
+                    coordinate = get_column_letter(column) + str(row)
+
+                style_id = int(item.get('s', 0))
+                if style_id not in formats:
+                    formats[style_id] = cls._get_number_format(book, style_id)
+                number_format = formats[style_id]
+
+                data_type = item.get('t', 'n')
+                # formula cells without a cached result carry an empty <v/>
+                value = item.findtext(VALUE_TAG) or None
+                if value is not None:
+                    if data_type == 'n':
+                        value = _cast_number(value)
+                        if is_date_format(number_format):
+                            value = from_excel(value, base_date)
+                    elif data_type == 'b':
+                        value = bool(int(value))
+                    elif data_type == 's':
+                        value = strings[int(value)]
+                elif data_type == 'inlineStr':
+                    child = item.find(INLINE_TAG)
+                    if child is not None:
+                        value = Text.from_tree(child).content
+
+                formula = None
+                node = item.find(FORMULA_TAG)
+                if node is not None:
+                    formula = "=" + (node.text or "")
+                    if node.get('t') == 'shared':
+                        si = node.get('si')
+                        if si in masters:
+                            formula = masters[si].translate_formula(coordinate)
+                        else:
+                            masters[si] = Translator(formula, coordinate)
+
+                cell = StreamedCell(result, row, column, value, formula,
+                                    number_format)
+                rows.setdefault(row, dict())[column] = cell
+                result.max_column = max(result.max_column, column)
+
+            element.clear()
+
+        width = result.max_column
+        for row in range(1, max(rows, default=0) + 1):
+            cells = rows.pop(row, dict())
+            result._rows.append(tuple(
+                cells.get(column) or StreamedCell(result, row, column)
+                for column in range(1, width + 1)
+            ))
+
+        return result
+
+    def cell(self, coordinate=None, row=None, column=None):
+        """
+
+
+        StreamedSheet.cell() -> StreamedCell
+
+        --``coordinate`` is an A1-style address, "$" allowed
+        --``row`` is a row number, starting at 1
+        --``column`` is a column number, starting at 1
+
+        Method returns the cell at ``coordinate`` or at ``row`` and
+        ``column``. Cells outside the grid come back empty.
+        """
+        if coordinate is not None:
+            row, column = coordinate_to_tuple(coordinate.upper())
+
+        if row <= len(self._rows) and column <= self.max_column:
+            return self._rows[row - 1][column - 1]
+
+        return StreamedCell(self, row, column)
+
+    def iter_rows(self, min_row=None, max_row=None, row_offset=0,
+                  column_offset=0):
+        """
+
+
+        StreamedSheet.iter_rows() -> iter
+
+        --``min_row`` is the first row number, 1 if omitted
+        --``max_row`` is the last row number, last row if omitted
+        --``row_offset`` is added to both row numbers
+        --``column_offset`` is the number of leading columns to skip
+
+        Method yields tuples of cells, one per row, like
+        Worksheet.iter_rows().
+        """
+        first = (min_row or 1) + row_offset
+        last = (max_row or len(self._rows)) + row_offset
+
+        for cells in self._rows[first - 1:last]:
+            yield cells[column_offset:]
+
+    #*************************************************************************#
+    #                          NON-PUBLIC METHODS                             #
+    #*************************************************************************#
+
+    @staticmethod
+    def _get_number_format(book, style_id):
+        """
+
+
+        StreamedSheet._get_number_format() -> str
+
+        --``book`` is the read-only openpyxl Workbook
+        --``style_id`` is the index of a cell style in ``book``
+
+        Method returns the number format of a cell style.
+        """
+        fmt_id = book._cell_styles[style_id].numFmtId
+        if fmt_id < 164:
+            return BUILTIN_FORMATS.get(fmt_id, 'General')
+
+        return book._number_formats[fmt_id - 164]
+
+
+class FormulaView:
+    """
+
+    FormulaView shows a StreamedSheet the way a workbook loaded with
+    data_only=False would: formula cells hold their formula string, other
+    cells their value.
+    ====================  ======================================================
+    Attribute             Description
+    ====================  ======================================================
+
+    DATA:
+    sheet                 StreamedSheet; sheet being viewed
+    title                 str; title of the sheet
+
+    FUNCTIONS:
+    cell()                returns cell by coordinate or row and column
+    ====================  ======================================================
+    """
+    def __init__(self, sheet):
+        self.sheet = sheet
+
+    @property
+    def title(self):
+        return self.sheet.title
+
+    def cell(self, coordinate=None, row=None, column=None):
+        """
+
+
+        FormulaView.cell() -> StreamedCell
+
+        --``coordinate`` is an A1-style address, "$" allowed
+        --``row`` is a row number, starting at 1
+        --``column`` is a column number, starting at 1
+
+        Method returns a copy of the sheet cell with the formula, if any, as
+        its value.
+        """
+        cell = self.sheet.cell(coordinate, row=row, column=column)
+        if cell.formula is None:
+            return cell
+
+        return StreamedCell(self, cell.row, cell.col_idx, cell.formula,
+                            cell.formula, cell.number_format)
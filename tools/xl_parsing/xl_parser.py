@@ -17,10 +17,13 @@ DATA:
 
 FUNCTIONS:
 add_projections()          creates a EngineModel with projections values from xl
+revise_projections()       replaces projections of a model, keeps actuals
+                           or merges only the changes into it in place
 
 _build_fins_from_sheet()    builds LineItem structure
 build_sheet_maps()     checks if upload xl projections is the right format
 _populate_fins_from_sheet() writes projected line values to financials
+_read_sheet_values()        reads those values without a model
 
 
 CLASSES:
@@ -35,10 +38,12 @@ import bb_settings
 import bb_exceptions
 import openpyxl as xlio
 import json
+import re
 
 from data_structures.modelling.model import Model
 from data_structures.modelling.business_unit import BusinessUnit
 from data_structures.modelling.line_item import LineItem
+from data_structures.modelling.parameters import Parameters
 from data_structures.modelling.statement import Statement
 from data_structures.modelling.time_line import TimeLine
 from data_structures.modelling.time_period import TimePeriod
@@ -46,13 +51,26 @@ from data_structures.modelling.time_period import TimePeriod
 from formula_manager import local_catalog as FC
 from datetime import datetime, date, timedelta
 from openpyxl.formula import Tokenizer
+from openpyxl.utils import column_index_from_string
 from . import sheet_map
+from . import sheet_reader
 from . import parser_settings as ps
 
 
 
 
-def add_projections(xl_serial, engine_model):
+# Constants
+_CELL_REF = re.compile(
+    r'("(?:[^"]|"")*")'
+    r'|(?<![A-Za-z0-9_.$])(\$?)([A-Za-z]{1,3})(\$?)([0-9]+)(?![A-Za-z0-9_.(])'
+)
+# A quoted string, left as is, or an A1 cell reference with optional "$"
+# markers; not part of a longer name or a function call like "LOG10(".
+
+
+
+
+def add_projections(xl_serial, engine_model, streaming=True):
     """
 
 
@@ -60,6 +78,7 @@ def add_projections(xl_serial, engine_model):
 
     --``xl_serial``     serialized string of an Excel workbook (".xlsx")
     --``engine_model``  instance of Engine Model
+    --``streaming``     bool; read the BB Metadata tab in one read-only pass
 
     Function takes a serialized Excel workbook in a specific format
     and converts it to an EngineModel with LineItem values. Model input will
@@ -74,34 +93,14 @@ def add_projections(xl_serial, engine_model):
     model = engine_model
 
     # 1) Extract xl_serial. Make sure it is in the right format
-    wb = xlio.load_workbook(xl_serial, data_only=True)  # Includes Values Only
-    wb_f = xlio.load_workbook(xl_serial, data_only=False)  # Includes Formulas
-
-    # For testing local excel files:
-    # filename = r"C:\Workbooks\Forecast_Rimini8.xlsx"
-    # wb = xlio.load_workbook(filename=filename, data_only=True)
-
-    # Look for the BB Metadata tab
-    metadata_names = ps.BB_METADATA_NAMES
-
-    bb_tabname = None
-    for tab in wb:
-        if tab.title.casefold() in metadata_names:
-            bb_tabname = tab.title
-            break
-    if not bb_tabname:
-        c = "No BB Metadata Tab!"
-        raise bb_exceptions.BBAnalyticalError(c)
-
-    sheet = wb[bb_tabname]
-    sheet_f = wb_f[bb_tabname]
+    sheet, sheet_f = _load_metadata_sheets(xl_serial, streaming)
 
     # Make sure sheet is valid format
     sm = build_sheet_map(sheet)
 
     # 2) Align model.time_line to ref_date. Add additional periods as needed
-    sheet_rows = [r for r in sheet.rows]
-    header_row = sheet_rows[sm.rows["HEADER"]-1]
+    header_row = next(sheet.iter_rows(min_row=sm.rows["HEADER"],
+                                      max_row=sm.rows["HEADER"]))
     xl_dates = []
     for cell in header_row[sm.cols["FIRST_PERIOD"]-1:]:
         if isinstance(cell.value, datetime):
@@ -138,7 +137,7 @@ def add_projections(xl_serial, engine_model):
     return model
 
 
-def revise_projections(xl_serial, old_model):
+def revise_projections(xl_serial, old_model, streaming=True, in_place=False):
     """
 
 
@@ -146,47 +145,54 @@ def revise_projections(xl_serial, old_model):
 
     --``xl_serial``     serialized string of an Excel workbook (".xlsx")
     --``old_model``     old instance of Engine Model
+    --``streaming``     bool; read the BB Metadata tab in one read-only pass
+    --``in_place``      bool; merge only what changed into ``old_model``
 
     Function revises projection values while keeping existing actuals values
     Function takes a serialized Excel workbook in a specific format
     and converts it to an EngineModel with LineItem values. 
 
+    If ``in_place`` is True and the upload adds no lines, statements or path
+    lines, function reads the upload into a unit outside any model and
+    compares it with ``old_model`` directly; no model, time line or period
+    financials are built for the upload. Function writes only the changed
+    values, drivers and parameters into ``old_model``, marks the company
+    dirty from the first changed period and returns ``old_model``. Callers
+    can then run recalculate_dirty(). Any structural change falls back to
+    building and returning a new model. See _merge_revision() for how the
+    result differs from the full rebuild.
+
     Function delegates to:
         build_sheet_maps()
         _build_fins_from_sheet()
         _populate_fins_from_sheet()
+        _match_structure(), _read_sheet_values() and _merge_revision() if
+        ``in_place`` is True
 
     """
-    new_model = Model(bb_settings.DEFAULT_MODEL_NAME)
-    new_model.start()
-    new_model._ref_date = old_model._ref_date
-
     # 1) Extract xl_serial. Make sure it is in the right format
-    wb = xlio.load_workbook(xl_serial, data_only=True)  # Includes Values Only
-    wb_f = xlio.load_workbook(xl_serial, data_only=False)  # Includes Formulas
-
-    # For testing local excel files:
-    # filename = r"C:\Workbooks\Forecast_Rimini8.xlsx"
-    # wb = xlio.load_workbook(filename=filename, data_only=True)
-
-    # Look for the BB Metadata tab
-    metadata_names = ps.BB_METADATA_NAMES
-
-    bb_tabname = None
-    for tab in wb:
-        if tab.title.casefold() in metadata_names:
-            bb_tabname = tab.title
-            break
-    if not bb_tabname:
-        c = "No BB Metadata Tab!"
-        raise bb_exceptions.BBAnalyticalError(c)
-
-    sheet = wb[bb_tabname]
-    sheet_f = wb_f[bb_tabname]
+    sheet, sheet_f = _load_metadata_sheets(xl_serial, streaming)
 
     # Make sure sheet is valid format
     sm = build_sheet_map(sheet)
 
+    old_bu = old_model.get_company()
+    if in_place and old_bu is not None:
+        # 2) Determine Line Structure from Excel upload, outside any model
+        upload_bu = BusinessUnit(old_bu.name)
+        _build_fins_from_sheet(upload_bu, sheet, sm)
+
+        pairs = _match_structure(old_bu, upload_bu)
+        if pairs is not None:
+            # 3) Apply only the differences to the old model
+            upload = _read_sheet_values(upload_bu, sheet, sheet_f, sm)
+            _merge_revision(old_model, upload_bu, pairs, upload)
+            return old_model
+
+    new_model = Model(bb_settings.DEFAULT_MODEL_NAME)
+    new_model.start()
+    new_model._ref_date = old_model._ref_date
+
     company = new_model.get_company()
     if not company:
         company = BusinessUnit(new_model.name)
@@ -220,7 +226,7 @@ def build_sheet_map(sheet):
 
     build_sheet_map(sheet) -> SheetMap()
 
-    --``sheet`` is an instance of openpyxl.WorkSheets
+    --``sheet`` is an instance of openpyxl.WorkSheets or StreamedSheet
 
     Function checks if the uploaded excel sheet is in the right format.
     Raises Error if format is violated. Function also finds and sets the Column
@@ -232,8 +238,8 @@ def build_sheet_map(sheet):
     sm.rows["TIMELINE"] = 2  # "Actual" or "Forecast"
     sm.rows["FIRST_DATA"] = 3  # First row with LineItem data
 
-    sheet_rows = [r for r in sheet.rows]
-    header_row = sheet_rows[sm.rows["HEADER"]-1]
+    header_row = next(sheet.iter_rows(min_row=sm.rows["HEADER"],
+                                      max_row=sm.rows["HEADER"]))
 
     # Next few columns can be in any order
     for cell in header_row:
@@ -275,6 +281,40 @@ def build_sheet_map(sheet):
     return sm
 
 
+def _load_metadata_sheets(xl_serial, streaming):
+    """
+
+
+    _load_metadata_sheets(xl_serial, streaming) -> tuple
+
+    --``xl_serial``     serialized string of an Excel workbook (".xlsx")
+    --``streaming``     bool; read the BB Metadata tab in one read-only pass
+
+    Function returns the BB Metadata tab twice, once with cached values and
+    once with formulas as strings. In streaming mode both come from a single
+    read-only pass over that tab, see sheet_reader. Otherwise the workbook is
+    loaded in full for values and again for formulas.
+    """
+    if streaming:
+        sheet = sheet_reader.read_metadata_sheet(xl_serial)
+        return sheet, sheet.formulas
+
+    wb = xlio.load_workbook(xl_serial, data_only=True)  # Includes Values Only
+    wb_f = xlio.load_workbook(xl_serial, data_only=False)  # Includes Formulas
+
+    # For testing local excel files:
+    # filename = r"C:\Workbooks\Forecast_Rimini8.xlsx"
+    # wb = xlio.load_workbook(filename=filename, data_only=True)
+
+    # Look for the BB Metadata tab
+    bb_tabname = sheet_reader.find_metadata_title(wb)
+
+    sheet = wb[bb_tabname]
+    sheet_f = wb_f[bb_tabname]
+
+    return sheet, sheet_f
+
+
 def _build_fins_from_sheet(bu, sheet, sm):
     """
 
@@ -559,6 +599,326 @@ def _combine_fins_structure(old_model, new_model):
             last_position = new_line.position
 
 
+def _get_line_key(line):
+    """
+
+
+    _get_line_key(line) -> tuple
+
+    --``line`` is a LineItem on a statement
+
+    Function returns (statement name, ancestor names, line name), with the
+    names of every parent line from the top of the statement down, so that
+    lines with the same name and parent name under different grandparents
+    get different keys. statement.find_first(*ancestors, line name) finds
+    the line again. Statement names are casefolded.
+    """
+    ancestors = list()
+    parent = line.relationships.parent
+    while isinstance(parent, LineItem):
+        ancestors.insert(0, parent.name)
+        parent = parent.relationships.parent
+
+    return (parent.name.casefold().strip(), tuple(ancestors), line.name)
+
+
+def _match_structure(old_bu, new_bu):
+    """
+
+
+    _match_structure(old_bu, new_bu) -> list or None
+
+    --``old_bu``        company of the old Engine Model
+    --``new_bu``        Business Unit built from the upload
+
+    Function returns a list of (old line, new line) pairs, one per line of
+    the upload, if the upload fits the structure of ``old_bu``. Function
+    returns None if the upload adds a statement, line or path line, changes
+    the order of statements or lines, or changes sum_details or tags of a
+    line. Those need the full rebuild.
+    """
+    old_fins = old_bu.financials
+    new_fins = new_bu.financials
+    if old_fins.full_order != new_fins.full_order:
+        return None
+
+    old_path = set()
+    if old_bu.stage.path is not None:
+        old_path = {line.name for line in old_bu.stage.path.get_full_ordered()}
+    if new_bu.stage.path is not None:
+        for line in new_bu.stage.path.get_full_ordered():
+            if line.name not in old_path:
+                return None
+
+    old_lines = dict()
+    old_order = list()
+    for old_stmt in old_fins.full_ordered:
+        if old_stmt:
+            for line in old_stmt.get_full_ordered():
+                key = _get_line_key(line)
+                old_lines[key] = line
+                old_order.append(key)
+
+    result = list()
+    for new_stmt in new_fins.full_ordered:
+        if not new_stmt:
+            continue
+
+        for new_line in new_stmt.get_full_ordered():
+            old_line = old_lines.get(_get_line_key(new_line))
+            if old_line is None:
+                return None
+            if old_line.sum_details != new_line.sum_details:
+                return None
+            if old_line.tags.all != new_line.tags.all:
+                return None
+
+            result.append((old_line, new_line))
+
+    # lines from the old model alone may sit anywhere in between
+    new_order = [_get_line_key(new_line) for old_line, new_line in result]
+    known = set(new_order)
+    if [key for key in old_order if key in known] != new_order:
+        return None
+
+    return result
+
+
+def _merge_revision(old_model, new_bu, pairs, upload):
+    """
+
+
+    _merge_revision(old_model, new_bu, pairs, upload) -> None
+
+    --``old_model``     old instance of Engine Model
+    --``new_bu``        Business Unit built from the upload, outside any model
+    --``pairs``         list of (old line, new line) from _match_structure()
+    --``upload``        dict from _read_sheet_values()
+
+    Function brings ``old_model`` to the state a full revision would produce,
+    touching only what differs. Line settings, statement display types and
+    visibility, drivers, time line and period parameters, and hardcoded
+    values are compared one by one. Hardcoded actuals already in
+    ``old_model`` win over the upload, as in _populate_old_actuals(). Lines
+    the upload leaves out lose their other hardcoded values in the periods
+    the upload covers, since the full revision copies them without values.
+    Every change marks the company dirty on old_model.dependencies from the
+    period it applies to.
+
+    Unlike the full revision, periods the upload does not cover are left as
+    they are, with their values, instead of being dropped.
+    """
+    old_bu = old_model.get_company()
+    tracker = old_model.dependencies
+    bu_id = old_bu.id.bbid
+
+    # Statement and line settings do not change values
+    for new_stmt in new_bu.financials.full_ordered:
+        if not new_stmt:
+            continue
+        old_stmt = old_bu.financials.get_statement(new_stmt.name)
+        if old_stmt.display_type != new_stmt.display_type:
+            old_stmt.display_type = new_stmt.display_type
+        if old_stmt.visible != new_stmt.visible:
+            old_stmt.visible = new_stmt.visible
+        if new_stmt.compute and not old_stmt.compute:
+            old_stmt.compute = True
+            tracker.mark_unit(bu_id)
+
+    for old_line, new_line in pairs:
+        if old_line.title != new_line.title:
+            old_line.set_title(new_line.title)
+
+        if new_line.usage.to_database() != old_line.usage.to_database():
+            old_line.usage = new_line.usage.copy()
+
+        new_format = new_line.xl_format
+        if new_format.number_format and not old_line.xl_format.number_format:
+            old_line.xl_format.number_format = new_format.number_format
+        old_line.xl_format.blank_row_after = new_format.blank_row_after
+
+        spec = upload["drivers"].get(id(new_line))
+        _merge_driver(old_model, old_line, spec)
+
+    # Values
+    old_actl_tl = old_model.get_timeline('monthly', name='actual')
+    if not old_actl_tl:
+        old_actl_tl = TimeLine(old_model)
+        old_model.set_timeline(old_actl_tl, resolution='monthly',
+                               name='actual')
+
+    # Lines the upload leaves out, with no new line. Starting balance sheets
+    # hold the ending balance of the period before, so they are left alone.
+    lines = list(pairs)
+    paired = {old_line.id.bbid for old_line, new_line in pairs}
+    old_fins = old_bu.financials
+    for old_stmt in old_fins.full_ordered:
+        if not old_stmt or old_stmt is old_fins.starting:
+            continue
+        for old_line in old_stmt.get_full_ordered():
+            if old_line.id.bbid not in paired:
+                lines.append((old_line, None))
+
+    kept = dict()
+    for old_pd in old_actl_tl.iter_ordered():
+        for old_line, new_line in lines:
+            bbid_hex = old_line.id.bbid.hex
+            if old_pd.get_line_hc(bbid_hex):
+                kept[(old_pd.end, bbid_hex)] = old_pd.get_line_value(bbid_hex)
+
+    for name in ('default', 'actual'):
+        old_tl = old_model.get_timeline('monthly', name=name)
+
+        for key, value in upload["parameters"][name].items():
+            if key not in old_tl.parameters or old_tl.parameters[key] != value:
+                old_tl.parameters.add({key: value}, overwrite=True)
+                tracker.mark_parameter(key)
+
+        periods = upload["periods"][name]
+        ends = set(periods)
+        ends.update(end for end, bbid_hex in kept)
+
+        for end in sorted(ends):
+            old_pd = old_tl.find_period(end)
+            if not old_pd:
+                start = periods.get(end) or old_actl_tl.find_period(end).start
+                old_pd = TimePeriod(start_date=start,
+                                    end_date=end,
+                                    model=old_model)
+                old_tl.add_period(old_pd)
+                tracker.mark_unit(bu_id, start=end)
+
+            new_params = upload["period_parameters"].get((name, end), dict())
+            for key, value in new_params.items():
+                known = old_pd.parameters
+                if key not in known or known[key] != value:
+                    known.add({key: value}, overwrite=True)
+                    tracker.mark_parameter(key, start=end)
+
+            hardcoded = upload["values"].get((name, end))
+            _merge_period_values(old_bu, old_pd, hardcoded, lines, kept)
+
+
+def _merge_driver(old_model, old_line, spec):
+    """
+
+
+    _merge_driver(old_model, old_line, spec) -> None
+
+    --``old_model``     old instance of Engine Model
+    --``old_line``      LineItem on the SSOT financials of ``old_model``
+    --``spec``          (driver name, data, formula) the upload gives the
+                        line, or None
+
+    Function gives ``old_line`` the driver described by ``spec``, or removes
+    its driver if ``spec`` is None. An existing driver with the same name
+    keeps its id and gets the new parameters in place. If its formula
+    changed, it is replaced, since the formula determines the driver's id.
+    Drivers that change mark their units dirty.
+    """
+    tracker = old_model.dependencies
+    bu_id = old_model.get_company().id.bbid
+
+    old_driver = old_line.get_driver()
+
+    if spec is None:
+        if old_driver is not None:
+            old_line.remove_driver()
+            tracker.mark_unit(bu_id)
+        return
+
+    dr_name, data, formula = spec
+    if old_driver is not None:
+        # Drivers store their names stripped and casefolded, see Tags
+        if all([old_driver.name == dr_name.strip().casefold(),
+                old_driver.parameters == data,
+                old_driver.formula_bbid == formula.id.bbid,
+                old_driver.run_on_past is False]):
+            return
+
+    driver = old_model.drivers.get_by_name(dr_name.casefold())
+    if driver is not None:
+        if driver.formula_bbid != formula.id.bbid:
+            tracker.mark_driver(driver.id.bbid)
+            old_model.drivers.remove(driver.id.bbid)
+            driver = None
+        elif not all([driver.parameters == data,
+                      driver.run_on_past is False]):
+            driver.parameters.clear()
+            driver.parameters.add(data, overwrite=True)
+            driver.run_on_past = False
+            tracker.mark_driver(driver.id.bbid)
+
+    if driver is None:
+        driver = old_model.drivers.get_or_create(dr_name, data, formula)
+
+    old_line.assign_driver(driver.id.bbid)
+    tracker.mark_unit(bu_id)
+
+
+def _merge_period_values(old_bu, old_pd, hardcoded, lines, kept):
+    """
+
+
+    _merge_period_values(old_bu, old_pd, hardcoded, lines, kept) -> None
+
+    --``old_bu``        company of the old Engine Model
+    --``old_pd``        TimePeriod of the old Engine Model
+    --``hardcoded``     dict of new line id : (value, cell address) for the
+                        period with the same end in the upload, or None if
+                        the upload does not cover the period
+    --``lines``         list of (old line, new line or None)
+    --``kept``          dict of (period end, old line bbid hex) : value of
+                        hardcoded actuals to keep
+
+    Function compares stored values and hardcoded flags, and builds the
+    financials of ``old_pd`` only if something differs. Lines hardcoded in
+    the upload get its value and cell reference. Other hardcoded lines are
+    cleared for recalculation. Lines in ``kept`` keep the old actual.
+    """
+    end = old_pd.end
+    changes = list()
+
+    for old_line, new_line in lines:
+        old_hex = old_line.id.bbid.hex
+        current = (old_pd.get_line_value(old_hex), old_pd.get_line_hc(old_hex))
+
+        if (end, old_hex) in kept:
+            wanted = (kept[(end, old_hex)], True)
+            source = None
+        elif hardcoded is None:
+            continue
+        elif id(new_line) in hardcoded:
+            value, source = hardcoded[id(new_line)]
+            wanted = (value, True)
+        elif current[1]:
+            wanted = (None, False)
+            source = None
+        else:
+            continue
+
+        if wanted != current:
+            changes.append((old_line, wanted, source))
+
+    if not changes:
+        return
+
+    old_fins = old_bu.get_financials(old_pd)
+    for old_line, (value, hardcoded), source in changes:
+        stmt_name, ancestors, line_name = _get_line_key(old_line)
+        statement = old_fins.get_statement(stmt_name)
+        line = statement.find_first(*ancestors, line_name)
+
+        line.set_hardcoded(hardcoded)
+        line.set_value(value, "uploaded projections", override=True)
+
+        if source is not None:
+            line.xl_data.set_ref_direct_source(source)
+
+    old_bu.relationships.model.dependencies.mark_unit(old_bu.id.bbid,
+                                                      start=end)
+
+
 def _populate_old_actuals(old_model, new_model):
     """
 
@@ -639,18 +999,14 @@ def _populate_fins_from_sheet(engine_model, sheet, sheet_f, sm):
     proj_tl = model.get_timeline('monthly', name='default')
     actl_tl = model.get_timeline('monthly', name='actual')
     ssot_fins = bu.financials
+    shapes = dict()  # formula shape : compiled tokens, see _parse_formula()
 
     # Loop across periods (Left to Right on Excel)
     sheet_columns = [c for c in sheet.columns]
     for col in sheet_columns[sm.cols["FIRST_PERIOD"]-1:]:
         dt = col[0].value.date()
         timeline_name = col[sm.rows["TIMELINE"]-1].value
-
-        start_dt = date(dt.year, dt.month, 1)
-        end_dt = date(dt.year, dt.month, 28)
-        while end_dt.month == start_dt.month:
-            end_dt += timedelta(1)
-        end_dt -= timedelta(1)
+        start_dt, end_dt = _get_month(dt)
 
         # Always add a proj_pd regardless of if something is forecast or actual
         proj_pd = proj_tl.find_period(dt)
@@ -671,23 +1027,13 @@ def _populate_fins_from_sheet(engine_model, sheet, sheet_f, sm):
 
         # Loop across Lines (Top to Down on Excel)
         for cell in col[sm.rows["FIRST_DATA"]-1:]:
-            # Skip blank cells
-            if cell.value in (None, ""):
-                behavior_str = ''
-                if sm.cols[ps.BEHAVIOR]:
-                    behavior_str = sheet.cell(row=cell.row,
-                                               column=sm.cols[ps.BEHAVIOR]).value
-
-                if not behavior_str:
-                    continue
+            if _skip_cell(sheet, cell, sm):
+                continue
 
             row_num = cell.row
             col_num = cell.col_idx
 
             statement_str = sheet.cell(row=row_num, column=sm.cols[ps.STATEMENT]).value
-            if not statement_str:
-                continue
-
             statement_name = statement_str.casefold().strip()
             line_name = sheet.cell(row=row_num, column=sm.cols[ps.LINE_NAME]).value
             parent_name = sheet.cell(row=row_num, column=sm.cols[ps.PARENT_NAME]).value
@@ -713,68 +1059,21 @@ def _populate_fins_from_sheet(engine_model, sheet, sheet_f, sm):
             proj_fins = bu.get_financials(proj_pd)
             proj_stmt = proj_fins.get_statement(statement_name)
 
-            # Always match number formats
+            # Always match number formats, status and behavior
             ssot_stmt = ssot_fins.get_statement(statement_name)
             ssot_line = ssot_stmt.find_first(line_name)
 
-            if cell.number_format and not ssot_line.xl_format.number_format:
-                ssot_line.xl_format.number_format = cell.number_format
-
-            # Status column
-            if sm.cols[ps.STATUS]:
-                status_cell = sheet.cell(row=row_num, column=sm.cols[ps.STATUS])
-                status_str = status_cell.value
-
-                if status_str:
-                    try:
-                        status_dict = json.loads(status_str)
-                    except ValueError:
-                        c = "Invalid JSON String: " + status_str
-                        raise bb_exceptions.BBAnalyticalError(c)
-
-                    required_keys = {"style"}
-                    missing_keys = required_keys - status_dict.keys()
-                    if len(missing_keys) > 0:
-                        c = "Missing Keys: " + missing_keys
-                        raise bb_exceptions.BBAnalyticalError(c)
-
-                    # If a key is "0.8", turn it into 0.8
-                    for key in status_dict:
-                        try:
-                            float(key)
-                        except ValueError:
-                            continue
-                        else:
-                            status_value = status_dict.pop(key)
-                            status_dict[float(key)] = status_value
-
-                    ssot_line.usage.status_rules = status_dict
-
-                if ssot_line.usage.status_rules and ssot_stmt.display_type == \
-                        ssot_stmt.REGULAR_TYPE:
-                    ssot_stmt.display_type = ssot_stmt.KPI_TYPE
-
-            # Behaviour column
-            if sm.cols[ps.BEHAVIOR]:
-                behavior_cell = sheet.cell(row=row_num,
-                                           column=sm.cols[ps.BEHAVIOR])
-                behavior_str = behavior_cell.value
-
-                limits_str = None
-                if sm.cols[ps.LIMITS]:
-                    limits_cell = sheet.cell(row=row_num,
-                                             column=sm.cols[ps.LIMITS])
-                    limits_str = limits_cell.value
-
-                if behavior_str:
-                    _set_behavior(behavior_str, limits_str, ssot_stmt,
-                                  ssot_line, model)
-                    continue  # Don't parse or hardcode line if behavior exists
+            has_behavior, spec = _set_line_settings(sheet, cell, sm,
+                                                    ssot_stmt, ssot_line)
+            if has_behavior:
+                if spec and not ssot_line.get_driver():
+                    _assign_driver(model, ssot_line, spec)
+                continue  # Don't parse or hardcode line if behavior exists
 
             # Look to see if Formula should be automatically imported
             cell_f = sheet_f.cell(row=row_num, column=col_num)
 
-            can_parse = _parse_formula(sheet, cell_f, bu, sm)
+            can_parse = _parse_formula(sheet, cell_f, bu, sm, shapes)
 
             # Otherwise, set the lowest level lines to a hardcoded value
             if can_parse is False:
@@ -784,24 +1083,286 @@ def _populate_fins_from_sheet(engine_model, sheet, sheet_f, sm):
                 if _check_truthy(timeline_name, others=["actual"]):
                     _populate_line_from_cell(cell, line_name, parent_name, actl_stmt)
 
-            if ssot_line.usage.status_rules and ssot_stmt.display_type == \
-                    ssot_stmt.REGULAR_TYPE:
-                ssot_stmt.display_type = ssot_stmt.KPI_TYPE
 
+def _read_sheet_values(bu, sheet, sheet_f, sm):
+    """
+
+
+    _read_sheet_values(bu, sheet, sheet_f, sm) -> dict
+
+    --``bu`` is a Business Unit outside any model, from _build_fins_from_sheet()
+    --``sheet`` is an instance of openpyxl.WorkSheet with Values
+    --``sheet_f`` is an instance of openpyxl.WorkSheet with Formulas as str
+    --``sm`` is an instance of SheetMap
 
-def _set_behavior(behavior_str, limits_str, statement, line, model):
+    Function reads the period columns of 'sheet' the way
+    _populate_fins_from_sheet() does, without time lines, periods or period
+    financials. Number formats, status and behavior go on the SSOT lines of
+    ``bu``. Function returns a dict of:
+
+    "periods"               time line name : {period end : period start}
+    "parameters"            time line name : Parameters
+    "period_parameters"     (time line name, period end) : Parameters
+    "values"                (time line name, period end) : {line id :
+                            (value, cell address)} of hardcoded values, with
+                            an entry for every period in the upload
+    "drivers"               line id : (driver name, data, formula) of the
+                            first driver the upload gives the line
+
+    Time line names are "default" and "actual", as in the model. Line ids
+    are id() of SSOT lines of ``bu``, since lines outside a model have no
+    bbids.
     """
+    ssot_fins = bu.financials
+    shapes = dict()  # formula shape : compiled tokens, see _parse_formula()
+
+    result = dict()
+    result["periods"] = {"default": dict(), "actual": dict()}
+    result["parameters"] = {"default": Parameters(), "actual": Parameters()}
+    result["period_parameters"] = dict()
+    result["values"] = dict()
+    result["drivers"] = dict()
+    drivers = result["drivers"]
+
+    # Loop across periods (Left to Right on Excel)
+    sheet_columns = [c for c in sheet.columns]
+    for col in sheet_columns[sm.cols["FIRST_PERIOD"]-1:]:
+        dt = col[0].value.date()
+        timeline_name = col[sm.rows["TIMELINE"]-1].value
+        start_dt, end_dt = _get_month(dt)
+
+        # Always a projected period, an actual one for actual columns
+        is_actual = _check_truthy(timeline_name, others=["actual"])
+        for name in ("default", "actual"):
+            periods = result["periods"][name]
+            if end_dt in periods or (name == "actual" and not is_actual):
+                continue
+            periods[end_dt] = start_dt
+            result["period_parameters"][(name, end_dt)] = Parameters()
+            result["values"][(name, end_dt)] = dict()
+
+        param_keys = [("default", end_dt)]
+        if end_dt in result["periods"]["actual"]:
+            param_keys.append(("actual", end_dt))
+
+        value_keys = [("default", end_dt)]
+        if is_actual:
+            value_keys.append(("actual", end_dt))
+
+        # Loop across Lines (Top to Down on Excel)
+        for cell in col[sm.rows["FIRST_DATA"]-1:]:
+            if _skip_cell(sheet, cell, sm):
+                continue
+
+            row_num = cell.row
+            col_num = cell.col_idx
+
+            statement_str = sheet.cell(row=row_num,
+                                       column=sm.cols[ps.STATEMENT]).value
+            statement_name = statement_str.casefold().strip()
+            line_name = sheet.cell(row=row_num,
+                                   column=sm.cols[ps.LINE_NAME]).value
+            parent_name = sheet.cell(row=row_num,
+                                     column=sm.cols[ps.PARENT_NAME]).value
+
+            # Handle rows where we just want to add a parameter value
+            if statement_name in ("parameters", "parameter"):
+                if parent_name in ("Timeline", "timeline"):
+                    if cell.value is not None:
+                        for name in ("actual", "default"):
+                            params = result["parameters"][name]
+                            params.add({line_name: cell.value})
+                else:
+                    for key in param_keys:
+                        params = result["period_parameters"][key]
+                        params.add({line_name: cell.value})
+                continue
+
+            # Always match number formats, status and behavior
+            ssot_stmt = ssot_fins.get_statement(statement_name)
+            ssot_line = ssot_stmt.find_first(line_name)
+
+            has_behavior, spec = _set_line_settings(sheet, cell, sm,
+                                                    ssot_stmt, ssot_line)
+            if has_behavior:
+                if spec and id(ssot_line) not in drivers:
+                    drivers[id(ssot_line)] = spec
+                continue  # Don't parse or hardcode line if behavior exists
+
+            # Look to see if Formula should be automatically imported
+            cell_f = sheet_f.cell(row=row_num, column=col_num)
+
+            found = _read_formula(sheet, cell_f, ssot_fins, sm, shapes)
+            if found is not None:
+                line, tokens = found
+                if id(line) not in drivers:
+                    drivers[id(line)] = _get_formula_driver(sheet, cell_f,
+                                                            sm, tokens)
+                continue
 
+            # Otherwise, keep the hardcoded value of the lowest level lines
+            line = _get_cell_line(cell, line_name, parent_name, ssot_stmt)
+            if line is not None:
+                address = "'" + cell.parent.title + "'!" + cell.coordinate
+                for key in value_keys:
+                    result["values"][key][id(line)] = (cell.value, address)
 
-    _set_behavior(sheet, cell_f, bu) -> bool
+    return result
+
+
+def _get_month(dt):
+    """
+
+
+    _get_month(dt) -> tuple
+
+    --``dt`` is a date
+
+    Function returns the first and last day of the month of ``dt``.
+    """
+    start_dt = date(dt.year, dt.month, 1)
+    end_dt = date(dt.year, dt.month, 28)
+    while end_dt.month == start_dt.month:
+        end_dt += timedelta(1)
+    end_dt -= timedelta(1)
+
+    return start_dt, end_dt
+
+
+def _skip_cell(sheet, cell, sm):
+    """
+
+
+    _skip_cell(sheet, cell, sm) -> bool
+
+    --``sheet`` is an instance of openpyxl.WorkSheet with Values
+    --``cell`` is an instance of openpyxl.Cell in a period column
+    --``sm`` is an instance of SheetMap
+
+    Function returns True for blank cells on rows without a behavior, and
+    for rows without a statement.
+    """
+    # Skip blank cells
+    if cell.value in (None, ""):
+        behavior_str = ''
+        if sm.cols[ps.BEHAVIOR]:
+            behavior_str = sheet.cell(row=cell.row,
+                                      column=sm.cols[ps.BEHAVIOR]).value
+
+        if not behavior_str:
+            return True
+
+    statement_str = sheet.cell(row=cell.row, column=sm.cols[ps.STATEMENT]).value
+
+    return not statement_str
+
+
+def _set_line_settings(sheet, cell, sm, statement, line):
+    """
+
+
+    _set_line_settings(sheet, cell, sm, statement, line) -> tuple
+
+    --``sheet`` is an instance of openpyxl.WorkSheet with Values
+    --``cell`` is an instance of openpyxl.Cell in a period column
+    --``sm`` is an instance of SheetMap
+    --``statement`` is the SSOT Statement of the row
+    --``line`` is the SSOT LineItem of the row
+
+    Function copies the number format of ``cell`` and the status and
+    behavior columns of its row onto ``line`` and ``statement``. Function
+    returns (has behavior, driver spec), see _read_behavior() for the spec.
+    Rows with a behavior are not parsed or hardcoded.
+    """
+    row_num = cell.row
+
+    if cell.number_format and not line.xl_format.number_format:
+        line.xl_format.number_format = cell.number_format
+
+    # Status column
+    if sm.cols[ps.STATUS]:
+        status_cell = sheet.cell(row=row_num, column=sm.cols[ps.STATUS])
+        status_str = status_cell.value
+
+        if status_str:
+            line.usage.status_rules = _read_status(status_str)
+
+    if line.usage.status_rules and statement.display_type == \
+            statement.REGULAR_TYPE:
+        statement.display_type = statement.KPI_TYPE
+
+    # Behaviour column
+    if sm.cols[ps.BEHAVIOR]:
+        behavior_cell = sheet.cell(row=row_num, column=sm.cols[ps.BEHAVIOR])
+        behavior_str = behavior_cell.value
+
+        limits_str = None
+        if sm.cols[ps.LIMITS]:
+            limits_cell = sheet.cell(row=row_num, column=sm.cols[ps.LIMITS])
+            limits_str = limits_cell.value
+
+        if behavior_str:
+            spec = _read_behavior(behavior_str, limits_str, statement, line)
+            return True, spec
+
+    return False, None
+
+
+def _read_status(status_str):
+    """
+
+
+    _read_status(status_str) -> dict
+
+    --``status_str`` is string representing a JSON dict
+
+    Function returns the status rules in ``status_str``, with numeric keys
+    like "0.8" turned into floats.
+    """
+    try:
+        status_dict = json.loads(status_str)
+    except ValueError:
+        c = "Invalid JSON String: " + status_str
+        raise bb_exceptions.BBAnalyticalError(c)
+
+    if not isinstance(status_dict, dict):
+        c = "Status must be a JSON dict: " + status_str
+        raise bb_exceptions.BBAnalyticalError(c)
+
+    required_keys = {"style"}
+    missing_keys = required_keys - status_dict.keys()
+    if len(missing_keys) > 0:
+        c = "Missing Keys: %s" % sorted(missing_keys)
+        raise bb_exceptions.BBAnalyticalError(c)
+
+    # If a key is "0.8", turn it into 0.8
+    for key in list(status_dict):
+        try:
+            float(key)
+        except ValueError:
+            continue
+        else:
+            status_value = status_dict.pop(key)
+            status_dict[float(key)] = status_value
+
+    return status_dict
+
+
+def _read_behavior(behavior_str, limits_str, statement, line):
+    """
+
+
+    _read_behavior(behavior_str, limits_str, statement, line) -> tuple or None
 
     --``behavior_str`` is string representing a JSON dict
     --``limits_str`` is string representing of a list of 2 item lists
+    --``statement`` is the Statement that holds ``line``
     --``line`` is the instance of LineItem which we want to add behavior
-    --``model`` is an instance of EngineModel    
 
-    Function takes a behavior and and limits string and figures out a formula
-    and driver to attach to the line.
+    Function takes a behavior and and limits string, stores them on the
+    usage of ``line`` and figures out a formula and driver for the line.
+    Function returns (driver name, data, formula), or None if the behavior
+    lacks data the formula requires.
     """
 
     try:
@@ -845,18 +1406,37 @@ def _set_behavior(behavior_str, limits_str, statement, line, model):
 
     required_keys = formula.required_data
 
-    if len(required_keys - behavior_dict.keys()) == 0:
-        if not line.get_driver():
-            data = dict()
-            data.update(behavior_dict)  # Same key names
+    if len(required_keys - behavior_dict.keys()) != 0:
+        return None
+
+    data = dict()
+    data.update(behavior_dict)  # Same key names
+
+    parent_name = line.relationships.parent.name
+    dr_name = (parent_name or "") + ">" + line.name
+
+    return dr_name, data, formula
+
+
+def _assign_driver(model, line, spec):
+    """
+
+
+    _assign_driver(model, line, spec) -> None
+
+    --``model`` is an instance of EngineModel
+    --``line`` is the instance of LineItem which gets the driver
+    --``spec`` is (driver name, data, formula)
 
-            parent_name = line.relationships.parent.name
-            dr_name = (parent_name or "") + ">" + line.name
-            driver = model.drivers.get_or_create(dr_name, data, formula)
-            line.assign_driver(driver.id.bbid)
+    Function gets or creates the driver in ``spec`` on ``model`` and assigns
+    it to ``line``.
+    """
+    dr_name, data, formula = spec
+    driver = model.drivers.get_or_create(dr_name, data, formula)
+    line.assign_driver(driver.id.bbid)
 
 
-def _parse_formula(sheet, cell_f, bu, sm):
+def _parse_formula(sheet, cell_f, bu, sm, shapes=None):
     """
 
 
@@ -865,32 +1445,64 @@ def _parse_formula(sheet, cell_f, bu, sm):
     --``sheet`` is an instance of openpyxl.WorkSheet with Values
     --``cell_f`` is an instance of openpyxl.Cell with Formulas as str
     --``bu`` is the instance of EngineModel.BusinessUnit
-    --``sm`` is an instance of SheetMap    
+    --``sm`` is an instance of SheetMap
+    --``shapes`` is an optional dict of formula shape : compiled tokens
 
     Function takes a formula string from excel and creates a driver that will
     provide the same value in the Blackbird Engine. Function returns False if
     it was not able to parse the formula and True if the driver was added.
+
+    Formulas are compiled once per shape (see _get_formula_shape()), so the
+    same relative formula copied across period columns is tokenized once per
+    upload when callers share ``shapes``.
     """
-    f_id = FC.by_name["custom formula from tokens."]
-    formula = FC.issue(f_id)
+    found = _read_formula(sheet, cell_f, bu.financials, sm, shapes)
+    if found is None:
+        return False
+
+    line, tokens = found
+
+    # if col == sm.cols["FIRST_PERIOD"]:  # Only insert drivers in first column
+    if not line.get_driver():
+        spec = _get_formula_driver(sheet, cell_f, sm, tokens)
+        _assign_driver(bu.relationships.model, line, spec)
+
+    return True
+
+
+def _read_formula(sheet, cell_f, financials, sm, shapes=None):
+    """
+
+
+    _read_formula(sheet, cell_f, financials, sm) -> tuple or None
+
+    --``sheet`` is an instance of openpyxl.WorkSheet with Values
+    --``cell_f`` is an instance of openpyxl.Cell with Formulas as str
+    --``financials`` is the SSOT Financials holding the line of the row
+    --``sm`` is an instance of SheetMap
+    --``shapes`` is an optional dict of formula shape : compiled tokens
 
+    Function returns (line, tokens) if the row of ``cell_f`` asks for its
+    formula to be imported and the Engine can reproduce it, see
+    _compile_formula() for tokens. Function returns None otherwise.
+    """
     row = cell_f.row
     col = cell_f.col_idx
 
     cell = sheet.cell(row=row, column=col)  # data only cell
     if cell.value is None:
-        return False
+        return None
 
     parse_formula_bool_cell = sheet.cell(row=row, column=sm.cols[ps.PARSE_FORMULA])
     if not _check_truthy(parse_formula_bool_cell.value):
-        return False
+        return None
 
     line_name = sheet.cell(row=row, column=sm.cols[ps.LINE_NAME]).value
     parent_name = sheet.cell(row=row, column=sm.cols[ps.PARENT_NAME]).value
     stmt_name = sheet.cell(row=row, column=sm.cols[ps.STATEMENT]).value
 
     stmt_str = stmt_name.casefold().strip()
-    statement = bu.financials.get_statement(stmt_str)
+    statement = financials.get_statement(stmt_str)
 
     ancestors = [line_name]
     if parent_name:
@@ -899,126 +1511,233 @@ def _parse_formula(sheet, cell_f, bu, sm):
 
     if not line:
         print("No line found!", ancestors)
-        return False
+        return None
 
     formula_str = cell_f.value
 
     if not isinstance(formula_str, str):
-        return False
-    elif "!" in formula_str:
-        return False  # Don't include other tabs "=Sheet2!A1"
+        return None
+
+    if shapes is None or not formula_str.startswith("="):
+        tokens = _compile_formula(formula_str, row, col)
     else:
-        tok = Tokenizer(formula_str)
-
-        for t in tok.items:
-            if t.type == "FUNC" and t.subtype in ("OPEN", "CLOSE"):
-                # # print(t.value)
-                if t.value in ("IF(", "MAX(", "MIN(", "ROUND(", ")"):
-                    # Allow simple functions like "=MAX(A1,B1)"
-                    pass
-                else:
-                    # Don't include all other functions like "=SUM(A1)"
-                    return False
-            if ":" in t.value and t.subtype == "RANGE":
-                return False  # Don't include ranged sources "A1:A8"
+        shape = _get_formula_shape(formula_str, row, col)
+        if shape not in shapes:
+            shapes[shape] = _compile_formula(formula_str, row, col)
+        tokens = shapes[shape]
 
-    # if col == sm.cols["FIRST_PERIOD"]:  # Only insert drivers in first column
-    if not line.get_driver():
-        data = dict()
-
-        i = 0
-        for t in tok.items:
-            i += 1
-
-            t_name = "token%02d" % i  # token01, token02, ... token99
-            t_type = t_name + "_type"
-            t_fixed_dt = t_name + "_fixed_date"
-            t_rel_pd = t_name + "_relative_pd"
-
-            # # print("Token Attr:", t_name, t.value, t.type, t.subtype)
-
-            if t.type == "OPERAND" and t.subtype == "NUMBER":  # "100"
-                data[t_name] = t.value
-                data[t_type] = "constant"
-
-            elif t.type == "OPERAND" and t.subtype == "LOGICAL":  # "TRUE"
-                if t.value == "TRUE":
-                    data[t_name] = True
-                elif t.value == "FALSE":
-                    data[t_name] = False
-                # data[t_name] = t.value.title()  # "FALSE" -> "False"
-                data[t_type] = "constant"
-
-            elif t.type == "OPERAND" and t.subtype == "TEXT":  # "EBITDA < 0"
-                # t.value might be '"EBITDA<="', we just want "EBITDA<="
-                if t.value[1:-1] in ps.ALLOWABLE_XL_TEXT:
-                    data[t_name] = t.value
-                else:
-                    data[t_name] = ""
-
-                data[t_type] = "constant"
-
-            elif t.type == "OPERAND" and t.subtype == "RANGE":  # "A1"
-                source_addr = t.value
-                source_cell = sheet.cell(source_addr)
-                source_row = source_cell.row
-                source_col = source_cell.col_idx
-
-                source_line_name = sheet.cell(row=source_row,
-                                              column=sm.cols[ps.LINE_NAME]).value
-                source_statement = sheet.cell(row=source_row,
-                                              column=sm.cols[ps.STATEMENT]).value
-                source_statement = source_statement.casefold().strip()
-                data[t_name] = source_line_name
-                data[t_type] = "source"
-                data[t_name + "_statement"] = source_statement
-                if source_addr[0] == "$":
-                    # Fixed Dates (source is always same column)
-                    data[t_fixed_dt] = sheet.cell(row=sm.rows["DATES"],
-                                                  column=source_col).value
-                elif source_col != cell_f.col_idx:
-                    # Relative Periods (n periods past or future)
-                    data[t_rel_pd] = source_col - cell_f.col_idx
-
-            elif t.type == "OPERATOR-INFIX":  # +, -, *, /, =
-                if t.value == "=":
-                    # Equality comparisons are "=" in Excel and "==" in Python
-                    data[t_name] = t.value = "=="
-                else:
-                    data[t_name] = t.value
-                data[t_type] = "operator"
+    if tokens is None:
+        return None
 
-            elif t.type == "OPERATOR-PREFIX":  # 1st character +, -, *, /, =
-                data[t_name] = t.value
-                data[t_type] = "operator"
+    return line, tokens
 
-            elif t.type == "PAREN":  # "(" or ")"
-                data[t_name] = t.value
-                data[t_type] = "operator"
 
-            elif t.type == "FUNC":
-                if t.value in ("MAX(", "MIN(", "ROUND("):
-                    # Excel functions same as lower case Python functions
-                    data[t_name] = t.value.casefold()
-                else:
-                    # Excel functions require a custom Python function ie "IF()"
-                    data[t_name] = t.value
-                data[t_type] = "operator"
-
-            elif t.type == "SEP" and t.subtype == "ARG":
-                data[t_name] = t.value.casefold()
-                data[t_type] = "operator"
-
-        model = bu.relationships.model
-        dr_name = stmt_name + '>' + (parent_name or "") + ">" + line_name
-        driver = model.drivers.get_or_create(
-            dr_name,
-            data,
-            formula
-        )
-        line.assign_driver(driver.id.bbid)
+def _get_formula_driver(sheet, cell_f, sm, tokens):
+    """
 
-    return True
+
+    _get_formula_driver(sheet, cell_f, sm, tokens) -> tuple
+
+    --``sheet`` is an instance of openpyxl.WorkSheet with Values
+    --``cell_f`` is an instance of openpyxl.Cell with Formulas as str
+    --``sm`` is an instance of SheetMap
+    --``tokens`` is the tuple from _compile_formula() for ``cell_f``
+
+    Function returns (driver name, data, formula) for a driver that will
+    provide the same value as ``cell_f`` in the Blackbird Engine.
+    """
+    row = cell_f.row
+    col = cell_f.col_idx
+
+    line_name = sheet.cell(row=row, column=sm.cols[ps.LINE_NAME]).value
+    parent_name = sheet.cell(row=row, column=sm.cols[ps.PARENT_NAME]).value
+    stmt_name = sheet.cell(row=row, column=sm.cols[ps.STATEMENT]).value
+
+    data = dict()
+
+    i = 0
+    for t_value, t_type_, t_subtype, ref in tokens:
+        i += 1
+
+        t_name = "token%02d" % i  # token01, token02, ... token99
+        t_type = t_name + "_type"
+        t_fixed_dt = t_name + "_fixed_date"
+        t_rel_pd = t_name + "_relative_pd"
+
+        # # print("Token Attr:", t_name, t_value, t_type_, t_subtype)
+
+        if t_type_ == "OPERAND" and t_subtype == "NUMBER":  # "100"
+            data[t_name] = t_value
+            data[t_type] = "constant"
+
+        elif t_type_ == "OPERAND" and t_subtype == "LOGICAL":  # "TRUE"
+            if t_value == "TRUE":
+                data[t_name] = True
+            elif t_value == "FALSE":
+                data[t_name] = False
+            # data[t_name] = t_value.title()  # "FALSE" -> "False"
+            data[t_type] = "constant"
+
+        elif t_type_ == "OPERAND" and t_subtype == "TEXT":  # "EBITDA < 0"
+            # t_value might be '"EBITDA<="', we just want "EBITDA<="
+            if t_value[1:-1] in ps.ALLOWABLE_XL_TEXT:
+                data[t_name] = t_value
+            else:
+                data[t_name] = ""
+
+            data[t_type] = "constant"
+
+        elif t_type_ == "OPERAND" and t_subtype == "RANGE":  # "A1"
+            row_fixed, source_row, col_fixed, source_col = ref
+            if not row_fixed:
+                source_row += row
+            if not col_fixed:
+                source_col += col
+
+            source_line_name = sheet.cell(row=source_row,
+                                          column=sm.cols[ps.LINE_NAME]).value
+            source_statement = sheet.cell(row=source_row,
+                                          column=sm.cols[ps.STATEMENT]).value
+            source_statement = source_statement.casefold().strip()
+            data[t_name] = source_line_name
+            data[t_type] = "source"
+            data[t_name + "_statement"] = source_statement
+            if col_fixed:
+                # Fixed Dates (source is always same column)
+                data[t_fixed_dt] = sheet.cell(row=sm.rows["DATES"],
+                                              column=source_col).value
+            elif source_col != col:
+                # Relative Periods (n periods past or future)
+                data[t_rel_pd] = source_col - col
+
+        elif t_type_ == "OPERATOR-INFIX":  # +, -, *, /, =
+            if t_value == "=":
+                # Equality comparisons are "=" in Excel and "==" in Python
+                data[t_name] = "=="
+            else:
+                data[t_name] = t_value
+            data[t_type] = "operator"
+
+        elif t_type_ == "OPERATOR-PREFIX":  # 1st character +, -, *, /, =
+            data[t_name] = t_value
+            data[t_type] = "operator"
+
+        elif t_type_ == "PAREN":  # "(" or ")"
+            data[t_name] = t_value
+            data[t_type] = "operator"
+
+        elif t_type_ == "FUNC":
+            if t_value in ("MAX(", "MIN(", "ROUND("):
+                # Excel functions same as lower case Python functions
+                data[t_name] = t_value.casefold()
+            else:
+                # Excel functions require a custom Python function ie "IF()"
+                data[t_name] = t_value
+            data[t_type] = "operator"
+
+        elif t_type_ == "SEP" and t_subtype == "ARG":
+            data[t_name] = t_value.casefold()
+            data[t_type] = "operator"
+
+    f_id = FC.by_name["custom formula from tokens."]
+    formula = FC.issue(f_id)
+
+    dr_name = stmt_name + '>' + (parent_name or "") + ">" + line_name
+
+    return dr_name, data, formula
+
+
+def _compile_formula(formula_str, row, col):
+    """
+
+
+    _compile_formula(formula_str, row, col) -> tuple or None
+
+    --``formula_str`` is a formula string from a cell, with leading "="
+    --``row`` is the row number of the cell holding the formula
+    --``col`` is the column number of the cell holding the formula
+
+    Function tokenizes ``formula_str`` and returns a tuple of (value, type,
+    subtype, ref) tuples, one per token. For cell references, ref is a tuple
+    of (row fixed, row, column fixed, column), with relative parts stored as
+    offsets from the formula cell. Function returns None if the formula uses
+    other tabs, ranges or functions the Engine cannot reproduce.
+    """
+    if "!" in formula_str:
+        return None  # Don't include other tabs "=Sheet2!A1"
+
+    tok = Tokenizer(formula_str)
+
+    result = list()
+    for t in tok.items:
+        if t.type == "FUNC" and t.subtype in ("OPEN", "CLOSE"):
+            # # print(t.value)
+            if t.value in ("IF(", "MAX(", "MIN(", "ROUND(", ")"):
+                # Allow simple functions like "=MAX(A1,B1)"
+                pass
+            else:
+                # Don't include all other functions like "=SUM(A1)"
+                return None
+        if ":" in t.value and t.subtype == "RANGE":
+            return None  # Don't include ranged sources "A1:A8"
+
+        ref = None
+        if t.type == "OPERAND" and t.subtype == "RANGE":
+            match = _CELL_REF.fullmatch(t.value)
+            if not match or match.group(1):
+                return None  # Named ranges and other non-cell sources
+
+            col_fixed = bool(match.group(2))
+            source_col = column_index_from_string(match.group(3).upper())
+            row_fixed = bool(match.group(4))
+            source_row = int(match.group(5))
+
+            if not row_fixed:
+                source_row -= row
+            if not col_fixed:
+                source_col -= col
+            ref = (row_fixed, source_row, col_fixed, source_col)
+
+        result.append((t.value, t.type, t.subtype, ref))
+
+    return tuple(result)
+
+
+def _get_formula_shape(formula_str, row, col):
+    """
+
+
+    _get_formula_shape(formula_str, row, col) -> str
+
+    --``formula_str`` is a formula string from a cell
+    --``row`` is the row number of the cell holding the formula
+    --``col`` is the column number of the cell holding the formula
+
+    Function returns ``formula_str`` with every cell reference written in
+    R1C1 style, relative parts as offsets from the formula cell. "=C5*2" in
+    D5 and "=D5*2" in E5 share the shape "=R[0]C[-1]*2". Text in quotes is
+    left alone.
+    """
+    def replace(match):
+        if match.group(1):
+            return match.group(1)
+
+        source_col = column_index_from_string(match.group(3).upper())
+        source_row = int(match.group(5))
+
+        if match.group(4):
+            row_part = "R%d" % source_row
+        else:
+            row_part = "R[%d]" % (source_row - row)
+
+        if match.group(2):
+            col_part = "C%d" % source_col
+        else:
+            col_part = "C[%d]" % (source_col - col)
+
+        return row_part + col_part
+
+    return _CELL_REF.sub(replace, formula_str)
 
 
 def _populate_line_from_cell(cell, line_name, parent_name, statement):
@@ -1034,10 +1753,37 @@ def _populate_line_from_cell(cell, line_name, parent_name, statement):
 
     Function writes a hardcoded line value to a statement
     """
-    value = cell.value
-    if value is None:
+    line = _get_cell_line(cell, line_name, parent_name, statement)
+    if line is None:
         return
 
+    line.set_value(cell.value, "uploaded projections", override=True)
+    line.set_hardcoded(True)
+
+    # If the line is a hardcoded value, set a direct reference in excel
+    sheet = cell.parent
+    full_address = "'" + sheet.title + "'!" + cell.coordinate
+    line.xl_data.set_ref_direct_source(full_address)
+
+
+def _get_cell_line(cell, line_name, parent_name, statement):
+    """
+
+
+    _get_cell_line(cell, line_name, parent_name, statement) -> LineItem
+
+    --``cell``        Cell() instance from Openpyxl
+    --``line_name``   string, name of LineItem we want to write to
+    --``parent_name`` string or None, name of its parent line
+    --``statement``   Statement() instance
+
+    Function returns the line on ``statement`` that takes the value of
+    ``cell`` as a hardcoded value, or None if the cell is empty, the line is
+    missing or the line sums its details.
+    """
+    if cell.value is None:
+        return None
+
     parent = statement.find_first(parent_name or "")
     if parent:
         line = parent.find_first(line_name)
@@ -1046,14 +1792,9 @@ def _populate_line_from_cell(cell, line_name, parent_name, statement):
 
     if line is None:
         print(line_name, parent_name)
+        return None
 
     if line._details and line.sum_details:
-        pass
-    else:
-        line.set_value(value, "uploaded projections", override=True)
-        line.set_hardcoded(True)
+        return None
 
-        # If the line is a hardcoded value, set a direct reference in excel
-        sheet = cell.parent
-        full_address = "'" + sheet.title + "'!" + cell.coordinate
-        line.xl_data.set_ref_direct_source(full_address)
+    return line